@@ -1,9 +1,47 @@
 # HealAPI package
+#
+# Submodules are loaded on first attribute access (PEP 562), so `import healapi`
+# does not pull in YAML, astor, sqlite3, asyncio or the LLM clients up front.
 
-from . import cli
-from . import diff_engine
-from . import healing_engine
-from . import openapi_typo_linter
-from . import report_generator
-from . import test_analyzer
-from . import test_runner
+import importlib
+
+__all__ = [
+    "async_runner",
+    "batch",
+    "benchmark",
+    "cli",
+    "diff_engine",
+    "healing_engine",
+    "latency",
+    "llm_backends",
+    "llm_budget",
+    "llm_stream",
+    "llm_stub",
+    "mock_server",
+    "openapi_typo_linter",
+    "patching",
+    "pipeline",
+    "postman_runner",
+    "profiling",
+    "report_generator",
+    "report_stream",
+    "report_writer",
+    "result_cache",
+    "run_history",
+    "scaffold",
+    "script_rewriter",
+    "server",
+    "spec_source",
+    "synthetic",
+    "test_analyzer",
+    "test_runner",
+    "watch",
+]
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
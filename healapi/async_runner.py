@@ -0,0 +1,288 @@
+import ssl
+import socket
+import json
+import time
+import asyncio
+import logging
+from urllib.parse import urlsplit
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from healapi.postman_runner import (ReportBuilder, ResponseView, build_request, collection_variables, iter_requests,
+                                    run_prerequest_script, run_test_script, script_lines, sets_variables)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_SAFE_METHODS = ("get", "head")
+
+class AsyncHTTPClient:
+    """
+    Small HTTP/1.1 client on asyncio streams with keep-alive connection reuse.
+
+    Concurrency is bounded globally and per host (scheme, host, port); the
+    per-host limit also caps the number of pooled connections per host.
+    """
+
+    def __init__(self, concurrency: int = 100, per_host: int = 10, timeout: float = 30.0, keepalive: bool = True):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.keepalive = keepalive
+        self._global = asyncio.Semaphore(concurrency)
+        self._host_limits: Dict[Tuple[str, str, int], asyncio.Semaphore] = {}
+        self._idle: Dict[Tuple[str, str, int], List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+        self._ssl = None
+        self.connections_opened = 0
+
+    def _host_limit(self, key: Tuple[str, str, int]) -> asyncio.Semaphore:
+        if key not in self._host_limits:
+            self._host_limits[key] = asyncio.Semaphore(self.per_host)
+        return self._host_limits[key]
+
+    async def _connect(self, key: Tuple[str, str, int]):
+        scheme, host, port = key
+        if scheme == "https" and self._ssl is None:
+            self._ssl = ssl.create_default_context()
+        self.connections_opened += 1
+        reader, writer = await asyncio.open_connection(host, port, ssl=self._ssl if scheme == "https" else None)
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            # Small request/response exchanges: don't let Nagle hold back the next request
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return reader, writer
+
+    async def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None, body: Optional[bytes] = None) -> ResponseView:
+        """Send one request and read the full response; raises on connection errors and timeouts."""
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        key = (scheme, parts.hostname or "localhost", parts.port or (443 if scheme == "https" else 80))
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        head = self._encode_head(method, target, parts.netloc, headers or {}, body)
+        async with self._global, self._host_limit(key):
+            return await asyncio.wait_for(self._send(key, method, head, body), self.timeout)
+
+    def _encode_head(self, method: str, target: str, netloc: str, headers: Dict[str, str], body: Optional[bytes]) -> bytes:
+        present = {k.lower() for k in headers}
+        lines = [f"{method} {target} HTTP/1.1"]
+        defaults = {"host": ("Host", netloc), "user-agent": ("User-Agent", "healapi"), "accept": ("Accept", "*/*"),
+                    "connection": ("Connection", "keep-alive" if self.keepalive else "close")}
+        for lower, (name, value) in defaults.items():
+            if lower not in present:
+                lines.append(f"{name}: {value}")
+        lines.extend(f"{k}: {v}" for k, v in headers.items())
+        if body is not None and "content-length" not in present:
+            lines.append(f"Content-Length: {len(body)}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send(self, key, method: str, head: bytes, body: Optional[bytes]) -> ResponseView:
+        start = time.perf_counter()
+        idle = self._idle.setdefault(key, [])
+        while True:
+            reused = bool(idle)
+            reader, writer = idle.pop() if reused else await self._connect(key)
+            try:
+                writer.write(head + (body or b""))
+                await writer.drain()
+                code, reason, headers, payload, reusable = await self._read_response(reader, method)
+                break
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if not reused:
+                    raise
+                # A pooled connection the server already closed: retry on a fresh one
+                logger.debug(f"Stale keep-alive connection to {key[1]}:{key[2]}, reconnecting")
+            except BaseException:
+                writer.close()
+                raise
+        if reusable and self.keepalive:
+            idle.append((reader, writer))
+        else:
+            writer.close()
+        return ResponseView(code, reason, headers, payload, round((time.perf_counter() - start) * 1000, 3))
+
+    async def _read_response(self, reader: asyncio.StreamReader, method: str):
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed before response")
+        version, code, reason = (status_line.decode("latin-1").rstrip("\r\n").split(" ", 2) + [""])[:3]
+        code = int(code)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip()] = value.strip()
+        lowered = {k.lower(): v.lower() for k, v in headers.items()}
+        reusable = lowered.get("connection") != "close" and (version != "HTTP/1.0" or lowered.get("connection") == "keep-alive")
+        if method == "HEAD" or code in (204, 304) or 100 <= code < 200:
+            payload = b""
+        elif "chunked" in lowered.get("transfer-encoding", ""):
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            payload = b"".join(chunks)
+        elif "content-length" in lowered:
+            payload = await reader.readexactly(int(lowered["content-length"]))
+        else:
+            payload = await reader.read()
+            reusable = False
+        return code, reason, headers, payload, reusable
+
+    async def close(self):
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
+
+async def execute_items(requests_list: List[Tuple[Dict[str, Any], Optional[Dict[str, Any]], Tuple[Dict[str, Any], ...]]],
+                        variables: Dict[str, Any], builder: ReportBuilder, client: AsyncHTTPClient,
+                        collection_scripts: Optional[Dict[str, List[str]]] = None,
+                        on_result: Optional[Callable[[Dict[str, Any]], None]] = None):
+    """
+    Execute request items concurrently, adding each execution to the report as it
+    completes (and passing it to on_result). A request is only built once it holds
+    one of the client's concurrency slots (granted in order), so with concurrency 1
+    variables set by earlier scripts are visible to later requests.
+    """
+    collection_scripts = collection_scripts or {}
+    length = len(requests_list)
+    slots = asyncio.Semaphore(client.concurrency)
+
+    async def run_one(position, item, auth, parents):
+        async with slots:
+            await run_item(position, item, auth, parents)
+
+    async def run_item(position, item, auth, parents):
+        prerequest = collection_scripts.get("prerequest", []) + [l for p in parents for l in script_lines(p, "prerequest")] + script_lines(item, "prerequest")
+        if prerequest:
+            run_prerequest_script(prerequest, variables)
+        sent = None
+        response = None
+        error = None
+        try:
+            sent = build_request(item.get("request") or {}, variables, auth)
+            response = await client.request(sent["method"], sent["url"], sent["headers"], sent["body"])
+        except asyncio.TimeoutError:
+            error = f"Request timed out after {client.timeout}s"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        assertions = []
+        if response is not None:
+            tests = collection_scripts.get("test", []) + [l for p in parents for l in script_lines(p, "test")] + script_lines(item, "test")
+            assertions = run_test_script(tests, response, variables)
+        execution = builder.add(item, parents, position, length, sent, response, assertions, error, bool(prerequest))
+        if on_result:
+            on_result(execution)
+
+    await asyncio.gather(*(run_one(position, item, auth, parents) for position, (item, auth, parents) in enumerate(requests_list)))
+
+async def _run_collection(collection: Dict[str, Any], variables: Dict[str, Any], timeout: float, concurrency: int,
+                          per_host: int, on_result: Optional[Callable[[Dict[str, Any]], None]]) -> Dict[str, Any]:
+    requests_list = list(iter_requests(collection.get("item", []), collection.get("auth")))
+    all_items = [collection] + [node for item, _, parents in requests_list for node in (item,) + parents]
+    if concurrency > 1 and sets_variables(all_items):
+        logger.warning("Collection scripts set variables; running requests in order to keep variable chaining intact")
+        concurrency = 1
+    builder = ReportBuilder(collection, {"values": [{"key": k, "value": v} for k, v in variables.items()]})
+    client = AsyncHTTPClient(concurrency=concurrency, per_host=min(per_host, concurrency), timeout=timeout)
+    try:
+        await execute_items(requests_list, variables, builder, client,
+                            {"prerequest": script_lines(collection, "prerequest"), "test": script_lines(collection, "test")}, on_result)
+    finally:
+        await client.close()
+    logger.info(f"Async run completed: {len(requests_list)} requests over {client.connections_opened} connections")
+    return builder.build()
+
+def run_collection_async(collection_path: str, environment_path: Optional[str] = None, env_vars: Optional[Dict[str, str]] = None,
+                         timeout: float = 30.0, concurrency: int = 50, per_host: int = 10,
+                         on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Run a Postman collection's requests concurrently on asyncio and return a
+    Newman-shaped report. Collections whose scripts chain variables run in order.
+    """
+    with open(collection_path, "r", encoding="utf-8") as f:
+        collection = json.load(f)
+    variables = collection_variables(collection, environment_path, env_vars)
+    return asyncio.run(_run_collection(collection, variables, timeout, concurrency, per_host, on_result))
+
+def _parameter_value(parameter: Dict[str, Any]) -> Optional[Any]:
+    schema = parameter.get("schema") or {}
+    for value in (parameter.get("example"), schema.get("example"), schema.get("default")):
+        if value is not None:
+            return value
+    if schema.get("enum"):
+        return schema["enum"][0]
+    return None
+
+def smoke_items(spec: Dict[str, Any], base_url_var: str = "baseUrl") -> List[Dict[str, Any]]:
+    """
+    Generate Postman request items for the spec's safe (GET/HEAD) operations, each
+    asserting that the status code is one the spec documents. Operations with a
+    required path parameter that has no example/default are skipped.
+    """
+    items = []
+    for path, path_item in spec.get("paths", {}).items():
+        if not isinstance(path_item, dict):
+            continue
+        for method, operation in path_item.items():
+            if method not in _SAFE_METHODS or not isinstance(operation, dict):
+                continue
+            parameters = list(path_item.get("parameters", [])) + list(operation.get("parameters", []))
+            url_path = path
+            query = []
+            resolvable = True
+            for parameter in parameters:
+                if not isinstance(parameter, dict) or "$ref" in parameter:
+                    continue
+                value = _parameter_value(parameter)
+                if parameter.get("in") == "path":
+                    if value is None:
+                        resolvable = False
+                        break
+                    url_path = url_path.replace("{" + parameter["name"] + "}", str(value))
+                elif parameter.get("in") == "query" and parameter.get("required") and value is not None:
+                    query.append(f"{parameter['name']}={value}")
+            if not resolvable:
+                logger.info(f"Skipping smoke check for {method.upper()} {path}: no example for a path parameter")
+                continue
+            codes = sorted(int(code) for code in operation.get("responses", {}) if str(code).isdigit())
+            raw = "{{" + base_url_var + "}}" + url_path + ("?" + "&".join(query) if query else "")
+            item = {"name": f"{method.upper()} {path}", "request": {"method": method.upper(), "url": raw}}
+            if codes:
+                item["event"] = [{"listen": "test", "script": {"type": "text/javascript", "exec": [
+                    "pm.test(\"Status code is documented\", function () {",
+                    f"    pm.expect(pm.response.code).to.be.oneOf({json.dumps(codes)});",
+                    "});"]}}]
+            items.append(item)
+    return items
+
+def run_smoke_checks(spec: Dict[str, Any], base_url: str, timeout: float = 30.0, concurrency: int = 50, per_host: int = 10,
+                     on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Run generated smoke checks for every safe operation of the spec against base_url
+    concurrently and return a Newman-shaped report.
+    """
+    collection = {"info": {"name": f"Smoke checks: {spec.get('info', {}).get('title', 'API')}"}, "item": smoke_items(spec)}
+    variables = {"baseUrl": base_url.rstrip("/")}
+    return asyncio.run(_run_collection(collection, variables, timeout, concurrency, per_host, on_result))
+
+# Example usage:
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) < 3 or sys.argv[1] not in ("collection", "smoke"):
+        print("Usage: python -m healapi.async_runner collection <collection.json> [environment.json]")
+        print("       python -m healapi.async_runner smoke <openapi.yaml> <base_url>")
+        sys.exit(1)
+    if sys.argv[1] == "collection":
+        result = run_collection_async(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+    else:
+        from healapi.diff_engine import load_spec
+        result = run_smoke_checks(load_spec(sys.argv[2]), sys.argv[3])
+    print(json.dumps(result["run"]["stats"], indent=2))
@@ -0,0 +1,299 @@
+import os
+import re
+import sys
+import time
+import logging
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+from healapi import diff_engine, healing_engine, openapi_typo_linter, report_generator, report_writer, spec_source, test_analyzer, test_runner
+from healapi.result_cache import digest
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUT_DIR = "healapi_batch"
+_SAFE_NAME_RE = re.compile(r"[^\w.-]+")
+# Manifest keys holding paths, resolved relative to the manifest file
+_PATH_KEYS = ("old_spec", "new_spec", "test_path", "env_path", "healed_collection_path", "result_cache", "llm_stub_responses", "durations_file")
+# Keys that only name or place a job's outputs; everything else decides what the job computes
+_OUTPUT_KEYS = ("name", "report_path", "log_path")
+_TEST_OPTION_KEYS = {"env_path": "environment_path", "shards": "shards", "shard_strategy": "shard_strategy",
+                     "postman_runner": "postman_runner", "request_timeout": "request_timeout", "concurrency": "concurrency",
+                     "per_host": "per_host", "cache_max_age": "cache_max_age", "durations_file": "durations_path"}
+
+def load_manifest(path: str) -> List[Dict[str, Any]]:
+    """
+    Read a YAML/JSON manifest: a list of jobs, or {"defaults": {...}, "jobs": [...]}
+    where defaults apply to every job. Each job needs old_spec, new_spec, test_type
+    and test_path; paths are relative to the manifest. Returns the normalized jobs.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = diff_engine.parse_spec(f.read(), path)
+    if isinstance(manifest, list):
+        manifest = {"jobs": manifest}
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("jobs"), list):
+        raise ValueError(f"{path}: expected a list of jobs or a mapping with a 'jobs' list")
+    base = os.path.dirname(os.path.abspath(path))
+    defaults = manifest.get("defaults") or {}
+    jobs = []
+    names = set()
+    for index, entry in enumerate(manifest["jobs"]):
+        job = {**defaults, **(entry or {})}
+        job["name"] = str(job.get("name") or f"job-{index + 1}")
+        missing = [key for key in ("old_spec", "new_spec", "test_type", "test_path") if not job.get(key)]
+        if missing:
+            raise ValueError(f"{path}: job {job['name']} is missing {', '.join(missing)}")
+        if job["test_type"] not in ("postman", "pytest"):
+            raise ValueError(f"{path}: job {job['name']} has unknown test_type {job['test_type']!r}")
+        if job["name"] in names:
+            raise ValueError(f"{path}: duplicate job name {job['name']}")
+        names.add(job["name"])
+        for key in _PATH_KEYS:
+            if job.get(key) and not spec_source.is_git_source(job[key]):
+                job[key] = os.path.normpath(os.path.join(base, job[key]))
+        jobs.append(job)
+    _check_write_conflicts(jobs, path)
+    return jobs
+
+def _check_write_conflicts(jobs: List[Dict[str, Any]], manifest_path: str):
+    """Jobs run in parallel, so no two jobs may write the same healed tests or result cache."""
+    targets = {}
+    for job in jobs:
+        written = [job["result_cache"]] if job.get("result_cache") else []
+        if job.get("apply"):
+            written.append(job.get("healed_collection_path") or job["test_path"])
+        for target in written:
+            if target in targets and targets[target] != job["name"]:
+                raise ValueError(f"{manifest_path}: jobs {targets[target]} and {job['name']} both write {target}")
+            targets[target] = job["name"]
+
+def job_key(job: Dict[str, Any]) -> str:
+    """Identity of what a job computes: jobs with equal keys run once."""
+    return digest({k: v for k, v in job.items() if k not in _OUTPUT_KEYS})
+
+def prepare(jobs: List[Dict[str, Any]]) -> Tuple[Dict[str, Dict[str, Any]], Dict[Tuple[str, str], Dict[str, Any]], Dict[Tuple[str, str], str]]:
+    """
+    Parse and lint every distinct spec file once and diff every distinct
+    (old, new) pair once. A spec that cannot be loaded or a pair that cannot be
+    diffed fails only the jobs using it. Returns ({spec path: {"spec", "typos"}},
+    {(old, new): diff}, {(old, new): error message}).
+    """
+    specs, load_errors = {}, {}
+    for path in sorted({job[key] for job in jobs for key in ("old_spec", "new_spec")}):
+        try:
+            spec = diff_engine.load_spec(path)
+            specs[path] = {"spec": spec, "typos": openapi_typo_linter.find_typos(spec)}
+        except Exception as e:
+            logger.error(f"Could not load spec {path}: {e}")
+            load_errors[path] = f"load spec {path}: {e}"
+    diffs, errors = {}, {}
+    for pair in sorted({(job["old_spec"], job["new_spec"]) for job in jobs}):
+        failed = [load_errors[path] for path in pair if path in load_errors]
+        if failed:
+            errors[pair] = "; ".join(dict.fromkeys(failed))
+            continue
+        try:
+            diffs[pair] = diff_engine.diff_specs(specs[pair[0]]["spec"], specs[pair[1]]["spec"])
+        except Exception as e:
+            logger.error(f"Could not diff {pair[0]} and {pair[1]}: {e}")
+            errors[pair] = f"diff: {e}"
+    return specs, diffs, errors
+
+@contextlib.contextmanager
+def _job_output(log_path: str):
+    """Send this process's log records and stdout to the job's log file while the job runs."""
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    with open(log_path, "w", encoding="utf-8") as log:
+        handler = logging.StreamHandler(log)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        root.handlers = [handler]
+        try:
+            with contextlib.redirect_stdout(log):
+                yield
+        finally:
+            root.handlers = handlers
+
+def _llm_backend(job: Dict[str, Any]):
+    if job["test_type"] != "pytest":
+        return None
+    from healapi import llm_backends
+    return llm_backends.get_backend(
+        job.get("llm_backend", "together"), job.get("llm_key_var", "TOGETHER_API_KEY"), job.get("llm_base_url"),
+        job.get("llm_timeout", 60.0), stub_options={"latency": job.get("llm_stub_latency", 0.0), "chunk_size": job.get("llm_stub_chunk_size", 16),
+                                                    "responses_path": job.get("llm_stub_responses")}
+    )
+
+def run_job(job: Dict[str, Any], new_spec: Dict[str, Any], diff: Dict[str, Any], history_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Analyze, heal, run and report one job with its parsed new spec and diff.
+    Runs in a worker process; failures are returned, never raised.
+    """
+    start = time.perf_counter()
+    timings = {}
+    result = {"name": job["name"], "status": "ok", "error": None, "report_path": job["report_path"], "log_path": job["log_path"],
+              "timings": timings, "summary": None}
+    stage = "analyze"
+    try:
+        with _job_output(job["log_path"]):
+            stage_start = time.perf_counter()
+            affected = test_analyzer.analyze_tests(job["test_type"], job["test_path"], diff)
+            timings["analyze"] = time.perf_counter() - stage_start
+
+            stage, stage_start = "heal", time.perf_counter()
+            healing = healing_engine.heal_tests(
+                job["test_type"], job["test_path"], affected, diff, new_spec, job.get("llm_model"), job.get("llm_key_var", "TOGETHER_API_KEY"),
+                output_path=job.get("healed_collection_path"), apply=bool(job.get("apply")), llm_backend=_llm_backend(job),
+                llm_max_seconds=job.get("llm_max_seconds"), llm_max_tokens=job.get("llm_max_tokens")
+            )
+            timings["heal"] = time.perf_counter() - stage_start
+
+            stage, stage_start = "run tests", time.perf_counter()
+            test_options = {option: job[key] for key, option in _TEST_OPTION_KEYS.items() if job.get(key) is not None}
+            if job.get("result_cache"):
+                from healapi import result_cache
+                test_options.update(result_cache=job["result_cache"], spec=new_spec, touched=result_cache.healed_tests(healing))
+            if not job.get("apply"):
+                logger.warning(f"Job {job['name']} does not apply the healing: running the original, unhealed tests")
+            test_results = test_runner.run_tests(job["test_type"], healing_engine.healed_test_path(healing, job["test_path"]), **test_options)
+            timings["run_tests"] = time.perf_counter() - stage_start
+
+            stage, stage_start = "report", time.perf_counter()
+            report = report_generator.generate_report(diff, healing, test_results, output_path=job["report_path"],
+                                                      report_format=job.get("report_format", "json"), history_path=history_path)
+            timings["report"] = time.perf_counter() - stage_start
+        result["summary"] = report["summary"]
+        if test_results.get("error"):
+            result.update(status="error", error=f"run tests: {test_results['error']}")
+        elif test_results.get("returncode"):
+            result["status"] = "tests_failed"
+    except Exception as e:
+        result.update(status="error", error=f"{stage}: {e}")
+    result["timings"] = {k: round(v * 1000, 2) for k, v in timings.items()}
+    result["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+def default_workers(job_count: int) -> int:
+    """Jobs mostly wait on HTTP and subprocesses, so use more processes than CPUs (but never more than jobs)."""
+    return max(1, min(job_count, max(8, 2 * (os.cpu_count() or 1))))
+
+def run_batch(jobs: List[Dict[str, Any]], out_dir: str = DEFAULT_OUT_DIR, workers: Optional[int] = None,
+              history_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run all jobs of a manifest on a process pool (one job per worker at a time,
+    each with its own report and log file in out_dir) after parsing shared specs
+    and computing shared diffs once, and write out_dir/batch_report.json.
+    Jobs computing the same thing run once. Returns the consolidated report.
+    """
+    start = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    for job in jobs:
+        name = _SAFE_NAME_RE.sub("_", job["name"])
+        job.setdefault("report_path", os.path.join(out_dir, f"{name}.json"))
+        job["log_path"] = os.path.join(out_dir, f"{name}.log")
+
+    prepare_start = time.perf_counter()
+    specs, diffs, prepare_errors = prepare(jobs)
+    prepare_ms = round((time.perf_counter() - prepare_start) * 1000, 2)
+    if history_path:
+        from healapi import run_history
+        run_history.HistoryStore(history_path).close()  # Create the schema once, before workers write concurrently
+
+    unique: Dict[str, Dict[str, Any]] = {}
+    duplicates: Dict[str, str] = {}
+    for job in jobs:
+        key = job_key(job)
+        if key in unique:
+            duplicates[job["name"]] = unique[key]["name"]
+        else:
+            unique[key] = job
+
+    results: Dict[str, Dict[str, Any]] = {}
+    workers = workers or default_workers(len(unique))
+    logger.info(f"Running {len(unique)} job(s) on {workers} worker process(es) ({len(duplicates)} duplicate(s), "
+                f"{len(specs)} distinct spec(s), {len(diffs)} distinct diff(s))")
+    runnable = []
+    for job in unique.values():
+        error = prepare_errors.get((job["old_spec"], job["new_spec"]))
+        if error:
+            results[job["name"]] = {"name": job["name"], "status": "error", "error": error, "report_path": None,
+                                    "log_path": job["log_path"], "timings": {}, "summary": None, "duration_ms": None}
+            logger.info(f"Job {job['name']}: error ({error})")
+        else:
+            runnable.append(job)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_job, job, specs[job["new_spec"]]["spec"], diffs[(job["old_spec"], job["new_spec"])], history_path): job
+                   for job in runnable}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                result = future.result()
+            except BrokenProcessPool as e:
+                # A worker died (e.g. killed or crashed in native code); the other jobs' results are kept
+                result = {"name": job["name"], "status": "error", "error": f"worker process died: {e}", "report_path": None,
+                          "log_path": job["log_path"], "timings": {}, "summary": None, "duration_ms": None}
+            results[job["name"]] = result
+            logger.info(f"Job {job['name']}: {result['status']}" + (f" ({result['error']})" if result["error"] else ""))
+
+    entries = []
+    for job in jobs:
+        if job["name"] in duplicates:
+            entry = {**results[duplicates[job["name"]]], "name": job["name"], "duplicate_of": duplicates[job["name"]]}
+        else:
+            entry = results[job["name"]]
+        entry["inputs"] = {key: job.get(key) for key in ("old_spec", "new_spec", "test_type", "test_path", "env_path")}
+        entry["lint"] = {key: specs[job[key]]["typos"] for key in ("old_spec", "new_spec") if specs.get(job[key], {}).get("typos")}
+        entries.append(entry)
+
+    wall_ms = round((time.perf_counter() - start) * 1000, 2)
+    statuses = {}
+    for entry in entries:
+        statuses[entry["status"]] = statuses.get(entry["status"], 0) + 1
+    job_ms = [r["duration_ms"] for r in results.values() if r.get("duration_ms") is not None]
+    summary = {"jobs": len(jobs), "unique_jobs": len(unique), "statuses": statuses, "workers": workers,
+               "distinct_specs": len(specs), "distinct_diffs": len(diffs), "prepare_ms": prepare_ms, "wall_ms": wall_ms,
+               "sum_job_ms": round(sum(job_ms), 2), "slowest_job_ms": max(job_ms, default=0.0)}
+    batch_report = {"summary": summary, "jobs": entries}
+    report_writer.write_report(os.path.join(out_dir, "batch_report.json"), batch_report)
+    return batch_report
+
+def summarize_batch(batch_report: Dict[str, Any]) -> str:
+    """Human-readable table of a batch report."""
+    summary = batch_report["summary"]
+    lines = [f"[BATCH] {summary['jobs']} job(s) ({summary['unique_jobs']} unique) on {summary['workers']} worker(s): "
+             f"{', '.join(f'{status} {count}' for status, count in sorted(summary['statuses'].items()))}",
+             f"  Wall time {summary['wall_ms']}ms (slowest job {summary['slowest_job_ms']}ms, sum of jobs {summary['sum_job_ms']}ms, "
+             f"spec parsing/diffing {summary['prepare_ms']}ms)",
+             "    Job                          | Status       | Duration ms | Report",
+             "    --------------------------------------------------------------------------"]
+    for entry in batch_report["jobs"]:
+        duration = f"= {entry['duplicate_of']}" if entry.get("duplicate_of") else entry.get("duration_ms")
+        lines.append(f"    {entry['name'][:28]:<28} | {entry['status']:<12} | {str(duration):>11} | {entry.get('report_path') or '-'}")
+        if entry.get("error"):
+            lines.append(f"      {entry['error']} (log: {entry['log_path']})")
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="healapi batch", description="Run many spec/collection jobs from a YAML/JSON manifest in parallel")
+    parser.add_argument('manifest', help='Manifest: a list of jobs or {"defaults": {...}, "jobs": [...]} (YAML/JSON)')
+    parser.add_argument('--out-dir', default=DEFAULT_OUT_DIR, help=f'Directory for per-job reports/logs and batch_report.json (default: {DEFAULT_OUT_DIR})')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: one per job, up to max(8, 2 x CPUs))')
+    parser.add_argument('--history-db', help='SQLite database to record every job run in (optional)')
+    args = parser.parse_args(argv)
+    try:
+        jobs = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] {e}")
+        return 2
+    batch_report = run_batch(jobs, args.out_dir, args.workers, args.history_db)
+    print(summarize_batch(batch_report))
+    print(f"Consolidated report: {os.path.join(args.out_dir, 'batch_report.json')}")
+    return 0 if set(batch_report["summary"]["statuses"]) <= {"ok"} else 1
+
+# Example usage:
+if __name__ == "__main__":
+    sys.exit(main())
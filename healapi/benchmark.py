@@ -0,0 +1,223 @@
+import os
+import sys
+import json
+import time
+import logging
+import platform
+import statistics
+import subprocess
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Windows: no peak RSS
+
+from healapi import (diff_engine, healing_engine, openapi_typo_linter, report_generator, spec_source, synthetic, test_analyzer)
+from healapi.patching import write_json_atomic
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RESULTS_VERSION = 1
+TEST_TYPES = ("postman", "pytest")
+
+def _git_revision() -> Dict[str, Any]:
+    """Commit of the healapi checkout being measured, and whether it has local changes."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=root, capture_output=True, text=True)
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root, capture_output=True, text=True)
+    except OSError:
+        return {"commit": None, "dirty": None}
+    if commit.returncode != 0:
+        return {"commit": None, "dirty": None}
+    return {"commit": commit.stdout.strip(), "dirty": bool(status.stdout.strip())}
+
+class StageTimer:
+    """Wall and CPU time of named stages over repeated runs."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[Dict[str, float]]] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.samples.setdefault(name, []).append({"wall_ms": (time.perf_counter() - wall) * 1000,
+                                                      "cpu_ms": (time.process_time() - cpu) * 1000})
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for name, samples in self.samples.items():
+            walls = [s["wall_ms"] for s in samples]
+            result[name] = {
+                "runs": len(samples),
+                "median_ms": round(statistics.median(walls), 2),
+                "min_ms": round(min(walls), 2),
+                "max_ms": round(max(walls), 2),
+                "cpu_median_ms": round(statistics.median(s["cpu_ms"] for s in samples), 2),
+                "wall_ms": [round(w, 2) for w in walls],
+            }
+        return result
+
+def _run_once(scenario_dir: str, scenario: Dict[str, Any], test_types: List[str], timer: StageTimer, llm_backend, work_dir: str,
+              heal_options: Dict[str, Any]) -> Dict[str, Any]:
+    files = {key: os.path.join(scenario_dir, name) for key, name in scenario["files"].items()}
+    # A fresh store without a disk cache, so every run parses the specs
+    spec_source.configure(cache_dir=None)
+    with timer.stage("load specs"):
+        old_spec = diff_engine.load_spec(files["old_spec"])
+        new_spec = diff_engine.load_spec(files["new_spec"])
+    with timer.stage("lint"):
+        typos = openapi_typo_linter.find_typos(old_spec) + openapi_typo_linter.find_typos(new_spec)
+    with timer.stage("diff"):
+        diff = diff_engine.diff_specs(old_spec, new_spec)
+    counts = {"typos": len(typos), **{key: len(value) for key, value in diff.items()}}
+    for test_type in test_types:
+        with timer.stage(f"{test_type}: load tests"):
+            if test_type == "postman":
+                with open(files["collection"], "r", encoding="utf-8") as f:
+                    tests = json.load(f)
+            else:
+                tests = {}
+                for name in sorted(os.listdir(files["tests"])):
+                    path = os.path.join(files["tests"], name)
+                    with open(path, "r", encoding="utf-8") as f:
+                        tests[path] = f.read()
+        with timer.stage(f"{test_type}: analyze"):
+            if test_type == "postman":
+                affected = test_analyzer.analyze_collection(tests, diff)
+            else:
+                affected = test_analyzer.analyze_pytest_sources(tests, diff)
+        with timer.stage(f"{test_type}: heal"):
+            if test_type == "postman":
+                actions, patch = healing_engine.heal_postman_items(tests, diff, new_spec)
+                healing = {"healed_requests": actions, "patch": patch}
+            else:
+                healing = healing_engine.heal_pytest_files(affected, diff, new_spec, apply=False, llm_backend=llm_backend,
+                                                           sources=tests, **heal_options)
+        with timer.stage(f"{test_type}: report"):
+            report_generator.generate_report(diff, healing, {}, output_path=os.path.join(work_dir, f"{test_type}_report.json"))
+        counts[f"{test_type}_affected"] = len(affected)
+        if test_type == "pytest":
+            counts["pytest_llm_calls"] = len(healing.get("llm_usage", {}).get("calls", []))
+    return counts
+
+def run_benchmark(scenario_dir: str, test_types: Optional[List[str]] = None, repeat: int = 3, llm_latency: float = 0.0,
+                  heal_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Time load, lint, diff, and per test type analyze, heal (pytest through the
+    stub LLM) and report on a scenario written by synthetic.write_scenario, repeat
+    times in this process. Returns the results document (see compare_results).
+    """
+    from healapi import llm_backends
+    with open(os.path.join(scenario_dir, "scenario.json"), "r", encoding="utf-8") as f:
+        scenario = json.load(f)
+    test_types = list(test_types or TEST_TYPES)
+    llm_backend = llm_backends.get_backend("stub", stub_options={"latency": llm_latency}) if "pytest" in test_types else None
+    timer = StageTimer()
+    counts = {}
+    with tempfile.TemporaryDirectory(prefix="healapi-bench-") as work_dir:
+        for run in range(repeat):
+            logger.info(f"Benchmark run {run + 1}/{repeat}")
+            counts = _run_once(scenario_dir, scenario, test_types, timer, llm_backend, work_dir, heal_options or {})
+    return {
+        "version": RESULTS_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "revision": _git_revision(),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "params": {"repeat": repeat, "test_types": test_types, "llm_latency": llm_latency, "heal_options": heal_options or {}},
+        "scenario": {key: value for key, value in scenario.items() if key not in ("mutations", "files")},
+        "counts": counts,
+        "stages": timer.summary(),
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None,
+    }
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.2, min_delta_ms: float = 5.0) -> List[Dict[str, Any]]:
+    """
+    Per-stage comparison of median wall times. A stage regressed when it got slower
+    by more than threshold (fraction) and by at least min_delta_ms.
+    """
+    rows = []
+    for name, stage in current["stages"].items():
+        base = baseline.get("stages", {}).get(name)
+        if not base:
+            continue
+        delta = stage["median_ms"] - base["median_ms"]
+        change = delta / base["median_ms"] if base["median_ms"] else None
+        rows.append({"stage": name, "baseline_ms": base["median_ms"], "current_ms": stage["median_ms"], "delta_ms": round(delta, 2),
+                     "change": round(change, 3) if change is not None else None,
+                     "regressed": change is not None and change > threshold and delta >= min_delta_ms})
+    return rows
+
+def stage_table(results: Dict[str, Any]) -> str:
+    lines = ["    Stage                      | median ms |   min ms |   max ms | cpu ms",
+             "    ----------------------------------------------------------------------"]
+    for name, s in results["stages"].items():
+        lines.append(f"    {name[:26]:<26} | {s['median_ms']:>9} | {s['min_ms']:>8} | {s['max_ms']:>8} | {s['cpu_median_ms']:>6}")
+    return "\n".join(lines)
+
+def comparison_table(rows: List[Dict[str, Any]]) -> str:
+    lines = ["    Stage                      | baseline ms | current ms |   change",
+             "    ---------------------------------------------------------------"]
+    for r in rows:
+        change = f"{r['change'] * 100:+.1f}%" if r["change"] is not None else "-"
+        flag = "  REGRESSION" if r["regressed"] else ""
+        lines.append(f"    {r['stage'][:26]:<26} | {r['baseline_ms']:>11} | {r['current_ms']:>10} | {change:>8}{flag}")
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="healapi bench", description="Time every pipeline stage on a seeded synthetic spec/test scenario")
+    parser.add_argument('--scenario', help='Scenario directory: reused when it holds a scenario.json, otherwise generated there (default: a temporary directory)')
+    parser.add_argument('--paths', type=int, default=10000, help='(Generated scenarios) Paths in the old spec (default: 10000)')
+    parser.add_argument('--seed', type=int, default=0, help='(Generated scenarios) Random seed (default: 0)')
+    parser.add_argument('--pytest-paths', type=int, default=200, help='(Generated scenarios) pytest tests for the mutated paths plus the first N others (default: 200)')
+    parser.add_argument('--test-types', nargs='+', choices=TEST_TYPES, default=list(TEST_TYPES), help='Test suites to analyze, heal and report on (default: both)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per stage; medians are reported (default: 3)')
+    parser.add_argument('--llm-latency', type=float, default=0.0, help='Stub LLM seconds before the first streamed byte (default: 0)')
+    parser.add_argument('--llm-max-seconds', type=float, help='LLM healing budget in seconds (optional)')
+    parser.add_argument('--output', help='Write the results as JSON to this path (optional)')
+    parser.add_argument('--compare', help='Results JSON of an earlier run (e.g. the previous commit) to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='(With --compare) Flag stages slower by more than this fraction (default: 0.2)')
+    parser.add_argument('--min-delta-ms', type=float, default=5.0, help='(With --compare) Ignore slowdowns smaller than this (default: 5ms)')
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    with tempfile.TemporaryDirectory(prefix="healapi-scenario-") as tmp_dir:
+        scenario_dir = args.scenario or tmp_dir
+        if not os.path.exists(os.path.join(scenario_dir, "scenario.json")):
+            print(f"Generating a {args.paths}-path scenario (seed {args.seed}) in {scenario_dir}...")
+            synthetic.write_scenario(scenario_dir, args.paths, args.seed, pytest_paths=args.pytest_paths)
+        heal_options = {"llm_max_seconds": args.llm_max_seconds} if args.llm_max_seconds else {}
+        results = run_benchmark(scenario_dir, args.test_types, args.repeat, args.llm_latency, heal_options)
+    print(f"Scenario: {results['scenario']['paths']} paths, {results['scenario']['operations']} operations, "
+          f"{results['scenario']['schemas']} schemas; counts: {json.dumps(results['counts'])}")
+    print(stage_table(results))
+    idle = [test_type for test_type in results["params"]["test_types"] if not results["counts"].get(f"{test_type}_affected")]
+    if idle:
+        print(f"[WARNING] No affected {' or '.join(idle)} tests: the analyze and heal stages timed the no-op path. "
+              f"Use a scenario with removals or method changes on tested paths.")
+    if args.output:
+        write_json_atomic(args.output, results)
+        print(f"Results written to {args.output}")
+    if baseline is not None:
+        if baseline.get("scenario") != results["scenario"]:
+            print("[WARNING] The baseline was measured on a different scenario; the comparison may not be meaningful.")
+        rows = compare_results(baseline, results, args.threshold, args.min_delta_ms)
+        print(f"Compared with {args.compare} (commit {(baseline.get('revision') or {}).get('commit')}):")
+        print(comparison_table(rows))
+        if any(r["regressed"] for r in rows):
+            return 1
+
+# Example usage:
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,52 +1,221 @@
+import os
+import sys
 import argparse
 import logging
 import json
-from healapi import diff_engine, test_analyzer, healing_engine, test_runner, report_generator, openapi_typo_linter
-from typing import Optional
+from contextlib import contextmanager, nullcontext
+from typing import TYPE_CHECKING, Dict, List, Optional
 
-def main():
-    parser = argparse.ArgumentParser(description="HealAPI: Self-Healing API Test Automation System")
-    parser.add_argument('--old-spec', required=True, help='Path to old OpenAPI spec (YAML/JSON)')
-    parser.add_argument('--new-spec', required=True, help='Path to new OpenAPI spec (YAML/JSON)')
+if TYPE_CHECKING:
+    from healapi import profiling
+
+# Submodules are imported inside the commands that need them, so `healapi --help`
+# and light subcommands (diff, lint, report) skip YAML, LLM, runner and database imports.
+
+SUBCOMMANDS = ("diff", "lint", "analyze", "heal", "run", "report", "serve", "batch", "bench", "mock", "scaffold")
+LLM_BACKENDS = ("together", "openai", "stub")
+
+def _make_llm_backend(args):
+    """LLM backend for pytest healing (Postman healing needs none)."""
+    if args.test_type != 'pytest':
+        return None
+    from healapi import llm_backends
+    return llm_backends.get_backend(
+        args.llm_backend, args.llm_key_var, args.llm_base_url, args.llm_timeout,
+        stub_options={"latency": args.llm_stub_latency, "chunk_size": args.llm_stub_chunk_size,
+                      "responses_path": args.llm_stub_responses}
+    )
+
+def _test_options(args):
+    """Keyword arguments for test_runner.run_tests."""
+    if args.test_type == 'pytest':
+        return {"shards": args.shards or None, "durations_path": args.durations_file}
+    return {"environment_path": args.env_path, "shards": args.shards or None, "shard_strategy": args.shard_strategy,
+            "postman_runner": args.postman_runner, "request_timeout": args.request_timeout,
+            "concurrency": args.concurrency, "per_host": args.per_host}
+
+def _add_spec_args(parser):
+    parser.add_argument('--old-spec', required=True, help='Old OpenAPI spec: a YAML/JSON file or git:<rev>:<path> (e.g. git:v1.2.0:openapi.yaml)')
+    parser.add_argument('--new-spec', required=True, help='New OpenAPI spec: a YAML/JSON file or git:<rev>:<path>')
+
+def _add_test_args(parser):
     parser.add_argument('--test-type', required=True, choices=['pytest', 'postman'], help='Type of tests to analyze and run')
     parser.add_argument('--test-path', required=True, help='Path to test directory (pytest) or Postman collection (postman)')
-    parser.add_argument('--env-path', help='Path to Postman environment file (optional, for postman only)')
-    parser.add_argument('--report-path', help='Path to save the final report (optional)')
+
+def _add_llm_args(parser):
     parser.add_argument('--llm-model', help='LLM model name for advanced healing (optional)')
-    parser.add_argument('--healed-collection-path', help='(Postman only) Path to save the healed Postman collection (optional)')
     parser.add_argument('--llm-key-var', help='Environment variable for LLM API key (optional, default: TOGETHER_API_KEY)', default='TOGETHER_API_KEY')
-    args = parser.parse_args()
+    parser.add_argument('--llm-backend', choices=LLM_BACKENDS, default='together', help='LLM backend: together, openai (any OpenAI-compatible endpoint) or stub (bundled local stub server)')
+    parser.add_argument('--llm-base-url', help='Base URL of the OpenAI-compatible endpoint, e.g. http://localhost:8000/v1 (openai backend only)')
+    parser.add_argument('--llm-timeout', type=float, default=60.0, help='Timeout in seconds for a single LLM HTTP call (default: 60)')
+    parser.add_argument('--llm-stub-latency', type=float, default=0.0, help='(stub backend) Seconds before the first streamed byte')
+    parser.add_argument('--llm-stub-chunk-size', type=int, default=16, help='(stub backend) Characters per streamed chunk')
+    parser.add_argument('--llm-stub-responses', help='(stub backend) JSON file with canned responses')
+    parser.add_argument('--llm-max-seconds', type=float, help='Global wall-clock budget in seconds for LLM healing (optional, default: unlimited)')
+    parser.add_argument('--llm-max-tokens', type=int, help='Global token budget (prompt + completion) for LLM healing (optional, default: unlimited)')
+
+def _add_heal_args(parser):
+    parser.add_argument('--healed-collection-path', help='(Postman only) Path to save the healed Postman collection (optional)')
+    parser.add_argument('--patch-path', help='Path to save the healing patch (JSON Patch / unified diffs) for later review or apply (optional)')
+    parser.add_argument('--no-apply', action='store_true', help='Only compute healing patches, do not modify the tests (optional)')
+    parser.add_argument('--scaffold-path', help='Write baseline tests for the added endpoints: a collection file (postman) or a directory of test modules (pytest) (optional)')
+
+def _add_run_args(parser):
+    parser.add_argument('--env-path', help='Path to Postman environment file (optional, for postman only)')
+    parser.add_argument('--shards', type=int, default=1, help='Run tests as N concurrent Newman/pytest processes; 0 = one per CPU (default: 1)')
+    parser.add_argument('--durations-file', help='(Pytest only) JSON file keeping per-test durations to balance --shards by, refreshed after each run, e.g. under a cache directory (optional, default: balance by test count)')
+    parser.add_argument('--shard-strategy', choices=['balanced', 'folder'], default='balanced', help='(Postman only) Split by balanced request count or keep top-level folders whole')
+    parser.add_argument('--postman-runner', choices=['auto', 'newman', 'native', 'async'], default='auto', help='(Postman only) Run collections with Newman, the built-in Python runner or the concurrent asyncio engine; auto uses Newman when installed')
+    parser.add_argument('--request-timeout', type=float, default=30.0, help='(Native/async Postman runners) Per-request timeout in seconds (default: 30)')
+    parser.add_argument('--concurrency', type=int, default=50, help='(Async Postman runner) Maximum requests in flight (default: 50)')
+    parser.add_argument('--per-host', type=int, default=10, help='(Async Postman runner) Maximum requests/connections per host (default: 10)')
+    parser.add_argument('--result-cache', help='Path to a test-result cache file: tests whose request/test code and target spec operation are unchanged reuse their last passing result instead of re-running (optional)')
+    parser.add_argument('--cache-max-age', type=float, help='(Result cache) Re-run cached tests older than this many seconds (default: no limit)')
+    parser.add_argument('--mock-spec', help='Run the tests against a local mock server generated from this OpenAPI spec (usually the new spec) instead of the real API (optional)')
+    parser.add_argument('--mock-processes', type=int, default=1, help='(Mock server) Worker processes (default: 1)')
+    parser.add_argument('--mock-latency', type=float, default=0.0, help='(Mock server) Seconds added to every response (default: 0)')
+    parser.add_argument('--mock-url-var', action='append', help='(Mock server) Postman variable holding the API base URL; repeatable (default: apiurl and baseUrl)')
+
+@contextmanager
+def _mock_server(args):
+    """
+    With --mock-spec, serve the spec from a local mock server while the tests run:
+    Postman runs get an environment pointing the base-URL variables at it, and
+    pytest runs see its URL in HEALAPI_MOCK_URL.
+    """
+    if not getattr(args, "mock_spec", None):
+        yield
+        return
+    import tempfile
+    from healapi import mock_server
+    server = mock_server.start_mock_server(args.mock_spec, processes=args.mock_processes, latency=args.mock_latency)
+    url = mock_server.server_url(server)
+    fd, env_path = tempfile.mkstemp(prefix="healapi-mock-env-", suffix=".json")
+    os.close(fd)
+    mock_server.write_mock_environment(env_path, url, args.mock_url_var or mock_server.DEFAULT_URL_VARIABLES, args.env_path)
+    original_env_path, args.env_path = args.env_path, env_path
+    os.environ["HEALAPI_MOCK_URL"] = url
+    try:
+        yield
+    finally:
+        os.environ.pop("HEALAPI_MOCK_URL", None)
+        args.env_path = original_env_path
+        os.remove(env_path)
+        mock_server.stop_mock_server(server)
+
+def _add_report_args(parser):
+    parser.add_argument('--report-path', help='Path to save the final report (optional); a .gz or .zst extension compresses it')
+    parser.add_argument('--history-db', help='SQLite database to record this run in (query it with python -m healapi.run_history) (optional)')
+    parser.add_argument('--latency-baseline-runs', type=int, default=20, help='(With --history-db) Compare per-endpoint response times against this many previous runs (default: 20)')
+    parser.add_argument('--latency-threshold', type=float, default=0.2, help='(With --history-db) Flag endpoints whose p95 latency grew by more than this fraction (default: 0.2)')
+    parser.add_argument('--latency-gate', action='store_true', help='(With --history-db) Exit with status 1 when an endpoint latency regression is flagged')
+    parser.add_argument('--report-format', choices=['json', 'sections'], default='json', help='Report file layout: json (one full document) or sections (summary first, bulky values in side files next to the report) (default: json)')
+
+def main(argv: Optional[List[str]] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in SUBCOMMANDS:
+        return globals()[f"_cmd_{argv[0]}"](argv[1:])
+    parser = argparse.ArgumentParser(
+        description="HealAPI: Self-Healing API Test Automation System",
+        epilog="Single steps: healapi {diff,lint,analyze,heal,run,report} --help; service mode: healapi serve --help; many jobs: healapi batch --help; benchmarks: healapi bench --help; mock API: healapi mock --help; tests for added endpoints: healapi scaffold --help"
+    )
+    _add_spec_args(parser)
+    _add_test_args(parser)
+    _add_report_args(parser)
+    _add_llm_args(parser)
+    _add_heal_args(parser)
+    _add_run_args(parser)
+    parser.add_argument('--profile', action='store_true', help='Record wall time, CPU time and peak memory per stage and sub-step (LLM calls, test shards) and add a timing table to the report')
+    parser.add_argument('--profile-dir', help='(Implies --profile; not with --overlap) Also write a cProfile dump per stage to this directory')
+    parser.add_argument('--overlap', action='store_true', help='Run independent stages concurrently: load specs and tests in parallel, lint beside the rest, and (pytest) run unaffected tests during healing and healed files as soon as each is final')
+    parser.add_argument('--watch', action='store_true', help='Keep running: re-lint, re-diff, re-analyze and dry-run heal whenever the specs or tests change')
+    parser.add_argument('--watch-interval', type=float, default=0.5, help='(Watch mode) Polling interval in seconds (default: 0.5)')
+    parser.add_argument('--watch-run-tests', action='store_true', help='(Watch mode) Also re-run the tests after each change')
+    args = parser.parse_args(argv)
+    with _mock_server(args):
+        return _run(args)
+
+def _run(args):
+    if args.watch:
+        from healapi import spec_source, watch
+        if spec_source.is_git_source(args.old_spec) or spec_source.is_git_source(args.new_spec):
+            print("[ERROR] --watch needs spec files on disk, not git:<rev>:<path> sources.")
+            return 1
+        print(f"[WATCH] Watching {args.old_spec}, {args.new_spec} and {args.test_path} (Ctrl+C to stop)...")
+        watch.watch(
+            args.old_spec, args.new_spec, args.test_type, args.test_path, interval=args.watch_interval,
+            heal_options={"openai_model": args.llm_model, "llm_key_var": args.llm_key_var, "llm_backend": _make_llm_backend(args),
+                          "llm_max_seconds": args.llm_max_seconds, "llm_max_tokens": args.llm_max_tokens},
+            run_tests=args.watch_run_tests, test_options=_test_options(args), report_path=args.report_path
+        )
+        return
+
+    if args.overlap:
+        if args.profile_dir:
+            print("[ERROR] --profile-dir is not supported with --overlap (stages run concurrently); use --profile for the task timeline.")
+            return 1
+        return _run_overlapped(args)
+
+    from healapi import profiling
+    profiler = profiling.Profiler(args.profile_dir) if args.profile or args.profile_dir else None
+    with profiler or nullcontext():
+        status = _run_pipeline(args, profiler)
+    if profiler:
+        print("\n===== PROFILE =====")
+        print(profiler.table())
+        if args.profile_dir:
+            print(f"cProfile dumps written to {args.profile_dir} (view with: python -m pstats <file>)")
+    return status
+
+def _run_pipeline(args, profiler: Optional["profiling.Profiler"] = None):
+    """Lint, diff, analyze, heal, run and report; returns the exit status (None for success)."""
+    from healapi import (diff_engine, healing_engine, openapi_typo_linter, patching, profiling, report_generator,
+                         result_cache, test_analyzer, test_runner)
+    if args.latency_gate and not args.history_db:
+        print("[WARNING] --latency-gate needs --history-db to compare against previous runs; latencies will only be reported.")
 
     # Typo linting step before diff
     print("[0/5] Linting OpenAPI specs for typos...")
-    old_typos = openapi_typo_linter.find_typos_in_yaml(args.old_spec)
-    new_typos = openapi_typo_linter.find_typos_in_yaml(args.new_spec)
+    with profiling.stage("lint"):
+        with profiling.step("lint old spec"):
+            old_typos = openapi_typo_linter.find_typos(diff_engine.load_spec(args.old_spec))
+        with profiling.step("lint new spec"):
+            new_typos = openapi_typo_linter.find_typos(diff_engine.load_spec(args.new_spec))
     if old_typos or new_typos:
         print("Possible typos found in OpenAPI specs:")
         if old_typos:
-            print(f"- {args.old_spec}:")
-            for t in old_typos:
-                print(f"  {t['path']}: '{t['typo']}' -> '{t['suggestion']}'")
+            _print_typos(args.old_spec, old_typos)
         if new_typos:
-            print(f"- {args.new_spec}:")
-            for t in new_typos:
-                print(f"  {t['path']}: '{t['typo']}' -> '{t['suggestion']}'")
+            _print_typos(args.new_spec, new_typos)
         print("[WARNING] Typos detected. Please fix them for best results.")
 
     try:
         print("[1/5] Running OpenAPI diff engine...")
-        old_spec = diff_engine.load_spec(args.old_spec)
-        new_spec = diff_engine.load_spec(args.new_spec)
-        diff = diff_engine.diff_specs(old_spec, new_spec)
+        with profiling.stage("diff"):
+            with profiling.step("parse old spec"):
+                old_spec = diff_engine.load_spec(args.old_spec)
+            with profiling.step("parse new spec"):
+                new_spec = diff_engine.load_spec(args.new_spec)
+            with profiling.step("diff specs"):
+                diff = diff_engine.diff_specs(old_spec, new_spec)
         print(json.dumps(diff, indent=2))
     except Exception as e:
         logging.error(f"Failed during OpenAPI diff: {e}")
         print(f"[ERROR] Failed during OpenAPI diff: {e}")
         return
 
+    if args.scaffold_path:
+        try:
+            with profiling.stage("scaffold"):
+                _print_scaffold(_scaffold(args, diff, new_spec), args.scaffold_path)
+        except Exception as e:
+            logging.error(f"Failed during test scaffolding: {e}")
+            print(f"[ERROR] Failed during test scaffolding: {e}")
+
     try:
         print("[2/5] Analyzing tests for impact...")
-        affected = test_analyzer.analyze_tests(args.test_type, args.test_path, diff)
+        with profiling.stage("analyze"):
+            affected = test_analyzer.analyze_tests(args.test_type, args.test_path, diff)
         print(f"Affected tests: {affected}")
     except Exception as e:
         logging.error(f"Failed during test analysis: {e}")
@@ -55,15 +224,17 @@ def main():
 
     try:
         print("[3/5] Healing affected tests...")
-        if args.test_type == 'postman' and args.healed_collection_path:
-            healing = healing_engine.heal_postman_collection(
-                args.test_path, diff, new_spec, args.llm_model, output_path=args.healed_collection_path
-            )
-        else:
+        with profiling.stage("heal"):
+            llm_backend = _make_llm_backend(args)
             healing = healing_engine.heal_tests(
-                args.test_type, args.test_path, affected, diff, new_spec, args.llm_model, args.llm_key_var
+                args.test_type, args.test_path, affected, diff, new_spec, args.llm_model, args.llm_key_var,
+                output_path=args.healed_collection_path, apply=not args.no_apply, llm_backend=llm_backend,
+                llm_max_seconds=args.llm_max_seconds, llm_max_tokens=args.llm_max_tokens
             )
         print(json.dumps(healing, indent=2))
+        if args.patch_path:
+            patching.write_json_atomic(args.patch_path, healing)
+            print(f"Healing patch saved to {args.patch_path}")
     except Exception as e:
         logging.error(f"Failed during healing: {e}")
         print(f"[ERROR] Failed during healing: {e}")
@@ -71,10 +242,14 @@ def main():
 
     try:
         print("[4/5] Running healed tests...")
-        if args.test_type == 'pytest':
-            test_results = test_runner.run_tests('pytest', args.test_path)
-        else:
-            test_results = test_runner.run_tests('postman', args.test_path, environment_path=args.env_path)
+        if args.no_apply:
+            print("[WARNING] --no-apply: running the original, unhealed tests; the results do not reflect the healing patch.")
+        test_options = _test_options(args)
+        if args.result_cache:
+            test_options.update(result_cache=args.result_cache, cache_max_age=args.cache_max_age, spec=new_spec,
+                                touched=result_cache.healed_tests(healing))
+        with profiling.stage("run tests"):
+            test_results = test_runner.run_tests(args.test_type, healing_engine.healed_test_path(healing, args.test_path), **test_options)
         print(json.dumps(test_results, indent=2))
     except Exception as e:
         logging.error(f"Failed during test execution: {e}")
@@ -83,15 +258,218 @@ def main():
 
     try:
         print("[5/5] Generating report...")
-        report = report_generator.generate_report(diff, healing, test_results, output_path=args.report_path)
+        with profiling.stage("report"):
+            report = report_generator.generate_report(diff, healing, test_results, output_path=args.report_path, report_format=args.report_format,
+                                                      history_path=args.history_db,
+                                                      latency_options={"baseline_runs": args.latency_baseline_runs, "threshold": args.latency_threshold},
+                                                      profile=list(profiler.records) if profiler else None)
         print("\n===== REPORT SUMMARY =====")
         print(report_generator.summarize_report(report))
         print("\n===== NATURAL LANGUAGE SUMMARY =====")
         print(report_generator.generate_natural_summary(report))
+        regressions = report.get("latency", {}).get("regressions")
+        if args.latency_gate and regressions:
+            print(f"[FAIL] Latency gate: {len(regressions)} endpoint(s) regressed")
+            return 1
     except Exception as e:
         logging.error(f"Failed during report generation: {e}")
         print(f"[ERROR] Failed during report generation: {e}")
         return
 
+def _scaffold(args, diff, new_spec):
+    from healapi import scaffold
+    return scaffold.scaffold_added_endpoints(diff, new_spec, args.test_type, args.scaffold_path)
+
+def _print_scaffold(result, scaffold_path: str):
+    if result["written"]:
+        print(f"Scaffolded tests for {result['operations']} added operation(s) in {scaffold_path}")
+    else:
+        print("No added operations to scaffold.")
+
+def _print_typos(spec_path: str, typos: List[Dict[str, str]]):
+    print(f"- {spec_path}:")
+    for t in typos:
+        print(f"  {t['path']}: '{t['typo']}' -> '{t['suggestion']}'")
+
+def _run_overlapped(args):
+    """The pipeline as a dependency-driven task graph (see pipeline.build_pipeline); prints the same output plus a task timeline."""
+    from healapi import patching, pipeline, report_generator
+    heal_options = {"openai_model": args.llm_model, "llm_key_var": args.llm_key_var, "output_path": args.healed_collection_path,
+                    "apply": not args.no_apply, "llm_backend": _make_llm_backend(args), "llm_max_seconds": args.llm_max_seconds,
+                    "llm_max_tokens": args.llm_max_tokens}
+    test_options = _test_options(args)
+    if args.result_cache:
+        test_options.update(result_cache=args.result_cache, cache_max_age=args.cache_max_age)
+    report_options = {"output_path": args.report_path, "report_format": args.report_format, "history_path": args.history_db,
+                      "latency_options": {"baseline_runs": args.latency_baseline_runs, "threshold": args.latency_threshold}}
+    print("[OVERLAP] Running lint, diff, analyze, heal, tests and report as a task graph...")
+    if args.no_apply:
+        print("[WARNING] --no-apply: running the original, unhealed tests; the results do not reflect the healing patch.")
+    graph = pipeline.build_pipeline(args.old_spec, args.new_spec, args.test_type, args.test_path, heal_options, test_options,
+                                    report_options, profile=args.profile, scaffold_path=args.scaffold_path)
+    results = graph.run()
+
+    old_typos, new_typos = results.get("lint old spec"), results.get("lint new spec")
+    if old_typos or new_typos:
+        print("Possible typos found in OpenAPI specs:")
+        if old_typos:
+            _print_typos(args.old_spec, old_typos)
+        if new_typos:
+            _print_typos(args.new_spec, new_typos)
+        print("[WARNING] Typos detected. Please fix them for best results.")
+    for name, stage in (("diff", "[1/5] OpenAPI diff"), ("analyze", "[2/5] Affected tests"), ("heal", "[3/5] Healing"),
+                        ("run tests", "[4/5] Test results")):
+        if name in results:
+            print(f"{stage}:")
+            print(json.dumps(results[name], indent=2) if name != "analyze" else results[name])
+    if "scaffold" in results:
+        _print_scaffold(results["scaffold"], args.scaffold_path)
+    if "heal" in results and args.patch_path:
+        patching.write_json_atomic(args.patch_path, results["heal"])
+        print(f"Healing patch saved to {args.patch_path}")
+    print("\n===== TIMELINE =====")
+    print(graph.timeline_table())
+    if graph.errors:
+        for name, error in graph.errors.items():
+            print(f"[ERROR] {name} failed: {error}")
+        return 1
+    report = results["report"]
+    print("\n===== REPORT SUMMARY =====")
+    print(report_generator.summarize_report(report))
+    print("\n===== NATURAL LANGUAGE SUMMARY =====")
+    print(report_generator.generate_natural_summary(report))
+    regressions = report.get("latency", {}).get("regressions")
+    if args.latency_gate and regressions:
+        print(f"[FAIL] Latency gate: {len(regressions)} endpoint(s) regressed")
+        return 1
+
+def _subparser(name: str, description: str) -> argparse.ArgumentParser:
+    return argparse.ArgumentParser(prog=f"healapi {name}", description=description)
+
+def _load_diff(old_path: str, new_path: str):
+    """Parsed new spec and the diff between both specs."""
+    from healapi import diff_engine
+    old_spec = diff_engine.load_spec(old_path)
+    new_spec = diff_engine.load_spec(new_path)
+    return new_spec, diff_engine.diff_specs(old_spec, new_spec)
+
+def _cmd_diff(argv: List[str]):
+    parser = _subparser("diff", "Print the structured diff between two OpenAPI specs as JSON")
+    parser.add_argument('old_spec', help='Old OpenAPI spec: a YAML/JSON file or git:<rev>:<path>')
+    parser.add_argument('new_spec', help='New OpenAPI spec: a YAML/JSON file or git:<rev>:<path>')
+    args = parser.parse_args(argv)
+    print(json.dumps(_load_diff(args.old_spec, args.new_spec)[1], indent=2))
+
+def _cmd_lint(argv: List[str]):
+    parser = _subparser("lint", "Check OpenAPI specs for likely typos in keys")
+    parser.add_argument('specs', nargs='+', help='OpenAPI specs: YAML/JSON files or git:<rev>:<path>')
+    args = parser.parse_args(argv)
+    from healapi import diff_engine, openapi_typo_linter
+    found = False
+    for spec in args.specs:
+        typos = openapi_typo_linter.find_typos(diff_engine.load_spec(spec))
+        if typos:
+            found = True
+            print(f"- {spec}:")
+            for t in typos:
+                print(f"  {t['path']}: '{t['typo']}' -> '{t['suggestion']}'")
+    if not found:
+        print("No typos found.")
+    return 1 if found else None
+
+def _cmd_analyze(argv: List[str]):
+    parser = _subparser("analyze", "List the tests affected by the changes between two specs")
+    _add_spec_args(parser)
+    _add_test_args(parser)
+    args = parser.parse_args(argv)
+    from healapi import test_analyzer
+    diff = _load_diff(args.old_spec, args.new_spec)[1]
+    print(json.dumps(test_analyzer.analyze_tests(args.test_type, args.test_path, diff), indent=2))
+
+def _cmd_heal(argv: List[str]):
+    parser = _subparser("heal", "Heal the tests affected by the changes between two specs")
+    _add_spec_args(parser)
+    _add_test_args(parser)
+    _add_llm_args(parser)
+    _add_heal_args(parser)
+    args = parser.parse_args(argv)
+    from healapi import healing_engine, patching, test_analyzer
+    new_spec, diff = _load_diff(args.old_spec, args.new_spec)
+    affected = test_analyzer.analyze_tests(args.test_type, args.test_path, diff)
+    healing = healing_engine.heal_tests(
+        args.test_type, args.test_path, affected, diff, new_spec, args.llm_model, args.llm_key_var,
+        output_path=args.healed_collection_path, apply=not args.no_apply, llm_backend=_make_llm_backend(args),
+        llm_max_seconds=args.llm_max_seconds, llm_max_tokens=args.llm_max_tokens
+    )
+    print(json.dumps(healing, indent=2))
+    if args.patch_path:
+        patching.write_json_atomic(args.patch_path, healing)
+        print(f"Healing patch saved to {args.patch_path}")
+    if args.scaffold_path:
+        _print_scaffold(_scaffold(args, diff, new_spec), args.scaffold_path)
+
+def _cmd_run(argv: List[str]):
+    parser = _subparser("run", "Run a pytest directory or Postman collection and print the results as JSON")
+    _add_test_args(parser)
+    _add_run_args(parser)
+    parser.add_argument('--spec', help='(Result cache) OpenAPI spec the cached results are validated against')
+    args = parser.parse_args(argv)
+    from healapi import test_runner
+    test_options = {}
+    if args.result_cache:
+        if not args.spec:
+            parser.error("--result-cache needs --spec")
+        from healapi import diff_engine
+        test_options.update(result_cache=args.result_cache, cache_max_age=args.cache_max_age, spec=diff_engine.load_spec(args.spec))
+    with _mock_server(args):
+        test_results = test_runner.run_tests(args.test_type, args.test_path, **_test_options(args), **test_options)
+    print(json.dumps(test_results, indent=2))
+    return 1 if test_results.get("error") or test_results.get("returncode") else None
+
+def _cmd_report(argv: List[str]):
+    parser = _subparser("report", "Summarize a saved report (reads only its summary section when present)")
+    parser.add_argument('report_path', help='Report written with --report-path (.json, .gz or .zst)')
+    args = parser.parse_args(argv)
+    from healapi import report_generator
+    report = {"summary": report_generator.report_summary(args.report_path)}
+    print("===== REPORT SUMMARY =====")
+    print(report_generator.summarize_report(report))
+    print("\n===== NATURAL LANGUAGE SUMMARY =====")
+    print(report_generator.generate_natural_summary(report))
+
+def _cmd_serve(argv: List[str]):
+    parser = _subparser("serve", "Run HealAPI as an HTTP service (diff, analyze, heal and report jobs) with warm caches")
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+    parser.add_argument('--workers', type=int, default=4, help='Jobs run concurrently (default: 4)')
+    parser.add_argument('--max-pending', type=int, default=64, help='Queued plus running jobs before new jobs are rejected with 503 (default: 64)')
+    parser.add_argument('--cache-size', type=int, default=64, help='Parsed specs, diffs and collections kept warm (default: 64)')
+    parser.add_argument('--job-ttl', type=float, default=3600.0, help='Seconds finished jobs stay available for polling (default: 3600)')
+    parser.add_argument('--history-db', help='SQLite database to record every generated report in (optional)')
+    _add_llm_args(parser)
+    args = parser.parse_args(argv)
+    from healapi import server
+    llm_options = {"backend": args.llm_backend, "key_var": args.llm_key_var, "base_url": args.llm_base_url, "timeout": args.llm_timeout,
+                   "model": args.llm_model, "max_seconds": args.llm_max_seconds, "max_tokens": args.llm_max_tokens,
+                   "stub_options": {"latency": args.llm_stub_latency, "chunk_size": args.llm_stub_chunk_size,
+                                    "responses_path": args.llm_stub_responses}}
+    server.serve(args.host, args.port, args.workers, args.max_pending, args.cache_size, args.job_ttl, llm_options, args.history_db)
+
+def _cmd_batch(argv: List[str]):
+    from healapi import batch
+    return batch.main(argv)
+
+def _cmd_mock(argv: List[str]):
+    from healapi import mock_server
+    return mock_server.main(argv)
+
+def _cmd_scaffold(argv: List[str]):
+    from healapi import scaffold
+    return scaffold.main(argv)
+
+def _cmd_bench(argv: List[str]):
+    from healapi import benchmark
+    return benchmark.main(argv)
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,21 +1,29 @@
 # ...existing code from modules/diff_engine.py...
-import yaml
 import json
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 from difflib import SequenceMatcher
 
+from healapi.result_cache import digest
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def parse_spec(text: str, path: str) -> Dict[str, Any]:
+    """Parse OpenAPI spec text as YAML or JSON, chosen by the file extension of path."""
+    if path.endswith('.yaml') or path.endswith('.yml'):
+        import yaml
+        return yaml.safe_load(text)
+    return json.loads(text)
+
 def load_spec(path: str) -> Dict[str, Any]:
-    """Load an OpenAPI spec from YAML or JSON file."""
+    """
+    Load an OpenAPI spec from a YAML or JSON file, or from git:<rev>:<path>.
+    Parsed specs are cached by content (see spec_source) and shared, so treat them as read-only.
+    """
+    from healapi import spec_source
     try:
-        with open(path, 'r') as f:
-            if path.endswith('.yaml') or path.endswith('.yml'):
-                spec = yaml.safe_load(f)
-            else:
-                spec = json.load(f)
+        spec = spec_source.load_spec(path)
         logger.info(f"Loaded spec from {path}")
         return spec
     except Exception as e:
@@ -35,13 +43,11 @@ def get_schema_properties(spec, path, method):
     except Exception:
         return set()
 
-def diff_specs(old_spec: Dict[str, Any], new_spec: Dict[str, Any]) -> Dict[str, Any]:
-    old_paths = set(old_spec.get('paths', {}).keys())
-    new_paths = set(new_spec.get('paths', {}).keys())
-
-    added = list(new_paths - old_paths)
-    removed = list(old_paths - new_paths)
-    
+def match_renamed_endpoints(old_spec: Dict[str, Any], new_spec: Dict[str, Any], added: List[str], removed: List[str]) -> Tuple[List[Dict[str, str]], List[str], List[str]]:
+    """
+    Pair added with removed paths that look like renames (similar path and response
+    properties). Returns (renamed, still_added, still_removed).
+    """
     renamed = []
     still_added = []
     still_removed = list(removed)
@@ -51,7 +57,7 @@ def diff_specs(old_spec: Dict[str, Any], new_spec: Dict[str, Any]) -> Dict[str,
         highest_score = 0.7  # Similarity threshold
 
         add_methods = set(new_spec['paths'][p_add].keys())
-        add_props = get_schema_properties(new_spec, p_add, list(add_methods)[0]) if add_methods else set()
+        add_props = get_schema_properties(new_spec, p_add, next(iter(new_spec['paths'][p_add]))) if add_methods else set()
 
         for p_rem in still_removed:
             rem_methods = set(old_spec['paths'][p_rem].keys())
@@ -60,7 +66,7 @@ def diff_specs(old_spec: Dict[str, Any], new_spec: Dict[str, Any]) -> Dict[str,
                 # Advanced score: path similarity + property similarity
                 path_ratio = SequenceMatcher(None, p_rem, p_add).ratio()
                 
-                rem_props = get_schema_properties(old_spec, p_rem, list(rem_methods)[0]) if rem_methods else set()
+                rem_props = get_schema_properties(old_spec, p_rem, next(iter(old_spec['paths'][p_rem]))) if rem_methods else set()
                 prop_ratio = 0
                 if add_props and rem_props:
                     prop_ratio = len(add_props.intersection(rem_props)) / len(add_props.union(rem_props))
@@ -77,6 +83,46 @@ def diff_specs(old_spec: Dict[str, Any], new_spec: Dict[str, Any]) -> Dict[str,
             still_removed.remove(best_match)
         else:
             still_added.append(p_add)
+    return renamed, still_added, still_removed
+
+def diff_path(old_spec: Dict[str, Any], new_spec: Dict[str, Any], path: str) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Diff one path present in both specs: (changed_endpoint entry or None, property_changes).
+    """
+    changed = None
+    property_changes = []
+    old_methods = set(old_spec['paths'][path].keys())
+    new_methods = set(new_spec['paths'][path].keys())
+    method_changes = old_methods ^ new_methods
+    if method_changes:
+        changed = {
+            'path': path,
+            'old_methods': list(old_methods),
+            'new_methods': list(new_methods)
+        }
+    # Property-level diff for common methods
+    for method in old_methods & new_methods:
+        old_props = get_schema_properties(old_spec, path, method)
+        new_props = get_schema_properties(new_spec, path, method)
+        added_props = new_props - old_props
+        removed_props = old_props - new_props
+        if added_props or removed_props:
+            property_changes.append({
+                'path': path,
+                'method': method,
+                'added_properties': list(added_props),
+                'removed_properties': list(removed_props)
+            })
+    return changed, property_changes
+
+def diff_specs(old_spec: Dict[str, Any], new_spec: Dict[str, Any]) -> Dict[str, Any]:
+    old_paths = set(old_spec.get('paths', {}).keys())
+    new_paths = set(new_spec.get('paths', {}).keys())
+
+    # Sorted, so the greedy rename matching (and everything built on the diff) is the same on every run
+    added = sorted(new_paths - old_paths)
+    removed = sorted(old_paths - new_paths)
+    renamed, still_added, still_removed = match_renamed_endpoints(old_spec, new_spec, added, removed)
 
     diff = {
         'added_endpoints': still_added,
@@ -86,33 +132,58 @@ def diff_specs(old_spec: Dict[str, Any], new_spec: Dict[str, Any]) -> Dict[str,
         'property_changes': []
     }
 
-    common = old_paths & new_paths
-    for path in common:
-        old_methods = set(old_spec['paths'][path].keys())
-        new_methods = set(new_spec['paths'][path].keys())
-        method_changes = old_methods ^ new_methods
-        if method_changes:
-            diff['changed_endpoints'].append({
-                'path': path,
-                'old_methods': list(old_methods),
-                'new_methods': list(new_methods)
-            })
-        # Property-level diff for common methods
-        for method in old_methods & new_methods:
-            old_props = get_schema_properties(old_spec, path, method)
-            new_props = get_schema_properties(new_spec, path, method)
-            added_props = new_props - old_props
-            removed_props = old_props - new_props
-            if added_props or removed_props:
-                diff['property_changes'].append({
-                    'path': path,
-                    'method': method,
-                    'added_properties': list(added_props),
-                    'removed_properties': list(removed_props)
-                })
+    # Same path order as diff_specs_cached, so both produce identical diffs
+    for path in sorted(old_paths & new_paths):
+        changed, property_changes = diff_path(old_spec, new_spec, path)
+        if changed:
+            diff['changed_endpoints'].append(changed)
+        diff['property_changes'].extend(property_changes)
     logger.info("Diff computed between specs")
     return diff
 
+def path_digests(spec: Dict[str, Any]) -> Dict[str, str]:
+    """Content digest of each path definition of a spec, for diff_specs_cached."""
+    return {path: digest(item) for path, item in (spec.get('paths') or {}).items()}
+
+def diff_specs_cached(old_spec: Dict[str, Any], new_spec: Dict[str, Any], cache: Any,
+                      old_digests: Optional[Dict[str, str]] = None, new_digests: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    diff_specs, reusing per-path results (and rename matches) for path definitions
+    seen before. cache is anything with get() and item assignment (a dict, an LRU
+    cache, a ChainMap) keyed by path definition digests; every entry this diff uses
+    is assigned back, so an LRU cache keeps them warm and a ChainMap(new, old)
+    collects exactly the current entries in new. Pass path_digests of the specs when
+    already known.
+    """
+    old_digests = path_digests(old_spec) if old_digests is None else old_digests
+    new_digests = path_digests(new_spec) if new_digests is None else new_digests
+    added = sorted(set(new_digests) - set(old_digests))
+    removed = sorted(set(old_digests) - set(new_digests))
+    rename_key = ("renames", tuple((p, new_digests[p]) for p in added), tuple((p, old_digests[p]) for p in removed))
+    renames = cache.get(rename_key)
+    if renames is None:
+        renames = match_renamed_endpoints(old_spec, new_spec, added, removed)
+    cache[rename_key] = renames
+    renamed, still_added, still_removed = renames
+    diff = {
+        'added_endpoints': list(still_added),
+        'removed_endpoints': list(still_removed),
+        'renamed_endpoints': list(renamed),
+        'changed_endpoints': [],
+        'property_changes': []
+    }
+    for path in sorted(set(old_digests) & set(new_digests)):
+        key = (path, old_digests[path], new_digests[path])
+        result = cache.get(key)
+        if result is None:
+            result = diff_path(old_spec, new_spec, path)
+        cache[key] = result
+        changed, property_changes = result
+        if changed:
+            diff['changed_endpoints'].append(changed)
+        diff['property_changes'].extend(property_changes)
+    return diff
+
 # Example usage:
 if __name__ == "__main__":
     old = load_spec('old_openapi.yaml')
@@ -2,58 +2,73 @@
 import json
 import re
 import logging
-import os
-from typing import List, Dict, Any, Optional
-from together import Together
+from typing import Callable, List, Dict, Any, Optional, Tuple
 import ast
-import astor
 import difflib
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except ImportError:
-    pass  # dotenv is optional, but recommended
+from healapi.llm_backends import LLMBackend, get_backend
+from healapi.llm_budget import LLMScheduler
+from healapi.llm_stream import extract_payload
+from healapi.script_rewriter import ScriptRewriter
+from healapi.patching import json_pointer, make_unified_diff, write_atomic, write_json_atomic
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Set Together API key and default model if not already set
-def _ensure_together_api_key_and_model(openai_model: Optional[str], llm_key_var: str) -> str:
-    if not os.environ.get(llm_key_var):
-        error_msg = f"{llm_key_var} not set. Please create a .env file with {llm_key_var}=your-key or set it in your environment."
-        logger.error(error_msg)
-        raise RuntimeError(error_msg)
-    if not openai_model:
-        openai_model = "meta-llama/Llama-3.3-70B-Instruct-Turbo-Free"
-        logger.info(f"Set Together model to {openai_model} by default.")
-    return openai_model
+# Leading Postman host variable of a raw url, e.g. "{{apiurl}}"
+_HOST_VAR_RE = re.compile(r"^\{\{[^}]+\}\}")
+
 
 def _extract_json_from_llm_response(response_text: str) -> str:
     """
-    Extract the first JSON code block from an LLM response (markdown or plain).
+    Extract the first valid JSON object (fenced or plain) from an LLM response
+    with a single linear scan.
+    """
+    payload = extract_payload(response_text, "json")
+    return payload if payload is not None else response_text.strip()
+
+def _pytest_impact(source: str, diff: Dict[str, Any]) -> int:
     """
-    # Try to find a ```json ... ``` code block
-    match = re.search(r"```json\s*([\s\S]+?)```", response_text, re.IGNORECASE)
-    if match:
-        return match.group(1).strip()
-    # Fallback: try to find any {...} block at the start of a line
-    match = re.search(r"(\{[\s\S]+\})", response_text)
-    if match:
-        return match.group(1).strip()
-    return response_text.strip()
-
-def heal_pytest_files(affected_files: List[str], diff: Dict[str, Any], openapi_new: Dict[str, Any], openai_model: Optional[str] = None, llm_key_var: str = "TOGETHER_API_KEY") -> Dict[str, Any]:
+    Impact score of a broken test file: references to removed/changed endpoints
+    plus references to removed response properties (likely broken assertions).
+    """
+    impact = 0
+    for path in diff.get("removed_endpoints", []) + [c.get("path", "") for c in diff.get("changed_endpoints", [])]:
+        if path:
+            impact += 2 * source.count(path)
+    for prop_change in diff.get("property_changes", []):
+        for prop in prop_change.get("removed_properties", []):
+            impact += source.count(f'"{prop}"') + source.count(f"'{prop}'")
+    return impact
+
+def heal_pytest_files(affected_files: List[str], diff: Dict[str, Any], openapi_new: Dict[str, Any], openai_model: Optional[str] = None, llm_key_var: str = "TOGETHER_API_KEY", apply: bool = True, llm_backend: Optional[LLMBackend] = None, llm_max_seconds: Optional[float] = None, llm_max_tokens: Optional[int] = None, sources: Optional[Dict[str, str]] = None,
+                      on_file_healed: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
     """
     Improved: Use AST to update endpoint paths, methods, and assertions in pytest files.
-    Uses LLM (Together API) only for complex cases.
-    Returns a dict with healing actions.
+    Uses the LLM backend (Together by default) only for complex cases; those files are
+    sent highest-impact first within the llm_max_seconds / llm_max_tokens budget, and
+    every call is metered under "llm_usage".
+    Returns a dict with healing actions and a unified diff per patched file; files are
+    only rewritten (atomically) when apply is set and their content changed.
+    With sources ({file path: source}), files are read from it instead of disk.
+    on_file_healed is called with each file's action as soon as that file is final
+    (and written): files healed without the LLM before any LLM call is made.
     """
-    openai_model = _ensure_together_api_key_and_model(openai_model, llm_key_var)
-    actions = []
+    import astor
+    llm_backend = llm_backend or get_backend("together", llm_key_var)
+    openai_model = llm_backend.resolve_model(openai_model)
+    file_actions = {}
+    patches = {}
+    healed_sources = {}
+    llm_candidates = []
+    diff_json = json.dumps(diff)
+    spec_json = json.dumps(openapi_new)
     for file_path in affected_files:
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                source = f.read()
+            if sources is not None:
+                source = sources[file_path]
+            else:
+                with open(file_path, "r", encoding="utf-8") as f:
+                    source = f.read()
             original_source = source
             tree = ast.parse(source)
             changed = False
@@ -104,36 +119,61 @@ def heal_pytest_files(affected_files: List[str], diff: Dict[str, Any], openapi_n
 
             tree = HealVisitor().visit(tree)
             healed_code = astor.to_source(tree)
-            # LLM fallback for complex cases
+            healed_sources[file_path] = (original_source, healed_code if changed else original_source)
+            # LLM fallback for complex cases, scheduled below by impact
             if not changed and openai_model:
-                prompt = f"""The following pytest test is broken due to these OpenAPI changes: {json.dumps(diff)}\nHere is the test code:\n{original_source}\nHere is the new OpenAPI schema:\n{json.dumps(openapi_new)}\nPlease suggest a fixed version that will pass with the new API spec."""
-                try:
-                    client = Together()
-                    response = client.chat.completions.create(
-                        model=openai_model,
-                        messages=[{"role": "user", "content": prompt}],
-                        stream=True
-                    )
-                    new_content = ""
-                    for token in response:
-                        if hasattr(token, 'choices'):
-                            new_content += token.choices[0].delta.content or ""
-                    if new_content.strip():
-                        healed_code = new_content
-                        changed = True
-                except Exception as e:
-                    logger.error(f"LLM healing failed for {file_path}: {e}")
-            if changed and healed_code != original_source:
-                with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(healed_code)
-                actions.append({"file": file_path, "action": "patched"})
-                logger.info(f"Patched {file_path}")
+                prompt = f"""The following pytest test is broken due to these OpenAPI changes: {diff_json}\nHere is the test code:\n{original_source}\nHere is the new OpenAPI schema:\n{spec_json}\nPlease suggest a fixed version that will pass with the new API spec."""
+                llm_candidates.append({"key": file_path, "impact": _pytest_impact(original_source, diff), "prompt": prompt})
+        except Exception as e:
+            logger.error(f"Error healing {file_path}: {e}")
+            file_actions[file_path] = {"file": file_path, "action": "error", "error": str(e)}
+
+    def finalize(file_path):
+        original_source, healed_code = healed_sources[file_path]
+        try:
+            if healed_code != original_source:
+                patches[file_path] = make_unified_diff(file_path, original_source, healed_code)
+                if apply:
+                    write_atomic(file_path, healed_code)
+                    logger.info(f"Patched {file_path}")
+                file_actions[file_path] = {"file": file_path, "action": "patched"}
             else:
-                actions.append({"file": file_path, "action": "no_change"})
+                file_actions[file_path] = {"file": file_path, "action": "no_change"}
         except Exception as e:
             logger.error(f"Error healing {file_path}: {e}")
-            actions.append({"file": file_path, "action": "error", "error": str(e)})
-    return {"healed_pytest_files": actions}
+            file_actions[file_path] = {"file": file_path, "action": "error", "error": str(e)}
+        if on_file_healed:
+            on_file_healed(file_actions[file_path])
+
+    pending_llm = {candidate["key"] for candidate in llm_candidates}
+    for file_path in affected_files:
+        if file_path in pending_llm:
+            continue
+        if file_path in healed_sources:
+            finalize(file_path)
+        elif on_file_healed and file_path in file_actions:
+            on_file_healed(file_actions[file_path])
+
+    def on_llm_result(candidate, assembler):
+        if assembler.payload:
+            healed_sources[candidate["key"]] = (healed_sources[candidate["key"]][0], assembler.payload + "\n")
+        else:
+            logger.warning(f"LLM response for {candidate['key']} contained no valid python code")
+        pending_llm.discard(candidate["key"])
+        finalize(candidate["key"])
+
+    scheduler = LLMScheduler(llm_backend, openai_model, llm_max_seconds, llm_max_tokens)
+    scheduler.run(llm_candidates, "python", on_llm_result)
+    # Candidates skipped by the budget or whose call failed keep their AST result
+    for file_path in [f for f in affected_files if f in pending_llm]:
+        finalize(file_path)
+
+    actions = [file_actions[f] for f in affected_files if f in file_actions]
+    return {
+        "healed_pytest_files": actions,
+        "patches": {f: patches[f] for f in affected_files if f in patches},
+        "llm_usage": {"budget": scheduler.summary(), "calls": scheduler.calls},
+    }
 
 def _find_renamed_endpoints(diff, old_spec, new_spec):
     """
@@ -172,46 +212,6 @@ def _find_renamed_endpoints(diff, old_spec, new_spec):
                     renames[old_path] = new_path
     return renames
 
-def _make_postman_request_for_endpoint(path, method, new_spec):
-    """
-    Create a basic Postman request item for a new endpoint.
-    """
-    url = {
-        "raw": f"{{{{apiurl}}}}{path}",
-        "host": ["{{apiurl}}"],
-        "path": [p for p in path.strip("/").split("/") if p]
-    }
-    # Try to get response properties for test script
-    responses = new_spec['paths'][path][method].get('responses', {})
-    test_lines = []
-    for code, resp in responses.items():
-        content = resp.get('content', {})
-        for ctype, cval in content.items():
-            schema = cval.get('schema', {})
-            if 'properties' in schema:
-                for prop in schema['properties']:
-                    test_lines.append(f"    pm.expect(jsonData).to.have.property('{prop}');")
-    test_script = [
-        "pm.test(\"Response has expected properties\", function () {",
-        "    var jsonData = pm.response.json();"
-    ] + test_lines + ["});"] if test_lines else []
-    return {
-        "name": f"{method.upper()} {path}",
-        "request": {
-            "method": method.upper(),
-            "header": [],
-            "url": url
-        },
-        "event": [{
-            "listen": "test",
-            "script": {
-                "type": "text/javascript",
-                "exec": test_script
-            }
-        }] if test_script else [],
-        "response": []
-    }
-
 def fuzzy_match_path(old_path, new_paths):
     best_match = None
     best_ratio = 0.0
@@ -222,181 +222,239 @@ def fuzzy_match_path(old_path, new_paths):
             best_match = new_path
     return best_match if best_ratio > 0.7 else None  # Threshold
 
-def heal_postman_collection(collection_path: str, diff: Dict[str, Any], openapi_new: Dict[str, Any], openai_model: Optional[str] = None, llm_key_var: str = "TOGETHER_API_KEY", output_path: Optional[str] = None) -> Dict[str, Any]:
+def _request_path(url) -> Optional[str]:
     """
-    Improved: Use fuzzy matching for endpoint renames, update test scripts, handle all body modes, and use LLM only for complex cases.
+    Return the spec-style path of a Postman request url (dict or raw string),
+    without the leading {{host}} variable and without any query string.
     """
-    openai_model = _ensure_together_api_key_and_model(openai_model, llm_key_var)
-    actions = []
+    raw = url.get("raw", "") if isinstance(url, dict) else url
+    if not raw or not isinstance(raw, str):
+        return None
+    path = _HOST_VAR_RE.sub("", raw, count=1)
+    return path.split("?", 1)[0].split("#", 1)[0]
+
+def _build_postman_heal_tables(diff: Dict[str, Any], openapi_new: Dict[str, Any], actions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Precompute the lookup tables used by the single-pass collection walk so that
+    every request is resolved to its operation with dict lookups only.
+    """
+    available_endpoints = set(openapi_new.get('paths', {}).keys())
+    renames = {item['from']: item['to'] for item in diff.get("renamed_endpoints", [])}
+
+    # Auto-detect renames by fuzzy matching removed endpoints against added endpoints
+    removed_endpoints = set(diff.get("removed_endpoints", []))
+    added_endpoints = set(diff.get("added_endpoints", []))
+    for removed_endpoint in sorted(removed_endpoints):
+        best_match = fuzzy_match_path(removed_endpoint, added_endpoints)
+        if best_match:
+            renames[removed_endpoint] = best_match
+            actions.append({"request": removed_endpoint, "action": f"auto-detected-rename-to {best_match}"})
+
+    property_changes = {}
+    for prop_change in diff.get("property_changes", []):
+        key = (prop_change.get('path'), (prop_change.get('method') or '').lower())
+        removed, added = property_changes.setdefault(key, ([], []))
+        removed.extend(prop_change.get("removed_properties", []))
+        added.extend(prop_change.get("added_properties", []))
+
+    return {
+        "available": available_endpoints,
+        "renames": renames,
+        "removed": removed_endpoints - available_endpoints,
+        "property_changes": property_changes,
+        "scripts": ScriptRewriter(openapi_new, property_changes),
+    }
+
+def _patch_request_body(item: Dict[str, Any], removed_props: List[str], added_props: List[str]) -> bool:
+    """
+    Drop removed properties from and add placeholders for added properties to a raw JSON body.
+    """
+    body = item.get("request", {}).get('body')
+    if not body or body.get('mode') != 'raw':
+        return False
+    body_raw = body.get('raw')
+    if not body_raw or not isinstance(body_raw, str):
+        return False
+    body_json = json.loads(body_raw)
+    if not isinstance(body_json, dict):
+        return False
+    body_changed = False
+    for prop in removed_props:
+        if prop in body_json:
+            del body_json[prop]
+            body_changed = True
+    for prop in added_props:
+        body_json[prop] = "<patched>"
+        body_changed = True
+    if body_changed:
+        body['raw'] = json.dumps(body_json, indent=2)
+    return body_changed
+
+def _set_op(container: Dict[str, Any], key: str, pointer: str, value: Any) -> Dict[str, Any]:
+    """JSON Patch operation setting container[key] (replace if present, add otherwise)."""
+    return {"op": "replace" if key in container else "add", "path": pointer, "value": value}
+
+def _heal_postman_request(item: Dict[str, Any], pointer: str, tables: Dict[str, Any], actions: List[Dict[str, Any]], patch: List[Dict[str, Any]]) -> Optional[bool]:
+    """
+    Apply rename, removal, body patching and test script updates to one request item,
+    recording the equivalent JSON Patch operations (relative to pointer) in patch.
+    Returns None if the item must be deleted, otherwise whether it was changed.
+    """
+    request = item.get("request", {})
+    if not isinstance(request, dict):
+        return False
+    url = request.get("url", {})
+    raw_path = _request_path(url)
+    if raw_path is None:
+        return False
+    method = (request.get("method") or "GET").lower()
+    changed = False
+
+    if raw_path in tables["renames"]:
+        new_path = tables["renames"][raw_path]
+        raw_full = url.get("raw", "") if isinstance(url, dict) else url
+        host = _HOST_VAR_RE.match(raw_full)
+        host = host.group(0) if host else ""
+        # Keep the host variable and any query string, swap only the path
+        new_raw = f"{host or '{{apiurl}}'}{new_path}{raw_full[len(host) + len(raw_path):]}"
+        url_pointer = json_pointer("request", "url")
+        if isinstance(url, dict):
+            new_segments = [p for p in new_path.strip("/").split("/") if p]
+            patch.append(_set_op(url, "raw", pointer + url_pointer + "/raw", new_raw))
+            patch.append(_set_op(url, "path", pointer + url_pointer + "/path", new_segments))
+            url["raw"] = new_raw
+            url["path"] = new_segments
+        else:
+            patch.append(_set_op(request, "url", pointer + url_pointer, new_raw))
+            request["url"] = new_raw
+        new_name = f"{request.get('method', 'GET')} {new_path}"
+        patch.append(_set_op(item, "name", pointer + "/name", new_name))
+        item["name"] = new_name
+        actions.append({"request": raw_path, "action": f"renamed-to {new_path}"})
+        raw_path = new_path
+        changed = True
+    elif raw_path in tables["removed"]:
+        actions.append({"request": raw_path, "action": "removed-deleted-endpoint"})
+        return None
+
+    if raw_path not in tables["available"]:
+        return changed
+
+    prop_change = tables["property_changes"].get((raw_path, method))
+    if prop_change:
+        try:
+            if _patch_request_body(item, *prop_change):
+                patch.append({"op": "replace", "path": pointer + json_pointer("request", "body", "raw"),
+                              "value": item["request"]["body"]["raw"]})
+                changed = True
+                actions.append({"request": item.get("name", raw_path), "action": "patched-properties"})
+        except json.JSONDecodeError:
+            logger.warning(f"Could not parse raw body as JSON for request: {item.get('name')}")
+        except Exception as e:
+            actions.append({"request": item.get("name", raw_path), "action": "property-patch-failed", "error": str(e)})
+
+    updated_events = tables["scripts"].rewrite_item(item, raw_path, method)
+    for index in updated_events:
+        patch.append({"op": "replace", "path": pointer + json_pointer("event", index, "script", "exec"),
+                      "value": item["event"][index]["script"]["exec"]})
+    if updated_events:
+        changed = True
+        actions.append({"request": item.get("name", raw_path), "action": "updated-test-script"})
+    return changed
+
+def _heal_postman_items(items: List[Dict[str, Any]], pointer: str, tables: Dict[str, Any], actions: List[Dict[str, Any]], patch: List[Dict[str, Any]], removals: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Walk a (possibly nested) list of Postman items once, healing requests and
+    descending into folders. Returns the surviving items and whether anything changed.
+    Pointers in patch and removals refer to the original, unhealed document.
+    """
+    healed_items = []
     changed = False
+    for index, item in enumerate(items):
+        item_pointer = f"{pointer}/{index}"
+        if isinstance(item.get("item"), list):
+            # Folder, recurse
+            item["item"], folder_changed = _heal_postman_items(item["item"], item_pointer + "/item", tables, actions, patch, removals)
+            changed = changed or folder_changed
+            healed_items.append(item)
+            continue
+        outcome = _heal_postman_request(item, item_pointer, tables, actions, patch)
+        if outcome is None:
+            removals.append({"op": "remove", "path": item_pointer})
+            changed = True
+            continue
+        changed = changed or outcome
+        healed_items.append(item)
+    return healed_items, changed
+
+def heal_postman_items(collection: Dict[str, Any], diff: Dict[str, Any], openapi_new: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Heal an in-memory Postman collection in a single recursive pass: every request
+    (including those nested in folders) is resolved once against precomputed rename,
+    removal and property-change tables, and renamed, deleted, body-patched and
+    script-updated together. Returns (actions, patch), where patch is the RFC 6902
+    JSON Patch turning the original collection into the healed one.
+    """
+    actions = []
+    patch = []
+    removals = []
+    tables = _build_postman_heal_tables(diff, openapi_new, actions)
+    collection["item"], _ = _heal_postman_items(collection.get("item", []), "/item", tables, actions, patch, removals)
+    # Removals go last, deepest/highest index first, so earlier pointers stay valid
+    patch.extend(reversed(removals))
+    return actions, patch
+
+def heal_postman_collection(collection_path: str, diff: Dict[str, Any], openapi_new: Dict[str, Any], openai_model: Optional[str] = None, llm_key_var: str = "TOGETHER_API_KEY", output_path: Optional[str] = None, apply: bool = True) -> Dict[str, Any]:
+    """
+    Heal a Postman collection and return the healing actions plus a JSON Patch.
+    When apply is set and the patch is not empty, the healed collection is written
+    atomically to output_path (or back to collection_path); unchanged collections
+    are never rewritten.
+    """
+    actions = []
+    patch = []
+    written_to = None
     try:
         with open(collection_path, "r", encoding="utf-8") as f:
             collection = json.load(f)
 
-        # Get available endpoints from new spec
-        available_endpoints = set()
-        for path in openapi_new.get('paths', {}).keys():
-            available_endpoints.add(path)
-
-        # Handle renamed endpoints using fuzzy matching
-        renames = {item['from']: item['to'] for item in diff.get("renamed_endpoints", [])}
-        
-        # Auto-detect renames by comparing removed and added endpoints
-        removed_endpoints = set(diff.get("removed_endpoints", []))
-        added_endpoints = set(diff.get("added_endpoints", []))
-        
-        # Try to match removed endpoints with added endpoints using fuzzy matching
-        for removed_endpoint in removed_endpoints:
-            best_match = fuzzy_match_path(removed_endpoint, added_endpoints)
-            if best_match:
-                renames[removed_endpoint] = best_match
-                actions.append({"request": removed_endpoint, "action": f"auto-detected-rename-to {best_match}"})
-
-        # Process each request in the collection
-        items_to_remove = []
-        for i, item in enumerate(collection.get("item", [])):
-            request = item.get("request", {})
-            url = request.get("url", {})
-            if not isinstance(url, dict):
-                continue
-
-            raw_path_full = url.get("raw", "")
-            if not raw_path_full or not isinstance(raw_path_full, str):
-                continue
-
-            raw_path = raw_path_full.replace("{{apiurl}}", "")
-            
-            # Check if this endpoint was renamed
-            if raw_path in renames:
-                new_path = renames[raw_path]
-                url["raw"] = f"{{{{apiurl}}}}{new_path}"
-                url["path"] = [p for p in new_path.strip("/").split("/") if p]
-                item["name"] = f"{request.get('method', 'GET')} {new_path}"
-                changed = True
-                actions.append({"request": raw_path, "action": f"renamed-to {new_path}"})
-                
-                # Update test scripts to match new endpoint response structure
-                _update_test_scripts_for_endpoint(item, new_path, openapi_new)
-                
-            # Check if this endpoint was removed and should be deleted
-            elif raw_path in removed_endpoints and raw_path not in available_endpoints:
-                items_to_remove.append(i)
-                actions.append({"request": raw_path, "action": "removed-deleted-endpoint"})
-                changed = True
-                
-            # Check if this endpoint still exists but needs test script updates
-            elif raw_path in available_endpoints:
-                _update_test_scripts_for_endpoint(item, raw_path, openapi_new)
-        
-        # Remove deleted endpoints (in reverse order to maintain indices)
-        for i in reversed(items_to_remove):
-            collection["item"].pop(i)
-        
-        # Handle body property changes
-        for item in collection.get("item", []):
-            request = item.get("request", {})
-            raw_path_full = request.get("url", {}).get("raw", "")
-            raw_path = raw_path_full.replace("{{apiurl}}", "")
-            
-            if request.get('body') and request['body'].get('mode') == 'raw':
-                body_raw = request['body'].get('raw')
-                if body_raw and isinstance(body_raw, str):
-                    try:
-                        body_json = json.loads(body_raw)
-                        body_changed = False
-                        for prop_change in diff.get("property_changes", []):
-                            if prop_change['path'] in raw_path_full and request.get("method", "").lower() == prop_change.get('method'):
-                                for prop in prop_change.get("removed_properties", []):
-                                    if prop in body_json:
-                                        del body_json[prop]
-                                        body_changed = True
-                                for prop in prop_change.get("added_properties", []):
-                                    body_json[prop] = "<patched>"
-                                    body_changed = True
-                        if body_changed:
-                            request['body']['raw'] = json.dumps(body_json, indent=2)
-                            changed = True
-                            actions.append({"request": item.get("name", raw_path), "action": "patched-properties"})
-                    except json.JSONDecodeError:
-                        logger.warning(f"Could not parse raw body as JSON for request: {item.get('name')}")
-                    except Exception as e:
-                        actions.append({"request": item.get("name", raw_path), "action": "property-patch-failed", "error": str(e)})
-
-        # At the end, write the healed collection back to the original file
-        with open(collection_path, "w", encoding="utf-8") as f:
-            json.dump(collection, f, indent=2)
+        actions, patch = heal_postman_items(collection, diff, openapi_new)
+
+        if apply and patch:
+            written_to = output_path or collection_path
+            write_json_atomic(written_to, collection)
+            logger.info(f"Healed collection written to {written_to}")
+        elif not patch:
+            logger.info(f"No healing changes for {collection_path}")
     except Exception as e:
         logger.error(f"Error healing Postman collection {collection_path}: {e}")
         actions.append({"collection": collection_path, "action": "error", "error": str(e)})
-    return {"healed_postman_requests": actions, "healed_collection": collection}
+    return {
+        "healed_postman_requests": actions,
+        "patch": patch,
+        "collection": collection_path,
+        "output_path": output_path,
+        "written_to": written_to,
+    }
 
-def _update_test_scripts_for_endpoint(item, endpoint_path, openapi_new):
+def healed_test_path(healing: Dict[str, Any], test_path: str) -> str:
     """
-    Update test scripts for a specific endpoint based on the new OpenAPI spec.
+    Where the healed tests are: the collection written by heal_postman_collection
+    (possibly a separate output path), else test_path (healed in place, or unchanged).
     """
-    try:
-        # Get the endpoint definition from the new spec
-        endpoint_def = openapi_new.get('paths', {}).get(endpoint_path, {})
-        if not endpoint_def:
-            return
-            
-        # Get the method (assume GET for now)
-        method = 'get'
-        if method not in endpoint_def:
-            return
-            
-        # Get response schema
-        responses = endpoint_def[method].get('responses', {})
-        expected_properties = set()
-        
-        for code, resp in responses.items():
-            content = resp.get('content', {})
-            for ctype, cval in content.items():
-                schema = cval.get('schema', {})
-                if 'properties' in schema:
-                    expected_properties.update(schema['properties'].keys())
-        
-        # Update test scripts
-        for event in item.get("event", []):
-            if event.get("listen") == "test":
-                script = event.get("script", {})
-                if script.get("type") == "text/javascript":
-                    exec_lines = script.get("exec", [])
-                    new_exec_lines = []
-                    
-                    for line in exec_lines:
-                        # Replace old property expectations with new ones
-                        if "pm.expect(jsonData).to.have.property(" in line:
-                            # Extract the old property name
-                            import re
-                            match = re.search(r"pm\.expect\(jsonData\)\.to\.have\.property\('([^']+)'\)", line)
-                            if match:
-                                old_prop = match.group(1)
-                                # If the old property is not in expected properties, replace it
-                                if old_prop not in expected_properties and expected_properties:
-                                    # Use the first expected property as replacement
-                                    new_prop = list(expected_properties)[0]
-                                    new_line = line.replace(f"'{old_prop}'", f"'{new_prop}'")
-                                    new_exec_lines.append(new_line)
-                                else:
-                                    new_exec_lines.append(line)
-                            else:
-                                new_exec_lines.append(line)
-                        else:
-                            new_exec_lines.append(line)
-                    
-                    script["exec"] = new_exec_lines
-    except Exception as e:
-        logger.warning(f"Error updating test scripts for {endpoint_path}: {e}")
+    return healing.get("written_to") or test_path
 
-def heal_tests(test_type: str, test_path: str, affected: List[str], diff: Dict[str, Any], openapi_new: Dict[str, Any], openai_model: Optional[str] = None, llm_key_var: str = "TOGETHER_API_KEY") -> Dict[str, Any]:
+def heal_tests(test_type: str, test_path: str, affected: List[str], diff: Dict[str, Any], openapi_new: Dict[str, Any], openai_model: Optional[str] = None, llm_key_var: str = "TOGETHER_API_KEY", output_path: Optional[str] = None, apply: bool = True, llm_backend: Optional[LLMBackend] = None, llm_max_seconds: Optional[float] = None, llm_max_tokens: Optional[int] = None,
+               on_file_healed: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
     """
-    Heal tests based on type and return healing actions.
+    Heal tests based on type and return healing actions and patches.
+    on_file_healed (pytest only): see heal_pytest_files.
     """
     if test_type == "pytest":
-        return heal_pytest_files(affected, diff, openapi_new, openai_model, llm_key_var)
+        return heal_pytest_files(affected, diff, openapi_new, openai_model, llm_key_var, apply=apply, llm_backend=llm_backend,
+                                 llm_max_seconds=llm_max_seconds, llm_max_tokens=llm_max_tokens, on_file_healed=on_file_healed)
     elif test_type == "postman":
-        return heal_postman_collection(test_path, diff, openapi_new, openai_model, llm_key_var)
+        return heal_postman_collection(test_path, diff, openapi_new, openai_model, llm_key_var, output_path=output_path, apply=apply)
     else:
         logger.error(f"Unknown test type: {test_type}")
         raise ValueError(f"Unknown test type: {test_type}")
@@ -0,0 +1,156 @@
+import math
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+from healapi.result_cache import request_path
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Defaults for the regression check against the rolling baseline
+BASELINE_RUNS = 20
+P95_THRESHOLD = 0.2
+MIN_DELTA_MS = 5.0
+ALPHA = 0.05
+MIN_BASELINE_SAMPLES = 5
+_EXACT_MAX_PAIRS = 2500
+
+def endpoint_key(method: Optional[str], path: Optional[str]) -> str:
+    return f"{(method or 'GET').upper()} {path or '/'}"
+
+def endpoint_samples(test_results: Dict[str, Any]) -> Dict[str, List[float]]:
+    """
+    Response times (ms) per endpoint ("METHOD /path") from the executions of a
+    Newman/native/async report. Cached and errored executions have no real timing and are left out.
+    """
+    report = (test_results or {}).get("report")
+    run = report.get("run") if isinstance(report, dict) else None
+    samples: Dict[str, List[float]] = {}
+    for execution in (run or {}).get("executions") or []:
+        response = execution.get("response") or {}
+        if execution.get("cached") or execution.get("requestError") or response.get("responseTime") is None:
+            continue
+        item_request = (execution.get("item") or {}).get("request") or {}
+        if isinstance(item_request, str):
+            item_request = {"url": item_request}
+        method = (execution.get("request") or {}).get("method") or item_request.get("method")
+        samples.setdefault(endpoint_key(method, request_path(item_request.get("url"))), []).append(float(response["responseTime"]))
+    return samples
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Percentile (0-100) with linear interpolation between closest ranks."""
+    ordered = sorted(values)
+    if not ordered:
+        raise ValueError("percentile of no values")
+    rank = (len(ordered) - 1) * q / 100
+    low = math.floor(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+def aggregate(values: Sequence[float]) -> Dict[str, Any]:
+    return {"count": len(values), "min": round(min(values), 3), "mean": round(sum(values) / len(values), 3),
+            "p50": round(percentile(values, 50), 3), "p95": round(percentile(values, 95), 3), "max": round(max(values), 3)}
+
+def aggregate_run(test_results: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """count/min/mean/p50/p95/max response time per endpoint of one run."""
+    return {endpoint: aggregate(values) for endpoint, values in sorted(endpoint_samples(test_results).items())}
+
+def _exact_u_sf(u: float, n1: int, n2: int) -> float:
+    """P(U >= u) for the Mann-Whitney U of sample sizes n1, n2 without ties (exact null distribution)."""
+    # counts[m][k]: number of arrangements of m first-sample and j second-sample values with U == k, built up over j
+    counts = [[1] + [0] * (n1 * n2) for _ in range(n1 + 1)]
+    for j in range(1, n2 + 1):
+        new = [[1] + [0] * (n1 * n2)]
+        for m in range(1, n1 + 1):
+            row = [0] * (n1 * n2 + 1)
+            for k in range(m * j + 1):
+                # The largest value belongs to the first sample (adds j to U) or to the second
+                row[k] = (new[m - 1][k - j] if k >= j else 0) + counts[m][k]
+            new.append(row)
+        counts = new
+    distribution = counts[n1]
+    total = sum(distribution)
+    return sum(distribution[math.ceil(u):]) / total
+
+def mann_whitney_greater(current: Sequence[float], baseline: Sequence[float]) -> Dict[str, float]:
+    """
+    One-sided Mann-Whitney U test of "current is stochastically greater than
+    baseline". Exact for small samples without ties, normal approximation (with
+    tie and continuity correction) otherwise.
+    """
+    n1, n2 = len(current), len(baseline)
+    combined = sorted([(v, 0) for v in current] + [(v, 1) for v in baseline])
+    ranks = [0.0] * len(combined)
+    tie_term = 0.0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        tie_term += (j - i + 1) ** 3 - (j - i + 1)
+        i = j + 1
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+    if tie_term == 0 and n1 * n2 <= _EXACT_MAX_PAIRS:
+        return {"u": u, "p_value": _exact_u_sf(u, n1, n2)}
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return {"u": u, "p_value": 1.0}
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return {"u": u, "p_value": 0.5 * math.erfc(z / math.sqrt(2))}
+
+def compare(current: Dict[str, List[float]], baseline: Dict[str, List[float]], threshold: float = P95_THRESHOLD,
+            min_delta_ms: float = MIN_DELTA_MS, alpha: float = ALPHA, min_baseline: int = MIN_BASELINE_SAMPLES) -> List[Dict[str, Any]]:
+    """
+    Per-endpoint comparison of this run's response times with the baseline samples.
+    An endpoint regressed when its p95 grew by more than threshold (relative) and
+    min_delta_ms (absolute) and the Mann-Whitney test rejects "not slower" at alpha.
+    Endpoints with fewer than min_baseline baseline samples are reported but never flagged.
+    """
+    results = []
+    for endpoint, values in sorted(current.items()):
+        history = baseline.get(endpoint) or []
+        entry = {"endpoint": endpoint, "p95": round(percentile(values, 95), 3), "samples": len(values),
+                 "baseline_samples": len(history), "baseline_p95": None, "change": None, "p_value": None, "regressed": False}
+        if len(history) >= min_baseline:
+            baseline_p95 = percentile(history, 95)
+            test = mann_whitney_greater(values, history)
+            entry.update(baseline_p95=round(baseline_p95, 3), p_value=round(test["p_value"], 5),
+                         change=round(entry["p95"] / baseline_p95 - 1, 3) if baseline_p95 else None)
+            entry["regressed"] = (entry["p95"] > baseline_p95 * (1 + threshold) and entry["p95"] - baseline_p95 >= min_delta_ms
+                                  and test["p_value"] < alpha)
+        results.append(entry)
+    return results
+
+def latency_section(test_results: Dict[str, Any], history_path: Optional[str] = None, baseline_runs: int = BASELINE_RUNS,
+                    threshold: float = P95_THRESHOLD, min_delta_ms: float = MIN_DELTA_MS, alpha: float = ALPHA) -> Dict[str, Any]:
+    """
+    Report section with per-endpoint latency aggregates and, when a run-history
+    database is given, the comparison against the last baseline_runs runs recorded there.
+    """
+    samples = endpoint_samples(test_results)
+    section = {"endpoints": {endpoint: aggregate(values) for endpoint, values in sorted(samples.items())},
+               "baseline_runs": baseline_runs, "threshold": threshold, "comparison": [], "regressions": []}
+    if history_path and samples:
+        from healapi.run_history import HistoryStore
+        with HistoryStore(history_path) as store:
+            baseline = store.latency_baseline(list(samples), baseline_runs)
+        section["comparison"] = compare(samples, baseline, threshold, min_delta_ms, alpha)
+        section["regressions"] = [entry for entry in section["comparison"] if entry["regressed"]]
+        for entry in section["regressions"]:
+            logger.warning(f"Latency regression: {entry['endpoint']} p95 {entry['p95']}ms vs baseline {entry['baseline_p95']}ms "
+                           f"(p={entry['p_value']})")
+    return section
+
+# Example usage:
+if __name__ == "__main__":
+    import sys
+    import json
+    if len(sys.argv) != 2:
+        print("Usage: python -m healapi.latency <test_results.json>")
+        sys.exit(1)
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        print(json.dumps(aggregate_run(json.load(f)), indent=2))
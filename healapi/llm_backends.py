@@ -0,0 +1,192 @@
+import abc
+import json
+import os
+import atexit
+import logging
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    import urllib.request
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOGETHER_MODEL = "meta-llama/Llama-3.3-70B-Instruct-Turbo-Free"
+BACKENDS = ("together", "openai", "stub")
+_dotenv_loaded = False
+# Stub servers by options, shared by every stub backend built with the same options
+_stub_servers: Dict[str, Any] = {}
+_stub_lock = threading.Lock()
+
+def load_dotenv_once():
+    """Load API keys from a .env file (if python-dotenv is installed) the first time an LLM backend is needed."""
+    global _dotenv_loaded
+    if _dotenv_loaded:
+        return
+    _dotenv_loaded = True
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass  # dotenv is optional, but recommended
+
+class ChatStream:
+    """
+    Text chunks of one chat completion as they arrive, plus the token usage the
+    backend reported for that call so far (None if it reported none). Every call
+    gets its own stream, so usage is never mixed up between concurrent calls.
+    """
+
+    def __init__(self, chunks: Callable[["ChatStream"], Iterator[str]]):
+        self.usage: Optional[Dict[str, int]] = None
+        self._chunks = chunks(self)
+
+    def __iter__(self) -> "ChatStream":
+        return self
+
+    def __next__(self) -> str:
+        return next(self._chunks)
+
+    def close(self):
+        """Stop reading (and release the connection) before the completion has ended."""
+        close = getattr(self._chunks, "close", None)
+        if close:
+            close()
+
+class LLMBackend(abc.ABC):
+    """
+    Minimal chat-completion interface used by the healing engine.
+    Subclasses implement stream_chat, returning a ChatStream of text chunks and the
+    call's token usage. Its timeout (seconds) bounds connecting and each wait for
+    more data of that one call; None means the backend's default. Backends are
+    never modified per call, so one instance can serve many schedulers.
+    """
+    name = "base"
+    default_model: Optional[str] = None
+
+    def resolve_model(self, model: Optional[str]) -> str:
+        if not model:
+            model = self.default_model
+            logger.info(f"Set {self.name} model to {model} by default.")
+        return model
+
+    @abc.abstractmethod
+    def stream_chat(self, model: str, messages: List[Dict[str, str]], timeout: Optional[float] = None) -> ChatStream:
+        """Start one chat completion and return its stream."""
+
+    def complete(self, model: str, messages: List[Dict[str, str]]) -> str:
+        return "".join(self.stream_chat(model, messages))
+
+class TogetherBackend(LLMBackend):
+    """Together AI through the official `together` client (imported on first use)."""
+    name = "together"
+    default_model = DEFAULT_TOGETHER_MODEL
+
+    def __init__(self, llm_key_var: str = "TOGETHER_API_KEY"):
+        if not os.environ.get(llm_key_var):
+            error_msg = f"{llm_key_var} not set. Please create a .env file with {llm_key_var}=your-key or set it in your environment."
+            logger.error(error_msg)
+            raise RuntimeError(error_msg)
+        self.api_key = os.environ[llm_key_var]
+        self._client = None
+
+    def stream_chat(self, model: str, messages: List[Dict[str, str]], timeout: Optional[float] = None) -> ChatStream:
+        return ChatStream(lambda stream: self._chunks(stream, model, messages, timeout))
+
+    def _chunks(self, stream: ChatStream, model: str, messages: List[Dict[str, str]], timeout: Optional[float]) -> Iterator[str]:
+        if self._client is None:
+            from together import Together
+            self._client = Together(api_key=self.api_key)
+        options = {"timeout": timeout} if timeout is not None else {}
+        response = self._client.chat.completions.create(model=model, messages=messages, stream=True, **options)
+        for token in response:
+            usage = getattr(token, 'usage', None)
+            if usage:
+                stream.usage = {"prompt_tokens": usage.prompt_tokens, "completion_tokens": usage.completion_tokens}
+            if hasattr(token, 'choices') and token.choices:
+                yield token.choices[0].delta.content or ""
+
+class OpenAICompatibleBackend(LLMBackend):
+    """
+    Any endpoint speaking the OpenAI chat completions protocol (vLLM, Ollama,
+    LiteLLM, the bundled stub server, ...), streamed over server-sent events.
+    """
+    name = "openai"
+    default_model = "default"
+
+    def __init__(self, base_url: str, llm_key_var: Optional[str] = None, timeout: float = 60.0):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = os.environ.get(llm_key_var) if llm_key_var else None
+        self.timeout = timeout
+
+    def _request(self, payload: Dict[str, Any]) -> "urllib.request.Request":
+        import urllib.request
+        headers = {"Content-Type": "application/json", "Accept": "text/event-stream"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return urllib.request.Request(f"{self.base_url}/chat/completions", data=json.dumps(payload).encode("utf-8"),
+                                      headers=headers, method="POST")
+
+    def stream_chat(self, model: str, messages: List[Dict[str, str]], timeout: Optional[float] = None) -> ChatStream:
+        return ChatStream(lambda stream: self._chunks(stream, model, messages, timeout))
+
+    def _chunks(self, stream: ChatStream, model: str, messages: List[Dict[str, str]], timeout: Optional[float]) -> Iterator[str]:
+        import urllib.request
+        request = self._request({"model": model, "messages": messages, "stream": True})
+        with urllib.request.urlopen(request, timeout=self.timeout if timeout is None else timeout) as response:
+            for raw_line in response:
+                line = raw_line.decode("utf-8").strip()
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                if chunk.get("usage"):
+                    stream.usage = chunk["usage"]
+                choices = chunk.get("choices") or [{}]
+                yield (choices[0].get("delta") or {}).get("content") or ""
+
+def _stub_server(options: Dict[str, Any]):
+    """The running stub server for these options, started on first use and shut down at exit."""
+    from healapi import llm_stub
+    key = json.dumps(options, sort_keys=True, default=str)
+    with _stub_lock:
+        if key not in _stub_servers:
+            if not _stub_servers:
+                atexit.register(shutdown_stub_servers)
+            _stub_servers[key] = llm_stub.start_stub_server(**options)
+        return _stub_servers[key]
+
+def shutdown_stub_servers():
+    """Stop every stub server started by get_backend('stub')."""
+    with _stub_lock:
+        servers = list(_stub_servers.values())
+        _stub_servers.clear()
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def get_backend(name: str = "together", llm_key_var: str = "TOGETHER_API_KEY", base_url: Optional[str] = None,
+                timeout: float = 60.0, stub_options: Optional[Dict[str, Any]] = None) -> LLMBackend:
+    """
+    Build an LLM backend by name: 'together', 'openai' (needs base_url) or 'stub'
+    (talks over HTTP to the bundled stub server, started in-process once per set
+    of stub_options and reused by later calls).
+    """
+    load_dotenv_once()
+    if name == "together":
+        return TogetherBackend(llm_key_var)
+    elif name == "openai":
+        if not base_url:
+            raise ValueError("The openai backend requires a base URL (e.g. http://localhost:8000/v1)")
+        return OpenAICompatibleBackend(base_url, llm_key_var, timeout)
+    elif name == "stub":
+        from healapi import llm_stub
+        backend = OpenAICompatibleBackend(llm_stub.server_url(_stub_server(stub_options or {})), timeout=timeout)
+        backend.default_model = "healapi-stub"
+        return backend
+    else:
+        logger.error(f"Unknown LLM backend: {name}")
+        raise ValueError(f"Unknown LLM backend: {name}")
@@ -0,0 +1,125 @@
+import time
+import logging
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from healapi import profiling
+from healapi.llm_backends import LLMBackend
+from healapi.llm_stream import ResponseAssembler, assemble_stream
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def estimate_tokens(chars: int) -> int:
+    """Rough token estimate (~4 characters per token) when the backend reports no usage."""
+    return max(1, chars // 4) if chars else 0
+
+class LLMScheduler:
+    """
+    Runs LLM healing requests in order of impact under a global wall-clock and
+    token budget, and meters every call (latency, prompt/completion tokens, outcome).
+
+    Candidates are dicts with at least "key", "impact" and "prompt". Candidates that
+    do not fit in the remaining budget are recorded with outcome "skipped-budget".
+    """
+
+    def __init__(self, backend: LLMBackend, model: str, max_seconds: Optional[float] = None, max_tokens: Optional[int] = None):
+        self.backend = backend
+        self.model = model
+        self.max_seconds = max_seconds
+        self.max_tokens = max_tokens
+        self.calls: List[Dict[str, Any]] = []
+        self.tokens_used = 0
+        self._started = None
+        self._backend_timeout = getattr(backend, "timeout", None)
+
+    def _remaining_seconds(self) -> Optional[float]:
+        if self.max_seconds is None:
+            return None
+        return self.max_seconds - (time.monotonic() - self._started)
+
+    def _metered(self, stream: Iterator[str], meter: Dict[str, Any]) -> Iterator[str]:
+        """Pass chunks through, stopping once the time or token budget runs out."""
+        for chunk in stream:
+            meter["completion_chars"] += len(chunk)
+            yield chunk
+            remaining = self._remaining_seconds()
+            if remaining is not None and remaining <= 0:
+                meter["cut"] = "time"
+                break
+            if self.max_tokens is not None and self.tokens_used + meter["prompt_tokens"] + estimate_tokens(meter["completion_chars"]) > self.max_tokens:
+                meter["cut"] = "tokens"
+                break
+
+    def run(self, candidates: List[Dict[str, Any]], kind: str = "python",
+            on_result: Optional[Callable[[Dict[str, Any], ResponseAssembler], None]] = None) -> List[Dict[str, Any]]:
+        """
+        Call the LLM for each candidate, highest impact first, and hand each
+        completed assembler to on_result. Returns the per-call records.
+        """
+        self._started = time.monotonic()
+        ranked = sorted(candidates, key=lambda c: c.get("impact", 0), reverse=True)
+        for candidate in ranked:
+            prompt = candidate["prompt"]
+            prompt_tokens = estimate_tokens(len(prompt))
+            record = {"key": candidate["key"], "impact": candidate.get("impact", 0), "latency_ms": 0.0,
+                      "prompt_tokens": 0, "completion_tokens": 0, "outcome": "skipped-budget"}
+            self.calls.append(record)
+            remaining = self._remaining_seconds()
+            if remaining is not None and remaining <= 0:
+                continue
+            if self.max_tokens is not None and self.tokens_used + prompt_tokens > self.max_tokens:
+                continue
+
+            # Never let a single stalled call outlive the global budget
+            timeout = None
+            if remaining is not None:
+                timeout = max(remaining, 0.1)
+                if self._backend_timeout is not None:
+                    timeout = min(self._backend_timeout, timeout)
+            meter = {"prompt_tokens": prompt_tokens, "completion_chars": 0, "cut": None}
+            with profiling.step(f"llm {candidate['key']}") as step:
+                start = time.perf_counter()
+                assembler = None
+                stream = None
+                try:
+                    stream = self.backend.stream_chat(self.model, [{"role": "user", "content": prompt}], timeout=timeout)
+                    try:
+                        assembler = assemble_stream(self._metered(stream, meter), kind)
+                    finally:
+                        close = getattr(stream, "close", None)
+                        if close:
+                            close()
+                    if assembler.payload:
+                        record["outcome"] = "ok"
+                    else:
+                        record["outcome"] = f"budget-cut-{meter['cut']}" if meter["cut"] else "invalid-response"
+                except Exception as e:
+                    logger.error(f"LLM healing failed for {candidate['key']}: {e}")
+                    timed_out = isinstance(e, TimeoutError) or isinstance(getattr(e, "reason", None), TimeoutError)
+                    record["outcome"] = "timeout" if timed_out else "error"
+                    record["error"] = str(e)
+                step["outcome"] = record["outcome"]
+            record["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            # Usage belongs to this call's stream; backends without any report fall back to estimates
+            usage = getattr(stream, "usage", None) or {}
+            record["prompt_tokens"] = usage.get("prompt_tokens", prompt_tokens)
+            record["completion_tokens"] = usage.get("completion_tokens", estimate_tokens(meter["completion_chars"]))
+            self.tokens_used += record["prompt_tokens"] + record["completion_tokens"]
+            if assembler is not None and on_result:
+                on_result(candidate, assembler)
+        return self.calls
+
+    def summary(self) -> Dict[str, Any]:
+        outcomes = {}
+        for call in self.calls:
+            outcomes[call["outcome"]] = outcomes.get(call["outcome"], 0) + 1
+        return {
+            "model": self.model,
+            "max_seconds": self.max_seconds,
+            "max_tokens": self.max_tokens,
+            "wall_ms": round((time.monotonic() - self._started) * 1000, 2) if self._started else 0.0,
+            "calls": sum(1 for c in self.calls if c["outcome"] != "skipped-budget"),
+            "prompt_tokens": sum(c["prompt_tokens"] for c in self.calls),
+            "completion_tokens": sum(c["completion_tokens"] for c in self.calls),
+            "outcomes": outcomes,
+        }
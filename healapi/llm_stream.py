@@ -0,0 +1,205 @@
+import ast
+import json
+import logging
+import re
+from typing import Any, Iterable, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_PYTHON_FENCES = ("", "python", "py", "python3")
+_JSON_FENCES = ("", "json", "javascript", "js")
+# Characters that can change scanner state while outside fences and objects
+_INTERESTING_RE = re.compile(r"[{`\n]")
+
+class ResponseAssembler:
+    """
+    Incremental assembler for streamed LLM output.
+
+    Chunks are scanned once by a small state machine that tracks markdown code
+    fences and (for kind="json") brace depth outside strings; plain prose between
+    fences and objects is skipped in bulk.
+    As soon as the first complete JSON object or code block has arrived it is
+    validated (json.loads / ast.parse) and feed() returns True, so callers can
+    close the stream without waiting for trailing prose.
+    """
+
+    def __init__(self, kind: str = "json"):
+        if kind not in ("json", "python"):
+            raise ValueError(f"Unknown payload kind: {kind}")
+        self.kind = kind
+        self.parts = []
+        self.payload: Optional[str] = None
+        self.value: Any = None
+        self.complete = False
+        # Fence state
+        self._at_line_start = True
+        self._ticks = 0
+        self._fence = None  # None, "info" or "body"
+        self._fence_info = []
+        self._fence_lang = ""
+        self._fence_body = []
+        # JSON object state
+        self._obj = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    def feed(self, chunk: str) -> bool:
+        """Consume one chunk; returns True once a valid payload is available."""
+        if self.complete or not chunk:
+            return self.complete
+        self.parts.append(chunk)
+        i = 0
+        n = len(chunk)
+        while i < n and not self.complete:
+            if self._fence is None and self._depth == 0 and not self._ticks:
+                # Idle: skip plain prose in one step
+                match = _INTERESTING_RE.search(chunk, i)
+                end = match.start() if match else n
+                if chunk[i:end].strip(" \t"):
+                    self._at_line_start = False
+                if not match:
+                    break
+                i = end
+            self._scan(chunk[i])
+            i += 1
+        return self.complete
+
+    def finish(self) -> Optional[str]:
+        """
+        End of stream: fall back to an unterminated fence or, for python, the whole
+        text, provided it validates. Returns the payload (or None).
+        """
+        if not self.complete:
+            if self._fence == "body" and self._fence_relevant():
+                self._try_complete("".join(self._fence_body))
+            if not self.complete and self.kind == "python":
+                self._try_complete(self.text)
+        return self.payload
+
+    def _fence_relevant(self) -> bool:
+        return self._fence_lang in (_PYTHON_FENCES if self.kind == "python" else _JSON_FENCES)
+
+    def _try_complete(self, candidate: str) -> bool:
+        candidate = candidate.strip()
+        if not candidate:
+            return False
+        try:
+            self.value = json.loads(candidate) if self.kind == "json" else ast.parse(candidate)
+        except (ValueError, SyntaxError):
+            return False
+        self.payload = candidate
+        self.complete = True
+        return True
+
+    def _scan(self, ch: str):
+        if self._fence == "info":
+            if ch == "\n":
+                self._fence_lang = "".join(self._fence_info).strip().lower()
+                self._fence_info = []
+                self._fence = "body"
+                self._fence_body = []
+                self._at_line_start = True
+            else:
+                self._fence_info.append(ch)
+            return
+
+        if self._at_line_start and ch == "`":
+            self._ticks += 1
+            if self._ticks == 3:
+                self._ticks = 0
+                self._at_line_start = False
+                self._toggle_fence()
+            return
+        if self._ticks:
+            ticks, self._ticks = self._ticks, 0
+            self._at_line_start = False
+            for _ in range(ticks):
+                self._consume("`")
+        if ch == "\n":
+            self._at_line_start = True
+        elif ch not in " \t":
+            self._at_line_start = False
+        self._consume(ch)
+
+    def _toggle_fence(self):
+        if self._fence == "body":
+            relevant = self._fence_relevant()
+            body = "".join(self._fence_body)
+            self._fence = None
+            self._fence_body = []
+            self._reset_object()
+            if relevant:
+                self._try_complete(body)
+        else:
+            self._fence = "info"
+            self._reset_object()
+
+    def _consume(self, ch: str):
+        if self._fence == "body":
+            self._fence_body.append(ch)
+            if self.kind == "python" or not self._fence_relevant():
+                return
+        elif self.kind == "python":
+            return
+        self._scan_json(ch)
+
+    def _reset_object(self):
+        self._obj = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def _scan_json(self, ch: str):
+        if self._depth == 0:
+            if ch == "{":
+                self._obj = [ch]
+                self._depth = 1
+            return
+        self._obj.append(ch)
+        if self._in_string:
+            if self._escaped:
+                self._escaped = False
+            elif ch == "\\":
+                self._escaped = True
+            elif ch == '"':
+                self._in_string = False
+        elif ch == '"':
+            self._in_string = True
+        elif ch == "{":
+            self._depth += 1
+        elif ch == "}":
+            self._depth -= 1
+            if self._depth == 0:
+                candidate = "".join(self._obj)
+                self._obj = []
+                # Not valid JSON (e.g. "{id}" in prose): keep scanning for the next object
+                self._try_complete(candidate)
+
+def assemble_stream(stream: Iterable[str], kind: str = "json") -> ResponseAssembler:
+    """
+    Feed a chunk stream into a ResponseAssembler and close the stream as soon as
+    a complete, valid payload has arrived.
+    """
+    assembler = ResponseAssembler(kind)
+    try:
+        for chunk in stream:
+            if assembler.feed(chunk):
+                break
+    finally:
+        close = getattr(stream, "close", None)
+        if close:
+            close()
+    assembler.finish()
+    return assembler
+
+def extract_payload(response_text: str, kind: str = "json") -> Optional[str]:
+    """Extract the first valid JSON object / code block from a complete response."""
+    assembler = ResponseAssembler(kind)
+    assembler.feed(response_text)
+    return assembler.finish()
@@ -0,0 +1,165 @@
+import json
+import re
+import time
+import hashlib
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Standalone default; server.DEFAULT_PORT (healapi serve) is 8765
+DEFAULT_PORT = 8766
+# The pytest healing prompt embeds the test source between these markers
+_TEST_CODE_RE = re.compile(r"Here is the test code:\n([\s\S]*?)\nHere is the new OpenAPI schema:")
+
+def load_canned_responses(path: Optional[str]) -> Dict[str, Any]:
+    """
+    Load canned responses: either a list of {"match": substring, "response": text}
+    or {"responses": [...], "default": text}.
+    """
+    if not path:
+        return {"responses": [], "default": None}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        data = {"responses": data}
+    data.setdefault("responses", [])
+    data.setdefault("default", None)
+    return data
+
+def rule_based_response(prompt: str) -> str:
+    """
+    Deterministic response derived from the prompt: pytest prompts get their test
+    code echoed back in a python block, anything else an empty JSON object.
+    """
+    match = _TEST_CODE_RE.search(prompt)
+    if match:
+        return f"Here is the fixed test:\n```python\n{match.group(1).strip()}\n```\nThe test now matches the new spec."
+    return "```json\n{}\n```"
+
+def stub_response(prompt: str, canned: Dict[str, Any]) -> str:
+    for entry in canned["responses"]:
+        if entry.get("match", "") in prompt:
+            return entry["response"]
+    if canned["default"] is not None:
+        return canned["default"]
+    return rule_based_response(prompt)
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _send_json(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "healapi-stub", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": "not found"})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        options = self.server.stub_options
+        prompt = "\n".join(m.get("content", "") for m in payload.get("messages", []))
+        text = stub_response(prompt, options["canned"])
+        completion_id = "chatcmpl-" + hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:12]
+        model = payload.get("model", "healapi-stub")
+        usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(text) // 4}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        if options["latency"]:
+            time.sleep(options["latency"])
+
+        if not payload.get("stream"):
+            self._send_json(200, {
+                "id": completion_id, "object": "chat.completion", "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        size = max(1, options["chunk_size"])
+        try:
+            for start in range(0, len(text), size):
+                # Running usage on every chunk, so clients that close the stream early still learn what they used
+                sent = {"prompt_tokens": usage["prompt_tokens"], "completion_tokens": min(start + size, len(text)) // 4}
+                sent["total_tokens"] = sent["prompt_tokens"] + sent["completion_tokens"]
+                self._write_event({"id": completion_id, "object": "chat.completion.chunk", "model": model,
+                                   "choices": [{"index": 0, "delta": {"content": text[start:start + size]}, "finish_reason": None}],
+                                   "usage": sent})
+                if options["chunk_delay"]:
+                    time.sleep(options["chunk_delay"])
+            self._write_event({"id": completion_id, "object": "chat.completion.chunk", "model": model,
+                               "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": usage})
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # Client closed the stream early (e.g. once it had a complete payload)
+            self.close_connection = True
+
+    def _write_event(self, payload: Dict[str, Any]):
+        self._write_chunk(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+def make_stub_server(host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, chunk_size: int = 16,
+                     chunk_delay: float = 0.0, responses_path: Optional[str] = None) -> ThreadingHTTPServer:
+    """
+    Create an OpenAI-compatible stub server. port=0 picks a free port.
+    latency is applied before the first byte, chunk_delay between streamed chunks.
+    """
+    server = ThreadingHTTPServer((host, port), _StubHandler)
+    server.daemon_threads = True
+    server.stub_options = {
+        "latency": latency,
+        "chunk_size": chunk_size,
+        "chunk_delay": chunk_delay,
+        "canned": load_canned_responses(responses_path),
+    }
+    return server
+
+def server_url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/v1"
+
+def start_stub_server(**kwargs) -> ThreadingHTTPServer:
+    """Start a stub server on a background daemon thread and return it."""
+    server = make_stub_server(**kwargs)
+    threading.Thread(target=server.serve_forever, name="healapi-llm-stub", daemon=True).start()
+    logger.info(f"LLM stub server listening on {server_url(server)}")
+    return server
+
+# Example usage:
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="HealAPI local LLM stub server (OpenAI-compatible)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port to listen on (default: {DEFAULT_PORT})')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds to wait before the first byte')
+    parser.add_argument('--chunk-size', type=int, default=16, help='Characters per streamed chunk')
+    parser.add_argument('--chunk-delay', type=float, default=0.0, help='Seconds between streamed chunks')
+    parser.add_argument('--responses', help='JSON file with canned responses')
+    args = parser.parse_args()
+    stub = make_stub_server(args.host, args.port, args.latency, args.chunk_size, args.chunk_delay, args.responses)
+    print(f"LLM stub server listening on {server_url(stub)}")
+    stub.serve_forever()
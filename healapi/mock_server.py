@@ -0,0 +1,420 @@
+import os
+import re
+import copy
+import json
+import time
+import random
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+PARAM_RE = re.compile(r"\{([^}/]+)\}")
+# Nesting limit for example synthesis ($ref chains, recursive schemas)
+MAX_EXAMPLE_DEPTH = 8
+DEFAULT_URL_VARIABLES = ("apiurl", "baseUrl")
+_STRING_FORMATS = {
+    "date-time": "2024-01-01T00:00:00Z",
+    "date": "2024-01-01",
+    "time": "00:00:00",
+    "email": "user@example.com",
+    "uuid": "00000000-0000-4000-8000-000000000000",
+    "uri": "https://example.com/",
+    "url": "https://example.com/",
+    "hostname": "example.com",
+    "ipv4": "127.0.0.1",
+    "ipv6": "::1",
+    "byte": "ZXhhbXBsZQ==",
+    "password": "secret",
+}
+
+class _Node:
+    __slots__ = ("literals", "patterns", "operations")
+
+    def __init__(self):
+        self.literals: Dict[str, "_Node"] = {}
+        self.patterns: List[Tuple["re.Pattern", List[str], "_Node"]] = []
+        self.operations: Optional[str] = None  # path template ending here
+
+class PathMatcher:
+    """
+    Spec path templates compiled into a segment trie: literal segments are dict
+    lookups, templated segments ({id}, {name}.json, ...) compiled regexes, and a
+    literal segment always wins over a templated one. Matching costs one step per
+    request path segment, however many paths the spec has.
+    """
+
+    def __init__(self, templates):
+        self._root = _Node()
+        self._patterns: Dict[str, Tuple["re.Pattern", List[str]]] = {}
+        for template in templates:
+            node = self._root
+            for segment in _segments(template):
+                if "{" not in segment:
+                    node = node.literals.setdefault(segment, _Node())
+                    continue
+                if segment not in self._patterns:
+                    parts = PARAM_RE.split(segment)
+                    regex = "".join(re.escape(part) if i % 2 == 0 else "([^/]+?)" for i, part in enumerate(parts))
+                    self._patterns[segment] = (re.compile(regex + r"\Z"), parts[1::2])
+                pattern, names = self._patterns[segment]
+                for existing, _, child in node.patterns:
+                    if existing is pattern:
+                        node = child
+                        break
+                else:
+                    child = _Node()
+                    node.patterns.append((pattern, names, child))
+                    node = child
+            node.operations = template
+
+    def match(self, path: str) -> Optional[Tuple[str, Dict[str, str]]]:
+        """(template, path parameters) for a request path, or None."""
+        return self._match(self._root, _segments(path), 0, {})
+
+    def _match(self, node: _Node, segments: List[str], index: int, params: Dict[str, str]) -> Optional[Tuple[str, Dict[str, str]]]:
+        if index == len(segments):
+            return (node.operations, params) if node.operations is not None else None
+        segment = segments[index]
+        child = node.literals.get(segment)
+        if child is not None:
+            found = self._match(child, segments, index + 1, params)
+            if found:
+                return found
+        for pattern, names, child in node.patterns:
+            m = pattern.match(segment)
+            if m:
+                found = self._match(child, segments, index + 1, {**params, **dict(zip(names, m.groups()))})
+                if found:
+                    return found
+        return None
+
+def _segments(path: str) -> List[str]:
+    return [s for s in path.split("/") if s]
+
+def resolve_ref(spec: Dict[str, Any], ref: str) -> Any:
+    """Target of a local $ref ("#/components/..."); None for external or dangling refs."""
+    if not ref.startswith("#/"):
+        return None  # External refs cannot be followed offline
+    node = spec
+    for part in ref[2:].split("/"):
+        part = part.replace("~1", "/").replace("~0", "~")
+        node = node.get(part) if isinstance(node, dict) else None
+    return node
+
+def example_for(schema: Any, spec: Dict[str, Any], depth: int = 0, ref_examples: Optional[Dict[Tuple[str, int], Any]] = None) -> Any:
+    """
+    Schema-conformant example value: explicit example/const/default/enum values
+    first, otherwise synthesized from type and format ($ref, allOf, oneOf/anyOf,
+    minItems, minimum and minLength are honored; nesting, including through $ref,
+    stops at MAX_EXAMPLE_DEPTH). With ref_examples, each $ref target is synthesized
+    once per depth and the result is shared by every schema using it.
+    """
+    if not isinstance(schema, dict) or depth > MAX_EXAMPLE_DEPTH:
+        return None
+    if "$ref" in schema:
+        key = (schema["$ref"], depth)
+        if ref_examples is not None and key in ref_examples:
+            return ref_examples[key]
+        value = example_for(resolve_ref(spec, schema["$ref"]), spec, depth + 1, ref_examples)
+        if ref_examples is not None:
+            ref_examples[key] = value
+        return value
+    for key in ("example", "const", "default"):
+        if key in schema:
+            return copy.deepcopy(schema[key])
+    if schema.get("examples") and isinstance(schema["examples"], list):
+        return copy.deepcopy(schema["examples"][0])
+    if schema.get("enum"):
+        return copy.deepcopy(schema["enum"][0])
+    if schema.get("allOf"):
+        merged: Dict[str, Any] = {}
+        for part in schema["allOf"]:
+            value = example_for(part, spec, depth + 1, ref_examples)
+            if isinstance(value, dict):
+                merged.update(value)
+        for name, prop in (schema.get("properties") or {}).items():
+            merged[name] = example_for(prop, spec, depth + 1, ref_examples)
+        return merged
+    for key in ("oneOf", "anyOf"):
+        if schema.get(key):
+            return example_for(schema[key][0], spec, depth + 1, ref_examples)
+    schema_type = schema.get("type")
+    if isinstance(schema_type, list):  # OpenAPI 3.1: ["string", "null"]
+        schema_type = next((t for t in schema_type if t != "null"), "null")
+    if schema_type is None:
+        schema_type = "object" if "properties" in schema else "array" if "items" in schema else None
+    if schema_type == "object":
+        return {name: example_for(prop, spec, depth + 1, ref_examples) for name, prop in (schema.get("properties") or {}).items()}
+    if schema_type == "array":
+        item = example_for(schema.get("items"), spec, depth + 1, ref_examples)
+        return [copy.deepcopy(item) for _ in range(max(1, schema.get("minItems", 1)))]
+    if schema_type == "string":
+        value = _STRING_FORMATS.get(schema.get("format"), "string")
+        return value.ljust(schema.get("minLength", 0), "x")
+    if schema_type == "integer":
+        minimum = schema.get("minimum", 1)
+        return int(minimum) + (1 if schema.get("exclusiveMinimum") is True else 0)
+    if schema_type == "number":
+        return float(schema.get("minimum", 1.5))
+    if schema_type == "boolean":
+        return True
+    return None
+
+def _media_example(media: Dict[str, Any], spec: Dict[str, Any], ref_examples: Optional[Dict[Tuple[str, int], Any]] = None) -> Any:
+    if "example" in media:
+        return copy.deepcopy(media["example"])
+    for example in (media.get("examples") or {}).values():
+        if isinstance(example, dict) and "$ref" in example:
+            example = resolve_ref(spec, example["$ref"]) or {}
+        if isinstance(example, dict) and "value" in example:
+            return copy.deepcopy(example["value"])
+    return example_for(media.get("schema"), spec, 0, ref_examples)
+
+def pick_response(operation: Dict[str, Any]) -> Tuple[int, Optional[Dict[str, Any]]]:
+    """Status code and response object the mock answers with: the lowest 2xx, else default, else the first."""
+    responses = operation.get("responses") or {}
+    codes = sorted(str(code) for code in responses if str(code).isdigit())
+    success = [code for code in codes if code.startswith("2")]
+    if success:
+        return int(success[0]), responses.get(success[0], responses.get(int(success[0])))
+    if "default" in responses:
+        return 200, responses["default"]
+    if codes:
+        return int(codes[0]), responses.get(codes[0], responses.get(int(codes[0])))
+    return 200, None
+
+def build_response(spec: Dict[str, Any], operation: Dict[str, Any], ref_examples: Optional[Dict[Tuple[str, int], Any]] = None) -> Tuple[int, Dict[str, str], bytes]:
+    """(status, headers, body) of the example response of an operation; ref_examples: see example_for."""
+    status, response = pick_response(operation)
+    if isinstance(response, dict) and "$ref" in response:
+        response = resolve_ref(spec, response["$ref"])
+    response = response or {}
+    content = response.get("content")
+    if content is None and "schema" in response:  # Swagger 2.0
+        content = {"application/json": {"schema": response["schema"]}}
+    if not content or status == 204:
+        return status, {}, b""
+    media_type = next((t for t in content if t.split(";")[0].strip() == "application/json"), None) \
+        or next((t for t in content if t.split(";")[0].strip().endswith("+json")), None) or next(iter(content))
+    example = _media_example(content[media_type] or {}, spec, ref_examples)
+    if "json" in media_type:
+        body = json.dumps(example).encode("utf-8")
+    else:
+        body = ("" if example is None else str(example)).encode("utf-8")
+    return status, {"Content-Type": media_type}, body
+
+class MockAPI:
+    """
+    Routes requests for an OpenAPI spec through a PathMatcher and answers with
+    example responses, built once per operation and cached. Requests may use
+    the path of a servers URL (e.g. /api/v1) as prefix or leave it out.
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.spec = spec
+        self.paths = spec.get("paths") or {}
+        self.matcher = PathMatcher(self.paths)
+        self.prefixes = sorted({urlsplit(s.get("url", "")).path.rstrip("/") for s in spec.get("servers") or [] if isinstance(s, dict)} - {""},
+                               key=len, reverse=True)
+        if spec.get("basePath", "/").rstrip("/"):  # Swagger 2.0
+            self.prefixes.append(spec["basePath"].rstrip("/"))
+        self._responses: Dict[Tuple[str, str], Tuple[int, Dict[str, str], bytes]] = {}
+        self._ref_examples: Dict[Tuple[str, int], Any] = {}
+        self._lock = threading.Lock()
+
+    def route(self, path: str) -> Optional[str]:
+        """Path template serving a request path (query string already removed)."""
+        found = self.matcher.match(path)
+        if found is None:
+            for prefix in self.prefixes:
+                if path == prefix or path.startswith(prefix + "/"):
+                    found = self.matcher.match(path[len(prefix):])
+                    if found:
+                        break
+        return found[0] if found else None
+
+    def response(self, template: str, method: str) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        key = (template, method)
+        cached = self._responses.get(key)
+        if cached is None:
+            operation = (self.paths.get(template) or {}).get(method)
+            if not isinstance(operation, dict):
+                return None
+            with self._lock:
+                cached = self._responses.get(key)
+                if cached is None:
+                    cached = self._responses[key] = build_response(self.spec, operation, self._ref_examples)
+        return cached
+
+    def allowed_methods(self, template: str) -> List[str]:
+        return [m.upper() for m in HTTP_METHODS if isinstance((self.paths.get(template) or {}).get(m), dict)]
+
+    def warm(self) -> int:
+        """Build every operation's response up front; returns the number of operations."""
+        count = 0
+        for template, path_item in self.paths.items():
+            for method in HTTP_METHODS:
+                if isinstance((path_item or {}).get(method), dict):
+                    self.response(template, method)
+                    count += 1
+        return count
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; with Nagle on, keep-alive clients wait ~40ms for the body
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _send(self, status: int, headers: Dict[str, str], body: bytes):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _handle(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        options = self.server.mock_options
+        if options["latency"] or options["jitter"]:
+            time.sleep(options["latency"] + random.uniform(0, options["jitter"]))
+        mock: MockAPI = self.server.mock
+        template = mock.route(urlsplit(self.path).path)
+        if template is None:
+            self._send(404, {"Content-Type": "application/json"}, b'{"error": "no such path in the spec"}')
+            return
+        method = self.command.lower()
+        response = mock.response(template, "get" if method == "head" else method)
+        if response is None:
+            self._send(405, {"Content-Type": "application/json", "Allow": ", ".join(mock.allowed_methods(template))},
+                       b'{"error": "method not allowed by the spec"}')
+            return
+        self._send(*response)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = _handle
+
+def make_mock_server(spec: Union[str, Dict[str, Any]], host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                     jitter: float = 0.0, warm: bool = True) -> ThreadingHTTPServer:
+    """
+    Create a mock server for a spec (parsed, or a path / git:<rev>:<path> source).
+    port=0 picks a free port. Every response waits latency plus up to jitter seconds.
+    With warm, every example response is built before the server starts.
+    """
+    if isinstance(spec, str):
+        from healapi import diff_engine
+        spec = diff_engine.load_spec(spec)
+    server = ThreadingHTTPServer((host, port), _MockHandler)
+    server.daemon_threads = True
+    server.mock = MockAPI(spec)
+    server.mock_options = {"latency": latency, "jitter": jitter}
+    if warm:
+        count = server.mock.warm()
+        logger.info(f"Mock server prepared example responses for {count} operations")
+    return server
+
+def server_url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+def _fork_workers(server: ThreadingHTTPServer, processes: int) -> List[Any]:
+    """Fork processes that all accept on the server's listening socket (sharing the warmed responses copy-on-write)."""
+    import multiprocessing
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=server.serve_forever, name=f"healapi-mock-{i + 1}", daemon=True) for i in range(processes)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+def start_mock_server(spec: Union[str, Dict[str, Any]], processes: int = 1, **kwargs) -> ThreadingHTTPServer:
+    """
+    Start a mock server in the background: on a daemon thread, or with processes > 1
+    (where fork is available) in that many worker processes. Stop it with stop_mock_server.
+    """
+    server = make_mock_server(spec, **kwargs)
+    server.mock_workers = []
+    if processes > 1 and hasattr(os, "fork"):
+        server.mock_workers = _fork_workers(server, processes)
+    else:
+        if processes > 1:
+            logger.warning("Multi-process mock servers need fork; serving from a thread instead")
+        threading.Thread(target=server.serve_forever, name="healapi-mock", daemon=True).start()
+    logger.info(f"Mock server listening on {server_url(server)} ({max(1, len(server.mock_workers))} process(es))")
+    return server
+
+def stop_mock_server(server: ThreadingHTTPServer):
+    if server.mock_workers:
+        for worker in server.mock_workers:
+            worker.terminate()
+        for worker in server.mock_workers:
+            worker.join()
+    else:
+        server.shutdown()
+    server.server_close()
+
+def write_mock_environment(path: str, url: str, variables=DEFAULT_URL_VARIABLES, base_path: Optional[str] = None):
+    """
+    Write a Postman environment that points the given base-URL variables at the
+    mock server, on top of the values of an existing environment file.
+    """
+    environment = {"id": "healapi-mock", "name": "healapi mock server", "values": []}
+    if base_path:
+        with open(base_path, "r", encoding="utf-8") as f:
+            environment = json.load(f)
+    values = [v for v in environment.get("values", []) if v.get("key") not in variables]
+    values.extend({"key": name, "value": url, "enabled": True} for name in variables)
+    environment["values"] = values
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(environment, f, indent=2)
+
+def serve(spec: Union[str, Dict[str, Any]], host: str = "127.0.0.1", port: int = 5000, processes: int = 1, latency: float = 0.0,
+          jitter: float = 0.0):
+    """Run a mock server in the foreground until interrupted."""
+    server = make_mock_server(spec, host, port, latency, jitter)
+    print(f"Mock server listening on {server_url(server)}")
+    if processes > 1 and hasattr(os, "fork"):
+        import signal
+        workers = _fork_workers(server, processes)
+        print(f"Serving from {len(workers)} processes (Ctrl+C to stop)")
+        # Stop the workers on SIGTERM too, not just Ctrl+C
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for worker in workers:
+                worker.terminate()
+    else:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    server.server_close()
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="healapi mock", description="Serve example responses for every operation of an OpenAPI spec")
+    parser.add_argument('spec', help='OpenAPI spec: a YAML/JSON file or git:<rev>:<path>')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=5000, help='Port to listen on (default: 5000)')
+    parser.add_argument('--processes', type=int, default=1, help='Worker processes sharing the port (default: 1)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response (default: 0)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Up to this many more seconds, at random (default: 0)')
+    args = parser.parse_args(argv)
+    serve(args.spec, args.host, args.port, args.processes, args.latency, args.jitter)
+
+# Example usage:
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,4 @@
 # ...existing code from modules/openapi_typo_linter.py...
-import yaml
 from difflib import get_close_matches
 
 # List of valid OpenAPI keys (partial, can be extended)
@@ -13,8 +12,13 @@ VALID_KEYS = [
 FUZZY_THRESHOLD = 0.8
 
 def find_typos_in_yaml(yaml_path, valid_keys=VALID_KEYS, threshold=FUZZY_THRESHOLD):
+    import yaml
     with open(yaml_path, 'r', encoding='utf-8') as f:
         data = yaml.safe_load(f)
+    return find_typos(data, valid_keys, threshold)
+
+def find_typos(data, valid_keys=VALID_KEYS, threshold=FUZZY_THRESHOLD):
+    """Lint an already parsed spec (see find_typos_in_yaml)."""
     typos = []
     def recurse(obj, path=None):
         if path is None:
@@ -0,0 +1,211 @@
+import json
+import os
+import re
+import stat
+import difflib
+import logging
+import tempfile
+from typing import Any, Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+_NO_NEWLINE = "\\ No newline at end of file"
+
+def json_pointer(*parts) -> str:
+    """Build an RFC 6901 JSON Pointer from path components."""
+    return "".join("/" + str(p).replace("~", "~0").replace("/", "~1") for p in parts)
+
+def _parse_pointer(pointer: str) -> List[str]:
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise ValueError(f"Invalid JSON pointer: {pointer}")
+    return [p.replace("~1", "/").replace("~0", "~") for p in pointer[1:].split("/")]
+
+def _resolve_parent(doc: Any, parts: List[str]):
+    target = doc
+    for part in parts[:-1]:
+        target = target[int(part)] if isinstance(target, list) else target[part]
+    return target
+
+def apply_json_patch(doc: Any, patch: List[Dict[str, Any]]) -> Any:
+    """
+    Apply an RFC 6902 JSON Patch (add/remove/replace/test) to doc in place and return it.
+    """
+    for op in patch:
+        parts = _parse_pointer(op["path"])
+        if not parts:
+            if op["op"] in ("add", "replace"):
+                doc = op["value"]
+                continue
+            raise ValueError(f"Unsupported operation on document root: {op['op']}")
+        parent = _resolve_parent(doc, parts)
+        key = parts[-1]
+        if isinstance(parent, list):
+            index = len(parent) if key == "-" else int(key)
+            if op["op"] == "add":
+                parent.insert(index, op["value"])
+            elif op["op"] == "remove":
+                parent.pop(index)
+            elif op["op"] == "replace":
+                parent[index] = op["value"]
+            elif op["op"] == "test":
+                if parent[index] != op["value"]:
+                    raise ValueError(f"Test failed at {op['path']}")
+            else:
+                raise ValueError(f"Unsupported patch operation: {op['op']}")
+        else:
+            if op["op"] == "add":
+                parent[key] = op["value"]
+            elif op["op"] == "remove":
+                del parent[key]
+            elif op["op"] == "replace":
+                if key not in parent:
+                    raise ValueError(f"Cannot replace missing member {op['path']}")
+                parent[key] = op["value"]
+            elif op["op"] == "test":
+                if parent.get(key) != op["value"]:
+                    raise ValueError(f"Test failed at {op['path']}")
+            else:
+                raise ValueError(f"Unsupported patch operation: {op['op']}")
+    return doc
+
+def make_unified_diff(file_path: str, old: str, new: str) -> str:
+    """
+    Unified diff between two versions of a text file, usable with `patch -p1`/`git apply`
+    and with apply_unified_diff.
+    """
+    lines = []
+    for line in difflib.unified_diff(old.splitlines(True), new.splitlines(True),
+                                     fromfile=f"a/{file_path}", tofile=f"b/{file_path}"):
+        if line.endswith("\n"):
+            lines.append(line)
+        else:
+            lines.append(line + "\n" + _NO_NEWLINE + "\n")
+    return "".join(lines)
+
+def apply_unified_diff(source: str, diff_text: str) -> str:
+    """
+    Apply a single-file unified diff to source. Raises ValueError if the context does not match.
+    """
+    src = source.splitlines(True)
+    out = []
+    pos = 0
+    last_tag = None
+    diff_lines = diff_text.splitlines(True)
+    i = 0
+    while i < len(diff_lines):
+        match = _HUNK_RE.match(diff_lines[i])
+        i += 1
+        if not match:
+            continue
+        start = int(match.group(1)) - (0 if match.group(2) == "0" else 1)
+        out.extend(src[pos:start])
+        pos = start
+        while i < len(diff_lines) and not diff_lines[i].startswith("@@"):
+            line = diff_lines[i]
+            i += 1
+            if line.rstrip("\n") == _NO_NEWLINE:
+                # The previous line carries no trailing newline
+                if out and out[-1].endswith("\n") and last_tag in (" ", "+"):
+                    out[-1] = out[-1][:-1]
+                continue
+            tag, text = line[:1], line[1:]
+            last_tag = tag
+            if tag in (" ", "-"):
+                if pos >= len(src) or src[pos].rstrip("\n") != text.rstrip("\n"):
+                    raise ValueError(f"Patch does not apply at line {pos + 1}")
+                if tag == " ":
+                    out.append(src[pos])
+                pos += 1
+            elif tag == "+":
+                out.append(text)
+    out.extend(src[pos:])
+    return "".join(out)
+
+def current_umask() -> int:
+    """
+    The process umask, read when a file is written rather than at import. Linux
+    reports it in /proc; elsewhere os.umask has to set it to read it back.
+    """
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+def replacement_mode(path: str) -> int:
+    """
+    Permission bits for a file about to replace path: those of the existing file,
+    or what open() would give a new one (0o666 minus the umask). mkstemp files are 0600.
+    """
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~current_umask()
+
+def write_atomic(path: str, text: str, encoding: str = "utf-8"):
+    """
+    Write text to path via a temp file in the same directory and os.replace,
+    so readers never observe a partially written file. The file mode of an
+    existing file is kept.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".healapi-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding=encoding, newline="") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, replacement_mode(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def write_json_atomic(path: str, data: Any):
+    write_atomic(path, json.dumps(data, indent=2))
+
+def apply_healing(healing: Dict[str, Any], output_path: Optional[str] = None) -> List[str]:
+    """
+    Apply the patches of a healing result (as returned by healing_engine.heal_tests)
+    and return the list of files written. Files without changes are not touched.
+    """
+    written = []
+    patch = healing.get("patch")
+    collection_path = healing.get("collection")
+    if patch and collection_path:
+        with open(collection_path, "r", encoding="utf-8") as f:
+            collection = json.load(f)
+        target = output_path or healing.get("output_path") or collection_path
+        write_json_atomic(target, apply_json_patch(collection, patch))
+        written.append(target)
+    for file_path, diff_text in healing.get("patches", {}).items():
+        if not diff_text:
+            continue
+        with open(file_path, "r", encoding="utf-8") as f:
+            source = f.read()
+        write_atomic(file_path, apply_unified_diff(source, diff_text))
+        written.append(file_path)
+    for path in written:
+        logger.info(f"Applied healing patch to {path}")
+    return written
+
+# Example usage:
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python -m healapi.patching <healing_patch.json> [output_path]")
+        sys.exit(1)
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        healing = json.load(f)
+    for path in apply_healing(healing, sys.argv[2] if len(sys.argv) == 3 else None):
+        print(f"Patched {path}")
@@ -0,0 +1,254 @@
+import os
+import json
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from healapi import diff_engine, healing_engine, openapi_typo_linter, report_generator, test_analyzer, test_runner
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class Channel:
+    """Closable queue that streams work items from one task to another while both run."""
+
+    _CLOSED = object()
+
+    def __init__(self):
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._closed = False
+
+    def put(self, item: Any):
+        self._queue.put(item)
+
+    def close(self):
+        self._queue.put(self._CLOSED)
+
+    def drain(self) -> Optional[List[Any]]:
+        """
+        Block until at least one item is available, then return every item
+        available now; None once the channel is closed and empty.
+        """
+        if self._closed:
+            return None
+        items = [self._queue.get()]
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if self._CLOSED in items:
+            self._closed = True
+            items = [item for item in items if item is not self._CLOSED]
+        return items if items or not self._closed else None
+
+class StageScheduler:
+    """
+    Runs named tasks on a thread pool as soon as all their dependencies have
+    finished, so independent work (spec parsing, test loading, linting, test runs
+    and LLM calls) overlaps. A task is fn(results) with the results of finished
+    tasks; when a task fails, everything depending on it is skipped. Each task's
+    start/end offsets, wall time and thread CPU time are kept in timeline.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, str] = {}
+        self.timeline: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, fn: Callable[[Dict[str, Any]], Any], deps: Iterable[str] = ()):
+        deps = list(deps)
+        unknown = [dep for dep in deps if dep not in self.tasks]
+        if unknown:
+            raise ValueError(f"Task {name} depends on unknown task(s): {', '.join(unknown)}")
+        self.tasks[name] = {"fn": fn, "deps": deps}
+
+    def _run_task(self, name: str, started: float) -> Any:
+        record = {"task": name, "start_ms": round((time.perf_counter() - started) * 1000, 2)}
+        cpu = time.thread_time()
+        try:
+            return self.tasks[name]["fn"](self.results)
+        finally:
+            end = time.perf_counter()
+            record.update(end_ms=round((end - started) * 1000, 2), cpu_ms=round((time.thread_time() - cpu) * 1000, 2))
+            record["wall_ms"] = round(record["end_ms"] - record["start_ms"], 2)
+            with self._lock:
+                self.timeline.append(record)
+
+    def run(self) -> Dict[str, Any]:
+        """Run every task; returns the results of those that succeeded."""
+        started = time.perf_counter()
+        done = set()
+        skipped = set()
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers or len(self.tasks) or 1, thread_name_prefix="healapi-stage") as pool:
+            while True:
+                for name, task in self.tasks.items():
+                    if name in done or name in skipped or name in self.errors or name in running.values():
+                        continue
+                    if any(dep in skipped or dep in self.errors for dep in task["deps"]):
+                        skipped.add(name)
+                        logger.warning(f"Skipping {name}: an upstream task failed")
+                    elif all(dep in done for dep in task["deps"]):
+                        running[pool.submit(self._run_task, name, started)] = name
+                if not running:
+                    break
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        self.results[name] = future.result()
+                        done.add(name)
+                    except Exception as e:
+                        logger.error(f"Task {name} failed: {e}")
+                        self.errors[name] = str(e)
+        self.wall_ms = round((time.perf_counter() - started) * 1000, 2)
+        self.skipped = sorted(skipped)
+        self.timeline.sort(key=lambda r: (r["start_ms"], r["task"]))
+        return self.results
+
+    def timeline_table(self) -> str:
+        lines = ["    Task                         | start ms |   end ms |  wall ms |   cpu ms",
+                 "    ---------------------------------------------------------------------"]
+        for r in self.timeline:
+            lines.append(f"    {r['task'][:28]:<28} | {r['start_ms']:>8} | {r['end_ms']:>8} | {r['wall_ms']:>8} | {r['cpu_ms']:>8}")
+        total = round(sum(r["wall_ms"] for r in self.timeline), 2)
+        lines.append(f"    Wall time {self.wall_ms}ms, sum of task times {total}ms")
+        return "\n".join(lines)
+
+    def profile_records(self) -> List[Dict[str, Any]]:
+        """Timeline as profiling records (one stage per task) for the report's profile section."""
+        return [{"stage": r["task"], "step": None, "wall_ms": r["wall_ms"], "cpu_ms": r["cpu_ms"], "child_cpu_ms": "-", "peak_kb": None,
+                 "start_ms": r["start_ms"]} for r in self.timeline]
+
+def _is_pytest_file(path: str) -> bool:
+    """pytest's default python_files patterns (test_*.py, *_test.py)."""
+    name = os.path.basename(path)
+    return (name.startswith("test_") and name.endswith(".py")) or name.endswith("_test.py")
+
+def _load_tests(test_type: str, test_path: str) -> Any:
+    """Parsed Postman collection, or {file path: source} of the .py files under a pytest directory."""
+    if test_type == "postman":
+        with open(test_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    sources = {}
+    for root, _, files in os.walk(test_path):
+        for file in files:
+            if file.endswith(".py"):
+                path = os.path.join(root, file)
+                with open(path, "r", encoding="utf-8") as f:
+                    sources[path] = f.read()
+    return sources
+
+def build_pipeline(old_spec_path: str, new_spec_path: str, test_type: str, test_path: str,
+                   heal_options: Optional[Dict[str, Any]] = None, test_options: Optional[Dict[str, Any]] = None,
+                   report_options: Optional[Dict[str, Any]] = None, profile: bool = False,
+                   scaffold_path: Optional[str] = None) -> StageScheduler:
+    """
+    The lint/diff/analyze/heal/run/report pipeline as a task graph. Both specs and
+    the tests load concurrently, and linting runs beside diffing and everything after it.
+
+    For pytest suites, the test files the analysis leaves unaffected start running
+    as soon as the analysis is done, while healing (and its LLM calls) goes on.
+    Healed files stream from the healer into micro-batched pytest runs as each one
+    is finalized. With a result cache or without apply, the run waits for healing
+    (the cache fingerprints the healed tests). Postman collections run once healing
+    is done, from the healed output.
+    heal_options go to healing_engine.heal_tests (including llm_backend and apply);
+    test_options to test_runner.run_tests; report_options to generate_report.
+    With profile, the report's profile section holds the task timeline. With
+    scaffold_path, tests for the added endpoints are scaffolded there beside healing.
+    """
+    heal_options = dict(heal_options or {})
+    test_options = dict(test_options or {})
+    report_options = report_options or {}
+    scheduler = StageScheduler()
+    add = scheduler.add
+
+    add("parse old spec", lambda r: diff_engine.load_spec(old_spec_path))
+    add("parse new spec", lambda r: diff_engine.load_spec(new_spec_path))
+    add("load tests", lambda r: _load_tests(test_type, test_path))
+    add("lint old spec", lambda r: openapi_typo_linter.find_typos(r["parse old spec"]), ["parse old spec"])
+    add("lint new spec", lambda r: openapi_typo_linter.find_typos(r["parse new spec"]), ["parse new spec"])
+    add("diff", lambda r: diff_engine.diff_specs(r["parse old spec"], r["parse new spec"]), ["parse old spec", "parse new spec"])
+
+    if scaffold_path:
+        from healapi import scaffold
+        add("scaffold", lambda r: scaffold.scaffold_added_endpoints(r["diff"], r["parse new spec"], test_type, scaffold_path),
+            ["diff", "parse new spec"])
+
+    def analyze(r):
+        if test_type == "postman":
+            return test_analyzer.analyze_collection(r["load tests"], r["diff"])
+        return test_analyzer.analyze_pytest_sources(r["load tests"], r["diff"])
+    add("analyze", analyze, ["diff", "load tests"])
+
+    # Streaming runs healed files as they are finalized, so it needs the healing applied to them
+    streamed = test_type == "pytest" and not test_options.get("result_cache") and heal_options.get("apply", True)
+    healed = Channel()
+
+    def heal(r):
+        options = dict(heal_options)
+        if streamed:
+            options["on_file_healed"] = healed.put
+        try:
+            return healing_engine.heal_tests(test_type, test_path, r["analyze"], r["diff"], r["parse new spec"], **options)
+        finally:
+            healed.close()
+    add("heal", heal, ["analyze", "parse new spec"])
+
+    if streamed:
+        extra_args = test_options.get("extra_args")
+
+        def run_unaffected(r):
+            affected = set(r["analyze"])
+            files = sorted(path for path in r["load tests"] if path not in affected and _is_pytest_file(path))
+            return test_runner.run_pytest_files(files, test_path, extra_args) if files else None
+        add("run unaffected tests", run_unaffected, ["analyze"])
+
+        def run_healed(r):
+            runs = []
+            while True:
+                batch = healed.drain()
+                if batch is None:
+                    return runs
+                files = [action["file"] for action in batch if _is_pytest_file(action["file"])]
+                if files:
+                    logger.info(f"Running {len(files)} healed test file(s)")
+                    runs.append(test_runner.run_pytest_files(files, test_path, extra_args))
+        add("run healed tests", run_healed, ["analyze"])
+
+        def merge_runs(r):
+            runs = ([r["run unaffected tests"]] if r["run unaffected tests"] else []) + r["run healed tests"]
+            return test_runner.merge_pytest_runs(runs)
+        add("run tests", merge_runs, ["run unaffected tests", "run healed tests"])
+    else:
+        def run_tests(r):
+            options = dict(test_options)
+            if options.get("result_cache"):
+                from healapi import result_cache
+                options.update(spec=r["parse new spec"], touched=result_cache.healed_tests(r["heal"]))
+            return test_runner.run_tests(test_type, healing_engine.healed_test_path(r["heal"], test_path), **options)
+        add("run tests", run_tests, ["heal", "parse new spec"])
+
+    def report(r):
+        return report_generator.generate_report(r["diff"], r["heal"], r["run tests"], profile=scheduler.profile_records() if profile else None,
+                                                **report_options)
+    add("report", report, ["diff", "heal", "run tests", "lint old spec", "lint new spec"])
+    return scheduler
+
+# Example usage:
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) != 5:
+        print("Usage: python -m healapi.pipeline <old_spec> <new_spec> <postman|pytest> <test_path>")
+        sys.exit(1)
+    pipeline = build_pipeline(sys.argv[1], sys.argv[2], sys.argv[3], sys.argv[4], heal_options={"apply": False})
+    pipeline.run()
+    print(pipeline.timeline_table())
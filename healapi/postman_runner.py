@@ -0,0 +1,677 @@
+import re
+import json
+import time
+import uuid
+import random
+import base64
+import logging
+import statistics
+from urllib.parse import urlencode
+from typing import Any, Dict, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_VAR_RE = re.compile(r"\{\{([^{}]+)\}\}")
+# Only a bare `pm.response.json()`; `pm.response.json().data` goes through the generic assignment
+_JSON_VAR_RE = re.compile(r"(?:var|let|const)\s+([A-Za-z_$][\w$]*)\s*=\s*pm\.response\.json\(\)\s*;?\s*\Z")
+_TEST_BLOCK_RE = re.compile(r"pm\.test\(\s*(['\"`])(?P<name>.*?)\1\s*,\s*(?:function\s*\([^)]*\)|\([^)]*\)\s*=>)\s*\{")
+_SETS_VARIABLES_RE = re.compile(r"pm\.(?:environment|variables|collectionVariables|globals)\.set\(")
+_SET_VAR_RE = re.compile(r"pm\.(environment|variables|collectionVariables|globals)\.set\(\s*(['\"])(?P<key>[^'\"]+)\2\s*,\s*(?P<value>.+)\)\s*$", re.S)
+_EXPECT_RE = re.compile(r"pm\.expect\((?P<subject>.+?)\)\.(?P<chain>(?:to|and|be|been|is|that|which|have|has|with|at|of|same|not|deep|\.)*?)\.?(?P<op>eql|equal|equals|eq|property|a|an|include|includes|contain|contains|oneOf|below|lessThan|above|greaterThan|exist|ok|true|false|null|undefined|empty|lengthOf|length|status|least|most|within)\b(?:\((?P<args>.*)\))?\s*$", re.S)
+_RESPONSE_TO_RE = re.compile(r"pm\.response\.to\.(?P<chain>(?:not\.)?(?:have|be)\.)?(?P<op>status|header|jsonBody|body|ok|success|json|error|clientError|serverError|notFound)\b(?:\((?P<args>.*)\))?\s*$", re.S)
+_PATH_TOKEN_RE = re.compile(r"\.([A-Za-z_$][\w$]*)|\[\s*(\d+)\s*\]|\[\s*(['\"])(.*?)\3\s*\]")
+_STATUS_TEXT = {200: "OK", 201: "Created", 202: "Accepted", 204: "No Content", 301: "Moved Permanently", 302: "Found",
+                304: "Not Modified", 400: "Bad Request", 401: "Unauthorized", 403: "Forbidden", 404: "Not Found",
+                405: "Method Not Allowed", 409: "Conflict", 422: "Unprocessable Entity", 429: "Too Many Requests",
+                500: "Internal Server Error", 502: "Bad Gateway", 503: "Service Unavailable", 504: "Gateway Timeout"}
+
+class UnsupportedScript(Exception):
+    """A script statement outside the supported pm.* subset."""
+
+class ResponseView:
+    """The parts of an HTTP response the assertion subset needs."""
+
+    def __init__(self, code: int, reason: str, headers: Dict[str, str], body: bytes, elapsed_ms: float):
+        self.code = code
+        self.reason = reason or _STATUS_TEXT.get(code, "")
+        self.headers = {k.lower(): v for k, v in headers.items()}
+        self.raw_headers = headers
+        self.body = body
+        self.elapsed_ms = elapsed_ms
+        self._json = None
+        self._json_loaded = False
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        if not self._json_loaded:
+            self._json = json.loads(self.body or b"null")
+            self._json_loaded = True
+        return self._json
+
+# --- variables -------------------------------------------------------------------
+
+def load_environment(environment_path: Optional[str]) -> Dict[str, str]:
+    if not environment_path:
+        return {}
+    with open(environment_path, "r", encoding="utf-8") as f:
+        env = json.load(f)
+    return {v["key"]: v.get("value", "") for v in env.get("values", []) if v.get("enabled", True)}
+
+def _dynamic_variable(name: str) -> Optional[str]:
+    if name == "$guid" or name == "$randomUUID":
+        return str(uuid.uuid4())
+    if name == "$timestamp":
+        return str(int(time.time()))
+    if name == "$isoTimestamp":
+        return time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
+    if name == "$randomInt":
+        return str(random.randint(0, 1000))
+    return None
+
+def substitute(value: Any, variables: Dict[str, Any]) -> Any:
+    """Replace {{var}} references (nested up to a few levels) in strings, lists and dicts."""
+    if isinstance(value, str):
+        for _ in range(5):
+            if "{{" not in value:
+                break
+
+            def replace(match):
+                name = match.group(1).strip()
+                if name in variables:
+                    return str(variables[name])
+                dynamic = _dynamic_variable(name)
+                return dynamic if dynamic is not None else match.group(0)
+
+            new_value = _VAR_RE.sub(replace, value)
+            if new_value == value:
+                break
+            value = new_value
+        return value
+    if isinstance(value, list):
+        return [substitute(v, variables) for v in value]
+    if isinstance(value, dict):
+        return {k: substitute(v, variables) for k, v in value.items()}
+    return value
+
+# --- request building ------------------------------------------------------------
+
+def _url_dict(url: Any) -> Dict[str, Any]:
+    """Newman-style url object for reports (summaries read host/path from it)."""
+    if isinstance(url, dict):
+        return url
+    raw = url or ""
+    rest = raw.split("://", 1)[-1]
+    host, _, path = rest.partition("/")
+    return {"raw": raw, "host": [host], "path": [p for p in path.split("?", 1)[0].split("/") if p]}
+
+def _raw_url(url: Any) -> str:
+    if not isinstance(url, dict):
+        return url or ""
+    if url.get("raw"):
+        return url["raw"]
+    host = ".".join(url.get("host", []))
+    path = "/".join(url.get("path", []))
+    raw = f"{url.get('protocol', 'http')}://{host}/{path}" if host else path
+    query = [q for q in url.get("query", []) if not q.get("disabled")]
+    if query:
+        raw += "?" + "&".join(f"{q.get('key')}={q.get('value') or ''}" for q in query)
+    return raw
+
+def _auth_headers(auth: Optional[Dict[str, Any]], variables: Dict[str, Any]) -> Dict[str, str]:
+    if not auth or auth.get("type") in (None, "noauth"):
+        return {}
+    params = {p["key"]: p.get("value") for p in auth.get(auth["type"], []) if isinstance(p, dict)}
+    params = substitute(params, variables)
+    if auth["type"] == "bearer":
+        return {"Authorization": f"Bearer {params.get('token', '')}"}
+    if auth["type"] == "basic":
+        token = base64.b64encode(f"{params.get('username', '')}:{params.get('password', '')}".encode()).decode()
+        return {"Authorization": f"Basic {token}"}
+    if auth["type"] == "apikey" and params.get("in", "header") == "header":
+        return {params.get("key", "X-API-Key"): params.get("value", "")}
+    logger.warning(f"Unsupported auth type {auth['type']}, sending request without it")
+    return {}
+
+def build_request(request: Dict[str, Any], variables: Dict[str, Any], auth: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Resolve a Postman request into method, url, headers and body bytes.
+    auth is the inherited (collection/folder) auth, overridden by the request's own.
+    """
+    if isinstance(request, str):
+        request = {"method": "GET", "url": request}
+    method = (request.get("method") or "GET").upper()
+    url = substitute(_raw_url(request.get("url")), variables)
+    if url and "://" not in url:
+        url = "http://" + url
+    headers = {}
+    for header in request.get("header", []) or []:
+        if not header.get("disabled"):
+            headers[substitute(header.get("key", ""), variables)] = substitute(header.get("value", ""), variables)
+    headers.update(_auth_headers(request.get("auth", auth), variables))
+
+    body = None
+    spec = request.get("body") or {}
+    mode = spec.get("mode")
+    if mode == "raw" and spec.get("raw"):
+        body = substitute(spec["raw"], variables).encode("utf-8")
+        language = spec.get("options", {}).get("raw", {}).get("language")
+        if language == "json" and not any(k.lower() == "content-type" for k in headers):
+            headers["Content-Type"] = "application/json"
+    elif mode == "urlencoded":
+        pairs = [(p["key"], p.get("value", "")) for p in spec.get("urlencoded", []) if not p.get("disabled")]
+        body = urlencode(substitute(pairs, variables)).encode("utf-8")
+        headers.setdefault("Content-Type", "application/x-www-form-urlencoded")
+    elif mode == "formdata":
+        pairs = [(p["key"], p.get("value", "")) for p in spec.get("formdata", []) if not p.get("disabled") and p.get("type", "text") == "text"]
+        body = urlencode(substitute(pairs, variables)).encode("utf-8")
+        headers.setdefault("Content-Type", "application/x-www-form-urlencoded")
+    elif mode == "graphql":
+        graphql = spec.get("graphql", {})
+        body = json.dumps({"query": substitute(graphql.get("query", ""), variables),
+                           "variables": json.loads(substitute(graphql.get("variables") or "{}", variables))}).encode("utf-8")
+        headers.setdefault("Content-Type", "application/json")
+    return {"method": method, "url": url, "headers": headers, "body": body}
+
+# --- script subset ---------------------------------------------------------------
+
+def script_lines(item: Dict[str, Any], listen: str) -> List[str]:
+    lines = []
+    for event in item.get("event", []) or []:
+        if event.get("listen") == listen and not event.get("disabled"):
+            exec_lines = event.get("script", {}).get("exec", [])
+            lines.extend(exec_lines.split("\n") if isinstance(exec_lines, str) else exec_lines)
+    return lines
+
+def sets_variables(items: List[Dict[str, Any]]) -> bool:
+    """Whether any script of these items (or folders/collections) sets variables that later requests may read."""
+    return any(_SETS_VARIABLES_RE.search(line) for item in items for listen in ("prerequest", "test")
+               for line in script_lines(item, listen) if isinstance(line, str))
+
+def _split_statements(body: str, separators: str = ";\n") -> List[str]:
+    """Split JS source on top-level separators (';' and newlines), respecting strings and brackets."""
+    statements = []
+    current = []
+    depth = 0
+    quote = None
+    escaped = False
+    for ch in body:
+        if quote:
+            current.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == quote:
+                quote = None
+            continue
+        if ch in "'\"`":
+            quote = ch
+        elif ch in "([{":
+            depth += 1
+        elif ch in ")]}":
+            depth -= 1
+        elif depth == 0 and ch in separators:
+            statement = "".join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+            continue
+        current.append(ch)
+    statement = "".join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+def _block_end(source: str, start: int) -> int:
+    """Index of the '}' closing the block whose body starts at start."""
+    depth = 1
+    quote = None
+    escaped = False
+    for index in range(start, len(source)):
+        ch = source[index]
+        if quote:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == quote:
+                quote = None
+        elif ch in "'\"`":
+            quote = ch
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return index
+    return len(source)
+
+def parse_tests(lines: List[str]) -> Tuple[List[str], List[Tuple[str, List[str]]]]:
+    """
+    Split a test script into top-level statements and pm.test(name, fn) blocks,
+    each with its list of statements.
+    """
+    source = "\n".join(lines)
+    top_level = []
+    tests = []
+    position = 0
+    for match in _TEST_BLOCK_RE.finditer(source):
+        if match.start() < position:
+            continue
+        top_level.extend(_split_statements(source[position:match.start()]))
+        end = _block_end(source, match.end())
+        tests.append((match.group("name"), _split_statements(source[match.end():end])))
+        position = source.find(")", end) + 1 or end + 1
+    top_level.extend(_split_statements(source[position:]))
+    return top_level, tests
+
+def _js_literal(text: str) -> Any:
+    text = text.strip()
+    if text in ("true", "false", "null"):
+        return {"true": True, "false": False, "null": None}[text]
+    if text == "undefined":
+        return None
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "'`":
+        return text[1:-1]
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    try:
+        # Single-quoted JS arrays/objects
+        return json.loads(re.sub(r"'([^'\\]*)'", r'"\1"', text))
+    except ValueError:
+        raise UnsupportedScript(f"Unsupported literal: {text}")
+
+def _split_args(args: str) -> List[str]:
+    return _split_statements(args, ",")
+
+def _walk_path(value: Any, path: str) -> Any:
+    for match in _PATH_TOKEN_RE.finditer(path):
+        key = match.group(1) or match.group(4)
+        if match.group(2) is not None:
+            index = int(match.group(2))
+            value = value[index] if isinstance(value, list) and index < len(value) else None
+        elif key == "length" and isinstance(value, (list, str)):
+            value = len(value)
+        else:
+            value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+class _Scope:
+    """Evaluation context for one script run: response, json variables, pm variables."""
+
+    def __init__(self, response: Optional[ResponseView], variables: Dict[str, Any]):
+        self.response = response
+        self.variables = variables
+        self.json_vars = {}
+
+    def evaluate(self, expression: str) -> Any:
+        expression = expression.strip()
+        response = self.response
+        if response is not None:
+            if expression.startswith("pm.response.json()"):
+                return _walk_path(response.json(), expression[len("pm.response.json()"):])
+            if expression in ("pm.response.code", "pm.response.status"):
+                return response.code if expression.endswith("code") else response.reason
+            if expression == "pm.response.responseTime":
+                return response.elapsed_ms
+            if expression == "pm.response.text()":
+                return response.text()
+            header = re.fullmatch(r"pm\.response\.headers\.get\(\s*(['\"])(.+?)\1\s*\)", expression)
+            if header:
+                return response.headers.get(header.group(2).lower())
+        variable = re.fullmatch(r"pm\.(?:environment|variables|collectionVariables|globals)\.get\(\s*(['\"])(.+?)\1\s*\)", expression)
+        if variable:
+            return self.variables.get(variable.group(2))
+        root = re.match(r"[A-Za-z_$][\w$]*", expression)
+        if root and root.group(0) in self.json_vars:
+            return _walk_path(self.json_vars[root.group(0)], expression[root.end():])
+        return _js_literal(expression)
+
+    def run_statement(self, statement: str):
+        """Execute one non-assertion statement (declarations, variable setters)."""
+        declaration = _JSON_VAR_RE.match(statement)
+        if declaration:
+            self.json_vars[declaration.group(1)] = self.response.json() if self.response else None
+            return
+        assignment = re.fullmatch(r"(?:var|let|const)\s+([A-Za-z_$][\w$]*)\s*=\s*(.+)", statement, re.S)
+        if assignment:
+            self.json_vars[assignment.group(1)] = self.evaluate(assignment.group(2))
+            return
+        setter = _SET_VAR_RE.match(statement)
+        if setter:
+            self.variables[setter.group("key")] = self.evaluate(setter.group("value"))
+            return
+        if statement.startswith("console.") or statement.startswith("//"):
+            return
+        raise UnsupportedScript(f"Unsupported statement: {statement[:80]}")
+
+    def check(self, statement: str):
+        """Evaluate one assertion statement; raises AssertionError on failure."""
+        expect = _EXPECT_RE.match(statement)
+        if expect:
+            subject = self.evaluate(expect.group("subject"))
+            negate = ".not." in f".{expect.group('chain')}."
+            args = [self.evaluate(a) for a in _split_args(expect.group("args") or "")]
+            ok, message = _expect(subject, expect.group("op"), args, expect.group("chain"))
+            if negate:
+                ok, message = not ok, message.replace(" to ", " to not ", 1)
+            if not ok:
+                raise AssertionError(message)
+            return
+        response_to = _RESPONSE_TO_RE.match(statement)
+        if response_to and self.response is not None:
+            negate = (response_to.group("chain") or "").startswith("not.")
+            args = [self.evaluate(a) for a in _split_args(response_to.group("args") or "")]
+            ok, message = _response_to(self.response, response_to.group("op"), args)
+            if negate:
+                ok = not ok
+            if not ok:
+                raise AssertionError(message)
+            return
+        self.run_statement(statement)
+
+def _type_name(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list):
+        return "array"
+    return "object"
+
+def _expect(subject: Any, op: str, args: List[Any], chain: str) -> Tuple[bool, str]:
+    shown = json.dumps(subject)[:120] if not isinstance(subject, str) else repr(subject)[:120]
+    if op in ("eql", "equal", "equals", "eq"):
+        return subject == args[0], f"expected {shown} to deeply equal {json.dumps(args[0])}"
+    if op == "property":
+        name = args[0]
+        ok = isinstance(subject, dict) and name in subject
+        if ok and len(args) > 1:
+            ok = subject[name] == args[1]
+        return ok, f"expected {shown} to have property '{name}'"
+    if op in ("a", "an"):
+        return _type_name(subject) == str(args[0]).lower(), f"expected {shown} to be a{'n' if op == 'an' else ''} {args[0]}"
+    if op in ("include", "includes", "contain", "contains"):
+        needle = args[0]
+        if isinstance(subject, dict) and isinstance(needle, dict):
+            ok = all(subject.get(k) == v for k, v in needle.items())
+        else:
+            ok = subject is not None and needle in subject
+        return ok, f"expected {shown} to include {json.dumps(needle)}"
+    if op == "oneOf":
+        return subject in args[0], f"expected {shown} to be one of {json.dumps(args[0])}"
+    if op in ("below", "lessThan", "most"):
+        bound = args[0]
+        ok = subject is not None and (subject <= bound if op == "most" else subject < bound)
+        return ok, f"expected {shown} to be below {bound}"
+    if op in ("above", "greaterThan", "least"):
+        bound = args[0]
+        ok = subject is not None and (subject >= bound if op == "least" else subject > bound)
+        return ok, f"expected {shown} to be above {bound}"
+    if op == "within":
+        return subject is not None and args[0] <= subject <= args[1], f"expected {shown} to be within {args[0]}..{args[1]}"
+    if op in ("lengthOf", "length"):
+        return subject is not None and len(subject) == args[0], f"expected {shown} to have a length of {args[0]}"
+    if op == "exist":
+        return subject is not None, f"expected {shown} to exist"
+    if op == "ok":
+        return bool(subject), f"expected {shown} to be truthy"
+    if op in ("true", "false", "null"):
+        expected = {"true": True, "false": False, "null": None}[op]
+        return subject is expected, f"expected {shown} to be {op}"
+    if op == "undefined":
+        return subject is None, f"expected {shown} to be undefined"
+    if op == "empty":
+        return subject is not None and len(subject) == 0, f"expected {shown} to be empty"
+    if op == "status":
+        return subject == args[0], f"expected {shown} to have status {args[0]}"
+    raise UnsupportedScript(f"Unsupported assertion: {op}")
+
+def _response_to(response: ResponseView, op: str, args: List[Any]) -> Tuple[bool, str]:
+    if op == "status":
+        expected = args[0]
+        actual = response.code if isinstance(expected, int) else response.reason
+        return actual == expected, f"expected response to have status code {expected} but got {response.code}"
+    if op == "header":
+        name = str(args[0]).lower()
+        ok = name in response.headers and (len(args) < 2 or response.headers[name] == args[1])
+        return ok, f"expected response to have header {args[0]}"
+    if op in ("ok", "success"):
+        return 200 <= response.code < 300, f"expected response code to be 2XX but found {response.code}"
+    if op == "error":
+        return response.code >= 400, f"expected response code to be 4XX or 5XX but found {response.code}"
+    if op == "clientError":
+        return 400 <= response.code < 500, f"expected response code to be 4XX but found {response.code}"
+    if op == "serverError":
+        return response.code >= 500, f"expected response code to be 5XX but found {response.code}"
+    if op == "notFound":
+        return response.code == 404, f"expected response code to be 404 but found {response.code}"
+    if op == "json":
+        try:
+            response.json()
+            return True, ""
+        except ValueError:
+            return False, "expected response body to be a valid json"
+    if op == "jsonBody":
+        try:
+            body = response.json()
+        except ValueError:
+            return False, "expected response body to be a valid json"
+        if not args:
+            return True, ""
+        value = _walk_path(body, "." + str(args[0])) if isinstance(args[0], str) else body
+        if isinstance(args[0], str) and len(args) > 1:
+            return value == args[1], f"expected response body to have property '{args[0]}' equal to {json.dumps(args[1])}"
+        if isinstance(args[0], str):
+            return value is not None, f"expected response body json at \"{args[0]}\" to contain a value"
+        return body == args[0], f"expected response body to equal {json.dumps(args[0])}"
+    if op == "body":
+        return not args or (response.text() == args[0] or args[0] in response.text()), f"expected response body to include {args[0] if args else ''}"
+    raise UnsupportedScript(f"Unsupported response assertion: {op}")
+
+def run_test_script(lines: List[str], response: Optional[ResponseView], variables: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Run the supported pm.* subset of a test script and return Newman-style assertions.
+    Tests using unsupported statements are reported as skipped.
+    """
+    scope = _Scope(response, variables)
+    top_level, tests = parse_tests(lines)
+    for statement in top_level:
+        try:
+            scope.run_statement(statement)
+        except UnsupportedScript as e:
+            logger.debug(str(e))
+        except Exception as e:
+            logger.debug(f"Script statement failed: {e}")
+    assertions = []
+    for index, (name, statements) in enumerate(tests):
+        assertion = {"assertion": name, "skipped": False}
+        try:
+            for statement in statements:
+                scope.check(statement)
+        except UnsupportedScript as e:
+            assertion["skipped"] = True
+            logger.warning(f"Skipping test '{name}': {e}")
+        except AssertionError as e:
+            assertion["error"] = {"name": "AssertionError", "index": index, "test": name, "message": str(e)}
+        except Exception as e:
+            assertion["error"] = {"name": type(e).__name__, "index": index, "test": name, "message": str(e)}
+        assertions.append(assertion)
+    return assertions
+
+def run_prerequest_script(lines: List[str], variables: Dict[str, Any]):
+    scope = _Scope(None, variables)
+    for statement in _split_statements("\n".join(lines)):
+        try:
+            scope.run_statement(statement)
+        except UnsupportedScript as e:
+            logger.debug(str(e))
+
+# --- collection walk and report ----------------------------------------------------
+
+def iter_requests(items: List[Dict[str, Any]], auth: Optional[Dict[str, Any]] = None, parents: Tuple[Dict[str, Any], ...] = ()):
+    """Yield (item, inherited_auth, parent_folders) for every request, depth first."""
+    for item in items:
+        if isinstance(item.get("item"), list):
+            yield from iter_requests(item["item"], item.get("auth", auth), parents + (item,))
+        else:
+            yield item, auth, parents
+
+def _new_stats() -> Dict[str, Dict[str, int]]:
+    keys = ("iterations", "items", "scripts", "prerequests", "requests", "tests", "assertions", "testScripts", "prerequestScripts")
+    return {key: {"total": 0, "pending": 0, "failed": 0} for key in keys}
+
+def _timings(response_times: List[float], started: float, completed: float) -> Dict[str, Any]:
+    timings = {"started": started, "completed": completed}
+    if response_times:
+        timings.update({
+            "responseAverage": statistics.fmean(response_times),
+            "responseMin": min(response_times),
+            "responseMax": max(response_times),
+            "responseSd": statistics.pstdev(response_times),
+        })
+    return timings
+
+class ReportBuilder:
+    """Accumulates executions into a report shaped like Newman's JSON reporter output."""
+
+    def __init__(self, collection: Dict[str, Any], environment: Optional[Dict[str, Any]] = None):
+        self.collection = collection
+        self.environment = environment or {}
+        self.stats = _new_stats()
+        self.stats["iterations"]["total"] = 1
+        self.executions = []
+        self.failures = []
+        self.response_times = []
+        self.response_total = 0
+        self.started = time.time() * 1000
+
+    def add(self, item: Dict[str, Any], parents: Tuple[Dict[str, Any], ...], position: int, length: int,
+            sent: Optional[Dict[str, Any]], response: Optional[ResponseView], assertions: List[Dict[str, Any]],
+            request_error: Optional[str] = None, prerequest_ran: bool = False) -> Dict[str, Any]:
+        item_id = item.get("id") or item.get("_postman_id") or item.get("name")
+        cursor = {"position": position, "iteration": 0, "length": length, "cycles": 1, "ref": item_id}
+        request = dict(item.get("request") or {}) if isinstance(item.get("request"), dict) else {"url": item.get("request")}
+        request["url"] = _url_dict(request.get("url"))
+        source = {"id": item_id, "name": item.get("name"), "request": request}
+        execution = {"cursor": cursor, "item": source, "assertions": assertions}
+        self.stats["items"]["total"] += 1
+        self.stats["requests"]["total"] += 1
+        if prerequest_ran:
+            self.stats["prerequestScripts"]["total"] += 1
+            self.stats["prerequests"]["total"] += 1
+        if sent:
+            execution["request"] = {"method": sent["method"], "url": _url_dict(sent["url"]),
+                                    "header": [{"key": k, "value": v} for k, v in sent["headers"].items()]}
+        if request_error:
+            self.stats["requests"]["failed"] += 1
+            execution["requestError"] = {"message": request_error}
+            self.failures.append({"error": {"name": "Error", "message": request_error}, "at": "request",
+                                  "source": source, "parent": {"name": parents[-1].get("name")} if parents else {}, "cursor": cursor})
+        if response is not None:
+            self.response_times.append(response.elapsed_ms)
+            self.response_total += len(response.body)
+            execution["response"] = {"code": response.code, "status": response.reason, "responseTime": response.elapsed_ms,
+                                     "responseSize": len(response.body),
+                                     "header": [{"key": k, "value": v} for k, v in response.raw_headers.items()]}
+            if script_lines(item, "test"):
+                self.stats["testScripts"]["total"] += 1
+                self.stats["tests"]["total"] += 1
+        for assertion in assertions:
+            self.stats["assertions"]["total"] += 1
+            if assertion.get("skipped"):
+                self.stats["assertions"]["pending"] += 1
+            elif assertion.get("error"):
+                self.stats["assertions"]["failed"] += 1
+                self.failures.append({"error": assertion["error"], "at": f"assertion:{assertion['error']['index']} in test-script",
+                                      "source": source, "parent": {"name": parents[-1].get("name")} if parents else {}, "cursor": cursor})
+        self.executions.append(execution)
+        return execution
+
+    def build(self) -> Dict[str, Any]:
+        self.executions.sort(key=lambda e: e["cursor"]["position"])
+        return {
+            "collection": {"info": self.collection.get("info", {})},
+            "environment": self.environment,
+            "run": {
+                "stats": self.stats,
+                "timings": _timings(self.response_times, self.started, time.time() * 1000),
+                "executions": self.executions,
+                "transfers": {"responseTotal": self.response_total},
+                "failures": self.failures,
+                "error": None,
+            },
+        }
+
+def collection_variables(collection: Dict[str, Any], environment_path: Optional[str], env_vars: Optional[Dict[str, str]]) -> Dict[str, Any]:
+    variables = {v["key"]: v.get("value", "") for v in collection.get("variable", []) if not v.get("disabled")}
+    variables.update(load_environment(environment_path))
+    variables.update(env_vars or {})
+    return variables
+
+def make_session(pool_size: int = 10):
+    """requests.Session with a keep-alive connection pool sized for pool_size hosts/connections."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def run_collection(collection_path: str, environment_path: Optional[str] = None, env_vars: Optional[Dict[str, str]] = None,
+                   timeout: float = 30.0, pool_size: int = 10) -> Dict[str, Any]:
+    """
+    Run a Postman collection in-process over a pooled keep-alive HTTP session and
+    return a report in the same shape as Newman's JSON reporter.
+    """
+    with open(collection_path, "r", encoding="utf-8") as f:
+        collection = json.load(f)
+    variables = collection_variables(collection, environment_path, env_vars)
+    builder = ReportBuilder(collection, {"values": [{"key": k, "value": v} for k, v in variables.items()]})
+    requests_list = list(iter_requests(collection.get("item", []), collection.get("auth")))
+    collection_pre = script_lines(collection, "prerequest")
+    collection_test = script_lines(collection, "test")
+    with make_session(pool_size) as session:
+        for position, (item, auth, parents) in enumerate(requests_list):
+            prerequest = collection_pre + [l for p in parents for l in script_lines(p, "prerequest")] + script_lines(item, "prerequest")
+            if prerequest:
+                run_prerequest_script(prerequest, variables)
+            sent = None
+            response = None
+            error = None
+            try:
+                sent = build_request(item.get("request") or {}, variables, auth)
+                start = time.perf_counter()
+                http_response = session.request(sent["method"], sent["url"], headers=sent["headers"], data=sent["body"],
+                                                timeout=timeout, allow_redirects=True)
+                body = http_response.content
+                elapsed = round((time.perf_counter() - start) * 1000, 3)
+                response = ResponseView(http_response.status_code, http_response.reason, dict(http_response.headers), body, elapsed)
+            except Exception as e:
+                error = str(e)
+            assertions = []
+            if response is not None:
+                tests = collection_test + [l for p in parents for l in script_lines(p, "test")] + script_lines(item, "test")
+                assertions = run_test_script(tests, response, variables)
+            builder.add(item, parents, position, len(requests_list), sent, response, assertions, error, bool(prerequest))
+    logger.info(f"Native Postman run completed for {collection_path}")
+    return builder.build()
+
+# Example usage:
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python -m healapi.postman_runner <collection.json> [environment.json]")
+        sys.exit(1)
+    result = run_collection(sys.argv[1], sys.argv[2] if len(sys.argv) == 3 else None)
+    print(json.dumps(result["run"]["stats"], indent=2))
@@ -0,0 +1,153 @@
+import os
+import re
+import time
+import logging
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Windows: no child-process CPU accounting
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_SAFE_NAME_RE = re.compile(r"[^\w.-]+")
+
+# Profiler of the current run; sub-steps deep inside the pipeline report to it through step()
+_active: Optional["Profiler"] = None
+
+def _children_cpu() -> float:
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+class Profiler:
+    """
+    Records wall time, CPU time and peak traced memory per pipeline stage, and
+    wall/CPU time (plus peak memory when on the stage's own thread) per sub-step.
+
+    Stage CPU time covers every thread of this process; child_cpu_ms adds the
+    CPU time of subprocesses (Newman, pytest) that finished during the stage.
+    Sub-steps report the CPU time of the thread they ran on. With cprofile_dir,
+    each stage's calling thread is also profiled with cProfile into <dir>/<stage>.prof.
+    """
+
+    def __init__(self, cprofile_dir: Optional[str] = None, trace_memory: bool = True):
+        self.cprofile_dir = cprofile_dir
+        self.trace_memory = trace_memory
+        self.records: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._stage: Optional[str] = None
+        self._stage_thread: Optional[int] = None
+        # Running peaks of the open stage/steps on the stage thread; tracemalloc has a single peak counter
+        self._peaks: List[int] = []
+
+    def __enter__(self):
+        global _active
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.cprofile_dir:
+            os.makedirs(self.cprofile_dir, exist_ok=True)
+        _active = self
+        return self
+
+    def __exit__(self, *exc):
+        global _active
+        _active = None
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def _reset_peak(self):
+        """Fold the current peak into every open frame, then start a fresh peak for the new frame."""
+        if not tracemalloc.is_tracing():
+            return
+        peak = tracemalloc.get_traced_memory()[1]
+        self._peaks = [max(p, peak) for p in self._peaks]
+        tracemalloc.reset_peak()
+        self._peaks.append(tracemalloc.get_traced_memory()[0])
+
+    def _pop_peak(self) -> Optional[int]:
+        if not tracemalloc.is_tracing() or not self._peaks:
+            return None
+        peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+        if self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], peak)
+        return peak
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Dict[str, Any]]:
+        record = {"stage": name, "step": None}
+        self._stage, self._stage_thread = name, threading.get_ident()
+        self._peaks = []
+        self._reset_peak()
+        profile = None
+        if self.cprofile_dir:
+            import cProfile
+            profile = cProfile.Profile()
+        wall, cpu, children = time.perf_counter(), time.process_time(), _children_cpu()
+        if profile:
+            profile.enable()
+        try:
+            yield record
+        finally:
+            if profile:
+                profile.disable()
+                path = os.path.join(self.cprofile_dir, _SAFE_NAME_RE.sub("_", name) + ".prof")
+                profile.dump_stats(path)
+                record["cprofile"] = path
+            peak = self._pop_peak()
+            record.update(wall_ms=round((time.perf_counter() - wall) * 1000, 2), cpu_ms=round((time.process_time() - cpu) * 1000, 2),
+                          child_cpu_ms=round((_children_cpu() - children) * 1000, 2),
+                          peak_kb=round(peak / 1024, 1) if peak is not None else None)
+            self._stage = None
+            with self._lock:
+                self.records.append(record)
+
+    @contextmanager
+    def step(self, name: str, **meta) -> Iterator[Dict[str, Any]]:
+        on_stage_thread = threading.get_ident() == self._stage_thread
+        record = {"stage": self._stage, "step": name, **meta}
+        if on_stage_thread:
+            self._reset_peak()
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield record
+        finally:
+            peak = self._pop_peak() if on_stage_thread else None
+            record.update(wall_ms=round((time.perf_counter() - wall) * 1000, 2), cpu_ms=round((time.thread_time() - cpu) * 1000, 2),
+                          peak_kb=round(peak / 1024, 1) if peak is not None else None)
+            with self._lock:
+                self.records.append(record)
+
+    def table(self) -> str:
+        return timing_table(self.records)
+
+def timing_table(records: List[Dict[str, Any]]) -> str:
+    """Timing table of profiler records: each stage followed by its sub-steps."""
+    lines = ["    Stage / step                         |  wall ms |   cpu ms | child cpu ms |  peak KB",
+             "    ----------------------------------------------------------------------------------"]
+    for stage_record in [r for r in records if r["step"] is None]:
+        lines.append(f"    {stage_record['stage']:<36} | {stage_record['wall_ms']:>8} | {stage_record['cpu_ms']:>8} | "
+                     f"{stage_record['child_cpu_ms']:>12} | {_kb(stage_record):>8}")
+        for step_record in [r for r in records if r["step"] is not None and r["stage"] == stage_record["stage"]]:
+            lines.append(f"      {step_record['step'][:34]:<34} | {step_record['wall_ms']:>8} | {step_record['cpu_ms']:>8} | "
+                         f"{'-':>12} | {_kb(step_record):>8}")
+    return "\n".join(lines)
+
+def _kb(record: Dict[str, Any]) -> Any:
+    return record["peak_kb"] if record.get("peak_kb") is not None else "-"
+
+def step(name: str, **meta):
+    """Time a sub-step under the active profiler; a no-op when no profiler is running."""
+    profiler = _active
+    return profiler.step(name, **meta) if profiler else nullcontext({})
+
+def stage(name: str):
+    """Time a pipeline stage under the active profiler; a no-op when no profiler is running."""
+    profiler = _active
+    return profiler.stage(name) if profiler else nullcontext({})
@@ -1,30 +1,135 @@
 # ...existing code from modules/report_generator.py...
 import json
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Union
+
+from healapi import latency, profiling, report_writer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def generate_report(diff: Dict[str, Any], healing: Dict[str, Any], test_results: Dict[str, Any], output_path: Optional[str] = None) -> Dict[str, Any]:
+def generate_report(diff: Dict[str, Any], healing: Dict[str, Any], test_results: Dict[str, Any], output_path: Optional[str] = None,
+                    report_format: str = "json", artifact_threshold: Optional[int] = report_writer.ARTIFACT_THRESHOLD,
+                    history_path: Optional[str] = None, latency_options: Optional[Dict[str, Any]] = None,
+                    profile: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
     """
     Generate a summary report of the diff, healing actions, and test results.
-    Optionally write to a file.
+    Optionally write to a file (gzip/zstd by .gz/.zst extension): "json" (default)
+    writes the whole report as one indented JSON document; "sections" streams a
+    compact summary section first and moves bulky values to side files.
+    With history_path, per-endpoint latencies are compared against the runs recorded
+    there (latency_options: see latency.latency_section) and the run is then recorded too.
+    profile: stage/sub-step timing records of the run (see profiling.Profiler).
     """
+    healing = dict(healing or {})
+    llm_usage = healing.pop("llm_usage", None)
     report = {
         "api_diff": diff,
         "healing_actions": healing,
         "test_results": test_results
     }
+    if llm_usage:
+        report["llm_usage"] = llm_usage
+    if profile:
+        report["profile"] = profile
+    try:
+        latency_report = latency.latency_section(test_results, history_path, **(latency_options or {}))
+        if latency_report["endpoints"]:
+            report["latency"] = latency_report
+    except Exception as e:
+        logger.error(f"Failed to compute endpoint latencies: {e}")
+    report = {"summary": build_summary(report), **report}
     if output_path:
         try:
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(report, f, indent=2)
-            logger.info(f"Report written to {output_path}")
+            if report_format == "json":
+                with report_writer.open_text(output_path, "wt") as f:
+                    json.dump(report, f, indent=2)
+                logger.info(f"Report written to {output_path}")
+            else:
+                report_writer.write_report(output_path, report, artifact_threshold=artifact_threshold)
         except Exception as e:
             logger.error(f"Failed to write report to {output_path}: {e}")
+    if history_path:
+        try:
+            from healapi import run_history
+            run_history.record_report(history_path, report, output_path)
+        except Exception as e:
+            logger.error(f"Failed to record run in {history_path}: {e}")
     return report
 
+def _failure_summary(fail: Dict[str, Any]) -> Dict[str, Any]:
+    item = fail.get('source', {})
+    request = item.get('request', {})
+    url = request.get('url', {})
+    if isinstance(url, dict):
+        url = url.get('host', [''])[0] + '/' + '/'.join(url.get('path', []))
+    return {"name": item.get('name', 'Unknown'), "method": request.get('method', ''), "url": url,
+            "message": fail.get('error', {}).get('message', '')}
+
+def _execution_status(execution: Dict[str, Any]) -> str:
+    assertions = execution.get('assertions', [])
+    if not assertions:
+        return 'Not tested'
+    if any(a.get('error') for a in assertions):
+        return 'Fail'
+    return 'Pass (cached)' if execution.get('cached') else 'Pass'
+
+def build_summary(report: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compact summary section of a report: everything summarize_report and
+    generate_natural_summary print, without the raw diff, patches or test output.
+    """
+    api_diff = report.get("api_diff") or {}
+    healing = report.get("healing_actions") or {}
+    test_results = report.get("test_results") or {}
+    summary = {"api_diff": None, "healing_actions": {}, "healing_lists": [], "llm_budget": None,
+               "test_stats": None, "test_duration_ms": 0, "failures": [], "endpoint_results": [],
+               "assertions": {"passed": 0, "failed": 0}, "latency": None, "profile": report.get("profile")}
+    if api_diff:
+        summary["api_diff"] = {
+            "added_endpoints": len(api_diff.get("added_endpoints", [])),
+            "removed_endpoints": len(api_diff.get("removed_endpoints", [])),
+            "changed_endpoints": len(api_diff.get("changed_endpoints", [])),
+            "property_changes": [{k: prop.get(k) for k in ("path", "method", "added_properties", "removed_properties")}
+                                 for prop in api_diff.get("property_changes", [])],
+        }
+    if isinstance(healing, dict):
+        summary["healing_actions"] = {k: _count(v) for k, v in healing.items()}
+        summary["healing_lists"] = [k for k, v in healing.items() if isinstance(v, (list, dict))]
+    summary["llm_budget"] = (report.get("llm_usage") or {}).get("budget")
+    latency_report = report.get("latency")
+    if latency_report:
+        slowest = sorted(latency_report["endpoints"].items(), key=lambda e: e[1]["p95"], reverse=True)[:10]
+        summary["latency"] = {
+            "endpoints": len(latency_report["endpoints"]),
+            "slowest": [dict(stats, endpoint=endpoint) for endpoint, stats in slowest],
+            "compared": bool(latency_report.get("comparison")),
+            "baseline_runs": latency_report.get("baseline_runs"),
+            "regressions": [{k: entry[k] for k in ("endpoint", "p95", "baseline_p95", "change", "p_value")}
+                            for entry in latency_report.get("regressions", [])],
+        }
+    run = test_results.get('report', {}).get('run') if isinstance(test_results.get('report'), dict) else None
+    if run:
+        summary["test_stats"] = run.get('stats')
+        timings = run.get('timings', {})
+        summary["test_duration_ms"] = timings.get('completed', 0) - timings.get('started', 0)
+        summary["failures"] = [_failure_summary(fail) for fail in run.get('failures', [])]
+        for execution in run.get('executions', []):
+            summary["endpoint_results"].append([execution.get('item', {}).get('name', 'Unknown'), _execution_status(execution)])
+            for a in execution.get('assertions', []):
+                summary["assertions"]["failed" if a.get('error') else "passed"] += 1
+    return summary
+
+def report_summary(report: Union[Dict[str, Any], str]) -> Dict[str, Any]:
+    """Summary section of a report dict, or of a report file (reading only that section when present)."""
+    if isinstance(report, str):
+        summary = report_writer.load_summary(report)
+        if summary is not None:
+            return summary
+        with report_writer.open_text(report, "rt") as f:
+            report = json.load(f)  # Older reports without a summary section
+    return report.get("summary") or build_summary(report)
+
 def print_report(report: Dict[str, Any]):
     """
     Print the report in a readable format.
@@ -39,33 +144,30 @@ def print_report(report: Dict[str, Any]):
     except Exception as e:
         logger.error(f"Error printing report: {e}")
 
-def summarize_report(report: Dict[str, Any]) -> str:
+def summarize_report(report: Union[Dict[str, Any], str]) -> str:
     """
-    Generate a human-readable summary of the report for quick review.
+    Generate a human-readable summary of the report (dict or report file) for quick review.
     """
+    report_data = report_summary(report)
     summary = []
-    api_diff = report.get("api_diff", {})
-    healing = report.get("healing_actions", {})
-    test_results = report.get("test_results", {})
+    api_diff = report_data.get("api_diff")
+    healing = report_data.get("healing_actions", {})
 
     # API Diff summary
     summary.append("[SUMMARY] API Diff:")
     if api_diff:
-        changed_endpoints = api_diff.get("changed_endpoints", [])
-        added_endpoints = api_diff.get("added_endpoints", [])
-        removed_endpoints = api_diff.get("removed_endpoints", [])
         property_changes = api_diff.get("property_changes", [])
-        summary.append(f"  Added endpoints: {len(added_endpoints)}")
-        summary.append(f"  Removed endpoints: {len(removed_endpoints)}")
-        summary.append(f"  Changed endpoints: {len(changed_endpoints)}")
+        summary.append(f"  Added endpoints: {api_diff['added_endpoints']}")
+        summary.append(f"  Removed endpoints: {api_diff['removed_endpoints']}")
+        summary.append(f"  Changed endpoints: {api_diff['changed_endpoints']}")
         summary.append(f"  Property changes: {len(property_changes)}")
         if property_changes:
             summary.append("    Path         | Method | Added Properties | Removed Properties")
             summary.append("    ------------------------------------------------------------")
             for prop in property_changes:
-                added = ','.join(prop.get('added_properties', []))
-                removed = ','.join(prop.get('removed_properties', []))
-                summary.append(f"    {prop.get('path',''):<13} | {prop.get('method',''):<6} | {added:<15} | {removed}")
+                added = ','.join(prop.get('added_properties') or [])
+                removed = ','.join(prop.get('removed_properties') or [])
+                summary.append(f"    {prop.get('path') or '':<13} | {prop.get('method') or '':<6} | {added:<15} | {removed}")
     else:
         summary.append("  No differences detected.")
 
@@ -73,30 +175,40 @@ def summarize_report(report: Dict[str, Any]) -> str:
     summary.append("[SUMMARY] Healing Actions:")
     if healing:
         for k, v in healing.items():
-            summary.append(f"  {k}: {len(v) if hasattr(v, '__len__') else v}")
+            summary.append(f"  {k}: {v}")
     else:
         summary.append("  No healing actions performed.")
 
+    llm_budget = report_data.get("llm_budget")
+    if llm_budget:
+        summary.append("[SUMMARY] LLM Usage:")
+        summary.append(f"  Calls: {llm_budget['calls']} in {llm_budget['wall_ms']}ms "
+                       f"(budget: {llm_budget['max_seconds'] or 'unlimited'}s, {llm_budget['max_tokens'] or 'unlimited'} tokens)")
+        summary.append(f"  Tokens: {llm_budget['prompt_tokens']} prompt, {llm_budget['completion_tokens']} completion")
+        summary.append(f"  Outcomes: {', '.join(f'{k}={v}' for k, v in llm_budget['outcomes'].items()) or 'none'}")
+
     # Test results summary (tabular)
     summary.append("[SUMMARY] Test Results:")
-    stats = None
-    if test_results and 'report' in test_results and 'run' in test_results['report']:
-        stats = test_results['report']['run']['stats']
+    stats = report_data.get("test_stats")
     if stats:
         table = []
         table.append("┌─────────────────────────┬──────────┬──────────┐")
         table.append("│                         │ executed │   failed │")
         table.append("├─────────────────────────┼──────────┼──────────┤")
-        for key, label in zip(["iterations", "items", "requests", "testScripts", "prerequestScripts", "assertions"],
-                              ["iterations", "requests", "requests", "test-scripts", "prerequest-scripts", "assertions"]):
+        keys = ["iterations", "items", "requests", "testScripts", "prerequestScripts", "assertions"]
+        labels = ["iterations", "requests", "requests", "test-scripts", "prerequest-scripts", "assertions"]
+        if "cached" in stats:
+            # Requests answered from the result cache (not re-run)
+            keys.append("cached")
+            labels.append("cached requests")
+        for key, label in zip(keys, labels):
             executed = stats.get(key, {}).get("total", 0)
             failed = stats.get(key, {}).get("failed", 0)
             table.append(f"│{label:>25} │{executed:>9} │{failed:>9} │")
             table.append("├─────────────────────────┼──────────┼──────────┤")
         table[-1] = "├─────────────────────────┴──────────┴──────────┤"
         # Duration and data
-        timings = test_results['report']['run'].get('timings', {})
-        duration = timings.get('completed', 0) - timings.get('started', 0)
+        duration = report_data.get("test_duration_ms", 0)
         table.append(f"│ total run duration: {duration}ms{' ' * (25 - len(str(duration)))}│")
         table.append("├───────────────────────────────────────────────┤")
         table.append(f"│ total data received: 0B (approx)              │")
@@ -106,39 +218,43 @@ def summarize_report(report: Dict[str, Any]) -> str:
         summary.append("  No test results available.")
 
     # Print errors for each request if available
-    if test_results and 'report' in test_results and 'run' in test_results['report']:
-        failures = test_results['report']['run'].get('failures', [])
-        for fail in failures:
-            item = fail.get('source', {})
-            name = item.get('name', 'Unknown')
-            method = item.get('request', {}).get('method', '')
-            url = item.get('request', {}).get('url', {}).get('host', [''])[0] + '/' + '/'.join(item.get('request', {}).get('url', {}).get('path', []))
-            error = fail.get('error', {}).get('message', '')
-            summary.append(f"\n{name}\n  {method} {url} [errored]\n     {error}")
+    for fail in report_data.get("failures", []):
+        summary.append(f"\n{fail['name']}\n  {fail['method']} {fail['url']} [errored]\n     {fail['message']}")
+
+    # Per-endpoint latency (slowest first) and regressions against the run history
+    latency_summary = report_data.get("latency")
+    if latency_summary:
+        summary.append(f"[SUMMARY] Endpoint Latency ({latency_summary['endpoints']} endpoints, slowest p95 first):")
+        summary.append("    Endpoint                       |     n |  p50 ms |  p95 ms |  max ms")
+        summary.append("    ---------------------------------------------------------------------")
+        for stats in latency_summary["slowest"]:
+            summary.append(f"    {stats['endpoint']:<30} | {stats['count']:>5} | {stats['p50']:>7} | {stats['p95']:>7} | {stats['max']:>7}")
+        if latency_summary["compared"]:
+            summary.append(f"[SUMMARY] Latency Regressions (p95 vs last {latency_summary['baseline_runs']} runs):")
+            for entry in latency_summary["regressions"]:
+                summary.append(f"  {entry['endpoint']}: p95 {entry['p95']}ms vs {entry['baseline_p95']}ms "
+                               f"(+{round(entry['change'] * 100, 1)}%, p={entry['p_value']})")
+            if not latency_summary["regressions"]:
+                summary.append("  None")
+
+    if report_data.get("profile"):
+        summary.append("[SUMMARY] Profile:")
+        summary.append(profiling.timing_table(report_data["profile"]))
 
     # Add per-endpoint test pass/fail table
-    summary.append(summarize_test_pass_fail(report))
+    summary.append(summarize_test_pass_fail(report_data))
     return "\n".join(summary)
 
-def summarize_test_pass_fail(report: dict) -> str:
+def _count(value):
+    """Number of entries for lists/dicts, the value itself otherwise."""
+    return len(value) if isinstance(value, (list, dict)) else value
+
+def summarize_test_pass_fail(report: Union[Dict[str, Any], str]) -> str:
     """
     Add a table of test pass/fail per endpoint to the summary.
     """
-    test_results = report.get("test_results", {})
-    endpoint_results = []
-    # Try to extract per-request results from newman report
-    if test_results and 'report' in test_results and 'run' in test_results['report']:
-        executions = test_results['report']['run'].get('executions', [])
-        for exec in executions:
-            name = exec.get('item', {}).get('name', 'Unknown')
-            assertions = exec.get('assertions', [])
-            if not assertions:
-                status = 'Not tested'
-            elif any(a.get('error') for a in assertions):
-                status = 'Fail'
-            else:
-                status = 'Pass'
-            endpoint_results.append((name, status))
+    summary = report if isinstance(report, dict) and "endpoint_results" in report else report_summary(report)
+    endpoint_results = summary.get("endpoint_results", [])
     if not endpoint_results:
         return "No per-endpoint test results available."
     # Build table
@@ -149,43 +265,41 @@ def summarize_test_pass_fail(report: dict) -> str:
         lines.append(f"| {name:<20} | {status:<6} |")
     return "\n".join(lines)
 
-def generate_natural_summary(report: Dict[str, Any]) -> str:
+def _latency_sentence(latency_summary: Optional[Dict[str, Any]]) -> str:
+    if not latency_summary or not latency_summary["compared"]:
+        return ""
+    regressions = latency_summary["regressions"]
+    if not regressions:
+        return "No endpoint got significantly slower than in previous runs. "
+    names = ", ".join(entry["endpoint"] for entry in regressions)
+    return f"{len(regressions)} endpoint(s) got significantly slower (p95) than in previous runs: {names}. "
+
+def generate_natural_summary(report: Union[Dict[str, Any], str]) -> str:
     """
-    Generate a natural language, paragraph-style summary of the report for easy reading.
+    Generate a natural language, paragraph-style summary of the report (dict or report file) for easy reading.
     """
-    api_diff = report.get("api_diff", {})
-    healing = report.get("healing_actions", {})
-    test_results = report.get("test_results", {})
+    report_data = report_summary(report)
+    api_diff = report_data.get("api_diff") or {}
+    healing = report_data.get("healing_actions", {})
 
     # API Diff
-    added = len(api_diff.get("added_endpoints", [])) if api_diff else 0
-    removed = len(api_diff.get("removed_endpoints", [])) if api_diff else 0
-    changed = len(api_diff.get("changed_endpoints", [])) if api_diff else 0
+    added = api_diff.get("added_endpoints", 0)
+    removed = api_diff.get("removed_endpoints", 0)
+    changed = api_diff.get("changed_endpoints", 0)
 
     # Healing
-    total_heal = len(healing) if healing else 0
-    heal_details = []
-    if isinstance(healing, dict):
-        for k, v in healing.items():
-            heal_details.append(f"{k}: {len(v) if hasattr(v, '__len__') else v}")
+    total_heal = len(healing)
+    heal_details = [f"{k}: {healing[k]}" for k in report_data.get("healing_lists", [])]
     heal_str = ", ".join(heal_details) if heal_details else "No healing actions performed."
 
     # Test Results
-    passed = 0
-    failed = 0
-    if test_results and 'report' in test_results and 'run' in test_results['report']:
-        executions = test_results['report']['run'].get('executions', [])
-        for exec in executions:
-            assertions = exec.get('assertions', [])
-            for a in assertions:
-                if a.get('error'):
-                    failed += 1
-                else:
-                    passed += 1
+    passed = report_data.get("assertions", {}).get("passed", 0)
+    failed = report_data.get("assertions", {}).get("failed", 0)
     summary = (
         f"In this HealAPI run, {added} endpoints were added, {removed} endpoints were removed, and {changed} endpoints were changed in your API. "
         f"A total of {total_heal} healing actions were performed ({heal_str}). "
         f"After healing, {passed} tests passed and {failed} tests failed. "
+        f"{_latency_sentence(report_data.get('latency'))}"
         "For more details, please refer to the full report above or the JSON file if you specified --report-path."
     )
     return summary
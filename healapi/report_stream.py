@@ -0,0 +1,227 @@
+import re
+import json
+import logging
+from typing import Any, Dict, IO
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Upper bound for captured stdout/stderr and failure texts kept in reports
+MAX_OUTPUT_CHARS = 20000
+
+_WS_RE = re.compile(r"[ \t\r\n]*")
+_STRING_BODY_RE = re.compile(r'(?:[^"\\]|\\.)*', re.S)
+_STRUCT_RE = re.compile(r'["{}\[\]]')
+_DECODER = json.JSONDecoder()
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
+
+def truncate_output(text: Any, limit: int = MAX_OUTPUT_CHARS) -> Any:
+    """Keep the head and tail of long texts; non-strings are returned unchanged."""
+    if not isinstance(text, str) or len(text) <= limit:
+        return text
+    half = limit // 2
+    return f"{text[:half]}\n... [{len(text) - 2 * half} characters truncated] ...\n{text[-half:]}"
+
+class JsonStreamReader:
+    """
+    Pull reader over a JSON document read in chunks. Values can be decoded
+    (read_value) or skipped (skip_value) without building them, so only the
+    selected parts of a large report are ever held in memory.
+    """
+
+    def __init__(self, fp: IO[str], chunk_size: int = 1 << 20):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Drop consumed text and append the next chunk; False at end of file."""
+        if self.eof:
+            return False
+        # Grow reads with the pending text so decoding a large value stays linear
+        chunk = self.fp.read(max(self.chunk_size, len(self.buf) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character (not consumed)."""
+        while True:
+            self.pos = _WS_RE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON document")
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} but found {found!r}")
+        self.pos += 1
+
+    def read_value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except ValueError:
+                if not self._fill():
+                    raise
+                continue
+            # A number cut by the chunk boundary ("-2." + "5e3") decodes as its prefix
+            if (end == len(self.buf) or (isinstance(value, (int, float)) and self.buf[end] in _NUMBER_CHARS)) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def _skip_string(self):
+        self.pos += 1
+        while True:
+            end = _STRING_BODY_RE.match(self.buf, self.pos).end()
+            if end < len(self.buf) and self.buf[end] == '"':
+                self.pos = end + 1
+                return
+            self.pos = end
+            if not self._fill():
+                raise ValueError("Unterminated string in JSON document")
+
+    def skip_value(self):
+        char = self.peek()
+        if char == '"':
+            self._skip_string()
+            return
+        if char not in "{[":
+            self.read_value()
+            return
+        depth = 0
+        while True:
+            match = _STRUCT_RE.search(self.buf, self.pos)
+            if not match:
+                self.pos = len(self.buf)
+                if not self._fill():
+                    raise ValueError("Unexpected end of JSON document")
+                continue
+            self.pos = match.start()
+            if match.group() == '"':
+                self._skip_string()
+                continue
+            self.pos += 1
+            depth += 1 if match.group() in "{[" else -1
+            if depth == 0:
+                return
+
+def select(reader: JsonStreamReader, fields: Any) -> Any:
+    """
+    Decode the next value keeping only the selected fields.
+
+    fields is True (keep the whole value), a callable (keep the value and
+    transform it), or a dict of key -> fields for objects; a dict applied to an
+    array selects from each element. Unselected keys are skipped unparsed.
+    """
+    if fields is True:
+        return reader.read_value()
+    if callable(fields):
+        return fields(reader.read_value())
+    char = reader.peek()
+    if char == "{":
+        reader.pos += 1
+        result = {}
+        if reader.peek() == "}":
+            reader.pos += 1
+            return result
+        while True:
+            key = reader.read_value()
+            reader.expect(":")
+            if key in fields:
+                result[key] = select(reader, fields[key])
+            else:
+                reader.skip_value()
+            char = reader.peek()
+            reader.pos += 1
+            if char == "}":
+                return result
+            if char != ",":
+                raise ValueError(f"Expected ',' or '}}' but found {char!r}")
+    if char == "[":
+        reader.pos += 1
+        items = []
+        if reader.peek() == "]":
+            reader.pos += 1
+            return items
+        while True:
+            items.append(select(reader, fields))
+            char = reader.peek()
+            reader.pos += 1
+            if char == "]":
+                return items
+            if char != ",":
+                raise ValueError(f"Expected ',' or ']' but found {char!r}")
+    return reader.read_value()
+
+def load_report(path: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Stream a JSON report from disk, keeping only the selected fields."""
+    with open(path, "r", encoding="utf-8") as f:
+        return select(JsonStreamReader(f), fields)
+
+_NEWMAN_REQUEST = {"method": True, "url": True}
+_NEWMAN_ERROR = {"name": True, "index": True, "test": True, "message": truncate_output}
+NEWMAN_REPORT_FIELDS = {
+    "collection": {"info": True},
+    "run": {
+        "stats": True,
+        "timings": True,
+        "transfers": True,
+        "error": True,
+        "executions": {
+            "id": True,
+            "cursor": True,
+            "item": {"id": True, "name": True, "request": _NEWMAN_REQUEST},
+            "request": _NEWMAN_REQUEST,
+            "response": {"id": True, "code": True, "status": True, "responseTime": True, "responseSize": True},
+            "assertions": {"assertion": True, "skipped": True, "error": _NEWMAN_ERROR},
+            "requestError": True,
+        },
+        "failures": {
+            "error": _NEWMAN_ERROR,
+            "at": True,
+            "source": {"id": True, "name": True, "request": _NEWMAN_REQUEST},
+            # For top-level requests the parent is the whole collection: keep its identity only
+            "parent": {"id": True, "name": True},
+            "cursor": True,
+        },
+    },
+}
+
+_PYTEST_STAGE = {"duration": True, "outcome": True, "crash": True, "longrepr": truncate_output}
+PYTEST_REPORT_FIELDS = {
+    "created": True,
+    "duration": True,
+    "exitcode": True,
+    "root": True,
+    "environment": True,
+    "summary": True,
+    "tests": {"nodeid": True, "lineno": True, "outcome": True, "setup": _PYTEST_STAGE, "call": _PYTEST_STAGE, "teardown": _PYTEST_STAGE},
+    "warnings": True,
+}
+
+def load_newman_report(path: str) -> Dict[str, Any]:
+    """Executions, failures, stats and timings of a Newman JSON report (bodies and collection tree dropped)."""
+    return load_report(path, NEWMAN_REPORT_FIELDS)
+
+def load_pytest_report(path: str) -> Dict[str, Any]:
+    """Summary and per-test outcomes/durations of a pytest-json-report file."""
+    return load_report(path, PYTEST_REPORT_FIELDS)
+
+# Example usage:
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) != 3 or sys.argv[1] not in ("newman", "pytest"):
+        print("Usage: python -m healapi.report_stream newman|pytest <report.json>")
+        sys.exit(1)
+    loader = load_newman_report if sys.argv[1] == "newman" else load_pytest_report
+    print(json.dumps(loader(sys.argv[2]), indent=2))
@@ -0,0 +1,202 @@
+import os
+import gzip
+import json
+import hashlib
+import logging
+import tempfile
+from typing import Any, Dict, IO, Iterator, Optional
+
+from healapi.patching import replacement_mode
+from healapi.report_stream import JsonStreamReader, select
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Values (inside a section) whose JSON is larger than this go to a side file
+ARTIFACT_THRESHOLD = 256 * 1024
+ARTIFACT_KEY = "$artifact"
+# Sections always written inline: readers of the summary must not need side files
+INLINE_SECTIONS = ("summary",)
+_ENCODER = json.JSONEncoder(default=str)
+_SUFFIXES = {"gzip": ".gz", "zstd": ".zst", None: ""}
+
+def compression_for(path: str) -> Optional[str]:
+    """Compression implied by a file name: gzip for .gz, zstd for .zst, none otherwise."""
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith(".zst"):
+        return "zstd"
+    return None
+
+def open_text(path: str, mode: str = "rt", compression: Optional[str] = "auto") -> IO[str]:
+    """Open a (possibly gzip/zstd compressed) UTF-8 text file; "auto" picks the compression from the file name."""
+    if compression == "auto":
+        compression = compression_for(path)
+    if compression == "gzip":
+        return gzip.open(path, mode, encoding="utf-8", compresslevel=6) if "w" in mode else gzip.open(path, mode, encoding="utf-8")
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("zstd compression requires the 'zstandard' package (pip install zstandard)")
+        return zstandard.open(path, mode, encoding="utf-8")
+    if compression:
+        raise ValueError(f"Unsupported compression: {compression}")
+    return open(path, mode.replace("t", ""), encoding="utf-8")
+
+class ReportWriter:
+    """
+    Writes a report as one JSON object, section by section, without building the
+    serialized document in memory. The summary section is expected first so
+    readers can stop after it (see load_summary). Inside the other sections, values
+    larger than artifact_threshold are streamed to content-addressed side files in
+    <report>.artifacts/ and replaced by {"$artifact": "<sha256>.json[.gz]", ...}.
+    The report appears atomically on close.
+    """
+
+    def __init__(self, path: str, compression: Optional[str] = "auto", artifact_threshold: Optional[int] = ARTIFACT_THRESHOLD):
+        self.path = path
+        self.compression = compression_for(path) if compression == "auto" else compression
+        self.artifact_threshold = artifact_threshold
+        self.artifacts_dir = f"{path}.artifacts"
+        self.artifacts: Dict[str, int] = {}
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, self._tmp_path = tempfile.mkstemp(prefix=".healapi-", suffix=".tmp", dir=directory)
+        os.close(fd)
+        self._f = open_text(self._tmp_path, "wt", self.compression)
+        self._sections = 0
+        self._f.write("{")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write_section(self, name: str, value: Any):
+        self._f.write(("," if self._sections else "") + f"\n{json.dumps(name)}: ")
+        self._sections += 1
+        if isinstance(value, dict) and self.artifact_threshold is not None and name not in INLINE_SECTIONS:
+            self._f.write("{")
+            for index, (key, item) in enumerate(value.items()):
+                self._f.write(("," if index else "") + f"\n  {json.dumps(str(key))}: ")
+                self._write_value(item)
+            self._f.write("}")
+        else:
+            self._write_chunks(_ENCODER.iterencode(value))
+
+    def _write_chunks(self, chunks: Iterator[str]):
+        for chunk in chunks:
+            self._f.write(chunk)
+
+    def _write_value(self, value: Any):
+        """Inline small values; stream large ones to a side file while hashing them."""
+        if not isinstance(value, (dict, list, str)):
+            self._write_chunks(_ENCODER.iterencode(value))
+            return
+        chunks = _ENCODER.iterencode(value)
+        pending = []
+        size = 0
+        for chunk in chunks:
+            pending.append(chunk)
+            size += len(chunk)
+            if size > self.artifact_threshold:
+                self._f.write(json.dumps(self._write_artifact(pending, chunks)))
+                return
+        self._write_chunks(pending)
+
+    def _write_artifact(self, head: list, rest: Iterator[str]) -> Dict[str, Any]:
+        os.makedirs(self.artifacts_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".artifact-", suffix=".tmp", dir=self.artifacts_dir)
+        os.close(fd)
+        sha = hashlib.sha256()
+        size = 0
+        try:
+            with open_text(tmp_path, "wt", self.compression) as f:
+                for chunks in (head, rest):
+                    for chunk in chunks:
+                        data = chunk.encode("utf-8")
+                        sha.update(data)
+                        size += len(data)
+                        f.write(chunk)
+            name = f"{sha.hexdigest()}.json{_SUFFIXES[self.compression]}"
+            target = os.path.join(self.artifacts_dir, name)
+            if os.path.exists(target):
+                os.remove(tmp_path)  # Same content already stored
+            else:
+                os.chmod(tmp_path, replacement_mode(target))
+                os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.artifacts[name] = size
+        return {ARTIFACT_KEY: name, "bytes": size}
+
+    def close(self):
+        self._f.write("\n}\n")
+        self._f.close()
+        # mkstemp files are 0600: give the report the mode of the one it replaces (or a new file's)
+        os.chmod(self._tmp_path, replacement_mode(self.path))
+        os.replace(self._tmp_path, self.path)
+        logger.info(f"Report written to {self.path}" + (f" ({len(self.artifacts)} side files in {self.artifacts_dir})" if self.artifacts else ""))
+
+    def abort(self):
+        self._f.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+def write_report(path: str, sections: Dict[str, Any], compression: Optional[str] = "auto",
+                 artifact_threshold: Optional[int] = ARTIFACT_THRESHOLD) -> Dict[str, int]:
+    """Write sections (in order) with a ReportWriter; returns the side files written (name -> bytes)."""
+    with ReportWriter(path, compression, artifact_threshold) as writer:
+        for name, value in sections.items():
+            writer.write_section(name, value)
+    return writer.artifacts
+
+def load_summary(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Read only the leading summary section of a sectioned report (side files
+    inlined, for reports written before the summary was kept inline); None for
+    reports without one (e.g. written by older versions).
+    """
+    with open_text(path, "rt") as f:
+        reader = JsonStreamReader(f, chunk_size=64 * 1024)
+        reader.expect("{")
+        if reader.peek() != '"' or reader.read_value() != "summary":
+            return None
+        reader.expect(":")
+        summary = reader.read_value()
+    return resolve_artifacts(summary, path)
+
+def load_section(path: str, name: str, resolve: bool = False) -> Any:
+    """Stream one section out of a report, optionally inlining its side files."""
+    with open_text(path, "rt") as f:
+        value = select(JsonStreamReader(f), {name: True}).get(name)
+    return resolve_artifacts(value, path) if resolve else value
+
+def load_artifact(report_path: str, name: str) -> Any:
+    """Load a side file referenced from a report."""
+    with open_text(os.path.join(f"{report_path}.artifacts", os.path.basename(name)), "rt") as f:
+        return json.load(f)
+
+def resolve_artifacts(value: Any, report_path: str) -> Any:
+    """Replace artifact references (one level deep, as written by ReportWriter) with their contents."""
+    if isinstance(value, dict):
+        return {k: load_artifact(report_path, v[ARTIFACT_KEY]) if isinstance(v, dict) and ARTIFACT_KEY in v else v
+                for k, v in value.items()}
+    return value
+
+# Example usage:
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python -m healapi.report_writer <report.json[.gz|.zst]> [section]")
+        sys.exit(1)
+    if len(sys.argv) == 3:
+        print(json.dumps(load_section(sys.argv[1], sys.argv[2], resolve=True), indent=2))
+    else:
+        print(json.dumps(load_summary(sys.argv[1]), indent=2))
@@ -0,0 +1,288 @@
+import os
+import re
+import ast
+import json
+import time
+import hashlib
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from healapi.patching import write_json_atomic
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+_HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+_HOST_VAR_RE = re.compile(r"^\{\{[^}]+\}\}")
+_SCHEME_HOST_RE = re.compile(r"^[a-zA-Z][\w+.-]*://[^/]*")
+
+def digest(data: Any) -> str:
+    """Stable content hash of text or JSON-serializable data."""
+    if not isinstance(data, (str, bytes)):
+        data = json.dumps(data, sort_keys=True, default=str)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha1(data).hexdigest()
+
+def _is_variable(segment: str) -> bool:
+    return segment.startswith(":") or (segment.startswith("{{") and segment.endswith("}}"))
+
+def _segments(path: str) -> List[str]:
+    return [s for s in path.split("/") if s]
+
+class SpecIndex:
+    """
+    Resolves concrete request paths to spec path templates and fingerprints
+    operations, including every component they reference through $ref, so a
+    change to a shared schema invalidates all operations using it.
+    """
+
+    def __init__(self, spec: Dict[str, Any], operations: Optional[Dict[Tuple[str, str], Optional[str]]] = None):
+        self.spec = spec or {}
+        self._templates: Dict[int, List[Tuple[str, List[str]]]] = {}
+        for template in (self.spec.get("paths") or {}):
+            segments = _segments(template)
+            self._templates.setdefault(len(segments), []).append((template, segments))
+        self._operations: Dict[Tuple[str, str], Optional[str]] = dict(operations or {})
+        self._refs: Dict[str, str] = {}
+
+    def resolve(self, path: str) -> Optional[str]:
+        """Spec path template matching a request path, preferring the most literal match."""
+        segments = _segments(path)
+        best = None
+        best_literals = -1
+        for template, template_segments in self._templates.get(len(segments), []):
+            literals = 0
+            for segment, template_segment in zip(segments, template_segments):
+                is_param = template_segment.startswith("{") and template_segment.endswith("}")
+                if is_param:
+                    continue
+                if _is_variable(segment) or segment != template_segment:
+                    break
+                literals += 1
+            else:
+                if literals > best_literals:
+                    best, best_literals = template, literals
+        return best
+
+    def _collect_refs(self, value: Any, refs: Set[str]):
+        if isinstance(value, dict):
+            ref = value.get("$ref")
+            if isinstance(ref, str):
+                refs.add(ref)
+            for v in value.values():
+                self._collect_refs(v, refs)
+        elif isinstance(value, list):
+            for v in value:
+                self._collect_refs(v, refs)
+
+    def _resolve_ref(self, ref: str) -> Any:
+        if not ref.startswith("#/"):
+            return ref  # External refs: fingerprint the reference itself
+        node = self.spec
+        for part in ref[2:].split("/"):
+            part = part.replace("~1", "/").replace("~0", "~")
+            node = node.get(part) if isinstance(node, dict) else None
+        return node
+
+    def _closure_digest(self, value: Any) -> str:
+        """Digest of a value plus, transitively, everything it references."""
+        seen: Set[str] = set()
+        pending: Set[str] = set()
+        self._collect_refs(value, pending)
+        parts = [digest(value)]
+        while pending:
+            ref = pending.pop()
+            if ref in seen:
+                continue
+            seen.add(ref)
+            target = self._resolve_ref(ref)
+            if ref not in self._refs:
+                self._refs[ref] = digest(target)
+            parts.append(f"{ref}={self._refs[ref]}")
+            self._collect_refs(target, pending)
+        return digest(sorted(parts))
+
+    def operation_digest(self, path: str, method: str) -> Optional[str]:
+        """Fingerprint of one operation (with path-level parameters), or None if it does not exist."""
+        key = (path, method.lower())
+        if key not in self._operations:
+            path_item = (self.spec.get("paths") or {}).get(path) or {}
+            operation = path_item.get(method.lower())
+            if not isinstance(operation, dict):
+                self._operations[key] = None
+            else:
+                self._operations[key] = self._closure_digest({"parameters": path_item.get("parameters"), "operation": operation,
+                                                              "servers": path_item.get("servers", self.spec.get("servers"))})
+        return self._operations[key]
+
+    def operation_digests(self) -> Dict[Tuple[str, str], Optional[str]]:
+        """Fingerprints of every operation in the spec, keyed by (path, method)."""
+        for path, path_item in (self.spec.get("paths") or {}).items():
+            if isinstance(path_item, dict):
+                for method in _HTTP_METHODS:
+                    if method in path_item:
+                        self.operation_digest(path, method)
+        return dict(self._operations)
+
+    def path_digest(self, path: str) -> Optional[str]:
+        """Fingerprint of every operation under a path template."""
+        path_item = (self.spec.get("paths") or {}).get(path)
+        if not isinstance(path_item, dict):
+            return None
+        return digest([(m, self.operation_digest(path, m)) for m in _HTTP_METHODS if m in path_item])
+
+def request_path(url: Any) -> Optional[str]:
+    """Path of a Postman request url (dict or raw), without host/variable prefix and query."""
+    if isinstance(url, dict):
+        if url.get("path"):
+            path = url["path"]
+            return "/" + "/".join(path) if isinstance(path, list) else path
+        url = url.get("raw", "")
+    if not isinstance(url, str) or not url:
+        return None
+    path = _SCHEME_HOST_RE.sub("", _HOST_VAR_RE.sub("", url, count=1), count=1)
+    return path.split("?", 1)[0].split("#", 1)[0] or "/"
+
+def _item_context(node: Dict[str, Any]) -> Dict[str, Any]:
+    """The parts of a collection/folder that requests inherit."""
+    return {k: node.get(k) for k in ("auth", "event", "variable") if k in node}
+
+def postman_fingerprint(item: Dict[str, Any], parents: Iterable[Dict[str, Any]], collection: Dict[str, Any],
+                        environment_digest: str = "") -> str:
+    """Fingerprint of a request with everything it inherits (collection/folder auth, scripts, variables, environment)."""
+    return digest({
+        "request": item.get("request"),
+        "event": item.get("event"),
+        "parents": [_item_context(p) for p in parents],
+        "collection": _item_context(collection),
+        "environment": environment_digest,
+    })
+
+def pytest_test_paths(source: str) -> Dict[str, List[str]]:
+    """
+    Map each test function name in a module (methods included) to the string
+    literals in its body that look like URL paths.
+    """
+    tests = {}
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return tests
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith("test"):
+            paths = []
+            for child in ast.walk(node):
+                if isinstance(child, ast.Constant) and isinstance(child.value, str) and "/" in child.value:
+                    value = child.value
+                    path = request_path(value) if "://" in value else value
+                    if path and path.startswith("/"):
+                        paths.append(path.split("?", 1)[0])
+            tests.setdefault(node.name, []).extend(paths)
+    return tests
+
+def _pytest_function(node_id: str) -> str:
+    return node_id.rsplit("::", 1)[-1].split("[", 1)[0]
+
+class ResultCache:
+    """
+    Persistent map of test key -> last passing result, valid while the test's
+    fingerprint and its target operation's fingerprint are unchanged and (when
+    max_age is set) the result is recent enough.
+    """
+
+    def __init__(self, path: str, max_age: Optional[float] = None):
+        self.path = path
+        self.max_age = max_age
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == CACHE_VERSION:
+                    self.entries = data.get("entries", {})
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable result cache {path}: {e}")
+
+    def lookup(self, key: str, fingerprint: str, operation: Optional[str]) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(key)
+        fresh = entry is not None and (self.max_age is None or time.time() - entry.get("recorded_at", 0) <= self.max_age)
+        if operation and fresh and entry.get("fingerprint") == fingerprint and entry.get("operation") == operation:
+            self.hits += 1
+            return entry["result"]
+        self.misses += 1
+        return None
+
+    def store(self, key: str, fingerprint: str, operation: Optional[str], result: Dict[str, Any]):
+        if operation:
+            self.entries[key] = {"fingerprint": fingerprint, "operation": operation, "recorded_at": time.time(), "result": result}
+
+    def discard(self, key: str):
+        self.entries.pop(key, None)
+
+    def save(self):
+        try:
+            write_json_atomic(self.path, {"version": CACHE_VERSION, "entries": self.entries})
+        except Exception as e:
+            logger.warning(f"Could not save result cache to {self.path}: {e}")
+
+def healed_tests(healing: Optional[Dict[str, Any]]) -> Set[str]:
+    """
+    Identifiers (request names/paths, pytest files) of everything a healing result
+    touched. Renamed requests are identified by their new path as well.
+    """
+    touched = set()
+    for action in (healing or {}).get("healed_postman_requests", []) or []:
+        if action.get("request"):
+            touched.add(action["request"])
+        if str(action.get("action", "")).startswith("renamed-to "):
+            touched.add(action["action"][len("renamed-to "):])
+    for action in (healing or {}).get("healed_pytest_files", []) or []:
+        if action.get("action") != "no_change" and action.get("file"):
+            touched.add(os.path.normpath(action["file"]))
+    for file_path in ((healing or {}).get("patches") or {}):
+        touched.add(os.path.normpath(file_path))
+    return touched
+
+def pytest_fingerprints(node_ids: List[str], spec_index: SpecIndex, root: str = ".") -> Dict[str, Tuple[str, Optional[str], str]]:
+    """
+    node id -> (fingerprint, operation digest, file) for collected pytest node ids.
+    The fingerprint covers the test module and every conftest.py above it; the
+    operation digest covers all spec paths the test function mentions (None when
+    it mentions none, which makes the test uncacheable).
+    """
+    sources: Dict[str, str] = {}
+    tests_by_file: Dict[str, Dict[str, List[str]]] = {}
+    conftests: Dict[str, str] = {}
+
+    def read(path):
+        if path not in sources:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    sources[path] = f.read()
+            except OSError:
+                sources[path] = ""
+        return sources[path]
+
+    def conftest_digest(directory):
+        if directory not in conftests:
+            parent = os.path.dirname(directory)
+            above = conftest_digest(parent) if parent and parent != directory and os.path.abspath(directory) != os.path.abspath(root) else ""
+            conftest = os.path.join(directory, "conftest.py")
+            conftests[directory] = digest(above + (read(conftest) if os.path.exists(conftest) else ""))
+        return conftests[directory]
+
+    result = {}
+    for node_id in node_ids:
+        file_path = os.path.normpath(os.path.join(root, node_id.split("::", 1)[0]))
+        source = read(file_path)
+        if file_path not in tests_by_file:
+            tests_by_file[file_path] = pytest_test_paths(source)
+        paths = sorted({p for p in (spec_index.resolve(path) for path in tests_by_file[file_path].get(_pytest_function(node_id), [])) if p})
+        operation = digest([(p, spec_index.path_digest(p)) for p in paths]) if paths else None
+        fingerprint = digest([node_id, digest(source), conftest_digest(os.path.dirname(file_path) or ".")])
+        result[node_id] = (fingerprint, operation, file_path)
+    return result
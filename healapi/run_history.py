@@ -0,0 +1,318 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import logging
+import argparse
+from typing import Any, Dict, Iterable, List, Optional
+
+from healapi.report_writer import load_section
+from healapi.result_cache import request_path
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+DEFAULT_DB = "healapi_history.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    recorded_at REAL NOT NULL,
+    test_type TEXT,
+    report_path TEXT,
+    added INTEGER, removed INTEGER, renamed INTEGER, changed INTEGER, property_changes INTEGER,
+    healing_actions INTEGER,
+    passed INTEGER, failed INTEGER, errored INTEGER, cached INTEGER,
+    duration_ms REAL
+);
+CREATE TABLE IF NOT EXISTS endpoint_changes (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    path TEXT,
+    method TEXT,
+    detail TEXT
+);
+CREATE TABLE IF NOT EXISTS healing_actions (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    target TEXT,
+    action TEXT,
+    detail TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    position INTEGER,
+    name TEXT,
+    method TEXT,
+    path TEXT,
+    url TEXT,
+    status TEXT,
+    code INTEGER,
+    duration_ms REAL,
+    cached INTEGER,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_recorded_at ON runs(recorded_at);
+CREATE INDEX IF NOT EXISTS endpoint_changes_path ON endpoint_changes(path, run_id);
+CREATE INDEX IF NOT EXISTS healing_actions_target ON healing_actions(target, run_id);
+CREATE INDEX IF NOT EXISTS results_name_status ON results(name, status, run_id);
+CREATE INDEX IF NOT EXISTS results_path_status ON results(path, status, run_id);
+CREATE INDEX IF NOT EXISTS results_run ON results(run_id, status);
+"""
+
+def _url_text(url: Any) -> Optional[str]:
+    if isinstance(url, dict):
+        return url.get("raw") or ("/" + "/".join(url.get("path", [])))
+    return url
+
+def _execution_row(position: int, execution: Dict[str, Any]) -> tuple:
+    item = execution.get("item") or {}
+    item_request = item.get("request") or {}
+    if isinstance(item_request, str):
+        item_request = {"url": item_request}
+    request = execution.get("request") or item_request
+    response = execution.get("response") or {}
+    assertions = execution.get("assertions") or []
+    errors = [a["error"].get("message", "") for a in assertions if a.get("error")]
+    if execution.get("requestError"):
+        status, message = "error", (execution["requestError"] or {}).get("message")
+    elif errors:
+        status, message = "fail", "; ".join(errors)
+    else:
+        status, message = ("pass" if assertions else "untested"), None
+    method = request.get("method") or item_request.get("method")
+    return (position, item.get("name"), method.upper() if method else None,
+            request_path(item_request.get("url")), _url_text(request.get("url")), status, response.get("code"),
+            response.get("responseTime"), int(bool(execution.get("cached"))), message)
+
+_PYTEST_STATUS = {"passed": "pass", "failed": "fail", "error": "error", "skipped": "skipped", "xfailed": "skipped", "xpassed": "pass"}
+
+def _pytest_row(position: int, test: Dict[str, Any]) -> tuple:
+    duration = sum((test.get(stage) or {}).get("duration", 0) for stage in ("setup", "call", "teardown"))
+    crash = next(((test.get(stage) or {}).get("crash") for stage in ("setup", "call", "teardown") if (test.get(stage) or {}).get("crash")), None)
+    return (position, test.get("nodeid"), None, test.get("nodeid", "").split("::", 1)[0], None,
+            _PYTEST_STATUS.get(test.get("outcome"), test.get("outcome")), None, round(duration * 1000, 3),
+            int(bool(test.get("cached"))), crash.get("message") if crash else None)
+
+def result_rows(test_results: Dict[str, Any]) -> List[tuple]:
+    """Per-request (Newman/native/async) or per-test (pytest) rows of a test result."""
+    report = (test_results or {}).get("report")
+    if not isinstance(report, dict):
+        return []
+    if isinstance(report.get("run"), dict):
+        return [_execution_row(i, e) for i, e in enumerate(report["run"].get("executions") or [])]
+    return [_pytest_row(i, t) for i, t in enumerate(report.get("tests") or [])]
+
+def _duration_ms(test_results: Dict[str, Any]) -> Optional[float]:
+    report = (test_results or {}).get("report")
+    if not isinstance(report, dict):
+        return None
+    if isinstance(report.get("run"), dict):
+        timings = report["run"].get("timings") or {}
+        return timings.get("completed", 0) - timings.get("started", 0)
+    return round(report["duration"] * 1000, 3) if report.get("duration") is not None else None
+
+def _change_rows(diff: Dict[str, Any]) -> List[tuple]:
+    rows = [("added", path, None, None) for path in diff.get("added_endpoints", [])]
+    rows += [("removed", path, None, None) for path in diff.get("removed_endpoints", [])]
+    for renamed in diff.get("renamed_endpoints", []):
+        rows.append(("renamed", renamed.get("to"), None, json.dumps({"from": renamed.get("from")})))
+    for changed in diff.get("changed_endpoints", []):
+        rows.append(("changed", changed.get("path"), None, json.dumps({k: sorted(v) for k, v in changed.items() if k != "path"})))
+    for prop in diff.get("property_changes", []):
+        rows.append(("properties", prop.get("path"), prop.get("method"),
+                     json.dumps({"added": sorted(prop.get("added_properties") or []), "removed": sorted(prop.get("removed_properties") or [])})))
+    return rows
+
+def _healing_rows(healing: Dict[str, Any]) -> List[tuple]:
+    rows = []
+    for key in ("healed_postman_requests", "healed_pytest_files"):
+        for action in (healing or {}).get(key) or []:
+            target = action.get("request") or action.get("file") or action.get("collection")
+            rows.append((target, action.get("action"), action.get("error")))
+    return rows
+
+class HistoryStore:
+    """
+    SQLite store of run summaries with indexed per-endpoint changes, healing
+    actions and per-request/per-test results, for fast history queries.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            raise ValueError(f"{path} has history schema version {version}, expected {SCHEMA_VERSION}")
+        self.conn.executescript(_SCHEMA)
+        self.conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record_run(self, report: Dict[str, Any], report_path: Optional[str] = None, recorded_at: Optional[float] = None) -> int:
+        """Insert one report (as returned by report_generator.generate_report); returns the run id."""
+        diff = report.get("api_diff") or {}
+        healing = report.get("healing_actions") or {}
+        test_results = report.get("test_results") or {}
+        results = result_rows(test_results)
+        changes = _change_rows(diff)
+        actions = _healing_rows(healing)
+        statuses = [row[5] for row in results]
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (recorded_at, test_type, report_path, added, removed, renamed, changed, property_changes, "
+                "healing_actions, passed, failed, errored, cached, duration_ms) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (recorded_at or time.time(), test_results.get("type"), report_path,
+                 len(diff.get("added_endpoints", [])), len(diff.get("removed_endpoints", [])), len(diff.get("renamed_endpoints", [])),
+                 len(diff.get("changed_endpoints", [])), len(diff.get("property_changes", [])), len(actions),
+                 statuses.count("pass"), statuses.count("fail"), statuses.count("error"), sum(row[8] for row in results),
+                 _duration_ms(test_results)))
+            run_id = cursor.lastrowid
+            self.conn.executemany("INSERT INTO endpoint_changes VALUES (?, ?, ?, ?, ?)", [(run_id, *row) for row in changes])
+            self.conn.executemany("INSERT INTO healing_actions VALUES (?, ?, ?, ?)", [(run_id, *row) for row in actions])
+            self.conn.executemany("INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", [(run_id, *row) for row in results])
+        return run_id
+
+    def _rows(self, sql: str, params: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self.conn.execute(sql, tuple(params))]
+
+    def runs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent runs first."""
+        return self._rows("SELECT * FROM runs ORDER BY id DESC LIMIT ?", (limit,))
+
+    def endpoint_history(self, endpoint: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Results of a request/test (by name or spec path), most recent first."""
+        return self._rows(
+            "SELECT r.run_id, runs.recorded_at, r.name, r.method, r.path, r.status, r.code, r.duration_ms, r.cached, r.message "
+            "FROM results r JOIN runs ON runs.id = r.run_id WHERE r.name = ? OR r.path = ? ORDER BY r.run_id DESC LIMIT ?",
+            (endpoint, endpoint, limit))
+
+    def failing_since(self, endpoint: str) -> Optional[Dict[str, Any]]:
+        """First run of the current failing streak of a request/test, or None if its latest result is not a failure."""
+        last_pass = self.conn.execute(
+            "SELECT MAX(run_id) FROM results WHERE (name = ? OR path = ?) AND status = 'pass'", (endpoint, endpoint)).fetchone()[0]
+        rows = self._rows(
+            "SELECT runs.*, r.name, r.status, r.code, r.message FROM results r JOIN runs ON runs.id = r.run_id "
+            "WHERE (r.name = ? OR r.path = ?) AND r.status IN ('fail', 'error') AND r.run_id > ? ORDER BY r.run_id LIMIT 1",
+            (endpoint, endpoint, last_pass or 0))
+        return rows[0] if rows else None
+
+    def failing(self) -> List[Dict[str, Any]]:
+        """Requests/tests failing in the latest run, with the run their failing streak started in."""
+        latest = self.conn.execute("SELECT MAX(id) FROM runs").fetchone()[0]
+        failing = self._rows("SELECT name, path, status, code, message FROM results WHERE run_id = ? AND status IN ('fail', 'error')", (latest,))
+        for row in failing:
+            last_pass = self.conn.execute("SELECT MAX(run_id) FROM results WHERE name = ? AND status = 'pass'", (row["name"],)).fetchone()[0]
+            row["failing_since_run"] = self.conn.execute(
+                "SELECT MIN(run_id) FROM results WHERE name = ? AND status IN ('fail', 'error') AND run_id > ?",
+                (row["name"], last_pass or 0)).fetchone()[0]
+        return failing
+
+    def endpoint_changes(self, path: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Spec changes (added/removed/renamed/changed/properties) recorded for a path, most recent first."""
+        return self._rows(
+            "SELECT c.run_id, runs.recorded_at, c.kind, c.method, c.detail FROM endpoint_changes c JOIN runs ON runs.id = c.run_id "
+            "WHERE c.path = ? ORDER BY c.run_id DESC LIMIT ?", (path, limit))
+
+    def healing_history(self, target: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Healing actions applied to a request/file, most recent first."""
+        return self._rows(
+            "SELECT h.run_id, runs.recorded_at, h.action, h.detail FROM healing_actions h JOIN runs ON runs.id = h.run_id "
+            "WHERE h.target = ? ORDER BY h.run_id DESC LIMIT ?", (target, limit))
+
+    def slowest(self, limit: int = 10, last_runs: int = 20) -> List[Dict[str, Any]]:
+        """Requests/tests with the highest average duration over the last runs."""
+        first_run = self.conn.execute("SELECT COALESCE(MAX(id), 0) - ? FROM runs", (last_runs,)).fetchone()[0]
+        return self._rows(
+            "SELECT name, COUNT(*) AS samples, ROUND(AVG(duration_ms), 3) AS avg_ms, MAX(duration_ms) AS max_ms FROM results INDEXED BY results_run "
+            "WHERE run_id > ? AND duration_ms IS NOT NULL AND cached = 0 GROUP BY name ORDER BY avg_ms DESC LIMIT ?", (first_run, limit))
+
+    def latency_baseline(self, endpoints: List[str], runs: int) -> Dict[str, List[float]]:
+        """
+        Response times of each endpoint ("METHOD /path") over the last `runs`
+        recorded runs that measured it (cached and errored requests excluded).
+        """
+        baseline = {}
+        for endpoint in endpoints:
+            method, _, path = endpoint.partition(" ")
+            where = "path = ? AND method = ? AND cached = 0 AND status != 'error' AND duration_ms IS NOT NULL"
+            baseline[endpoint] = [row[0] for row in self.conn.execute(
+                f"SELECT duration_ms FROM results WHERE {where} AND run_id >= "
+                f"(SELECT MIN(run_id) FROM (SELECT DISTINCT run_id FROM results WHERE {where} ORDER BY run_id DESC LIMIT ?))",
+                (path, method, path, method, runs))]
+        return baseline
+
+def record_report(db_path: str, report: Dict[str, Any], report_path: Optional[str] = None) -> int:
+    """Open the history database, insert one report and close it again."""
+    with HistoryStore(db_path) as store:
+        run_id = store.record_run(report, report_path)
+    logger.info(f"Recorded run {run_id} in {db_path}")
+    return run_id
+
+def import_report_file(store: HistoryStore, path: str) -> int:
+    """Insert a report file written earlier (sectioned or single-document, side files resolved)."""
+    report = {name: load_section(path, name, resolve=True) for name in ("api_diff", "healing_actions", "test_results")}
+    return store.record_run(report, path, recorded_at=os.path.getmtime(path))
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Query the HealAPI run history database")
+    parser.add_argument('--db', default=DEFAULT_DB, help=f'History database (default: {DEFAULT_DB})')
+    commands = parser.add_subparsers(dest='command', required=True)
+    runs = commands.add_parser('runs', help='List recent runs')
+    runs.add_argument('--limit', type=int, default=20)
+    history = commands.add_parser('history', help='Results of one request/test (name or spec path) over time')
+    history.add_argument('endpoint')
+    history.add_argument('--limit', type=int, default=50)
+    since = commands.add_parser('failing-since', help='Run in which the current failing streak of a request/test started')
+    since.add_argument('endpoint')
+    commands.add_parser('failing', help='Requests/tests failing in the latest run')
+    changes = commands.add_parser('changes', help='Spec changes recorded for a path')
+    changes.add_argument('path')
+    changes.add_argument('--limit', type=int, default=50)
+    healing = commands.add_parser('healing', help='Healing actions applied to a request/file')
+    healing.add_argument('target')
+    healing.add_argument('--limit', type=int, default=50)
+    slowest = commands.add_parser('slowest', help='Slowest requests/tests over the last runs')
+    slowest.add_argument('--limit', type=int, default=10)
+    slowest.add_argument('--runs', type=int, default=20)
+    imports = commands.add_parser('import', help='Record existing report files')
+    imports.add_argument('reports', nargs='+')
+    args = parser.parse_args(argv)
+
+    if args.command != 'import' and not os.path.exists(args.db):
+        print(f"[ERROR] No history database at {args.db}")
+        return 1
+    with HistoryStore(args.db) as store:
+        if args.command == 'runs':
+            rows = store.runs(args.limit)
+        elif args.command == 'history':
+            rows = store.endpoint_history(args.endpoint, args.limit)
+        elif args.command == 'failing-since':
+            rows = store.failing_since(args.endpoint)
+        elif args.command == 'failing':
+            rows = store.failing()
+        elif args.command == 'changes':
+            rows = store.endpoint_changes(args.path, args.limit)
+        elif args.command == 'healing':
+            rows = store.healing_history(args.target, args.limit)
+        elif args.command == 'slowest':
+            rows = store.slowest(args.limit, args.runs)
+        else:
+            rows = [{"report": path, "run_id": import_report_file(store, path)} for path in args.reports]
+    print(json.dumps(rows, indent=2))
+
+# Example usage:
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+import os
+import re
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from healapi.mock_server import HTTP_METHODS, PARAM_RE, pick_response, resolve_ref, example_for
+from healapi.patching import write_atomic, write_json_atomic
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCAFFOLD_FOLDER = "Scaffolded endpoints"
+POSTMAN_SCHEMA = "https://schema.getpostman.com/json/collection/v2.1.0/collection.json"
+_NON_IDENTIFIER_RE = re.compile(r"[^0-9A-Za-z]+")
+
+def added_operations(diff: Dict[str, Any], spec: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """
+    (path, method) of every operation the diff reports as new: all methods of added
+    paths, plus methods added to paths that exist in both specs. Sorted.
+    """
+    paths = spec.get("paths") or {}
+    operations = set()
+    for path in diff.get("added_endpoints", []):
+        operations.update((path, method) for method in (paths.get(path) or {}) if method in HTTP_METHODS)
+    for changed in diff.get("changed_endpoints", []):
+        new_methods = set(changed.get("new_methods", [])) - set(changed.get("old_methods", []))
+        operations.update((changed["path"], method) for method in new_methods
+                          if method in HTTP_METHODS and method in (paths.get(changed["path"]) or {}))
+    return sorted(operations)
+
+class Scaffolder:
+    """
+    Builds baseline Postman requests and pytest tests for operations of a spec.
+
+    Each operation is resolved once for both test formats. Example bodies are
+    synthesized once per $ref target (the mock server's example_for memo) and
+    serialized once per referenced request schema; assertion blocks are built once
+    per (status, response properties) and assertion lines once per property name.
+    """
+
+    def __init__(self, spec: Dict[str, Any], base_url_var: str = "apiurl"):
+        self.spec = spec
+        self.paths = spec.get("paths") or {}
+        self.base_url_var = base_url_var
+        self._ref_examples: Dict[Tuple[str, int], Any] = {}
+        self._bodies: Dict[str, Tuple[str, str]] = {}
+        self._parts: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._property_lines: Dict[str, Tuple[str, str]] = {}
+        self._properties: Dict[str, List[str]] = {}
+        self._postman_tests: Dict[Tuple[int, Tuple[str, ...]], List[str]] = {}
+        self._pytest_asserts: Dict[Tuple[int, Tuple[str, ...]], List[str]] = {}
+
+    def _deref(self, value: Any) -> Any:
+        seen = set()
+        while isinstance(value, dict) and isinstance(value.get("$ref"), str) and value["$ref"] not in seen:
+            seen.add(value["$ref"])
+            value = resolve_ref(self.spec, value["$ref"])
+        return value
+
+    def schema_properties(self, schema: Any) -> List[str]:
+        """Top-level property names of a schema ($ref and allOf resolved), cached per $ref."""
+        ref = schema.get("$ref") if isinstance(schema, dict) else None
+        if isinstance(ref, str) and ref in self._properties:
+            return self._properties[ref]
+        resolved = self._deref(schema)
+        names: List[str] = []
+        if isinstance(resolved, dict):
+            for part in resolved.get("allOf") or []:
+                names.extend(name for name in self.schema_properties(part) if name not in names)
+            names.extend(name for name in (resolved.get("properties") or {}) if name not in names)
+        if isinstance(ref, str):
+            self._properties[ref] = names
+        return names
+
+    def _json_example(self, media: Dict[str, Any]) -> Tuple[str, str]:
+        """(JSON text, Python literal) of a media type's example; cached when its schema is a $ref."""
+        schema = media.get("schema")
+        ref = schema.get("$ref") if isinstance(schema, dict) and "example" not in media and "examples" not in media else None
+        if isinstance(ref, str) and ref in self._bodies:
+            return self._bodies[ref]
+        if "example" in media:
+            value = media["example"]
+        else:
+            value = example_for(schema, self.spec, 0, self._ref_examples)
+        text = json.dumps(value, indent=2, default=str)  # YAML specs may hold dates
+        text = (text, repr(json.loads(text)))
+        if isinstance(ref, str):
+            self._bodies[ref] = text
+        return text
+
+    def _operation(self, path: str, method: str) -> Dict[str, Any]:
+        return self.paths[path][method] or {}
+
+    def concrete_path(self, path: str, method: str) -> str:
+        """Path with each {parameter} replaced by an example value of its schema (1 when none is declared)."""
+        values = {}
+        for parameter in (self.paths[path].get("parameters") or []) + (self._operation(path, method).get("parameters") or []):
+            parameter = self._deref(parameter)
+            if isinstance(parameter, dict) and parameter.get("in") == "path":
+                schema = parameter.get("schema") or {k: v for k, v in parameter.items() if k in ("type", "format", "enum", "example")}
+                value = parameter.get("example", example_for(schema, self.spec, 0, self._ref_examples))
+                values[parameter.get("name")] = value
+        return PARAM_RE.sub(lambda m: str(values.get(m.group(1)) if values.get(m.group(1)) is not None else 1), path)
+
+    def _request_body(self, path: str, method: str) -> Optional[Tuple[str, str]]:
+        body = self._deref(self._operation(path, method).get("requestBody"))
+        content = (body or {}).get("content") or {}
+        media_type = next((t for t in content if "json" in t), None)
+        return self._json_example(content[media_type] or {}) if media_type else None
+
+    def expected_response(self, path: str, method: str) -> Tuple[int, Tuple[str, ...]]:
+        """Status code of the success response and its top-level JSON properties."""
+        status, response = pick_response(self._operation(path, method))
+        response = self._deref(response) or {}
+        content = response.get("content")
+        if content is None and "schema" in response:  # Swagger 2.0
+            content = {"application/json": {"schema": response["schema"]}}
+        media = next((m for t, m in (content or {}).items() if "json" in t), None)
+        properties = self.schema_properties((media or {}).get("schema")) if media else []
+        return status, tuple(properties)
+
+    def operation_parts(self, path: str, method: str) -> Dict[str, Any]:
+        """Concrete path, request body and expected response of an operation, computed once for both test formats."""
+        key = (path, method)
+        if key not in self._parts:
+            self._parts[key] = {"concrete": self.concrete_path(path, method), "body": self._request_body(path, method),
+                                "expected": self.expected_response(path, method)}
+        return self._parts[key]
+
+    def _property_line(self, name: str, index: int) -> str:
+        """Postman (index 0) or pytest (index 1) assertion line for one response property."""
+        if name not in self._property_lines:
+            self._property_lines[name] = (f"    pm.expect(jsonData).to.have.property('{name}');", f"    assert {json.dumps(name)} in data")
+        return self._property_lines[name][index]
+
+    def postman_tests(self, status: int, properties: Tuple[str, ...]) -> List[str]:
+        key = (status, properties)
+        if key not in self._postman_tests:
+            lines = [f"pm.test(\"Status code is {status}\", function () {{", f"    pm.response.to.have.status({status});", "});"]
+            if properties:
+                lines += ["pm.test(\"Response has expected properties\", function () {", "    var jsonData = pm.response.json();"]
+                lines += [self._property_line(name, 0) for name in properties]
+                lines.append("});")
+            self._postman_tests[key] = lines
+        return list(self._postman_tests[key])
+
+    def pytest_asserts(self, status: int, properties: Tuple[str, ...]) -> List[str]:
+        key = (status, properties)
+        if key not in self._pytest_asserts:
+            lines = [f"    assert response.status_code == {status}"]
+            if properties:
+                lines.append("    data = response.json()")
+                lines += [self._property_line(name, 1) for name in properties]
+            self._pytest_asserts[key] = lines
+        return self._pytest_asserts[key]
+
+    def postman_item(self, path: str, method: str) -> Dict[str, Any]:
+        """Postman request for one operation, with status and response-property tests."""
+        parts = self.operation_parts(path, method)
+        concrete = parts["concrete"]
+        host = f"{{{{{self.base_url_var}}}}}"
+        request = {"method": method.upper(), "header": [],
+                   "url": {"raw": host + concrete, "host": [host], "path": [s for s in concrete.strip("/").split("/") if s]}}
+        if parts["body"] is not None:
+            request["header"].append({"key": "Content-Type", "value": "application/json"})
+            request["body"] = {"mode": "raw", "raw": parts["body"][0], "options": {"raw": {"language": "json"}}}
+        return {
+            "name": f"{method.upper()} {path}",
+            "request": request,
+            "event": [{"listen": "test", "script": {"type": "text/javascript", "exec": self.postman_tests(*parts["expected"])}}],
+            "response": [],
+        }
+
+    def pytest_function(self, path: str, method: str, name: str) -> List[str]:
+        """Source lines of one requests-based test function for an operation."""
+        parts = self.operation_parts(path, method)
+        call = f"requests.{method}(BASE_URL + {json.dumps(parts['concrete'])}"
+        call += f", json={parts['body'][1]})" if parts["body"] is not None else ")"
+        return [f"def {name}():", f"    response = {call}"] + self.pytest_asserts(*parts["expected"]) + [""]
+
+def _test_name(method: str, path: str, used: Dict[str, int]) -> str:
+    name = f"test_{method}_" + _NON_IDENTIFIER_RE.sub("_", path).strip("_")
+    used[name] = used.get(name, 0) + 1
+    return name if used[name] == 1 else f"{name}_{used[name]}"
+
+def scaffold_tests(diff: Dict[str, Any], spec: Dict[str, Any], base_url_var: str = "apiurl", base_url: str = "http://localhost:5000",
+                   tests_per_file: int = 200, operations: Optional[List[Tuple[str, str]]] = None) -> Dict[str, Any]:
+    """
+    Postman items and pytest modules for every added operation (see added_operations),
+    built in one pass over the new spec. Returns {"operations", "postman_items",
+    "pytest_files": {file name: source}}. pytest modules read the API base URL from
+    HEALAPI_MOCK_URL or API_BASE_URL, falling back to base_url.
+    """
+    operations = added_operations(diff, spec) if operations is None else operations
+    scaffolder = Scaffolder(spec, base_url_var)
+    items = []
+    functions = []
+    used: Dict[str, int] = {}
+    for path, method in operations:
+        items.append(scaffolder.postman_item(path, method))
+        functions.append(scaffolder.pytest_function(path, method, _test_name(method, path, used)))
+    header = ["import os", "import requests", "",
+              f"BASE_URL = os.environ.get(\"HEALAPI_MOCK_URL\") or os.environ.get(\"API_BASE_URL\", {json.dumps(base_url)})", "", ""]
+    files = {}
+    for start in range(0, len(functions), tests_per_file):
+        lines = list(header)
+        for function in functions[start:start + tests_per_file]:
+            lines += function + [""]
+        files[f"test_scaffold_{start // tests_per_file:04d}.py"] = "\n".join(lines).rstrip("\n") + "\n"
+    logger.info(f"Scaffolded tests for {len(operations)} added operation(s)")
+    return {"operations": [{"path": path, "method": method} for path, method in operations], "postman_items": items, "pytest_files": files}
+
+def add_to_collection(collection: Optional[Dict[str, Any]], items: List[Dict[str, Any]], folder: str = SCAFFOLD_FOLDER) -> Dict[str, Any]:
+    """
+    Collection (a new one when None) with items in its scaffold folder. Requests the
+    folder already holds (same name) are kept, so scaffolding again adds only new ones.
+    """
+    collection = collection or {"info": {"name": "HealAPI scaffolded tests", "schema": POSTMAN_SCHEMA}, "item": []}
+    target = next((i for i in collection.setdefault("item", []) if i.get("name") == folder and "item" in i), None)
+    if target is None:
+        target = {"name": folder, "item": []}
+        collection["item"].append(target)
+    existing = {i.get("name") for i in target["item"]}
+    target["item"].extend(item for item in items if item["name"] not in existing)
+    return collection
+
+def write_scaffold(scaffold: Dict[str, Any], test_type: str, output_path: str, collection_path: Optional[str] = None) -> List[str]:
+    """
+    Write scaffolded tests: for postman, a collection at output_path (collection_path's
+    requests plus the scaffold folder when given); for pytest, the modules into the
+    output_path directory. Existing pytest modules are overwritten. Returns the written paths.
+    """
+    if test_type == "postman":
+        collection = None
+        if collection_path:
+            with open(collection_path, "r", encoding="utf-8") as f:
+                collection = json.load(f)
+        write_json_atomic(output_path, add_to_collection(collection, scaffold["postman_items"]))
+        return [output_path]
+    os.makedirs(output_path, exist_ok=True)
+    written = []
+    for name, source in scaffold["pytest_files"].items():
+        file_path = os.path.join(output_path, name)
+        write_atomic(file_path, source)
+        written.append(file_path)
+    return written
+
+def scaffold_added_endpoints(diff: Dict[str, Any], spec: Dict[str, Any], test_type: str, output_path: str,
+                             collection_path: Optional[str] = None, **options) -> Dict[str, Any]:
+    """scaffold_tests plus write_scaffold; options go to scaffold_tests. Returns {"operations": count, "written": paths}."""
+    scaffold = scaffold_tests(diff, spec, **options)
+    if not scaffold["operations"]:
+        return {"operations": 0, "written": []}
+    return {"operations": len(scaffold["operations"]), "written": write_scaffold(scaffold, test_type, output_path, collection_path)}
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+    from healapi import diff_engine
+    parser = argparse.ArgumentParser(prog="healapi scaffold", description="Generate baseline Postman requests or pytest tests for the endpoints added between two specs")
+    parser.add_argument('--old-spec', required=True, help='Old OpenAPI spec: a YAML/JSON file or git:<rev>:<path>')
+    parser.add_argument('--new-spec', required=True, help='New OpenAPI spec: a YAML/JSON file or git:<rev>:<path>')
+    parser.add_argument('--test-type', required=True, choices=['pytest', 'postman'], help='Kind of tests to generate')
+    parser.add_argument('--output', required=True, help='Collection file to write (postman) or directory for the test modules (pytest)')
+    parser.add_argument('--collection', help='(Postman only) Existing collection to add the scaffold folder to (may equal --output)')
+    parser.add_argument('--base-url-var', default='apiurl', help='(Postman only) Variable holding the API base URL (default: apiurl)')
+    parser.add_argument('--base-url', default='http://localhost:5000', help='(pytest only) Base URL when HEALAPI_MOCK_URL and API_BASE_URL are unset (default: http://localhost:5000)')
+    parser.add_argument('--tests-per-file', type=int, default=200, help='(pytest only) Test functions per module (default: 200)')
+    args = parser.parse_args(argv)
+    old_spec = diff_engine.load_spec(args.old_spec)
+    new_spec = diff_engine.load_spec(args.new_spec)
+    diff = diff_engine.diff_specs(old_spec, new_spec)
+    result = scaffold_added_endpoints(diff, new_spec, args.test_type, args.output, args.collection, base_url_var=args.base_url_var,
+                                      base_url=args.base_url, tests_per_file=args.tests_per_file)
+    if result["written"]:
+        print(f"Scaffolded {result['operations']} added operation(s) into {', '.join(result['written'])}")
+    else:
+        print("No added operations to scaffold.")
+
+# Example usage:
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import re
+import difflib
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Minimum similarity for a replacement property when several candidates exist
+SIMILARITY_CUTOFF = 0.6
+
+_JSON_VAR_RE = re.compile(r"(?:var|let|const)\s+([A-Za-z_$][\w$]*)\s*=\s*pm\.response\.json\(\)")
+_NAME = r"[A-Za-z_$][\w$]*"
+
+# Assertions naming a response property explicitly: any property missing from the
+# new schema is rewritten.
+_PROPERTY_ASSERTIONS = [
+    ("to.have.property", re.compile(r"(pm\.expect\((?P<var>" + _NAME + r")\)\.to\.have\.property\(\s*(?P<q>['\"]))(?P<prop>[^'\"]+)(?P=q)")),
+    ("jsonBody", re.compile(r"(pm\.response\.to\.have\.jsonBody\(\s*(?P<q>['\"]))(?P<prop>[^'\".\[]+)")),
+]
+# Property accesses (jsonData.x, jsonData['x'], pm.response.json().x), typically used
+# with .eql/.equal: only properties known to be removed are rewritten.
+_PROPERTY_ACCESSES = [
+    ("member", re.compile(r"(\b(?P<var>" + _NAME + r")\.)(?P<prop>" + _NAME + r")")),
+    ("bracket", re.compile(r"(\b(?P<var>" + _NAME + r")\[\s*(?P<q>['\"]))(?P<prop>[^'\"]+)(?P=q)")),
+    ("response.json()", re.compile(r"(pm\.response\.json\(\)\.)(?P<prop>" + _NAME + r")")),
+]
+
+def response_properties(spec: Dict[str, Any], path: str, method: str) -> Set[str]:
+    """
+    Collect the top-level response properties of one operation (all status codes).
+    """
+    properties = set()
+    operation = spec.get('paths', {}).get(path, {}).get(method)
+    if not isinstance(operation, dict):
+        return properties
+    for code, resp in operation.get('responses', {}).items():
+        for ctype, cval in (resp or {}).get('content', {}).items():
+            schema = (cval or {}).get('schema', {})
+            if 'properties' in schema:
+                properties.update(schema['properties'].keys())
+    return properties
+
+class ScriptRewriter:
+    """
+    Rewrites Postman test-script assertions against the new spec.
+
+    Expected properties and replacement choices are cached per (path, method), and
+    all assertion patterns are compiled once, so rewriting cost is linear in the
+    number of script lines. Replacements are picked by similarity, preferring the
+    properties the diff reports as added for the same operation.
+    """
+
+    def __init__(self, spec: Dict[str, Any], property_changes: Optional[Dict[Tuple[str, str], Tuple[List[str], List[str]]]] = None):
+        self.spec = spec
+        self.property_changes = property_changes or {}
+        self._expected: Dict[Tuple[str, str], Set[str]] = {}
+        self._replacements: Dict[Tuple[str, str, str], Optional[str]] = {}
+
+    def expected_properties(self, path: str, method: str) -> Set[str]:
+        key = (path, method)
+        if key not in self._expected:
+            self._expected[key] = response_properties(self.spec, path, method)
+        return self._expected[key]
+
+    def replacement_for(self, path: str, method: str, old_prop: str) -> Optional[str]:
+        """
+        Most similar expected property for a missing one, or None when there is no
+        convincing candidate (the line is then left untouched). Properties the diff
+        reports as added are tried first, then all expected ones; a lone candidate
+        is only taken when nothing expected is similar.
+        """
+        key = (path, method, old_prop)
+        if key in self._replacements:
+            return self._replacements[key]
+        expected = self.expected_properties(path, method)
+        added = [p for p in self.property_changes.get((path, method), ([], []))[1] if p in expected]
+        replacement = None
+        for candidates in (sorted(added), sorted(expected)):
+            matches = difflib.get_close_matches(old_prop, candidates, n=1, cutoff=SIMILARITY_CUTOFF)
+            if matches:
+                replacement = matches[0]
+                break
+        else:
+            lone = added or sorted(expected)
+            if len(lone) == 1:
+                replacement = lone[0]
+        self._replacements[key] = replacement
+        return replacement
+
+    def rewrite_lines(self, lines: List[str], path: str, method: str) -> Tuple[List[str], bool]:
+        expected = self.expected_properties(path, method)
+        removed = set(self.property_changes.get((path, method), ([], []))[0])
+        json_vars = {"jsonData"}
+        for line in lines:
+            if "pm.response.json()" in line:
+                json_vars.update(_JSON_VAR_RE.findall(line))
+        changed = False
+        new_lines = []
+
+        def property_sub(match):
+            nonlocal changed
+            if "var" in match.groupdict() and match.group("var") not in json_vars:
+                return match.group(0)
+            old_prop = match.group("prop")
+            if old_prop in expected:
+                return match.group(0)
+            new_prop = self.replacement_for(path, method, old_prop)
+            if not new_prop:
+                return match.group(0)
+            changed = True
+            return match.group(1) + new_prop + match.group(0)[match.end("prop") - match.start():]
+
+        def access_sub(match):
+            if match.group("prop") not in removed:
+                return match.group(0)
+            return property_sub(match)
+
+        for line in lines:
+            if not isinstance(line, str) or not ("pm." in line or any(v in line for v in json_vars)):
+                new_lines.append(line)
+                continue
+            if "property(" in line or "jsonBody(" in line:
+                for _, pattern in _PROPERTY_ASSERTIONS:
+                    line = pattern.sub(property_sub, line)
+            if removed:
+                for _, pattern in _PROPERTY_ACCESSES:
+                    line = pattern.sub(access_sub, line)
+            new_lines.append(line)
+        return new_lines, changed
+
+    def rewrite_item(self, item: Dict[str, Any], path: str, method: str) -> List[int]:
+        """
+        Rewrite the test scripts of one Postman request item in place.
+        Returns the indexes of the events whose script changed.
+        """
+        changed_events = []
+        if not self.expected_properties(path, method):
+            return changed_events
+        try:
+            for index, event in enumerate(item.get("event", [])):
+                if event.get("listen") != "test":
+                    continue
+                script = event.get("script", {})
+                if script.get("type", "text/javascript") != "text/javascript":
+                    continue
+                exec_lines = script.get("exec", [])
+                as_text = isinstance(exec_lines, str)
+                new_lines, changed = self.rewrite_lines(exec_lines.split("\n") if as_text else exec_lines, path, method)
+                if changed:
+                    script["exec"] = "\n".join(new_lines) if as_text else new_lines
+                    changed_events.append(index)
+        except Exception as e:
+            logger.warning(f"Error updating test scripts for {path}: {e}")
+        return changed_events
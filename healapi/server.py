@@ -0,0 +1,450 @@
+import os
+import copy
+import json
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from flask import Flask, jsonify, request
+
+from healapi import diff_engine, healing_engine, openapi_typo_linter, report_generator, result_cache, test_analyzer
+from healapi.llm_backends import ChatStream, LLMBackend, get_backend
+from healapi.llm_stream import extract_payload
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_PENDING = 64
+DEFAULT_CACHE_SIZE = 64
+DEFAULT_JOB_TTL = 3600.0
+# Per-path diff results are small and shared by many spec pairs
+_PATH_DIFFS_PER_SPEC = 64
+
+class LRUCache:
+    """Thread-safe bounded mapping that evicts the least recently used entry."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Any, value: Any):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def __setitem__(self, key: Any, value: Any):
+        self.put(key, value)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._data), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+class CachingBackend(LLMBackend):
+    """
+    Wraps an LLM backend with a shared response cache keyed by (backend, model,
+    messages). Complete responses, or prefixes already holding a valid payload,
+    are cached; a cached answer is replayed as one chunk and reports zero token
+    usage. Usage is carried by each call's stream, so one wrapper can serve
+    concurrent jobs.
+    """
+
+    def __init__(self, inner: LLMBackend, cache: LRUCache):
+        self.inner = inner
+        self.cache = cache
+        self.name = inner.name
+        self.default_model = inner.default_model
+        if hasattr(inner, "timeout"):
+            self.timeout = inner.timeout
+
+    def stream_chat(self, model: str, messages: List[Dict[str, str]], timeout: Optional[float] = None) -> ChatStream:
+        return ChatStream(lambda stream: self._chunks(stream, model, messages, timeout))
+
+    def _chunks(self, stream: ChatStream, model: str, messages: List[Dict[str, str]], timeout: Optional[float]) -> Iterator[str]:
+        key = result_cache.digest([self.inner.name, model, messages])
+        cached = self.cache.get(key)
+        if cached is not None:
+            stream.usage = {"prompt_tokens": 0, "completion_tokens": 0}
+            yield cached
+            return
+        inner = self.inner.stream_chat(model, messages, timeout=timeout)
+        chunks = []
+        complete = False
+        try:
+            for chunk in inner:
+                stream.usage = getattr(inner, "usage", None)
+                chunks.append(chunk)
+                yield chunk
+            complete = True
+        finally:
+            stream.usage = getattr(inner, "usage", None)
+            close = getattr(inner, "close", None)
+            if close:
+                close()
+            # Readers close the stream once a valid payload has arrived; such a prefix is as good as the full answer
+            text = "".join(chunks)
+            if complete or extract_payload(text, "python") is not None or extract_payload(text, "json") is not None:
+                self.cache.put(key, text)
+
+class QueueFull(Exception):
+    """Raised when the job queue already holds its maximum of pending jobs."""
+
+class JobQueue:
+    """
+    Runs jobs on a bounded thread pool and keeps their status and results for
+    polling. At most max_pending jobs may be queued or running; finished jobs are
+    forgotten job_ttl seconds after they complete.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, max_pending: int = DEFAULT_MAX_PENDING, job_ttl: float = DEFAULT_JOB_TTL):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.job_ttl = job_ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="healapi-job")
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def _pending(self) -> int:
+        return sum(1 for job in self._jobs.values() if job["status"] in ("queued", "running"))
+
+    def _expire(self):
+        now = time.time()
+        for job_id in [j for j, job in self._jobs.items() if job.get("finished_at") and now - job["finished_at"] > self.job_ttl]:
+            del self._jobs[job_id]
+            self._futures.pop(job_id, None)
+
+    def submit(self, kind: str, fn: Callable[..., Any], *args) -> Dict[str, Any]:
+        with self._lock:
+            self._expire()
+            if self._pending() >= self.max_pending:
+                raise QueueFull(f"{self.max_pending} jobs already pending")
+            job = {"id": uuid.uuid4().hex, "kind": kind, "status": "queued", "submitted_at": time.time(),
+                   "started_at": None, "finished_at": None, "result": None, "error": None}
+            self._jobs[job["id"]] = job
+            self._futures[job["id"]] = self._executor.submit(self._run, job, fn, args)
+        return job
+
+    def _run(self, job: Dict[str, Any], fn: Callable[..., Any], args: Tuple):
+        job["status"], job["started_at"] = "running", time.time()
+        try:
+            job["result"] = fn(*args)
+            job["status"] = "done"
+        except Exception as e:
+            logger.error(f"Job {job['id']} ({job['kind']}) failed: {e}")
+            job["error"] = str(e)
+            job["status"] = "error"
+        finally:
+            job["finished_at"] = time.time()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """Block up to timeout seconds for a job to finish; returns the job (finished or not)."""
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            try:
+                future.result(timeout)
+            except FutureTimeoutError:
+                pass
+        return self.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return {"workers": self.workers, "max_pending": self.max_pending, "jobs": counts}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+def job_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Public representation of a job, with run/queue times in ms."""
+    view = {k: job[k] for k in ("id", "kind", "status", "error")}
+    if job["started_at"]:
+        view["queued_ms"] = round((job["started_at"] - job["submitted_at"]) * 1000, 2)
+    if job["finished_at"] and job["started_at"]:
+        view["run_ms"] = round((job["finished_at"] - job["started_at"]) * 1000, 2)
+    if job["status"] == "done":
+        view["result"] = job["result"]
+    return view
+
+class WarmState:
+    """
+    State shared by all requests of a server: parsed specs (with lint results and
+    per-path digests), per-path and whole diffs, parsed collections, analysis
+    results and LLM responses, each in a bounded LRU cache keyed by content digests.
+    Specs and tests are passed inline (text or JSON) or as paths on the server.
+    llm_options configure the LLM backend (backend, key_var, base_url, timeout,
+    stub_options) and per-request defaults (model, max_seconds, max_tokens).
+    """
+
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE, llm_options: Optional[Dict[str, Any]] = None,
+                 history_path: Optional[str] = None):
+        self.specs = LRUCache(cache_size)
+        self.diffs = LRUCache(cache_size)
+        self.path_diffs = LRUCache(cache_size * _PATH_DIFFS_PER_SPEC)
+        self.collections = LRUCache(cache_size)
+        self.analyses = LRUCache(cache_size * 4)
+        self.llm_responses = LRUCache(cache_size * 16)
+        self.llm_options = llm_options or {}
+        self.history_path = history_path
+        self._llm_backend: Optional[LLMBackend] = None
+        self._llm_lock = threading.Lock()
+
+    # --- inputs ------------------------------------------------------------------
+
+    def spec(self, body: Dict[str, Any], field: str) -> Dict[str, Any]:
+        """Cache entry {"digest", "spec", "typos", "path_digests"} for body[field] or body[field + "_path"]."""
+        value, name = body.get(field), None
+        if value is None and body.get(f"{field}_path"):
+            name = body[f"{field}_path"]
+            with open(name, "r", encoding="utf-8") as f:
+                value = f.read()
+        if value is None:
+            raise ValueError(f"Missing {field} (spec text or object) or {field}_path")
+        digest = result_cache.digest(value)
+        entry = self.specs.get(digest)
+        if entry is None:
+            if isinstance(value, str):
+                spec = diff_engine.parse_spec(value, name) if name else _parse_text(value)
+            else:
+                spec = value
+            entry = {"digest": digest, "spec": spec, "typos": openapi_typo_linter.find_typos(spec),
+                     "path_digests": diff_engine.path_digests(spec)}
+            self.specs.put(digest, entry)
+        return entry
+
+    def diff(self, old: Dict[str, Any], new: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """(digest, diff) of two cached specs, reusing per-path results for unchanged path definitions."""
+        key = (old["digest"], new["digest"])
+        cached = self.diffs.get(key)
+        if cached is not None:
+            return cached
+        diff = diff_engine.diff_specs_cached(old["spec"], new["spec"], self.path_diffs, old["path_digests"], new["path_digests"])
+        result = (result_cache.digest(diff), diff)
+        self.diffs.put(key, result)
+        return result
+
+    def tests(self, body: Dict[str, Any]) -> Tuple[str, str, Any]:
+        """
+        (test type, digest, tests) for the body: a Postman "collection" object or
+        {file: source} pytest "sources", or a "test_path" on the server.
+        """
+        test_type = body.get("test_type")
+        if test_type == "postman":
+            collection = body.get("collection")
+            if collection is None:
+                if not body.get("test_path"):
+                    raise ValueError("Missing collection or test_path")
+                with open(body["test_path"], "r", encoding="utf-8") as f:
+                    text = f.read()
+                digest = result_cache.digest(text)
+                collection = self.collections.get(digest)
+                if collection is None:
+                    collection = json.loads(text)
+                    self.collections.put(digest, collection)
+                return test_type, digest, collection
+            return test_type, result_cache.digest(collection), collection
+        if test_type == "pytest":
+            sources = body.get("sources")
+            if sources is None:
+                if not body.get("test_path"):
+                    raise ValueError("Missing sources or test_path")
+                sources = {}
+                for root, _, files in os.walk(body["test_path"]):
+                    for file in sorted(files):
+                        if file.endswith(".py"):
+                            path = os.path.join(root, file)
+                            with open(path, "r", encoding="utf-8") as f:
+                                sources[path] = f.read()
+            return test_type, result_cache.digest(sources), sources
+        raise ValueError("test_type must be 'postman' or 'pytest'")
+
+    def llm_backend(self) -> LLMBackend:
+        """The server's LLM backend (created on first use) behind the shared response cache, used by every job."""
+        with self._llm_lock:
+            if self._llm_backend is None:
+                options = self.llm_options
+                backend = get_backend(options.get("backend", "together"), options.get("key_var", "TOGETHER_API_KEY"),
+                                      options.get("base_url"), options.get("timeout", 60.0), options.get("stub_options"))
+                self._llm_backend = CachingBackend(backend, self.llm_responses)
+            return self._llm_backend
+
+    # --- operations --------------------------------------------------------------
+
+    def run_diff(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        old, new = self.spec(body, "old_spec"), self.spec(body, "new_spec")
+        digest, diff = self.diff(old, new)
+        return {"diff": diff, "diff_digest": digest, "lint": {"old_spec": old["typos"], "new_spec": new["typos"]}}
+
+    def _analyze(self, body: Dict[str, Any]):
+        old, new = self.spec(body, "old_spec"), self.spec(body, "new_spec")
+        diff_digest, diff = self.diff(old, new)
+        test_type, tests_digest, tests = self.tests(body)
+        affected = self.analyses.get((test_type, diff_digest, tests_digest))
+        if affected is None:
+            if test_type == "postman":
+                affected = test_analyzer.analyze_collection(tests, diff)
+            else:
+                affected = test_analyzer.analyze_pytest_sources(tests, diff)
+            self.analyses.put((test_type, diff_digest, tests_digest), affected)
+        return new, diff_digest, diff, test_type, tests, affected
+
+    def run_analyze(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        _, diff_digest, diff, _, _, affected = self._analyze(body)
+        return {"diff_digest": diff_digest, "affected": affected}
+
+    def run_heal(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Dry-run healing: actions plus a JSON Patch (Postman) or unified diffs (pytest); nothing is written."""
+        new, diff_digest, diff, test_type, tests, affected = self._analyze(body)
+        if test_type == "postman":
+            actions, patch = healing_engine.heal_postman_items(copy.deepcopy(tests), diff, new["spec"])
+            healing = {"healed_postman_requests": actions, "patch": patch}
+            if body.get("test_path"):
+                healing["collection"] = body["test_path"]
+        else:
+            healing = healing_engine.heal_pytest_files(
+                affected, diff, new["spec"], body.get("llm_model", self.llm_options.get("model")), apply=False,
+                llm_backend=self.llm_backend(), llm_max_seconds=body.get("llm_max_seconds", self.llm_options.get("max_seconds")),
+                llm_max_tokens=body.get("llm_max_tokens", self.llm_options.get("max_tokens")), sources=tests
+            )
+        return {"diff_digest": diff_digest, "affected": affected, "healing": healing}
+
+    def run_report(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Report for a given diff/healing/test_results, computing the diff (and a
+        dry-run healing when tests are given) from specs when they are missing.
+        """
+        diff, healing = body.get("diff"), body.get("healing")
+        if diff is None:
+            if body.get("test_type") and healing is None:
+                healed = self.run_heal(body)
+                healing = healed["healing"]
+            diff = self.run_diff(body)["diff"]
+        report = report_generator.generate_report(diff, healing or {}, body.get("test_results") or {}, history_path=self.history_path)
+        return {"report": report, "summary": report_generator.summarize_report(report),
+                "natural_summary": report_generator.generate_natural_summary(report)}
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: getattr(self, name).stats() for name in ("specs", "diffs", "path_diffs", "collections", "analyses", "llm_responses")}
+
+def _parse_text(text: str) -> Dict[str, Any]:
+    """Parse inline spec text: JSON when it looks like JSON, YAML otherwise."""
+    if text.lstrip().startswith("{"):
+        return json.loads(text)
+    import yaml
+    return yaml.safe_load(text)
+
+def create_app(state: Optional[WarmState] = None, jobs: Optional[JobQueue] = None) -> Flask:
+    """
+    Flask app exposing POST /diff, /analyze, /heal and /report as jobs on the
+    worker pool, GET /jobs/<id> for polling and GET /health for queue and cache
+    statistics. POST endpoints answer 202 with the job (and a Location header);
+    with ?wait=SECONDS they answer 200 with the result if it is ready in time.
+    """
+    state = state or WarmState()
+    jobs = jobs or JobQueue()
+    app = Flask("healapi")
+    app.config["HEALAPI_STATE"], app.config["HEALAPI_JOBS"] = state, jobs
+
+    def submit(kind: str, fn: Callable[[Dict[str, Any]], Dict[str, Any]]):
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            return jsonify({"error": "Request body must be a JSON object"}), 400
+        try:
+            wait = float(request.args.get("wait", 0))
+        except ValueError:
+            return jsonify({"error": "wait must be a number of seconds"}), 400
+        try:
+            job = jobs.submit(kind, fn, body)
+        except QueueFull as e:
+            response = jsonify({"error": f"Server busy: {e}"})
+            response.headers["Retry-After"] = "1"
+            return response, 503
+        if wait > 0:
+            job = jobs.wait(job["id"], wait)
+        return job_response(job)
+
+    def job_response(job: Dict[str, Any]):
+        response = jsonify(job_view(job))
+        if job["status"] in ("queued", "running"):
+            response.headers["Location"] = f"/jobs/{job['id']}"
+            return response, 202
+        return response, 200
+
+    @app.post("/diff")
+    def diff():
+        return submit("diff", state.run_diff)
+
+    @app.post("/analyze")
+    def analyze():
+        return submit("analyze", state.run_analyze)
+
+    @app.post("/heal")
+    def heal():
+        return submit("heal", state.run_heal)
+
+    @app.post("/report")
+    def report():
+        return submit("report", state.run_report)
+
+    @app.get("/jobs/<job_id>")
+    def get_job(job_id: str):
+        try:
+            wait = float(request.args.get("wait", 0))
+        except ValueError:
+            return jsonify({"error": "wait must be a number of seconds"}), 400
+        job = jobs.wait(job_id, wait) if wait > 0 else jobs.get(job_id)
+        if job is None:
+            return jsonify({"error": f"Unknown job {job_id}"}), 404
+        return job_response(job)
+
+    @app.get("/health")
+    def health():
+        return jsonify({"status": "ok", "queue": jobs.stats(), "caches": state.stats()})
+
+    return app
+
+def serve(host: str = "127.0.0.1", port: int = DEFAULT_PORT, workers: int = DEFAULT_WORKERS, max_pending: int = DEFAULT_MAX_PENDING,
+          cache_size: int = DEFAULT_CACHE_SIZE, job_ttl: float = DEFAULT_JOB_TTL, llm_options: Optional[Dict[str, Any]] = None,
+          history_path: Optional[str] = None):
+    """
+    Run the service in this process (Flask's threaded server). Jobs and caches
+    live in the process, so run a single process per instance.
+    """
+    jobs = JobQueue(workers, max_pending, job_ttl)
+    app = create_app(WarmState(cache_size, llm_options, history_path), jobs)
+    logger.info(f"HealAPI server on http://{host}:{port} ({workers} workers, up to {max_pending} pending jobs)")
+    try:
+        app.run(host=host, port=port, threaded=True)
+    finally:
+        jobs.shutdown()
+
+# Example usage:
+if __name__ == "__main__":
+    import sys
+    serve(port=int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT)
@@ -0,0 +1,212 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+import subprocess
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from healapi.result_cache import SpecIndex
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+GIT_PREFIX = "git:"
+CACHE_VERSION = 2
+
+def is_git_source(source: str) -> bool:
+    return isinstance(source, str) and source.startswith(GIT_PREFIX)
+
+def split_git_source(source: str) -> Tuple[str, str]:
+    """
+    (rev, path) of a git:<rev>:<path> source. As with `git show`, path is relative
+    to the repository root; start it with ./ to make it relative to the working directory.
+    """
+    rev, sep, path = source[len(GIT_PREFIX):].partition(":")
+    if not sep or not rev or not path:
+        raise ValueError(f"Invalid git spec source {source!r}: expected git:<rev>:<path>")
+    return rev, path
+
+def blob_sha(data: bytes) -> str:
+    """Git blob id of some content (what `git hash-object` prints), so files and blobs share cache entries."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+def _git(args, repo: Optional[str] = None, stdin: Optional[bytes] = None) -> bytes:
+    try:
+        result = subprocess.run(["git", *args], cwd=repo, input=stdin, capture_output=True)
+    except FileNotFoundError:
+        raise RuntimeError("git executable not found; git:<rev>:<path> spec sources need git on PATH")
+    if result.returncode != 0:
+        raise ValueError(result.stderr.decode("utf-8", "replace").strip() or f"git {' '.join(args)} failed")
+    return result.stdout
+
+def git_blob_sha(rev: str, path: str, repo: Optional[str] = None) -> str:
+    """Blob id of path at rev, without reading the blob."""
+    line = _git(["cat-file", "--batch-check"], repo, f"{rev}:{path}\n".encode("utf-8")).decode("utf-8", "replace").split()
+    if len(line) != 3 or line[1] != "blob":
+        raise FileNotFoundError(f"No file {path!r} at git revision {rev!r}")
+    return line[0]
+
+def read_git_blob(sha: str, repo: Optional[str] = None) -> bytes:
+    return _git(["cat-file", "blob", sha], repo)
+
+def _spec_format(path: str) -> str:
+    return "yaml" if path.endswith((".yaml", ".yml")) else "json"
+
+class SpecStore:
+    """
+    Parsed specs keyed by the git blob id of their content (and YAML/JSON format),
+    so the same spec text is parsed once however it is reached: a working-tree
+    file, git:<rev>:<path> at any commit or branch, or both sides of a diff.
+    Each entry keeps a result_cache.SpecIndex, so per-operation fingerprints are
+    computed once per blob as well. With cache_dir, entries (with every operation
+    fingerprint) are also stored as plain JSON in <cache_dir>/<sha>.<format>.json
+    and reused by later runs; loading them never runs code, and specs JSON cannot
+    represent exactly (e.g. YAML dates or integer keys) are only cached in memory.
+
+    Cached specs are shared between callers: the same dict is returned for every
+    load of the same content, so callers must treat it as read-only and deep-copy
+    it before changing it.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_entries: int = 32, repo: Optional[str] = None):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.repo = repo
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._keys_by_spec: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if not isinstance(entry, dict) or entry.get("version") != CACHE_VERSION or not isinstance(entry.get("spec"), dict):
+                return None
+            operations = {(path, method): digest for path, method, digest in entry.get("operations", [])}
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable spec cache entry {key}: {e}")
+            return None
+        return {"spec": entry["spec"], "operations": operations}
+
+    def _write_disk(self, key: str, spec: Dict[str, Any], index: SpecIndex):
+        if not self.cache_dir:
+            return
+        operations = [[path, method, digest] for (path, method), digest in index.operation_digests().items()]
+        text = json.dumps({"version": CACHE_VERSION, "spec": spec, "operations": operations}, separators=(",", ":"))
+        if json.loads(text)["spec"] != spec:
+            logger.info(f"Not caching spec blob {key} on disk: it does not round-trip through JSON")
+            return
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".healapi-", suffix=".tmp", dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, self._disk_path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _remember(self, key: str, spec: Dict[str, Any], index: SpecIndex):
+        with self._lock:
+            self._entries[key] = {"spec": spec, "index": index}
+            self._keys_by_spec[id(spec)] = key
+            while len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._keys_by_spec.pop(id(evicted["spec"]), None)
+
+    def _cached(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def load(self, source: str) -> Dict[str, Any]:
+        """Parsed spec of a file path or git:<rev>:<path> source (shared with other callers: do not mutate it)."""
+        from healapi.diff_engine import parse_spec
+        data = None
+        if is_git_source(source):
+            rev, path = split_git_source(source)
+            sha = git_blob_sha(rev, path, self.repo)
+        else:
+            path = source
+            with open(source, "rb") as f:
+                data = f.read()
+            sha = blob_sha(data)
+        key = f"{sha}.{_spec_format(path)}"
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # One parse per blob, even when both sides of a diff load it at the same time
+        with key_lock:
+            entry = self._cached(key)
+            if entry is not None:
+                self.hits += 1
+                logger.info(f"Reusing parsed spec for {source} (blob {sha[:12]})")
+                return entry["spec"]
+            stored = self._read_disk(key)
+            if stored is not None:
+                self.hits += 1
+                logger.info(f"Loaded parsed spec for {source} from the spec cache (blob {sha[:12]})")
+                self._remember(key, stored["spec"], SpecIndex(stored["spec"], stored.get("operations")))
+                return stored["spec"]
+            self.misses += 1
+            if data is None:
+                data = read_git_blob(sha, self.repo)
+            spec = parse_spec(data.decode("utf-8"), path)
+            index = SpecIndex(spec)
+            self._remember(key, spec, index)
+            try:
+                self._write_disk(key, spec, index)
+            except Exception as e:
+                logger.warning(f"Could not write spec cache entry for {source}: {e}")
+            return spec
+
+    def index(self, spec: Dict[str, Any]) -> SpecIndex:
+        """The SpecIndex (with its fingerprints) kept for a spec this store returned; a fresh one otherwise."""
+        with self._lock:
+            key = self._keys_by_spec.get(id(spec))
+            entry = self._entries.get(key) if key else None
+        if entry is not None and entry["spec"] is spec:
+            return entry["index"]
+        return SpecIndex(spec)
+
+# HEALAPI_SPEC_CACHE names an on-disk cache directory shared by every run (and batch worker)
+_store = SpecStore(os.environ.get("HEALAPI_SPEC_CACHE") or None)
+
+def configure(cache_dir: Optional[str] = None, max_entries: Optional[int] = None, repo: Optional[str] = None) -> SpecStore:
+    """Replace the process-wide store used by diff_engine.load_spec (e.g. to use another cache directory or repository)."""
+    global _store
+    _store = SpecStore(cache_dir, max_entries or _store.max_entries, repo)
+    return _store
+
+def load_spec(source: str) -> Dict[str, Any]:
+    """Parsed spec from the process-wide store; shared between callers, so treat it as read-only."""
+    return _store.load(source)
+
+def spec_index(spec: Dict[str, Any]) -> SpecIndex:
+    return _store.index(spec)
+
+# Example usage:
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) < 2:
+        print("Usage: python -m healapi.spec_source <path or git:<rev>:<path>> [...]")
+        sys.exit(1)
+    for source in sys.argv[1:]:
+        spec = load_spec(source)
+        print(f"{source}: {len(spec.get('paths') or {})} paths")
+    print(f"Parsed {_store.misses}, reused {_store.hits}")
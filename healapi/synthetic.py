@@ -0,0 +1,285 @@
+import os
+import copy
+import json
+import random
+import logging
+import itertools
+from typing import Any, Dict, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RESOURCES = ["accounts", "orders", "invoices", "payments", "users", "products", "carts", "shipments", "reviews", "coupons",
+             "tickets", "messages", "devices", "reports", "teams", "projects", "files", "events", "plans", "refunds"]
+WORDS = ["id", "name", "status", "amount", "currency", "created", "updated", "owner", "email", "phone", "address", "city",
+         "country", "total", "count", "label", "note", "priority", "version", "score", "region", "source", "kind", "flag"]
+_TYPES = ["string", "integer", "number", "boolean"]
+
+def _property_names(rng: random.Random, count: int) -> List[str]:
+    names = rng.sample(WORDS, min(count, len(WORDS)))
+    return names + [f"field_{i}" for i in range(count - len(names))]
+
+def _schema(rng: random.Random, properties: int, depth: int, refs: List[str]) -> Dict[str, Any]:
+    """Inline object schema; nested objects down to depth, some properties $ref existing components."""
+    props = {}
+    for name in _property_names(rng, properties):
+        roll = rng.random()
+        if depth > 1 and roll < 0.15:
+            props[name] = _schema(rng, max(2, properties // 2), depth - 1, refs)
+        elif refs and roll < 0.3:
+            props[name] = {"$ref": rng.choice(refs)}
+        elif roll < 0.4:
+            props[name] = {"type": "array", "items": {"type": rng.choice(_TYPES)}}
+        else:
+            props[name] = {"type": rng.choice(_TYPES)}
+    return {"type": "object", "properties": props}
+
+def _path(index: int, item: bool) -> str:
+    # Zero-padded ids, so /v1/orders-00001 is not a prefix of /v1/orders-00012 (the analyzers match paths by substring)
+    base = f"/v1/{RESOURCES[index % len(RESOURCES)]}-{index:05d}"
+    return base + "/{id}" if item else base
+
+def _operation(rng: random.Random, method: str, properties: int, depth: int, refs: List[str]) -> Dict[str, Any]:
+    operation = {
+        "summary": f"{method.upper()} operation",
+        "responses": {"200": {"description": "OK", "content": {"application/json": {"schema": _schema(rng, properties, depth, refs)}}}},
+    }
+    if method in ("post", "put"):
+        operation["requestBody"] = {"content": {"application/json": {"schema": _schema(rng, properties, 1, [])}}}
+    return operation
+
+def _path_item(rng: random.Random, path: str, properties: int, depth: int, refs: List[str]) -> Dict[str, Any]:
+    methods = ["get"] + [m for m, p in (("post", 0.4), ("put", 0.2), ("delete", 0.2)) if rng.random() < p]
+    item = {m: _operation(rng, m, properties, depth, refs) for m in methods}
+    if "{id}" in path:
+        item["parameters"] = [{"name": "id", "in": "path", "required": True, "schema": {"type": "string"}}]
+    return item
+
+def generate_spec(paths: int = 1000, seed: int = 0, properties: int = 8, depth: int = 3, schemas: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Seeded OpenAPI 3 spec with the given number of paths (every other one an item
+    path with an {id} parameter), inline response schemas nested down to depth, and
+    shared component schemas (paths // 20 by default) referenced through $ref.
+    """
+    rng = random.Random(seed)
+    schema_count = schemas if schemas is not None else max(5, paths // 20)
+    components = {}
+    for i in range(schema_count):
+        # Components only reference earlier ones, so $ref chains are acyclic
+        components[f"Model{i:04d}"] = _schema(rng, properties, depth, [f"#/components/schemas/Model{j:04d}" for j in range(max(0, i - 5), i)])
+    refs = [f"#/components/schemas/{name}" for name in components]
+    spec = {
+        "openapi": "3.0.0",
+        "info": {"title": "Synthetic API", "version": "1.0.0"},
+        "servers": [{"url": "http://localhost:5000"}],
+        "paths": {},
+        "components": {"schemas": components},
+    }
+    for i in range(paths):
+        path = _path(i // 2, item=bool(i % 2))
+        spec["paths"][path] = _path_item(rng, path, properties, depth, refs)
+    return spec
+
+def _response_properties(path_item: Dict[str, Any], method: str) -> Dict[str, Any]:
+    return path_item[method]["responses"]["200"]["content"]["application/json"]["schema"]["properties"]
+
+def mutate_spec(spec: Dict[str, Any], seed: int = 0, renames: int = 0, property_changes: int = 0, removals: int = 0,
+                additions: int = 0, schema_changes: int = 0, method_changes: int = 0) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Copy of spec with controlled, seeded mutations: renamed paths (/v1/... -> /v2/...,
+    same operations, so the diff engine pairs them as renames), renamed response
+    properties, removed and added paths, changed component schemas (which change
+    no path but every operation fingerprint referencing them) and collection paths
+    gaining or losing an operation. Returns (new spec, mutations).
+
+    The analyzers flag tests by the paths of removed endpoints and of endpoints whose
+    methods changed, so removals and method changes are what make tests "affected";
+    method changes go to collection paths (no {id}), which the analyzers also match
+    inside the concrete item URLs below them.
+    """
+    rng = random.Random(seed)
+    new = copy.deepcopy(spec)
+    mutations = []
+    candidates = list(new["paths"])
+    rng.shuffle(candidates)
+    picked = iter(candidates)
+
+    def take(count):
+        return [p for _, p in zip(range(count), picked)]
+
+    for path in take(renames):
+        new_path = "/v2/" + path[len("/v1/"):]
+        new["paths"][new_path] = new["paths"].pop(path)
+        mutations.append({"kind": "rename", "path": path, "new_path": new_path})
+    for path in take(removals):
+        del new["paths"][path]
+        mutations.append({"kind": "remove", "path": path})
+    for path in take(property_changes):
+        method = "get"
+        props = _response_properties(new["paths"][path], method)
+        old_name = rng.choice(sorted(props))
+        new_name = f"{old_name}_v2"
+        props[new_name] = props.pop(old_name)
+        mutations.append({"kind": "property", "path": path, "method": method, "removed": old_name, "added": new_name})
+    for path in itertools.islice((p for p in picked if "{" not in p), method_changes):
+        path_item = new["paths"][path]
+        removable = sorted(m for m in path_item if m not in ("get", "parameters"))
+        if removable:
+            del path_item[removable[0]]
+            mutations.append({"kind": "method", "path": path, "removed": removable[0]})
+        else:
+            path_item["patch"] = _operation(rng, "patch", 4, 1, [])
+            mutations.append({"kind": "method", "path": path, "added": "patch"})
+    refs = [f"#/components/schemas/{name}" for name in new["components"]["schemas"]]
+    for i in range(additions):
+        path = f"/v1/new-{rng.choice(RESOURCES)}-{i:05d}"
+        new["paths"][path] = _path_item(rng, path, 8, 2, refs)
+        mutations.append({"kind": "add", "path": path})
+    for name in rng.sample(sorted(new["components"]["schemas"]), min(schema_changes, len(new["components"]["schemas"]))):
+        new["components"]["schemas"][name]["properties"]["added_field"] = {"type": "string"}
+        mutations.append({"kind": "schema", "schema": name})
+    return new, mutations
+
+def _concrete(path: str) -> str:
+    return path.replace("{id}", "1")
+
+def generate_postman_collection(spec: Dict[str, Any], base_url_var: str = "baseUrl") -> Dict[str, Any]:
+    """
+    Postman collection with one request per operation, in one folder per resource,
+    each with a test asserting the response properties of the spec.
+    """
+    folders: Dict[str, List[Dict[str, Any]]] = {}
+    for path, path_item in spec["paths"].items():
+        for method, operation in path_item.items():
+            if method == "parameters":
+                continue
+            concrete = _concrete(path)
+            segments = [s for s in concrete.split("/") if s]
+            request = {"method": method.upper(),
+                       "url": {"raw": f"{{{{{base_url_var}}}}}{concrete}", "host": [f"{{{{{base_url_var}}}}}"], "path": segments}}
+            if "requestBody" in operation:
+                body_props = operation["requestBody"]["content"]["application/json"]["schema"]["properties"]
+                request["header"] = [{"key": "Content-Type", "value": "application/json"}]
+                request["body"] = {"mode": "raw", "raw": json.dumps({name: "value" for name in body_props}, indent=2)}
+            exec_lines = ["pm.test(\"Status code is 200\", function () {", "    pm.response.to.have.status(200);", "});"]
+            response_props = operation["responses"]["200"]["content"]["application/json"]["schema"].get("properties", {})
+            if response_props:
+                exec_lines += ["pm.test(\"Response has expected properties\", function () {", "    var jsonData = pm.response.json();"]
+                exec_lines += [f"    pm.expect(jsonData).to.have.property('{name}');" for name in response_props]
+                exec_lines.append("});")
+            folders.setdefault(segments[1].rsplit("-", 1)[0], []).append({
+                "name": f"{method.upper()} {path}",
+                "request": request,
+                "event": [{"listen": "test", "script": {"type": "text/javascript", "exec": exec_lines}}],
+            })
+    return {
+        "info": {"_postman_id": "synthetic", "name": "Synthetic API Collection",
+                 "schema": "https://schema.getpostman.com/json/collection/v2.1.0/collection.json"},
+        "item": [{"name": name, "item": items} for name, items in sorted(folders.items())],
+    }
+
+def _path_literal(path: str) -> str:
+    return f"\"{path}\".format(id=1)" if "{id}" in path else f"\"{path}\""
+
+def _test_name(method: str, path: str) -> str:
+    return "test_" + method + "_" + "".join(c if c.isalnum() else "_" for c in path).strip("_")
+
+def generate_pytest_suite(spec: Dict[str, Any], out_dir: str, tests_per_file: int = 10, base_url: str = "http://localhost:5000") -> List[str]:
+    """
+    Write pytest modules with one test per GET operation (tests_per_file per module),
+    in the style the healer rewrites: requests calls with literal paths (item paths as
+    "/v1/orders-00001/{id}".format(id=1), so the spec path appears in the source) and
+    assertions on response.json()["property"]. Returns the written file paths.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    operations = [(path, "get", path_item["get"]) for path, path_item in spec["paths"].items() if "get" in path_item]
+    files = []
+    for start in range(0, len(operations), tests_per_file):
+        lines = ["import requests", "", f"BASE_URL = \"{base_url}\"", ""]
+        for path, method, operation in operations[start:start + tests_per_file]:
+            props = sorted(operation["responses"]["200"]["content"]["application/json"]["schema"].get("properties", {}))[:3]
+            lines += ["", f"def {_test_name(method, path)}():",
+                      f"    response = requests.{method}(BASE_URL + {_path_literal(path)})",
+                      "    assert response.status_code == 200"]
+            lines += [f"    assert response.json()[\"{name}\"] is not None" for name in props]
+            lines.append("")
+        file_path = os.path.join(out_dir, f"test_synthetic_{start // tests_per_file:04d}.py")
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+        files.append(file_path)
+    return files
+
+def default_mutations(paths: int) -> Dict[str, int]:
+    """Mutation counts scaled to the spec size: 1% renames, property and method changes, 0.5% removals and additions."""
+    return {"renames": max(1, paths // 100), "property_changes": max(1, paths // 100), "removals": max(1, paths // 200),
+            "additions": max(1, paths // 200), "schema_changes": max(1, paths // 1000), "method_changes": max(1, paths // 100)}
+
+def write_scenario(out_dir: str, paths: int = 1000, seed: int = 0, properties: int = 8, depth: int = 3,
+                   mutations: Optional[Dict[str, int]] = None, tests_per_file: int = 10, pytest_paths: Optional[int] = None,
+                   spec_format: str = "json") -> Dict[str, Any]:
+    """
+    Write a complete scenario to out_dir: old and new specs (old plus mutations)
+    as old_openapi.<json|yaml> / new_openapi.<json|yaml>, collection.json and tests/
+    generated from the old spec, and scenario.json describing it. pytest_paths
+    limits the pytest suite to the mutated paths plus the first N others.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    counts = mutations if mutations is not None else default_mutations(paths)
+    old = generate_spec(paths, seed, properties, depth)
+    new, applied = mutate_spec(old, seed + 1, **counts)
+    collection = generate_postman_collection(old)
+    suite_spec = old
+    if pytest_paths is not None:
+        mutated = {m["path"] for m in applied if m.get("path") in old["paths"]}
+        kept = mutated | set(list(old["paths"])[:pytest_paths])
+        suite_spec = {**old, "paths": {p: item for p, item in old["paths"].items() if p in kept}}
+    test_files = generate_pytest_suite(suite_spec, os.path.join(out_dir, "tests"), tests_per_file)
+    files = {"old_spec": f"old_openapi.{spec_format}", "new_spec": f"new_openapi.{spec_format}", "collection": "collection.json", "tests": "tests"}
+    for key, data in (("old_spec", old), ("new_spec", new), ("collection", collection)):
+        with open(os.path.join(out_dir, files[key]), "w", encoding="utf-8") as f:
+            if key != "collection" and spec_format == "yaml":
+                import yaml
+                yaml.safe_dump(data, f, sort_keys=False)
+            else:
+                json.dump(data, f)
+    scenario = {
+        "seed": seed,
+        "paths": paths,
+        "properties": properties,
+        "depth": depth,
+        "spec_format": spec_format,
+        "mutation_counts": counts,
+        "files": files,
+        "operations": sum(1 for item in old["paths"].values() for m in item if m != "parameters"),
+        "schemas": len(old["components"]["schemas"]),
+        "pytest_files": len(test_files),
+        "mutations": applied,
+    }
+    with open(os.path.join(out_dir, "scenario.json"), "w", encoding="utf-8") as f:
+        json.dump(scenario, f, indent=2)
+    logger.info(f"Wrote synthetic scenario ({paths} paths, {len(applied)} mutations) to {out_dir}")
+    return scenario
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m healapi.synthetic", description="Generate a seeded synthetic spec/test scenario")
+    parser.add_argument('out_dir', help='Directory to write the scenario to')
+    parser.add_argument('--paths', type=int, default=1000, help='Number of paths in the old spec (default: 1000)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--properties', type=int, default=8, help='Properties per schema object (default: 8)')
+    parser.add_argument('--depth', type=int, default=3, help='Nesting depth of response schemas (default: 3)')
+    parser.add_argument('--tests-per-file', type=int, default=10, help='pytest tests per generated module (default: 10)')
+    parser.add_argument('--pytest-paths', type=int, help='Only generate pytest tests for the mutated paths plus the first N others (default: all)')
+    parser.add_argument('--format', choices=['json', 'yaml'], default='json', help='Spec file format (default: json)')
+    for name in ("renames", "property_changes", "removals", "additions", "schema_changes", "method_changes"):
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, dest=name, help=f'Number of {name.replace("_", " ")} (default: scaled to --paths)')
+    args = parser.parse_args(argv)
+    counts = default_mutations(args.paths)
+    counts.update({k: getattr(args, k) for k in counts if getattr(args, k) is not None})
+    scenario = write_scenario(args.out_dir, args.paths, args.seed, args.properties, args.depth, counts, args.tests_per_file,
+                              args.pytest_paths, args.format)
+    print(json.dumps({k: v for k, v in scenario.items() if k != "mutations"}, indent=2))
+
+# Example usage:
+if __name__ == "__main__":
+    main()
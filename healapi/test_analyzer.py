@@ -2,7 +2,7 @@
 import json
 import os
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Set
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -13,8 +13,7 @@ def analyze_pytest_files(test_dir: str, diff: Dict[str, Any]) -> List[str]:
     Returns a list of affected test file paths.
     """
     affected = []
-    changed_paths = set(diff.get("added_endpoints", []) + diff.get("removed_endpoints", []))
-    changed_paths.update([c["path"] for c in diff.get("changed_endpoints", [])])
+    changed_paths = changed_endpoint_paths(diff)
     for root, _, files in os.walk(test_dir):
         for file in files:
             if file.endswith(".py"):
@@ -22,14 +21,26 @@ def analyze_pytest_files(test_dir: str, diff: Dict[str, Any]) -> List[str]:
                 try:
                     with open(file_path, "r", encoding="utf-8") as f:
                         content = f.read()
-                        for path in changed_paths:
-                            if path in content:
-                                affected.append(file_path)
-                                break
+                        if _mentions_any(content, changed_paths):
+                            affected.append(file_path)
                 except Exception as e:
                     logger.error(f"Error reading {file_path}: {e}")
     return affected
 
+def changed_endpoint_paths(diff: Dict[str, Any]) -> Set[str]:
+    """Paths added, removed or with changed methods in the diff."""
+    changed_paths = set(diff.get("added_endpoints", []) + diff.get("removed_endpoints", []))
+    changed_paths.update([c["path"] for c in diff.get("changed_endpoints", [])])
+    return changed_paths
+
+def _mentions_any(content: str, changed_paths: Set[str]) -> bool:
+    return any(path in content for path in changed_paths)
+
+def analyze_pytest_sources(sources: Dict[str, str], diff: Dict[str, Any]) -> List[str]:
+    """Same as analyze_pytest_files, over already loaded {file path: source} contents."""
+    changed_paths = changed_endpoint_paths(diff)
+    return [file_path for file_path, content in sources.items() if _mentions_any(content, changed_paths)]
+
 def _traverse_postman_items(items, changed_paths, affected):
     for item in items:
         if "item" in item:
@@ -49,16 +60,18 @@ def analyze_postman_collection(collection_path: str, diff: Dict[str, Any]) -> Li
     Analyze a Postman collection to find requests impacted by API changes.
     Returns a list of affected request names.
     """
-    affected = []
-    changed_paths = set(diff.get("added_endpoints", []) + diff.get("removed_endpoints", []))
-    changed_paths.update([c["path"] for c in diff.get("changed_endpoints", [])])
     try:
         with open(collection_path, "r", encoding="utf-8") as f:
             collection = json.load(f)
-        items = collection.get("item", [])
-        _traverse_postman_items(items, changed_paths, affected)
+        return analyze_collection(collection, diff)
     except Exception as e:
         logger.error(f"Error reading or parsing Postman collection {collection_path}: {e}")
+    return []
+
+def analyze_collection(collection: Dict[str, Any], diff: Dict[str, Any]) -> List[str]:
+    """Same as analyze_postman_collection, over an already loaded collection."""
+    affected = []
+    _traverse_postman_items(collection.get("item", []), changed_endpoint_paths(diff), affected)
     return affected
 
 def analyze_tests(test_type: str, test_path: str, diff: Dict[str, Any]) -> List[str]:
@@ -2,84 +2,665 @@
 import subprocess
 import json
 import os
+import math
+import heapq
 import logging
-from typing import Dict, Any, List, Optional
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+from healapi import profiling, spec_source
+from healapi.patching import write_json_atomic
+from healapi.report_stream import load_newman_report, load_pytest_report, truncate_output
+from healapi.result_cache import ResultCache, digest, postman_fingerprint, pytest_fingerprints, request_path
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Report sections pytest-json-report can leave out; they are never read back
+_PYTEST_REPORT_OMIT = ["--json-report-omit", "collectors", "keywords", "streams", "log"]
+
+def _pytest_command(targets: List[str], workdir: str, report_path: str, extra_args: Optional[List[str]] = None) -> List[str]:
+    """pytest command writing its JSON report and cache into the run's own workspace."""
+    cmd = ["pytest", *targets, *_PYTEST_REPORT_OMIT, "--json-report", f"--json-report-file={report_path}",
+           "-o", f"cache_dir={os.path.join(workdir, '.pytest_cache')}"]
+    if extra_args:
+        cmd.extend(extra_args)
+    return cmd
+
 def run_pytest(test_dir: str, extra_args: Optional[List[str]] = None) -> Dict[str, Any]:
     """
     Run pytest on the given directory and return results as a dict.
+    The report is written to a private temporary workspace, so concurrent runs
+    on one host never share files, and is ingested with a streaming parser.
     """
-    cmd = ["pytest", test_dir, "--json-report", "--json-report-file=pytest_report.json"]
-    if extra_args:
-        cmd.extend(extra_args)
+    return _run_pytest([test_dir], test_dir, extra_args)
+
+def run_pytest_files(files: List[str], test_dir: str = ".", extra_args: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Run pytest on selected test files (or node ids) of test_dir; same result shape as run_pytest."""
+    return _run_pytest(files, test_dir, extra_args)
+
+def merge_pytest_runs(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine the results of several pytest runs over disjoint files into one run_pytest-shaped result."""
+    errors = [run["error"] for run in runs if run.get("error")]
+    reports = [run["report"] for run in runs if isinstance(run.get("report"), dict) and "tests" in run["report"]]
+    if not runs:
+        return {"type": "pytest", "returncode": 0, "stdout": "", "stderr": "", "runs": 0, "report": merge_pytest_reports([])}
+    result = {
+        "type": "pytest",
+        "returncode": max((run.get("returncode", 1) for run in runs if not run.get("error")), default=1),
+        "stdout": truncate_output("".join(run.get("stdout", "") for run in runs)),
+        "stderr": truncate_output("".join(run.get("stderr", "") for run in runs)),
+        "runs": len(runs),
+        "report": merge_pytest_reports(reports) if reports else {"error": "pytest report not found"},
+    }
+    if errors:
+        result["error"] = "; ".join(errors)
+    return result
+
+def _run_pytest(targets: List[str], test_dir: str, extra_args: Optional[List[str]] = None) -> Dict[str, Any]:
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        report_path = os.path.join(test_dir, "pytest_report.json")
-        if os.path.exists(report_path):
-            with open(report_path, "r") as f:
-                report = json.load(f)
-            os.remove(report_path)
-        else:
-            report = {"error": "pytest report not found", "stdout": result.stdout, "stderr": result.stderr}
+        with tempfile.TemporaryDirectory(prefix="healapi-pytest-") as workdir:
+            report_path = os.path.join(workdir, "pytest_report.json")
+            with profiling.step("pytest", tests=len(targets)):
+                result = subprocess.run(_pytest_command(targets, workdir, report_path, extra_args), capture_output=True, text=True)
+            if os.path.exists(report_path):
+                report = load_pytest_report(report_path)
+            else:
+                report = {"error": "pytest report not found", "stdout": truncate_output(result.stdout), "stderr": truncate_output(result.stderr)}
         logger.info(f"Pytest run completed for {test_dir}")
         return {
             "type": "pytest",
             "returncode": result.returncode,
-            "stdout": result.stdout,
-            "stderr": result.stderr,
+            "stdout": truncate_output(result.stdout),
+            "stderr": truncate_output(result.stderr),
             "report": report
         }
     except Exception as e:
         logger.error(f"Error running pytest for {test_dir}: {e}")
         return {"type": "pytest", "error": str(e)}
 
-def run_newman(collection_path: str, environment_path: Optional[str] = None) -> Dict[str, Any]:
+# Shard by file instead of node id when the node ids would not fit on a command line
+_MAX_ARGS_CHARS = 24000
+
+def collect_pytest_ids(test_dir: str, extra_args: Optional[List[str]] = None) -> List[str]:
     """
-    Run a Postman collection using Newman and return results as a dict.
+    Collect pytest node ids (relative to the current directory) without running them.
+    """
+    cmd = ["pytest", test_dir, "--collect-only", "-q", f"--rootdir={os.getcwd()}"]
+    if extra_args:
+        cmd.extend(extra_args)
+    with profiling.step("pytest collect"):
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    return [line.strip() for line in result.stdout.splitlines() if "::" in line and not line.startswith(" ")]
+
+def _load_durations(durations_path: Optional[str]) -> Dict[str, float]:
+    """Per-test durations from an earlier run; a missing, unreadable or malformed file is no history."""
+    if not durations_path or not os.path.exists(durations_path):
+        return {}
+    try:
+        with open(durations_path, "r", encoding="utf-8") as f:
+            durations = json.load(f)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable durations file {durations_path}: {e}")
+        return {}
+    if not isinstance(durations, dict):
+        logger.warning(f"Ignoring malformed durations file {durations_path}")
+        return {}
+    return {node_id: float(duration) for node_id, duration in durations.items()
+            if isinstance(duration, (int, float)) and not isinstance(duration, bool)}
+
+def _save_durations(durations_path: Optional[str], report: Dict[str, Any]):
+    if not durations_path:
+        return
+    durations = _load_durations(durations_path)
+    for test in report.get("tests", []):
+        durations[test["nodeid"]] = round(sum(test.get(stage, {}).get("duration", 0) for stage in ("setup", "call", "teardown")), 4)
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(durations_path)), exist_ok=True)
+        write_json_atomic(durations_path, dict(sorted(durations.items())))
+    except Exception as e:
+        logger.warning(f"Could not save test durations to {durations_path}: {e}")
+
+def shard_pytest_ids(node_ids: List[str], shards: int, durations: Optional[Dict[str, float]] = None) -> List[List[str]]:
+    """
+    Balance node ids over shards by historical duration (longest first onto the
+    least loaded shard). Unknown tests get the median known duration. Each shard
+    keeps the collection order so module/class fixtures are still shared.
+    """
+    durations = durations or {}
+    known = sorted(durations[n] for n in node_ids if n in durations)
+    default = known[len(known) // 2] if known else 1.0
+    order = {node_id: index for index, node_id in enumerate(node_ids)}
+    heap = [(0.0, shard) for shard in range(min(shards, len(node_ids)))]
+    buckets = [[] for _ in heap]
+    for node_id in sorted(node_ids, key=lambda n: durations.get(n, default), reverse=True):
+        load, shard = heapq.heappop(heap)
+        buckets[shard].append(node_id)
+        heapq.heappush(heap, (load + durations.get(node_id, default), shard))
+    return [sorted(bucket, key=order.get) for bucket in buckets if bucket]
+
+def merge_pytest_reports(reports: List[Dict[str, Any]], node_order: Optional[List[str]] = None) -> Dict[str, Any]:
     """
-    newman_path = os.environ.get('NEWMAN_PATH', r'C:\Users\niran\AppData\Roaming\npm\newman.cmd')
-    is_cmd = newman_path.lower().endswith('.cmd')
-    cmd_list = [newman_path, "run", collection_path, "--reporters", "json", "--reporter-json-export", "newman_report.json"]
+    Merge per-shard pytest-json-report reports into one report of the same shape.
+    """
+    summary = {}
+    for report in reports:
+        for key, value in report.get("summary", {}).items():
+            if isinstance(value, (int, float)):
+                summary[key] = summary.get(key, 0) + value
+    tests = [t for report in reports for t in report.get("tests", [])]
+    if node_order:
+        order = {node_id: index for index, node_id in enumerate(node_order)}
+        tests.sort(key=lambda t: order.get(t.get("nodeid"), len(order)))
+    exitcodes = [r.get("exitcode", 0) for r in reports]
+    first = reports[0] if reports else {}
+    return {
+        "created": min((r.get("created", 0) for r in reports), default=0),
+        "duration": max((r.get("duration", 0) for r in reports), default=0),
+        "exitcode": next((code for code in exitcodes if code), 0),
+        "root": first.get("root"),
+        "environment": first.get("environment", {}),
+        "summary": summary,
+        "collectors": [c for report in reports for c in report.get("collectors", [])],
+        "tests": tests,
+        "warnings": [w for report in reports for w in report.get("warnings", [])],
+    }
+
+def run_pytest_sharded(test_dir: str, shards: Optional[int] = None, extra_args: Optional[List[str]] = None, durations_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run a pytest suite as N concurrent pytest processes (no pytest-xdist needed).
+    With durations_path (e.g. under a cache directory, never written by default),
+    node ids are balanced using the durations of earlier runs kept in that file,
+    which is refreshed after the run; otherwise every test counts the same.
+    """
+    shards = shards or os.cpu_count() or 1
+    try:
+        node_ids = collect_pytest_ids(test_dir, extra_args)
+        if not node_ids:
+            return run_pytest(test_dir, extra_args)
+        durations = _load_durations(durations_path)
+        units = node_ids
+        if sum(len(n) + 1 for n in node_ids) > _MAX_ARGS_CHARS * shards:
+            # Too many ids for the command line: balance whole files instead
+            units = list(dict.fromkeys(n.split("::", 1)[0] for n in node_ids))
+            file_durations = {}
+            for node_id in node_ids:
+                file_name = node_id.split("::", 1)[0]
+                file_durations[file_name] = file_durations.get(file_name, 0) + durations.get(node_id, 1.0)
+            durations = file_durations
+        buckets = shard_pytest_ids(units, shards, durations)
+        with tempfile.TemporaryDirectory(prefix="healapi-pytest-") as workdir:
+            jobs = [(bucket, os.path.join(workdir, f"shard_{index}_report.json")) for index, bucket in enumerate(buckets)]
+
+            def run_shard(job):
+                bucket, report_path = job
+                cmd = _pytest_command(bucket, workdir, report_path, [f"--rootdir={os.getcwd()}", "-p", "no:cacheprovider", *(extra_args or [])])
+                with profiling.step(f"pytest shard {os.path.basename(report_path).split('_')[1]}", tests=len(bucket)):
+                    return subprocess.run(cmd, capture_output=True, text=True)
+
+            with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+                results = list(pool.map(run_shard, jobs))
+
+            reports = []
+            for (bucket, report_path), result in zip(jobs, results):
+                if os.path.exists(report_path):
+                    reports.append(load_pytest_report(report_path))
+                else:
+                    reports.append({"exitcode": result.returncode, "error": "pytest report not found", "stderr": truncate_output(result.stderr)})
+        report = merge_pytest_reports(reports, node_ids)
+        _save_durations(durations_path, report)
+        logger.info(f"Pytest run completed for {test_dir} in {len(jobs)} shards")
+        return {
+            "type": "pytest",
+            "returncode": max((r.returncode for r in results), default=0),
+            "stdout": truncate_output("".join(r.stdout for r in results)),
+            "stderr": truncate_output("".join(r.stderr for r in results)),
+            "shards": len(jobs),
+            "report": report
+        }
+    except Exception as e:
+        logger.error(f"Error running sharded pytest for {test_dir}: {e}")
+        return {"type": "pytest", "error": str(e)}
+
+_WINDOWS_NEWMAN_PATH = os.path.join(os.environ.get('APPDATA', ''), 'npm', 'newman.cmd')
+
+def find_newman() -> Optional[str]:
+    """
+    Locate the Newman executable: NEWMAN_PATH, then newman on PATH, then the
+    default npm global install location on Windows. Returns None if not found.
+    """
+    if os.environ.get('NEWMAN_PATH'):
+        return os.environ['NEWMAN_PATH']
+    found = shutil.which('newman')
+    if found:
+        return found
+    if os.name == 'nt' and os.path.exists(_WINDOWS_NEWMAN_PATH):
+        return _WINDOWS_NEWMAN_PATH
+    return None
+
+def _newman_command(collection_path: str, report_path: str, environment_path: Optional[str] = None) -> List[str]:
+    newman_path = find_newman() or 'newman'
+    cmd_list = [newman_path, "run", collection_path, "--reporters", "json", "--reporter-json-export", report_path]
     if environment_path:
         cmd_list.extend(["--environment", environment_path])
-    if is_cmd:
+    if newman_path.lower().endswith('.cmd'):
         # Use cmd.exe /c to run the .cmd file
-        cmd = ['cmd.exe', '/c'] + cmd_list
-        shell = False
-    else:
-        cmd = cmd_list
-        shell = False
+        return ['cmd.exe', '/c'] + cmd_list
+    return cmd_list
+
+def run_newman(collection_path: str, environment_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run a Postman collection using Newman and return results as a dict.
+    Newman runs inside a private temporary workspace; only the executions,
+    failures, stats and timings of its report are kept (streamed from disk).
+    """
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, shell=shell)
-        report_path = "newman_report.json"
-        if os.path.exists(report_path):
-            with open(report_path, "r") as f:
-                report = json.load(f)
-            os.remove(report_path)
-        else:
-            report = {"error": "newman report not found", "stdout": result.stdout, "stderr": result.stderr}
+        with tempfile.TemporaryDirectory(prefix="healapi-newman-") as workdir:
+            report_path = os.path.join(workdir, "newman_report.json")
+            cmd = _newman_command(os.path.abspath(collection_path), report_path,
+                                  os.path.abspath(environment_path) if environment_path else None)
+            with profiling.step("newman"):
+                result = subprocess.run(cmd, capture_output=True, text=True, shell=False, cwd=workdir)
+            if os.path.exists(report_path):
+                report = load_newman_report(report_path)
+            else:
+                report = {"error": "newman report not found", "stdout": truncate_output(result.stdout), "stderr": truncate_output(result.stderr)}
         logger.info(f"Newman run completed for {collection_path}")
         return {
             "type": "newman",
             "returncode": result.returncode,
-            "stdout": result.stdout,
-            "stderr": result.stderr,
+            "stdout": truncate_output(result.stdout),
+            "stderr": truncate_output(result.stderr),
             "report": report
         }
     except Exception as e:
         logger.error(f"Error running newman for {collection_path}: {e}")
         return {"type": "newman", "error": str(e)}
 
+def run_postman_native(collection_path: str, environment_path: Optional[str] = None, timeout: float = 30.0, pool_size: int = 10) -> Dict[str, Any]:
+    """
+    Run a Postman collection in-process with the native runner (no Node/Newman needed).
+    The report has the same shape as Newman's JSON reporter output.
+    """
+    from healapi.postman_runner import run_collection
+    try:
+        with profiling.step("native runner"):
+            report = run_collection(collection_path, environment_path, timeout=timeout, pool_size=pool_size)
+        return {
+            "type": "native",
+            "returncode": 1 if report["run"]["failures"] else 0,
+            "report": report
+        }
+    except Exception as e:
+        logger.error(f"Error running collection {collection_path} natively: {e}")
+        return {"type": "native", "error": str(e)}
+
+def run_postman_async(collection_path: str, environment_path: Optional[str] = None, timeout: float = 30.0,
+                      concurrency: int = 50, per_host: int = 10) -> Dict[str, Any]:
+    """
+    Run a Postman collection's requests concurrently on the asyncio engine.
+    The report has the same shape as Newman's JSON reporter output.
+    """
+    from healapi.async_runner import run_collection_async
+    try:
+        with profiling.step("async runner"):
+            report = run_collection_async(collection_path, environment_path, timeout=timeout, concurrency=concurrency, per_host=per_host)
+        return {
+            "type": "async",
+            "returncode": 1 if report["run"]["failures"] else 0,
+            "report": report
+        }
+    except Exception as e:
+        logger.error(f"Error running collection {collection_path} asynchronously: {e}")
+        return {"type": "async", "error": str(e)}
+
+def _count_requests(item: Dict[str, Any]) -> int:
+    if isinstance(item.get("item"), list):
+        return sum(_count_requests(child) for child in item["item"])
+    return 1
+
+def _leaf_paths(items: List[Dict[str, Any]], prefix: Tuple[int, ...] = ()) -> List[Tuple[int, ...]]:
+    """Index paths of all requests, in collection order."""
+    paths = []
+    for index, item in enumerate(items):
+        if isinstance(item.get("item"), list):
+            paths.extend(_leaf_paths(item["item"], prefix + (index,)))
+        else:
+            paths.append(prefix + (index,))
+    return paths
+
+def _partition(weights: List[int], shards: int) -> List[Tuple[int, int]]:
+    """
+    Split a sequence into at most `shards` contiguous (start, end) ranges of roughly
+    equal total weight. Contiguity keeps the merged execution order identical to a serial run.
+    """
+    total = sum(weights)
+    ranges = []
+    start = 0
+    acc = 0
+    for index, weight in enumerate(weights):
+        acc += weight
+        remaining_shards = shards - len(ranges) - 1
+        remaining_units = len(weights) - index - 1
+        if remaining_shards > 0 and remaining_units > 0 and (acc >= total * (len(ranges) + 1) / shards or remaining_units < remaining_shards):
+            ranges.append((start, index + 1))
+            start = index + 1
+    if start < len(weights):
+        ranges.append((start, len(weights)))
+    return ranges
+
+def _subcollection(collection: Dict[str, Any], leaves: List[Tuple[int, ...]]) -> Dict[str, Any]:
+    """
+    Copy of the collection (info, variables, auth, collection-level scripts) holding
+    only the given requests, with their folders (and folder-level scripts) rebuilt around them.
+    """
+    shard = {k: v for k, v in collection.items() if k != "item"}
+    shard["item"] = []
+    folders = {(): shard}
+    for leaf in leaves:
+        parent = shard
+        source = collection
+        for depth in range(len(leaf) - 1):
+            source = source["item"][leaf[depth]]
+            key = leaf[:depth + 1]
+            if key not in folders:
+                folder = {k: v for k, v in source.items() if k != "item"}
+                folder["item"] = []
+                parent["item"].append(folder)
+                folders[key] = folder
+            parent = folders[key]
+        parent["item"].append(source["item"][leaf[-1]])
+    return shard
+
+def split_collection(collection: Dict[str, Any], shards: int, strategy: str = "balanced") -> List[Dict[str, Any]]:
+    """
+    Split a Postman collection into up to `shards` sub-collections.
+    'folder' keeps top-level folders whole; 'balanced' balances by request count.
+    """
+    items = collection.get("item", [])
+    if strategy == "folder":
+        ranges = _partition([_count_requests(item) for item in items], shards)
+        return [dict({k: v for k, v in collection.items() if k != "item"}, item=items[start:end]) for start, end in ranges]
+    elif strategy == "balanced":
+        leaves = _leaf_paths(items)
+        ranges = _partition([1] * len(leaves), shards)
+        return [_subcollection(collection, leaves[start:end]) for start, end in ranges]
+    else:
+        raise ValueError(f"Unknown shard strategy: {strategy}")
+
+def _combine_timing(timings: List[Dict[str, Any]], counts: List[int], prefix: str) -> Dict[str, Any]:
+    """Pool <prefix>Average/Min/Max/Sd across shards, weighting by request count."""
+    pairs = [(t, n) for t, n in zip(timings, counts) if n and f"{prefix}Average" in t]
+    if not pairs:
+        return {}
+    total = sum(n for _, n in pairs)
+    mean = sum(t[f"{prefix}Average"] * n for t, n in pairs) / total
+    second_moment = sum((t.get(f"{prefix}Sd", 0) ** 2 + t[f"{prefix}Average"] ** 2) * n for t, n in pairs) / total
+    return {
+        f"{prefix}Average": mean,
+        f"{prefix}Min": min(t.get(f"{prefix}Min", 0) for t, _ in pairs),
+        f"{prefix}Max": max(t.get(f"{prefix}Max", 0) for t, _ in pairs),
+        f"{prefix}Sd": math.sqrt(max(second_moment - mean ** 2, 0)),
+    }
+
+def merge_newman_reports(reports: List[Dict[str, Any]], collection: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Merge per-shard Newman JSON reports (in shard order) into one report with the
+    same structure as a single Newman run.
+    """
+    runs = [r.get("run", {}) for r in reports]
+    stats = {}
+    for run in runs:
+        for key, value in run.get("stats", {}).items():
+            merged = stats.setdefault(key, {"total": 0, "pending": 0, "failed": 0})
+            for field in merged:
+                merged[field] += value.get(field, 0)
+    counts = [run.get("stats", {}).get("requests", {}).get("total", 0) for run in runs]
+    shard_timings = [run.get("timings", {}) for run in runs]
+    timings = {}
+    for prefix in ("response", "dns", "firstByte"):
+        timings.update(_combine_timing(shard_timings, counts, prefix))
+    started = [t["started"] for t in shard_timings if "started" in t]
+    completed = [t["completed"] for t in shard_timings if "completed" in t]
+    if started:
+        timings["started"] = min(started)
+    if completed:
+        timings["completed"] = max(completed)
+    errors = [run.get("error") for run in runs if run.get("error")]
+    first = reports[0] if reports else {}
+    return {
+        "collection": {"info": (collection or first.get("collection", {})).get("info", {})},
+        "environment": first.get("environment", {}),
+        "globals": first.get("globals", {}),
+        "run": {
+            "stats": stats,
+            "timings": timings,
+            "executions": [e for run in runs for e in run.get("executions", [])],
+            "transfers": {"responseTotal": sum(run.get("transfers", {}).get("responseTotal", 0) for run in runs)},
+            "failures": [f for run in runs for f in run.get("failures", [])],
+            "error": errors[0] if errors else None,
+        },
+    }
+
+def run_newman_sharded(collection_path: str, environment_path: Optional[str] = None, shards: Optional[int] = None, strategy: str = "balanced") -> Dict[str, Any]:
+    """
+    Run a Postman collection as N concurrent Newman processes over temporary
+    sub-collections and merge their JSON reports into one Newman-shaped report.
+    Requests that pass data to later requests through variables must share a shard
+    (use strategy='folder' and keep such chains inside one top-level folder).
+    """
+    shards = shards or os.cpu_count() or 1
+    try:
+        with open(collection_path, "r", encoding="utf-8") as f:
+            collection = json.load(f)
+        sub_collections = split_collection(collection, shards, strategy)
+        with tempfile.TemporaryDirectory(prefix="healapi-newman-") as workdir:
+            jobs = []
+            for index, sub_collection in enumerate(sub_collections):
+                shard_path = os.path.join(workdir, f"shard_{index}.json")
+                with open(shard_path, "w", encoding="utf-8") as f:
+                    json.dump(sub_collection, f)
+                jobs.append((shard_path, os.path.join(workdir, f"shard_{index}_report.json")))
+
+            def run_shard(job):
+                shard_path, report_path = job
+                with profiling.step(f"newman {os.path.basename(shard_path)[:-len('.json')].replace('_', ' ')}"):
+                    return subprocess.run(_newman_command(shard_path, report_path, environment_path and os.path.abspath(environment_path)),
+                                          capture_output=True, text=True, cwd=workdir)
+
+            with ThreadPoolExecutor(max_workers=len(jobs) or 1) as pool:
+                results = list(pool.map(run_shard, jobs))
+
+            reports = []
+            for (shard_path, report_path), result in zip(jobs, results):
+                if os.path.exists(report_path):
+                    reports.append(load_newman_report(report_path))
+                else:
+                    reports.append({"run": {"error": {"message": "newman report not found", "stderr": truncate_output(result.stderr)}}})
+        report = merge_newman_reports(reports, collection)
+        logger.info(f"Newman run completed for {collection_path} in {len(jobs)} shards")
+        return {
+            "type": "newman",
+            "returncode": max((r.returncode for r in results), default=0),
+            "stdout": truncate_output("".join(r.stdout for r in results)),
+            "stderr": truncate_output("".join(r.stderr for r in results)),
+            "shards": len(jobs),
+            "report": report
+        }
+    except Exception as e:
+        logger.error(f"Error running sharded newman for {collection_path}: {e}")
+        return {"type": "newman", "error": str(e)}
+
+def run_pytest_cached(test_dir: str, spec: Dict[str, Any], cache: ResultCache, touched: Optional[set] = None,
+                      extra_args: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Run only the pytest tests whose cached passing result is not valid any more
+    (test module/conftest changed, target operation changed, too old, or touched
+    by healing); cached tests are merged into the report with "cached": true.
+    """
+    touched = {os.path.abspath(t) for t in (touched or ())}
+    node_ids = collect_pytest_ids(test_dir, extra_args)
+    if not node_ids:
+        return run_pytest(test_dir, extra_args)
+    fingerprints = pytest_fingerprints(node_ids, spec_source.spec_index(spec))
+    cached = {}
+    to_run = []
+    for node_id in node_ids:
+        fingerprint, operation, file_path = fingerprints[node_id]
+        hit = None if os.path.abspath(file_path) in touched else cache.lookup(node_id, fingerprint, operation)
+        if hit:
+            cached[node_id] = dict(hit, cached=True)
+        else:
+            to_run.append(node_id)
+    if to_run:
+        if sum(len(n) + 1 for n in to_run) > _MAX_ARGS_CHARS:
+            # Too many ids for the command line: run everything and refresh the cache
+            to_run, cached = [test_dir], {}
+        result = _run_pytest(to_run, test_dir, [f"--rootdir={os.getcwd()}", *(extra_args or [])])
+    else:
+        result = {"type": "pytest", "returncode": 0, "stdout": "", "stderr": "",
+                  "report": {"exitcode": 0, "summary": {"total": 0, "collected": 0}, "tests": []}}
+    report = result.get("report")
+    if not isinstance(report, dict) or "tests" not in report:
+        return result
+    for test in report["tests"]:
+        if test.get("nodeid") not in fingerprints:
+            continue
+        fingerprint, operation, _ = fingerprints[test["nodeid"]]
+        if test.get("outcome") == "passed":
+            cache.store(test["nodeid"], fingerprint, operation, test)
+        else:
+            cache.discard(test["nodeid"])
+    if cached:
+        order = {node_id: index for index, node_id in enumerate(node_ids)}
+        report["tests"] = sorted(report["tests"] + list(cached.values()), key=lambda t: order.get(t.get("nodeid"), len(order)))
+        summary = report.setdefault("summary", {})
+        for key in ("passed", "total", "collected"):
+            summary[key] = summary.get(key, 0) + len(cached)
+        summary["cached"] = len(cached)
+    cache.save()
+    result["cached"] = len(cached)
+    logger.info(f"Pytest result cache: {len(cached)} cached, {len(node_ids) - len(cached)} run")
+    return result
+
+def run_postman_cached(collection_path: str, spec: Dict[str, Any], cache: ResultCache, touched: Optional[set] = None,
+                       **kwargs) -> Dict[str, Any]:
+    """
+    Run only the Postman requests whose cached passing result is not valid any more
+    (request or inherited context changed, environment changed, target operation
+    changed, too old, or touched by healing). Cached executions are merged back in
+    collection order with "cached": true. Collections whose scripts set variables
+    are always run in full, since a cached request would not set them for the
+    requests after it.
+    """
+    from healapi.postman_runner import sets_variables
+    touched = touched or set()
+    with open(collection_path, "r", encoding="utf-8") as f:
+        collection = json.load(f)
+    environment_digest = ""
+    if kwargs.get("environment_path"):
+        with open(kwargs["environment_path"], "r", encoding="utf-8") as f:
+            environment_digest = digest(f.read())
+    index = spec_source.spec_index(spec)
+    leaves = []
+    for leaf in _leaf_paths(collection.get("item", [])):
+        parents = []
+        node = collection
+        for position in leaf[:-1]:
+            node = node["item"][position]
+            parents.append(node)
+        leaves.append((leaf, parents, node["item"][leaf[-1]]))
+    chained = sets_variables([collection] + [node for _, parents, item in leaves for node in parents + [item]])
+    if chained:
+        logger.info("Collection scripts set variables; running every request instead of reusing cached results")
+    plan = []
+    for leaf, parents, item in leaves:
+        request = item.get("request") or {}
+        if isinstance(request, str):
+            request = {"method": "GET", "url": request}
+        fingerprint = postman_fingerprint(item, parents, collection, environment_digest)
+        template = index.resolve(request_path(request.get("url")) or "")
+        operation = index.operation_digest(template, request.get("method") or "GET") if template else None
+        url = request.get("url")
+        raw = url.get("raw") if isinstance(url, dict) else url
+        forced = chained or bool(touched & {item.get("name"), item.get("id"), raw, request_path(url)})
+        hit = None if forced else cache.lookup(fingerprint, fingerprint, operation)
+        plan.append((leaf, fingerprint, operation, hit))
+
+    to_run = [leaf for leaf, _, _, hit in plan if not hit]
+    if to_run:
+        with tempfile.TemporaryDirectory(prefix="healapi-cache-") as workdir:
+            sub_path = os.path.join(workdir, "collection.json")
+            with open(sub_path, "w", encoding="utf-8") as f:
+                json.dump(_subcollection(collection, to_run), f)
+            result = run_tests("postman", sub_path, **kwargs)
+    else:
+        result = {"type": "cached", "returncode": 0,
+                  "report": {"collection": {"info": collection.get("info", {})},
+                             "run": {"stats": {}, "timings": {}, "executions": [], "failures": [], "error": None}}}
+    run = (result.get("report") or {}).get("run")
+    if not isinstance(run, dict):
+        return result
+    executed = iter(run.get("executions", []))
+    executions = []
+    cached = 0
+    for position, (leaf, fingerprint, operation, hit) in enumerate(plan):
+        if hit:
+            execution = dict(hit, cached=True)
+            cached += 1
+        else:
+            execution = next(executed, None)
+            if execution is None:
+                continue
+            failed = execution.get("requestError") or any(a.get("error") or a.get("skipped") for a in execution.get("assertions", []))
+            if failed:
+                cache.discard(fingerprint)
+            else:
+                cache.store(fingerprint, fingerprint, operation, {k: execution[k] for k in ("item", "response", "assertions") if k in execution})
+        execution["cursor"] = dict(execution.get("cursor") or {}, position=position, length=len(plan))
+        executions.append(execution)
+    executions.extend(executed)
+    run["executions"] = executions
+    run.setdefault("stats", {})["cached"] = {"total": cached, "pending": 0, "failed": 0}
+    cache.save()
+    result["cached"] = cached
+    logger.info(f"Postman result cache: {cached} cached, {len(plan) - cached} run")
+    return result
+
 def run_tests(test_type: str, test_path: str, **kwargs) -> Dict[str, Any]:
     """
     Run tests based on type ('pytest' or 'postman') and return results.
+    With result_cache (a cache file path) and spec (the new OpenAPI spec), tests
+    with a valid cached result are skipped; see run_pytest_cached/run_postman_cached.
     """
+    if kwargs.get("result_cache"):
+        kwargs = dict(kwargs)
+        cache = ResultCache(kwargs.pop("result_cache"), kwargs.pop("cache_max_age", None))
+        spec = kwargs.pop("spec", None)
+        touched = kwargs.pop("touched", None)
+        if spec is None:
+            logger.warning("Result cache needs the OpenAPI spec; running all tests")
+        elif test_type == "pytest":
+            return run_pytest_cached(test_path, spec, cache, touched, kwargs.get("extra_args"))
+        elif test_type == "postman":
+            return run_postman_cached(test_path, spec, cache, touched, **kwargs)
     if test_type == "pytest":
+        if kwargs.get("shards", 1) != 1:
+            return run_pytest_sharded(test_path, kwargs.get("shards"), kwargs.get("extra_args"), kwargs.get("durations_path"))
         return run_pytest(test_path, kwargs.get("extra_args"))
     elif test_type == "postman":
+        runner = kwargs.get("postman_runner", "auto")
+        if runner == "async":
+            return run_postman_async(test_path, kwargs.get("environment_path"), kwargs.get("request_timeout", 30.0),
+                                     kwargs.get("concurrency", 50), kwargs.get("per_host", 10))
+        if runner == "native" or (runner == "auto" and find_newman() is None):
+            if runner == "auto":
+                logger.info("Newman not found, using the native Postman runner")
+            return run_postman_native(test_path, kwargs.get("environment_path"), kwargs.get("request_timeout", 30.0))
+        if kwargs.get("shards", 1) != 1:
+            return run_newman_sharded(test_path, kwargs.get("environment_path"), kwargs.get("shards"), kwargs.get("shard_strategy", "balanced"))
         return run_newman(test_path, kwargs.get("environment_path"))
     else:
         logger.error(f"Unknown test type: {test_type}")
@@ -0,0 +1,269 @@
+import os
+import copy
+import json
+import time
+import logging
+from collections import ChainMap
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from healapi import diff_engine, healing_engine, openapi_typo_linter, report_generator, result_cache, test_analyzer, test_runner
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Seconds a changed file must stay unchanged before a cycle starts (editors save in steps)
+SETTLE_SECONDS = 0.05
+
+def _signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+class WatchSession:
+    """
+    Warm state for watch mode: parsed specs and their lint results, per-path diff
+    results, test sources or the parsed collection, and per-file healing results.
+
+    Each cycle re-reads only files whose stat signature changed and recomputes only
+    the stages those files feed: a single-endpoint edit re-parses one spec, re-diffs
+    one path and re-heals only the tests whose content or diff input changed.
+    Healing always runs as a dry run (patches are reported, files are not touched).
+    """
+
+    def __init__(self, old_spec_path: str, new_spec_path: str, test_type: str, test_path: str,
+                 heal_options: Optional[Dict[str, Any]] = None, run_tests: bool = False,
+                 test_options: Optional[Dict[str, Any]] = None, report_path: Optional[str] = None):
+        self.old_spec_path = old_spec_path
+        self.new_spec_path = new_spec_path
+        self.test_type = test_type
+        self.test_path = test_path
+        self.heal_options = heal_options or {}
+        self.run_tests = run_tests
+        self.test_options = test_options or {}
+        self.report_path = report_path
+        self._signatures: Dict[str, Optional[Tuple[int, int]]] = {}
+        # spec path -> {"digest", "spec", "typos", "path_digests"}
+        self._specs: Dict[str, Dict[str, Any]] = {}
+        # Per-path diff results and rename matches of the current specs (see diff_engine.diff_specs_cached)
+        self._path_diffs: Dict[Tuple, Any] = {}
+        # pytest file -> (digest, source) / collection (digest, data)
+        self._sources: Dict[str, Tuple[str, str]] = {}
+        self._collection: Optional[Tuple[str, Dict[str, Any]]] = None
+        self._heal_cache: Dict[str, Tuple[str, str, Dict[str, Any]]] = {}
+        self.diff: Optional[Dict[str, Any]] = None
+        self.diff_digest: Optional[str] = None
+        self.affected: List[str] = []
+        self.healing: Dict[str, Any] = {}
+        self.llm_usage: Optional[Dict[str, Any]] = None
+        self.test_results: Dict[str, Any] = {}
+        self.cycles = 0
+
+    # --- change detection --------------------------------------------------------
+
+    def _watched_files(self) -> List[str]:
+        files = [self.old_spec_path, self.new_spec_path]
+        if self.test_type == "pytest":
+            for root, _, names in os.walk(self.test_path):
+                files.extend(os.path.join(root, name) for name in names if name.endswith(".py"))
+        else:
+            files.append(self.test_path)
+            if self.test_options.get("environment_path"):
+                files.append(self.test_options["environment_path"])
+        return files
+
+    def poll(self) -> Set[str]:
+        """Files added, removed or modified since the last poll."""
+        current = {path: _signature(path) for path in self._watched_files()}
+        changed = {path for path, sig in current.items() if self._signatures.get(path) != sig}
+        changed.update(path for path in self._signatures if path not in current)
+        self._signatures = current
+        return changed
+
+    # --- stages ------------------------------------------------------------------
+
+    def _load_spec(self, path: str) -> bool:
+        """(Re)parse and lint one spec; returns True when its content changed."""
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        digest = result_cache.digest(text)
+        cached = self._specs.get(path)
+        if cached and cached["digest"] == digest:
+            return False
+        spec = diff_engine.parse_spec(text, path)
+        self._specs[path] = {
+            "digest": digest,
+            "spec": spec,
+            "typos": openapi_typo_linter.find_typos(spec),
+            "path_digests": diff_engine.path_digests(spec),
+        }
+        return True
+
+    def _diff(self) -> Dict[str, Any]:
+        """diff_specs, reusing per-path results for paths whose definitions are unchanged."""
+        old = self._specs[self.old_spec_path]
+        new = self._specs[self.new_spec_path]
+        # Entries used by this diff land in current; results for outdated definitions are dropped
+        current: Dict[Tuple, Any] = {}
+        diff = diff_engine.diff_specs_cached(old["spec"], new["spec"], ChainMap(current, self._path_diffs),
+                                             old["path_digests"], new["path_digests"])
+        self._path_diffs = current
+        return diff
+
+    def _load_tests(self, changed: Set[str]) -> bool:
+        """Refresh test sources from changed files; returns True when any content changed."""
+        if self.test_type == "postman":
+            if self._collection is not None and self.test_path not in changed:
+                return False
+            with open(self.test_path, "r", encoding="utf-8") as f:
+                text = f.read()
+            digest = result_cache.digest(text)
+            if self._collection and self._collection[0] == digest:
+                return False
+            self._collection = (digest, json.loads(text))
+            return True
+        updated = False
+        for path in list(self._sources):
+            if path in changed and not os.path.exists(path):
+                del self._sources[path]
+                updated = True
+        for path in self._signatures:
+            if not path.endswith(".py") or (path in self._sources and path not in changed):
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                source = f.read()
+            digest = result_cache.digest(source)
+            if self._sources.get(path, (None,))[0] != digest:
+                self._sources[path] = (digest, source)
+                updated = True
+        return updated
+
+    def _heal(self, new_spec: Dict[str, Any]) -> Dict[str, Any]:
+        if self.test_type == "postman":
+            actions, patch = healing_engine.heal_postman_items(copy.deepcopy(self._collection[1]), self.diff, new_spec)
+            return {"healed_postman_requests": actions, "patch": patch}
+        # Re-heal only files whose source or the diff changed since their last healing
+        stale = [path for path in self.affected
+                 if self._heal_cache.get(path, (None, None))[:2] != (self._sources[path][0], self.diff_digest)]
+        if stale:
+            result = healing_engine.heal_pytest_files(stale, self.diff, new_spec, apply=False,
+                                                      sources={p: self._sources[p][1] for p in stale}, **self.heal_options)
+            actions = {a["file"]: a for a in result["healed_pytest_files"]}
+            for path in stale:
+                self._heal_cache[path] = (self._sources[path][0], self.diff_digest, {
+                    "action": actions.get(path), "patch": result["patches"].get(path),
+                })
+            self.llm_usage = result.get("llm_usage")
+        self._heal_cache = {path: entry for path, entry in self._heal_cache.items() if path in self._sources}
+        entries = [(path, self._heal_cache[path][2]) for path in self.affected]
+        healing = {
+            "healed_pytest_files": [e["action"] for _, e in entries if e["action"]],
+            "patches": {path: e["patch"] for path, e in entries if e["patch"]},
+        }
+        if self.llm_usage:
+            # Usage of the most recent healing call that needed the LLM
+            healing["llm_usage"] = self.llm_usage
+        return healing
+
+    def run_cycle(self, changed: Set[str]) -> Dict[str, Any]:
+        """Recompute the stages fed by the changed files; returns per-stage timings."""
+        timings = {}
+        start = time.perf_counter()
+        specs_changed = False
+        for path in (self.old_spec_path, self.new_spec_path):
+            if path in changed or path not in self._specs:
+                specs_changed = self._load_spec(path) or specs_changed
+        timings["parse_lint"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        diff_changed = False
+        if specs_changed or self.diff is None:
+            diff = self._diff()
+            digest = result_cache.digest(diff)
+            diff_changed = digest != self.diff_digest
+            self.diff, self.diff_digest = diff, digest
+        timings["diff"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        tests_changed = self._load_tests(changed)
+        timings["load_tests"] = time.perf_counter() - start
+
+        stale = diff_changed or tests_changed or specs_changed
+        start = time.perf_counter()
+        if stale:
+            if self.test_type == "pytest":
+                self.affected = test_analyzer.analyze_pytest_sources({p: s for p, (_, s) in sorted(self._sources.items())}, self.diff)
+            else:
+                self.affected = test_analyzer.analyze_collection(self._collection[1], self.diff)
+        timings["analyze"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if stale:
+            self.healing = self._heal(self._specs[self.new_spec_path]["spec"])
+        timings["heal"] = time.perf_counter() - start
+
+        environment_changed = self.test_options.get("environment_path") in changed
+        if self.run_tests and (stale or environment_changed):
+            start = time.perf_counter()
+            self.test_results = test_runner.run_tests(self.test_type, self.test_path, **self.test_options)
+            timings["run_tests"] = time.perf_counter() - start
+        self.cycles += 1
+        return {"stale": stale, "timings": {k: round(v * 1000, 2) for k, v in timings.items()}}
+
+    def report(self) -> Dict[str, Any]:
+        report = report_generator.generate_report(self.diff or {}, self.healing, self.test_results, output_path=self.report_path)
+        report["lint"] = {path: self._specs[path]["typos"] for path in (self.old_spec_path, self.new_spec_path) if path in self._specs}
+        return report
+
+def _print_cycle(session: WatchSession, changed: Set[str], result: Dict[str, Any]):
+    names = ", ".join(sorted(os.path.basename(p) for p in changed)) or "initial run"
+    stages = ", ".join(f"{stage} {ms}ms" for stage, ms in result["timings"].items())
+    print(f"\n[WATCH] Cycle {session.cycles} ({names}): {stages}")
+    report = session.report()
+    for path, typos in report["lint"].items():
+        for t in typos:
+            print(f"  [LINT] {path}: {t['path']}: '{t['typo']}' -> '{t['suggestion']}'")
+    if result["stale"]:
+        print(report_generator.summarize_report(report))
+    else:
+        print("  No content changes affecting the diff or tests.")
+
+def watch(old_spec_path: str, new_spec_path: str, test_type: str, test_path: str, interval: float = 0.5,
+          heal_options: Optional[Dict[str, Any]] = None, run_tests: bool = False, test_options: Optional[Dict[str, Any]] = None,
+          report_path: Optional[str] = None, on_cycle: Optional[Callable[[WatchSession, Set[str], Dict[str, Any]], None]] = None,
+          max_cycles: Optional[int] = None) -> WatchSession:
+    """
+    Poll the specs and tests every `interval` seconds and re-run the affected stages
+    on change, keeping all parsed state warm between cycles. Runs until interrupted
+    (or for max_cycles cycles).
+    """
+    session = WatchSession(old_spec_path, new_spec_path, test_type, test_path, heal_options, run_tests, test_options, report_path)
+    on_cycle = on_cycle or _print_cycle
+    changed = session.poll()
+    try:
+        while max_cycles is None or session.cycles < max_cycles:
+            if changed:
+                # Wait for the writes to settle before reading
+                time.sleep(SETTLE_SECONDS)
+                changed |= session.poll()
+                try:
+                    result = session.run_cycle(changed)
+                    on_cycle(session, changed, result)
+                except Exception as e:
+                    # e.g. a half-written YAML file: keep the last good state until the next save
+                    logger.error(f"Watch cycle failed (keeping previous state): {e}")
+                    session.cycles += 1
+            time.sleep(interval)
+            changed = session.poll()
+    except KeyboardInterrupt:
+        print("\n[WATCH] Stopped.")
+    return session
+
+# Example usage:
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) != 5:
+        print("Usage: python -m healapi.watch <old_spec> <new_spec> <postman|pytest> <test_path>")
+        sys.exit(1)
+    watch(sys.argv[1], sys.argv[2], sys.argv[3], sys.argv[4])
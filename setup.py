@@ -6,7 +6,7 @@ setup(
     description="Self-Healing API Test Automation System",
     author="Niranjan C",
     author_email="niranjanlite@gmail.com",  # <-- Add your email here
-    packages=find_packages(),
+    packages=find_packages(exclude=["tests", "tests.*"]),
     install_requires=[
         "pyyaml",
         "jsonschema",
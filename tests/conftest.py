@@ -0,0 +1,43 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class _APIHandler(BaseHTTPRequestHandler):
+    """GET /users/<id> returns a user, POST echoes its JSON body, anything else is a 404."""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        parts = [p for p in self.path.split("?", 1)[0].split("/") if p]
+        if len(parts) == 2 and parts[0] == "users":
+            self._send(200, {"id": parts[1], "name": "Ada", "auth": self.headers.get("Authorization")})
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self._send(201, json.loads(self.rfile.read(length) or b"{}"))
+
+
+@pytest.fixture
+def api_server():
+    """Base URL of a local JSON API (see _APIHandler) running for one test."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _APIHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
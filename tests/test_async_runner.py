@@ -0,0 +1,55 @@
+import asyncio
+import json
+
+from healapi import async_runner
+
+SPEC = {"info": {"title": "Users"}, "paths": {
+    "/users/{id}": {"parameters": [{"name": "id", "in": "path", "required": True, "schema": {"example": 3}}],
+                    "get": {"responses": {"200": {}, "404": {}}}, "delete": {"responses": {"204": {}}}},
+    "/users/{id}/avatar": {"get": {"parameters": [{"name": "id", "in": "path", "required": True}], "responses": {"200": {}}}},
+    "/missing": {"get": {"responses": {"200": {}}}},
+}}
+
+
+def test_client_reuses_keepalive_connections(api_server):
+    async def run():
+        client = async_runner.AsyncHTTPClient(concurrency=4, per_host=2)
+        try:
+            responses = await asyncio.gather(*(client.request("GET", f"{api_server}/users/{i}") for i in range(20)))
+            echoed = await client.request("POST", f"{api_server}/users", {"Content-Type": "application/json"}, b'{"a": 1}')
+        finally:
+            await client.close()
+        return responses, echoed, client.connections_opened
+
+    responses, echoed, opened = asyncio.run(run())
+    assert [r.json()["id"] for r in responses] == [str(i) for i in range(20)]
+    assert echoed.code == 201 and echoed.json() == {"a": 1}
+    assert opened <= 2
+
+
+def test_smoke_items_only_safe_resolvable_operations():
+    items = async_runner.smoke_items(SPEC)
+    assert [(i["name"], i["request"]["url"]) for i in items] == [("GET /users/{id}", "{{baseUrl}}/users/3"),
+                                                                 ("GET /missing", "{{baseUrl}}/missing")]
+    assert "[200,404]" in items[0]["event"][0]["script"]["exec"][1].replace(" ", "")
+
+
+def test_run_smoke_checks_against_a_local_server(api_server):
+    report = async_runner.run_smoke_checks(SPEC, api_server, concurrency=4)
+    assert report["run"]["stats"]["requests"]["total"] == 2
+    assert report["run"]["stats"]["assertions"]["failed"] == 1
+
+
+def test_variable_chaining_collections_run_in_order(tmp_path, api_server):
+    collection = {"variable": [{"key": "baseUrl", "value": api_server}], "item": [
+        {"name": "first", "request": {"method": "GET", "url": "{{baseUrl}}/users/1"},
+         "event": [{"listen": "test", "script": {"exec": ["pm.environment.set(\"next\", \"10\");"]}}]},
+        {"name": "second", "request": {"method": "GET", "url": "{{baseUrl}}/users/{{next}}"},
+         "event": [{"listen": "test", "script": {"exec": ["pm.test(\"chained\", function () { pm.expect(pm.response.json().id).to.eql('10'); });"]}}]},
+    ]}
+    path = tmp_path / "collection.json"
+    path.write_text(json.dumps(collection))
+    seen = []
+    report = async_runner.run_collection_async(str(path), concurrency=8, on_result=lambda e: seen.append(e["item"]["name"]))
+    assert seen == ["first", "second"]
+    assert report["run"]["stats"]["assertions"] == {"total": 1, "pending": 0, "failed": 0}
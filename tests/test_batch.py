@@ -0,0 +1,73 @@
+import json
+import os
+
+import pytest
+
+from healapi import batch, report_writer
+
+OLD_SPEC = {"openapi": "3.0.0", "paths": {"/users/{id}": {"get": {"responses": {"200": {}}}},
+                                          "/orders": {"get": {"responses": {"200": {}}}}}}
+NEW_SPEC = {"openapi": "3.0.0", "paths": {"/users/{id}": {"get": {"responses": {"200": {}}}}}}
+
+
+def _write_json(path, data):
+    path.write_text(json.dumps(data))
+    return str(path)
+
+
+def _manifest(tmp_path, jobs, defaults=None):
+    return _write_json(tmp_path / "manifest.json", {"defaults": defaults or {}, "jobs": jobs})
+
+
+def test_load_manifest_applies_defaults_and_resolves_paths(tmp_path):
+    path = _manifest(tmp_path, [{"name": "a", "test_path": "a.json"}, {"test_path": "b.json", "old_spec": "git:HEAD~1:api.yaml"}],
+                     {"old_spec": "specs/old.yaml", "new_spec": "specs/new.yaml", "test_type": "postman"})
+    first, second = batch.load_manifest(path)
+    assert first["old_spec"] == str(tmp_path / "specs" / "old.yaml") and first["test_path"] == str(tmp_path / "a.json")
+    assert second["name"] == "job-2" and second["old_spec"] == "git:HEAD~1:api.yaml"
+
+
+@pytest.mark.parametrize("jobs, message", [
+    ([{"name": "a", "old_spec": "o", "new_spec": "n", "test_type": "postman"}], "missing test_path"),
+    ([{"name": "a", "old_spec": "o", "new_spec": "n", "test_type": "jest", "test_path": "t"}], "unknown test_type"),
+    ([{"name": "a", "old_spec": "o", "new_spec": "n", "test_type": "postman", "test_path": "t"}] * 2, "duplicate job name"),
+    ([{"name": n, "old_spec": "o", "new_spec": n, "test_type": "postman", "test_path": "t", "apply": True} for n in "ab"], "both write"),
+    ([{"name": n, "old_spec": "o", "new_spec": n, "test_type": "postman", "test_path": n, "result_cache": "c"} for n in "ab"], "both write"),
+])
+def test_load_manifest_rejects_invalid_jobs(tmp_path, jobs, message):
+    with pytest.raises(ValueError, match=message):
+        batch.load_manifest(_manifest(tmp_path, jobs))
+
+
+def test_job_key_ignores_output_names():
+    job = {"name": "a", "old_spec": "o", "new_spec": "n", "report_path": "a.json", "log_path": "a.log"}
+    assert batch.job_key(job) == batch.job_key(dict(job, name="b", report_path="b.json"))
+    assert batch.job_key(job) != batch.job_key(dict(job, new_spec="m"))
+
+
+def test_run_batch_shares_work_and_writes_reports(tmp_path, api_server):
+    collection = {"variable": [{"key": "baseUrl", "value": api_server}], "item": [
+        {"name": "user", "request": {"method": "GET", "url": {"raw": "{{baseUrl}}/users/1"}},
+         "event": [{"listen": "test", "script": {"exec": ["pm.test(\"ok\", function () { pm.response.to.have.status(200); });"]}}]},
+        {"name": "orders", "request": {"method": "GET", "url": {"raw": "{{baseUrl}}/orders"}}},
+    ]}
+    _write_json(tmp_path / "old.json", OLD_SPEC)
+    _write_json(tmp_path / "new.json", NEW_SPEC)
+    _write_json(tmp_path / "collection.json", collection)
+    path = _manifest(tmp_path, [{"name": "first"}, {"name": "second"}, {"name": "broken", "test_path": "missing.json"},
+                                {"name": "no spec", "new_spec": "nope.json"}],
+                     {"old_spec": "old.json", "new_spec": "new.json", "test_type": "postman", "test_path": "collection.json",
+                      "postman_runner": "native"})
+    out_dir = str(tmp_path / "out")
+
+    report = batch.run_batch(batch.load_manifest(path), out_dir, workers=2)
+    jobs = {entry["name"]: entry for entry in report["jobs"]}
+    assert report["summary"]["unique_jobs"] == 3 and report["summary"]["distinct_diffs"] == 1
+    assert jobs["first"]["status"] == "ok" and jobs["first"]["summary"]
+    assert jobs["second"]["duplicate_of"] == "first"
+    assert jobs["broken"]["status"] == "error" and "missing.json" in jobs["broken"]["error"]
+    assert jobs["no spec"]["status"] == "error" and "nope.json" in jobs["no spec"]["error"]
+    assert report["summary"]["statuses"] == {"ok": 2, "error": 2}
+    assert os.path.exists(jobs["first"]["report_path"]) and os.path.exists(jobs["broken"]["log_path"])
+    assert report_writer.load_summary(os.path.join(out_dir, "batch_report.json")) == report["summary"]
+    assert "= first" in batch.summarize_batch(report)
@@ -0,0 +1,54 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import healapi
+from healapi import cli
+
+OLD_SPEC = {"openapi": "3.0.0", "paths": {"/users": {"get": {"responses": {"200": {}}}},
+                                          "/orders": {"get": {"responses": {"200": {}}}}}}
+NEW_SPEC = {"openapi": "3.0.0", "paths": {"/users": {"get": {"responses": {"200": {}}}},
+                                          "/invoices": {"get": {"respnses": {"200": {}}}}}}
+
+
+@pytest.fixture
+def specs(tmp_path):
+    old, new = tmp_path / "old.json", tmp_path / "new.json"
+    old.write_text(json.dumps(OLD_SPEC))
+    new.write_text(json.dumps(NEW_SPEC))
+    return str(old), str(new)
+
+
+def test_import_loads_submodules_lazily():
+    code = "import sys, healapi; print(sorted(m for m in sys.modules if m.startswith('healapi.') or m in ('yaml', 'astor')))"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    loaded = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=root).stdout
+    assert loaded.strip() == "[]"
+    assert healapi.latency.__name__ == "healapi.latency"
+    assert "diff_engine" in dir(healapi)
+    with pytest.raises(AttributeError):
+        healapi.not_a_module
+
+
+def test_diff_subcommand(specs, capsys):
+    cli.main(["diff", *specs])
+    diff = json.loads(capsys.readouterr().out)
+    assert diff["removed_endpoints"] == ["/orders"] and diff["added_endpoints"] == ["/invoices"]
+
+
+def test_lint_subcommand_fails_on_typos(specs, capsys):
+    assert cli.main(["lint", specs[1]]) == 1
+    assert "'respnses' -> 'responses'" in capsys.readouterr().out
+    assert cli.main(["lint", specs[0]]) is None
+
+
+def test_analyze_subcommand(specs, tmp_path, capsys):
+    collection = tmp_path / "collection.json"
+    collection.write_text(json.dumps({"item": [
+        {"name": "orders", "request": {"method": "GET", "url": {"raw": "{{baseUrl}}/orders"}}},
+        {"name": "users", "request": {"method": "GET", "url": {"raw": "{{baseUrl}}/users"}}}]}))
+    cli.main(["analyze", "--old-spec", specs[0], "--new-spec", specs[1], "--test-type", "postman", "--test-path", str(collection)])
+    assert json.loads(capsys.readouterr().out) == ["orders"]
@@ -0,0 +1,97 @@
+import copy
+import json
+
+from healapi import healing_engine
+from healapi.patching import apply_json_patch
+
+USER = {"content": {"application/json": {"schema": {"properties": {"id": {}, "email": {}, "full_name": {}}}}}}
+NEW_SPEC = {"paths": {
+    "/customers/{id}": {"get": {"responses": {"200": USER}}},
+    "/users": {"get": {"responses": {"200": USER}}, "post": {"responses": {"201": USER}}},
+}}
+DIFF = {
+    "renamed_endpoints": [{"from": "/users/{id}", "to": "/customers/{id}"}],
+    "removed_endpoints": ["/orders"],
+    "property_changes": [{"path": "/users", "method": "post", "removed_properties": ["name"], "added_properties": ["full_name"]}],
+}
+
+
+def _request(method, path, body=None, tests=None):
+    request = {"method": method, "url": {"raw": "{{apiurl}}" + path, "path": path.strip("/").split("/")}}
+    if body is not None:
+        request["body"] = {"mode": "raw", "raw": json.dumps(body)}
+    item = {"name": f"{method} {path}", "request": request}
+    if tests:
+        item["event"] = [{"listen": "test", "script": {"type": "text/javascript", "exec": tests}}]
+    return item
+
+
+def _collection():
+    return {"item": [
+        {"name": "users", "item": [
+            {"name": "by id", "item": [_request("GET", "/users/{id}?verbose=1", tests=["pm.expect(jsonData).to.have.property('emial');"])]},
+            _request("POST", "/users", body={"name": "Ada", "email": "a@x"}, tests=["pm.expect(jsonData).to.have.property('name');"]),
+            _request("GET", "/users", tests=["pm.expect(jsonData).to.have.property('zzzz');"]),
+        ]},
+        _request("DELETE", "/orders"),
+        {"name": "empty folder", "item": []},
+    ]}
+
+
+def test_heals_nested_renames_removals_and_bodies_per_method():
+    original = _collection()
+    collection = copy.deepcopy(original)
+    actions, patch = healing_engine.heal_postman_items(collection, DIFF, NEW_SPEC)
+
+    renamed = collection["item"][0]["item"][0]["item"][0]
+    assert renamed["name"] == "GET /customers/{id}"
+    assert renamed["request"]["url"] == {"raw": "{{apiurl}}/customers/{id}?verbose=1", "path": ["customers", "{id}"]}
+    assert renamed["event"][0]["script"]["exec"] == ["pm.expect(jsonData).to.have.property('email');"]
+
+    post, get = collection["item"][0]["item"][1:]
+    assert json.loads(post["request"]["body"]["raw"]) == {"email": "a@x", "full_name": "<patched>"}
+    assert post["event"][0]["script"]["exec"] == ["pm.expect(jsonData).to.have.property('full_name');"]
+    # Property changes are keyed by method: the GET on the same path keeps its script
+    assert get == original["item"][0]["item"][2]
+
+    assert [item["name"] for item in collection["item"]] == ["users", "empty folder"]
+    assert {"request": "/orders", "action": "removed-deleted-endpoint"} in actions
+    assert {"request": "/users/{id}", "action": "renamed-to /customers/{id}"} in actions
+    assert apply_json_patch(original, patch) == collection
+
+
+def test_unchanged_collection_yields_no_patch():
+    collection = {"item": [_request("GET", "/users", tests=["pm.expect(jsonData).to.have.property('email');"])]}
+    assert healing_engine.heal_postman_items(collection, {}, NEW_SPEC) == ([], [])
+
+
+def test_auto_detected_renames_keep_other_host_variables():
+    collection = {"item": [{"request": {"method": "GET", "url": "{{base}}/user/{id}"}}]}
+    actions, _ = healing_engine.heal_postman_items(collection, {"removed_endpoints": ["/user/{id}"], "added_endpoints": ["/users/{id}"]},
+                                                   {"paths": {"/users/{id}": {"get": {}}}})
+    assert collection["item"][0]["request"]["url"] == "{{base}}/users/{id}"
+    assert actions[0] == {"request": "/user/{id}", "action": "auto-detected-rename-to /users/{id}"}
+
+
+def test_heal_postman_collection_writes_only_when_applied_and_changed(tmp_path):
+    source = tmp_path / "collection.json"
+    source.write_text(json.dumps(_collection()))
+    before = source.read_text()
+
+    dry_run = healing_engine.heal_postman_collection(str(source), DIFF, NEW_SPEC, apply=False)
+    assert dry_run["patch"] and dry_run["written_to"] is None and source.read_text() == before
+
+    output = tmp_path / "healed.json"
+    result = healing_engine.heal_postman_collection(str(source), DIFF, NEW_SPEC, output_path=str(output))
+    assert result["written_to"] == str(output) and source.read_text() == before
+    assert apply_json_patch(json.loads(before), result["patch"]) == json.loads(output.read_text())
+    assert healing_engine.healed_test_path(result, str(source)) == str(output)
+
+    unchanged = healing_engine.heal_postman_collection(str(output), {}, NEW_SPEC)
+    assert unchanged["patch"] == [] and unchanged["written_to"] is None
+    assert healing_engine.healed_test_path(unchanged, str(output)) == str(output)
+
+
+def test_unreadable_collection_is_reported(tmp_path):
+    result = healing_engine.heal_postman_collection(str(tmp_path / "missing.json"), DIFF, NEW_SPEC)
+    assert result["healed_postman_requests"][0]["action"] == "error" and result["written_to"] is None
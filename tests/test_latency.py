@@ -0,0 +1,62 @@
+import pytest
+
+from healapi import latency
+from healapi.run_history import HistoryStore
+
+
+def _results(*timings):
+    executions = [{"item": {"name": path, "request": {"method": method, "url": {"raw": "{{baseUrl}}" + path}}},
+                   "response": {"code": 200, "responseTime": time_ms}, "assertions": []}
+                  for method, path, time_ms in timings]
+    return {"type": "postman", "report": {"run": {"executions": executions}}}
+
+
+def test_percentile_interpolates_between_ranks():
+    assert latency.percentile([1, 2, 3, 4], 50) == 2.5
+    assert latency.percentile([5], 95) == 5
+    assert latency.percentile([10, 0], 100) == 10
+    with pytest.raises(ValueError):
+        latency.percentile([], 50)
+
+
+def test_endpoint_samples_skip_cached_and_errored_executions():
+    results = _results(("get", "/users/1", 10), ("GET", "/users/1", 20), ("POST", "/users", 5))
+    executions = results["report"]["run"]["executions"]
+    executions.append(dict(executions[0], cached=True))
+    executions.append(dict(executions[0], requestError={"message": "refused"}))
+    assert latency.endpoint_samples(results) == {"GET /users/1": [10.0, 20.0], "POST /users": [5.0]}
+    assert latency.aggregate_run(results)["GET /users/1"] == {"count": 2, "min": 10.0, "mean": 15.0, "p50": 15.0,
+                                                              "p95": 19.5, "max": 20.0}
+
+
+def test_mann_whitney_exact_small_samples():
+    # All three current values above all three baseline values: 1 of C(6, 3) arrangements
+    assert latency.mann_whitney_greater([4, 5, 6], [1, 2, 3]) == {"u": 9.0, "p_value": pytest.approx(1 / 20)}
+    assert latency.mann_whitney_greater([1, 2, 3], [4, 5, 6])["p_value"] == pytest.approx(1.0)
+
+
+def test_mann_whitney_normal_approximation_with_ties():
+    slower = latency.mann_whitney_greater([20] * 10 + [25] * 10, [10] * 10 + [20] * 10)
+    assert slower["p_value"] < 0.001
+    assert latency.mann_whitney_greater([10] * 5, [10] * 5)["p_value"] == 1.0
+
+
+def test_compare_flags_only_significant_large_regressions():
+    baseline = {"GET /a": [10, 11, 12, 10, 11, 12, 10, 11], "GET /b": [10, 11, 12, 10, 11, 12, 10, 11], "GET /c": [1, 2]}
+    current = {"GET /a": [30, 31, 32, 33, 34], "GET /b": [11, 12, 11, 12, 13], "GET /c": [100, 100], "GET /d": [1]}
+    results = {entry["endpoint"]: entry for entry in latency.compare(current, baseline)}
+    assert results["GET /a"]["regressed"] and results["GET /a"]["p_value"] < 0.05
+    assert not results["GET /b"]["regressed"]
+    assert not results["GET /c"]["regressed"] and results["GET /c"]["baseline_p95"] is None
+    assert results["GET /d"]["baseline_samples"] == 0
+
+
+def test_latency_section_compares_against_history(tmp_path):
+    db = str(tmp_path / "history.db")
+    with HistoryStore(db) as store:
+        for run in range(3):
+            store.record_run({"test_results": _results(*[("GET", "/a", 10 + i % 3) for i in range(4)])})
+    section = latency.latency_section(_results(*[("GET", "/a", 40 + i) for i in range(5)]), db)
+    assert section["endpoints"]["GET /a"]["count"] == 5
+    assert [entry["endpoint"] for entry in section["regressions"]] == ["GET /a"]
+    assert latency.latency_section(_results())["comparison"] == []
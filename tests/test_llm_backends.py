@@ -0,0 +1,65 @@
+import pytest
+
+from healapi import llm_backends, llm_stub
+
+
+@pytest.fixture
+def stub_backends():
+    yield
+    llm_backends.shutdown_stub_servers()
+
+
+def test_rule_based_response_echoes_test_code():
+    prompt = "broken\nHere is the test code:\ndef test_x():\n    assert True\nHere is the new OpenAPI schema:\n{}"
+    response = llm_stub.rule_based_response(prompt)
+    assert "```python\ndef test_x():\n    assert True\n```" in response
+    assert llm_stub.rule_based_response("anything else") == "```json\n{}\n```"
+
+
+def test_canned_responses_match_before_default():
+    canned = {"responses": [{"match": "orders", "response": "A"}], "default": "B"}
+    assert llm_stub.stub_response("heal the orders test", canned) == "A"
+    assert llm_stub.stub_response("heal the users test", canned) == "B"
+
+
+def test_stub_backend_streams_the_stub_response(stub_backends):
+    backend = llm_backends.get_backend("stub", stub_options={"chunk_size": 4})
+    stream = backend.stream_chat(backend.resolve_model(None), [{"role": "user", "content": "hello"}])
+    chunks = list(stream)
+    assert len(chunks) > 1
+    assert "".join(chunks) == "```json\n{}\n```"
+    assert stream.usage["prompt_tokens"] > 0 and stream.usage["completion_tokens"] == len("".join(chunks)) // 4
+    assert not hasattr(backend, "last_usage")
+
+
+def test_early_closed_stub_streams_report_usage_so_far(stub_backends):
+    backend = llm_backends.get_backend("stub", stub_options={"chunk_size": 4})
+    stream = backend.stream_chat("m", [{"role": "user", "content": "hello"}])
+    assert next(stream) == "```j"
+    stream.close()
+    assert stream.usage["completion_tokens"] == 1
+    with pytest.raises(StopIteration):
+        next(stream)
+
+
+def test_backends_must_implement_stream_chat():
+    with pytest.raises(TypeError):
+        llm_backends.LLMBackend()
+
+
+def test_stub_backends_share_one_server_per_options(stub_backends):
+    first = llm_backends.get_backend("stub")
+    second = llm_backends.get_backend("stub")
+    other = llm_backends.get_backend("stub", stub_options={"latency": 0.01})
+    assert first.base_url == second.base_url
+    assert other.base_url != first.base_url
+    assert len(llm_backends._stub_servers) == 2
+    llm_backends.shutdown_stub_servers()
+    assert llm_backends._stub_servers == {}
+
+
+def test_unknown_backend_raises():
+    with pytest.raises(ValueError):
+        llm_backends.get_backend("nope")
+    with pytest.raises(ValueError):
+        llm_backends.get_backend("openai")
@@ -0,0 +1,96 @@
+import threading
+import time
+
+from healapi.llm_backends import ChatStream, LLMBackend
+from healapi.llm_budget import LLMScheduler, estimate_tokens
+
+
+class FakeBackend(LLMBackend):
+    """Streams a canned python block, recording the per-call timeouts it was given."""
+    name = "fake"
+
+    def __init__(self, delay=0.0, timeout=60.0):
+        self.delay = delay
+        self.timeout = timeout
+        self.timeouts = []
+
+    def stream_chat(self, model, messages, timeout=None):
+        self.timeouts.append(timeout)
+        return ChatStream(lambda stream: self._chunks(stream, messages))
+
+    def _chunks(self, stream, messages):
+        time.sleep(self.delay)
+        for chunk in ("```python\n", "x = 1\n", "```\n"):
+            # Report the prompt size as its usage, so records show which call they belong to
+            stream.usage = {"prompt_tokens": len(messages[0]["content"]), "completion_tokens": 1}
+            yield chunk
+            time.sleep(self.delay)
+
+
+def _candidates(*impacts):
+    return [{"key": f"test_{i}.py", "impact": impact, "prompt": "p" * 40} for i, impact in enumerate(impacts)]
+
+
+def test_estimate_tokens():
+    assert estimate_tokens(0) == 0
+    assert estimate_tokens(3) == 1
+    assert estimate_tokens(400) == 100
+
+
+def test_runs_highest_impact_first_and_reports_results():
+    results = []
+    scheduler = LLMScheduler(FakeBackend(), "m")
+    calls = scheduler.run(_candidates(1, 5, 3), on_result=lambda c, a: results.append((c["key"], a.payload)))
+    assert [c["key"] for c in calls] == ["test_1.py", "test_2.py", "test_0.py"]
+    assert all(c["outcome"] == "ok" for c in calls)
+    assert results[0] == ("test_1.py", "x = 1")
+    assert scheduler.summary()["calls"] == 3
+
+
+def test_token_budget_skips_remaining_candidates():
+    scheduler = LLMScheduler(FakeBackend(), "m", max_tokens=42)
+    calls = scheduler.run(_candidates(3, 2, 1))
+    assert calls[0]["outcome"] == "ok"
+    assert {c["outcome"] for c in calls[1:]} == {"skipped-budget"}
+    assert scheduler.summary()["outcomes"]["skipped-budget"] == 2
+
+
+def test_time_budget_bounds_per_call_timeout_without_touching_the_backend():
+    backend = FakeBackend(delay=0.2, timeout=60.0)
+    scheduler = LLMScheduler(backend, "m", max_seconds=0.3)
+    calls = scheduler.run(_candidates(3, 2, 1))
+    assert backend.timeout == 60.0
+    assert backend.timeouts[0] <= 0.3
+    assert calls[-1]["outcome"] == "skipped-budget"
+
+
+def test_backend_errors_are_recorded():
+    class FailingBackend(FakeBackend):
+        def stream_chat(self, model, messages, timeout=None):
+            raise TimeoutError("slow")
+
+    calls = LLMScheduler(FailingBackend(), "m").run(_candidates(1))
+    assert calls[0]["outcome"] == "timeout"
+    assert calls[0]["error"] == "slow"
+
+
+def test_usage_is_attributed_per_call_on_a_shared_backend():
+    backend = FakeBackend(delay=0.01)
+    schedulers = [LLMScheduler(backend, "m") for _ in range(4)]
+    threads = [threading.Thread(target=scheduler.run, args=([{"key": "t", "prompt": "p" * (10 * (i + 1))}],))
+               for i, scheduler in enumerate(schedulers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [s.calls[0]["prompt_tokens"] for s in schedulers] == [10, 20, 30, 40]
+    assert all(s.calls[0]["completion_tokens"] == 1 for s in schedulers)
+
+
+def test_streams_without_usage_fall_back_to_estimates():
+    class SilentBackend(FakeBackend):
+        def stream_chat(self, model, messages, timeout=None):
+            return iter(["```python\nx = 1\n```\n"])
+
+    calls = LLMScheduler(SilentBackend(), "m").run(_candidates(1))
+    assert (calls[0]["prompt_tokens"], calls[0]["completion_tokens"]) == (10, 5)
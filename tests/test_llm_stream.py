@@ -0,0 +1,66 @@
+import pytest
+
+from healapi.llm_stream import ResponseAssembler, assemble_stream, extract_payload
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_json_object_in_prose_any_chunking(size):
+    text = 'Sure! The path {id} stays.\nHere: {"a": {"b": "}"}, "c": [1]} and that is all.'
+    assembler = ResponseAssembler("json")
+    for chunk in _chunks(text, size):
+        if assembler.feed(chunk):
+            break
+    assert assembler.complete
+    assert assembler.value == {"a": {"b": "}"}, "c": [1]}
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 1000])
+def test_python_fence_any_chunking(size):
+    text = "Fixed:\n```python\ndef test_x():\n    assert 1 == 1\n```\nDone."
+    assembler = ResponseAssembler("python")
+    for chunk in _chunks(text, size):
+        assembler.feed(chunk)
+    assert assembler.payload == "def test_x():\n    assert 1 == 1"
+
+
+def test_invalid_fence_is_skipped_for_the_next_one():
+    text = "```python\ndef broken(:\n```\n```python\nx = 1\n```"
+    assert extract_payload(text, "python") == "x = 1"
+
+
+def test_json_fence_ignored_for_python():
+    text = '```json\n{"a": 1}\n```\n```py\ny = 2\n```'
+    assert extract_payload(text, "python") == "y = 2"
+
+
+def test_unterminated_fence_falls_back_on_finish():
+    assembler = ResponseAssembler("python")
+    assembler.feed("```python\nx = 1\n")
+    assert not assembler.complete
+    assert assembler.finish() == "x = 1"
+
+
+def test_no_payload():
+    assert extract_payload("no code here", "json") is None
+
+
+def test_assemble_stream_stops_reading_at_the_first_payload():
+    consumed = []
+
+    def stream():
+        for chunk in ['{"a":', ' 1}', " trailing", " prose"]:
+            consumed.append(chunk)
+            yield chunk
+
+    assembler = assemble_stream(stream(), "json")
+    assert assembler.value == {"a": 1}
+    assert consumed == ['{"a":', ' 1}']
+
+
+def test_unknown_kind_raises():
+    with pytest.raises(ValueError):
+        ResponseAssembler("yaml")
@@ -0,0 +1,91 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from healapi import mock_server
+from healapi.mock_server import MockAPI, PathMatcher
+
+SPEC = {
+    "openapi": "3.0.0",
+    "servers": [{"url": "http://localhost/api/v1"}],
+    "paths": {
+        "/users/{id}": {"get": {"responses": {"200": {"content": {"application/json": {
+            "schema": {"$ref": "#/components/schemas/User"}}}}}},
+            "delete": {"responses": {"204": {}}}},
+        "/users/me": {"get": {"responses": {"200": {"content": {"application/json": {"example": {"me": True}}}}}}},
+        "/files/{name}.{ext}": {"get": {"responses": {"default": {"content": {"text/plain": {"schema": {"type": "string"}}}}}}},
+    },
+    "components": {"schemas": {
+        "User": {"type": "object", "properties": {
+            "id": {"type": "integer", "minimum": 10}, "email": {"type": "string", "format": "email"},
+            "tags": {"type": "array", "items": {"enum": ["a", "b"]}, "minItems": 2},
+            "manager": {"$ref": "#/components/schemas/User"}}},
+    }},
+}
+
+
+def test_path_matcher_prefers_literal_segments():
+    matcher = PathMatcher(["/users/{id}", "/users/me", "/users/{id}/orders/{order}", "/files/{name}.{ext}"])
+    assert matcher.match("/users/me") == ("/users/me", {})
+    assert matcher.match("/users/7") == ("/users/{id}", {"id": "7"})
+    assert matcher.match("/users/me/orders/3") == ("/users/{id}/orders/{order}", {"id": "me", "order": "3"})
+    assert matcher.match("/files/report.tar.gz") == ("/files/{name}.{ext}", {"name": "report", "ext": "tar.gz"})
+    assert matcher.match("/users") is None and matcher.match("/users/7/orders") is None
+
+
+def test_example_for_honors_schema_keywords():
+    user = mock_server.example_for({"$ref": "#/components/schemas/User"}, SPEC)
+    assert (user["id"], user["email"], user["tags"]) == (10, "user@example.com", ["a", "a"])
+    depth = 0
+    while isinstance(user, dict):
+        user, depth = user["manager"], depth + 1
+    assert depth <= mock_server.MAX_EXAMPLE_DEPTH
+    assert mock_server.example_for({"type": ["string", "null"], "minLength": 8}, SPEC) == "stringxx"
+    assert mock_server.example_for({"allOf": [{"properties": {"a": {"type": "boolean"}}}, {"example": {"b": 1}}]}, SPEC) == {"a": True, "b": 1}
+
+
+@pytest.mark.parametrize("responses, status", [
+    ({"404": {}, "201": {}, "200": {}}, 200),
+    ({"default": {}, "404": {}}, 200),
+    ({"500": {}, "404": {}}, 404),
+    ({}, 200),
+])
+def test_pick_response(responses, status):
+    assert mock_server.pick_response({"responses": responses})[0] == status
+
+
+def test_mock_api_routes_with_and_without_server_prefix():
+    api = MockAPI(SPEC)
+    assert api.route("/api/v1/users/1") == api.route("/users/1") == "/users/{id}"
+    assert api.route("/api/v2/users/1") is None
+    assert api.response("/users/{id}", "delete") == (204, {}, b"")
+    assert api.response("/users/{id}", "post") is None
+    assert api.allowed_methods("/users/{id}") == ["GET", "DELETE"]
+    assert api.warm() == 4
+
+
+def test_server_answers_examples(tmp_path):
+    server = mock_server.start_mock_server(SPEC)
+    url = mock_server.server_url(server)
+    try:
+        with urllib.request.urlopen(f"{url}/api/v1/users/me") as response:
+            assert json.load(response) == {"me": True}
+        with urllib.request.urlopen(f"{url}/files/a.txt") as response:
+            assert response.headers["Content-Type"] == "text/plain" and response.read() == b"string"
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(urllib.request.Request(f"{url}/users/1", method="PUT"))
+        assert error.value.code == 405 and error.value.headers["Allow"] == "GET, DELETE"
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{url}/nothing")
+        assert error.value.code == 404
+    finally:
+        mock_server.stop_mock_server(server)
+
+    environment = tmp_path / "env.json"
+    base = tmp_path / "base.json"
+    base.write_text(json.dumps({"values": [{"key": "token", "value": "t"}, {"key": "baseUrl", "value": "old"}]}))
+    mock_server.write_mock_environment(str(environment), url, base_path=str(base))
+    values = {v["key"]: v["value"] for v in json.loads(environment.read_text())["values"]}
+    assert values == {"token": "t", "apiurl": url, "baseUrl": url}
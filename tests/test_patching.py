@@ -0,0 +1,107 @@
+import copy
+import json
+import os
+import stat
+
+import pytest
+
+from healapi import patching
+
+
+def test_json_pointer_escapes_tilde_and_slash():
+    assert patching.json_pointer("item", 0, "a/b~c") == "/item/0/a~1b~0c"
+
+
+def test_apply_json_patch_add_remove_replace_test():
+    doc = {"item": [{"name": "a"}, {"name": "b"}], "info": {"name": "old"}}
+    patch = [
+        {"op": "test", "path": "/info/name", "value": "old"},
+        {"op": "replace", "path": "/info/name", "value": "new"},
+        {"op": "add", "path": "/item/-", "value": {"name": "c"}},
+        {"op": "remove", "path": "/item/0"},
+        {"op": "add", "path": "/info/a~1b", "value": 1},
+    ]
+    result = patching.apply_json_patch(doc, patch)
+    assert result == {"item": [{"name": "b"}, {"name": "c"}], "info": {"name": "new", "a/b": 1}}
+
+
+def test_apply_json_patch_failed_test_raises():
+    with pytest.raises(ValueError):
+        patching.apply_json_patch({"a": 1}, [{"op": "test", "path": "/a", "value": 2}])
+
+
+def test_apply_json_patch_replace_missing_member_raises():
+    with pytest.raises(ValueError):
+        patching.apply_json_patch({"a": 1}, [{"op": "replace", "path": "/b", "value": 2}])
+
+
+def test_healed_collection_patch_round_trips():
+    from healapi import healing_engine
+    collection = {"item": [{"name": "folder", "item": [
+        {"name": "list users", "request": {"method": "GET", "url": {"raw": "{{baseUrl}}/users", "path": ["users"]}}},
+        {"name": "list orders", "request": {"method": "GET", "url": {"raw": "{{baseUrl}}/orders", "path": ["orders"]}}},
+    ]}]}
+    diff = {"added_endpoints": [], "removed_endpoints": ["/orders"], "changed_endpoints": [], "property_changes": [],
+            "renamed_endpoints": [{"from": "/users", "to": "/accounts"}]}
+    healed = copy.deepcopy(collection)
+    _, patch = healing_engine.heal_postman_items(healed, diff, {"paths": {"/accounts": {"get": {}}}})
+    assert patch and healed != collection
+    assert patching.apply_json_patch(copy.deepcopy(collection), patch) == healed
+
+
+@pytest.mark.parametrize("old, new", [
+    ("a\nb\nc\n", "a\nB\nc\n"),
+    ("a\nb\nc", "a\nb\nc\nd"),
+    ("a\nb\n", "a\nb"),
+    ("", "x\n"),
+    ("x\n", ""),
+    ("".join(f"line {i}\n" for i in range(40)), "".join(f"line {i}\n" for i in range(40) if i not in (3, 30)) + "end"),
+])
+def test_unified_diff_round_trips(old, new):
+    diff_text = patching.make_unified_diff("tests/test_x.py", old, new)
+    assert diff_text.startswith("--- a/tests/test_x.py")
+    assert patching.apply_unified_diff(old, diff_text) == new
+
+
+def test_apply_unified_diff_rejects_mismatched_context():
+    diff_text = patching.make_unified_diff("f.py", "a\nb\n", "a\nc\n")
+    with pytest.raises(ValueError):
+        patching.apply_unified_diff("a\nx\n", diff_text)
+
+
+def test_write_atomic_keeps_file_mode(tmp_path):
+    path = tmp_path / "collection.json"
+    path.write_text("old")
+    os.chmod(path, 0o640)
+    patching.write_atomic(str(path), "new")
+    assert path.read_text() == "new"
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+    assert os.listdir(tmp_path) == ["collection.json"]
+
+
+def test_write_atomic_new_file_gets_umask_mode(tmp_path):
+    path = tmp_path / "new.json"
+    patching.write_json_atomic(str(path), {"a": 1})
+    assert json.loads(path.read_text()) == {"a": 1}
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o666 & ~patching.current_umask()
+
+
+def test_write_atomic_follows_umask_changes_after_import(tmp_path):
+    previous = os.umask(0o077)
+    try:
+        assert patching.current_umask() == 0o077
+        patching.write_atomic(str(tmp_path / "private.txt"), "x")
+    finally:
+        os.umask(previous)
+    assert stat.S_IMODE(os.stat(tmp_path / "private.txt").st_mode) == 0o600
+
+
+def test_apply_healing_writes_only_patched_files(tmp_path):
+    source = tmp_path / "test_a.py"
+    source.write_text("x = 1\n")
+    untouched = tmp_path / "test_b.py"
+    untouched.write_text("y = 1\n")
+    healing = {"patches": {str(source): patching.make_unified_diff(str(source), "x = 1\n", "x = 2\n"), str(untouched): ""}}
+    assert patching.apply_healing(healing) == [str(source)]
+    assert source.read_text() == "x = 2\n"
+    assert untouched.read_text() == "y = 1\n"
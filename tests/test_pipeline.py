@@ -0,0 +1,86 @@
+import json
+import threading
+
+import pytest
+
+from healapi.pipeline import Channel, StageScheduler, build_pipeline
+
+
+def test_channel_drains_batches_until_closed():
+    channel = Channel()
+    channel.put(1)
+    channel.put(2)
+    assert channel.drain() == [1, 2]
+    channel.put(3)
+    channel.close()
+    assert channel.drain() == [3]
+    assert channel.drain() is None
+
+    empty = Channel()
+    empty.close()
+    assert empty.drain() is None
+
+
+def test_channel_streams_between_threads():
+    channel, seen = Channel(), []
+
+    def consume():
+        while (batch := channel.drain()) is not None:
+            seen.extend(batch)
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    for i in range(5):
+        channel.put(i)
+    channel.close()
+    consumer.join(5)
+    assert seen == list(range(5))
+
+
+def test_scheduler_runs_tasks_after_their_dependencies():
+    scheduler = StageScheduler()
+    scheduler.add("a", lambda r: 1)
+    scheduler.add("b", lambda r: 2)
+    scheduler.add("sum", lambda r: r["a"] + r["b"], ["a", "b"])
+    assert scheduler.run()["sum"] == 3
+    timeline = {record["task"]: record for record in scheduler.timeline}
+    assert timeline["sum"]["start_ms"] >= max(timeline["a"]["end_ms"], timeline["b"]["end_ms"])
+    assert "Wall time" in scheduler.timeline_table()
+    assert [record["stage"] for record in scheduler.profile_records()][-1] == "sum"
+
+
+def test_scheduler_skips_tasks_downstream_of_failures():
+    def fail(r):
+        raise RuntimeError("boom")
+    scheduler = StageScheduler()
+    scheduler.add("fail", fail)
+    scheduler.add("ok", lambda r: "ok")
+    scheduler.add("after", lambda r: None, ["fail"])
+    scheduler.add("last", lambda r: None, ["after", "ok"])
+    assert scheduler.run() == {"ok": "ok"}
+    assert scheduler.errors == {"fail": "boom"} and scheduler.skipped == ["after", "last"]
+    with pytest.raises(ValueError):
+        scheduler.add("orphan", lambda r: None, ["missing"])
+
+
+def test_postman_pipeline_runs_the_healed_collection(tmp_path, api_server):
+    old_spec = {"openapi": "3.0.0", "paths": {"/users/{id}": {"get": {"responses": {"200": {}}}},
+                                              "/orders": {"get": {"responses": {"200": {}}}}}}
+    new_spec = {"openapi": "3.0.0", "paths": {"/users/{id}": {"get": {"responses": {"200": {}}}}}}
+    collection = {"variable": [{"key": "baseUrl", "value": api_server}], "item": [
+        {"name": "user", "request": {"method": "GET", "url": {"raw": "{{baseUrl}}/users/1"}}},
+        {"name": "orders", "request": {"method": "GET", "url": {"raw": "{{baseUrl}}/orders"}}}]}
+    paths = {}
+    for name, data in (("old", old_spec), ("new", new_spec), ("collection", collection)):
+        paths[name] = tmp_path / f"{name}.json"
+        paths[name].write_text(json.dumps(data))
+    healed = tmp_path / "healed.json"
+
+    pipeline = build_pipeline(str(paths["old"]), str(paths["new"]), "postman", str(paths["collection"]),
+                              heal_options={"output_path": str(healed)}, test_options={"postman_runner": "native"}, profile=True)
+    results = pipeline.run()
+    assert not pipeline.errors
+    assert results["analyze"] == ["orders"]
+    assert [item["name"] for item in json.loads(healed.read_text())["item"]] == ["user"]
+    assert json.loads(paths["collection"].read_text()) == collection
+    assert [e["item"]["name"] for e in results["run tests"]["report"]["run"]["executions"]] == ["user"]
+    assert {record["stage"] for record in results["report"]["profile"]} >= {"diff", "heal", "run tests"}
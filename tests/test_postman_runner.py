@@ -0,0 +1,90 @@
+import json
+
+from healapi import postman_runner
+from healapi.postman_runner import ResponseView
+
+
+def _response(payload, code=200):
+    return ResponseView(code, "", {"Content-Type": "application/json"}, json.dumps(payload).encode("utf-8"), 12.0)
+
+
+def test_substitute_nested_and_unknown_variables():
+    variables = {"host": "{{scheme}}://api", "scheme": "https"}
+    assert postman_runner.substitute("{{host}}/users/{{id}}", variables) == "https://api/users/{{id}}"
+    assert postman_runner.substitute({"a": ["{{scheme}}"]}, variables) == {"a": ["https"]}
+
+
+def test_build_request_resolves_url_headers_auth_and_body():
+    request = {"method": "post", "url": {"raw": "{{baseUrl}}/users"},
+               "header": [{"key": "X-Trace", "value": "{{trace}}"}, {"key": "X-Off", "value": "1", "disabled": True}],
+               "body": {"mode": "raw", "raw": "{\"name\": \"{{name}}\"}", "options": {"raw": {"language": "json"}}}}
+    auth = {"type": "bearer", "bearer": [{"key": "token", "value": "{{token}}"}]}
+    sent = postman_runner.build_request(request, {"baseUrl": "localhost:1", "trace": "t", "name": "Ada", "token": "s"}, auth)
+    assert sent["method"] == "POST"
+    assert sent["url"] == "http://localhost:1/users"
+    assert sent["headers"] == {"X-Trace": "t", "Authorization": "Bearer s", "Content-Type": "application/json"}
+    assert json.loads(sent["body"]) == {"name": "Ada"}
+
+
+def test_run_test_script_reports_passes_failures_and_skips():
+    lines = [
+        "var jsonData = pm.response.json();",
+        "pm.test(\"Status code is 200\", function () {",
+        "    pm.response.to.have.status(200);",
+        "});",
+        "pm.test(\"Has name\", function () {",
+        "    pm.expect(jsonData).to.have.property('name');",
+        "    pm.expect(jsonData.name).to.eql('Ada');",
+        "});",
+        "pm.test(\"Has email\", function () {",
+        "    pm.expect(jsonData).to.have.property('email');",
+        "});",
+        "pm.test(\"Custom\", function () {",
+        "    someLibrary.check(jsonData);",
+        "});",
+    ]
+    variables = {}
+    assertions = postman_runner.run_test_script(lines, _response({"name": "Ada"}), variables)
+    assert [a["assertion"] for a in assertions] == ["Status code is 200", "Has name", "Has email", "Custom"]
+    assert "error" not in assertions[0] and "error" not in assertions[1]
+    assert assertions[2]["error"]["name"] == "AssertionError"
+    assert assertions[3]["skipped"]
+
+
+def test_json_declarations_bind_the_selected_value():
+    lines = [
+        "var user = pm.response.json().data;",
+        "const first = pm.response.json().items[0]",
+        "let body = pm.response.json();",
+        "pm.test(\"ids\", function () {",
+        "    pm.expect(user.id).to.eql(5);",
+        "    pm.expect(first.id).to.eql(7);",
+        "    pm.expect(body.id).to.eql(1);",
+        "});",
+    ]
+    response = _response({"data": {"id": 5}, "items": [{"id": 7}], "id": 1})
+    assert "error" not in postman_runner.run_test_script(lines, response, {})[0]
+
+
+def test_run_collection_against_a_local_server(tmp_path, api_server):
+    collection = {
+        "info": {"name": "c"},
+        "variable": [{"key": "baseUrl", "value": api_server}],
+        "auth": {"type": "bearer", "bearer": [{"key": "token", "value": "abc"}]},
+        "item": [{"name": "users", "item": [
+            {"name": "get user", "request": {"method": "GET", "url": {"raw": "{{baseUrl}}/users/7"}},
+             "event": [{"listen": "test", "script": {"exec": [
+                 "pm.test(\"ok\", function () { pm.response.to.have.status(200); });",
+                 "pm.test(\"auth\", function () { pm.expect(pm.response.json().auth).to.eql('Bearer abc'); });",
+             ]}}]},
+            {"name": "missing", "request": {"method": "GET", "url": {"raw": "{{baseUrl}}/nope"}},
+             "event": [{"listen": "test", "script": {"exec": ["pm.test(\"ok\", function () { pm.response.to.have.status(200); });"]}}]},
+        ]}],
+    }
+    path = tmp_path / "collection.json"
+    path.write_text(json.dumps(collection))
+    report = postman_runner.run_collection(str(path))
+    stats = report["run"]["stats"]
+    assert stats["requests"]["total"] == 2
+    assert stats["assertions"] == {"total": 3, "pending": 0, "failed": 1}
+    assert [e["response"]["code"] for e in report["run"]["executions"]] == [200, 404]
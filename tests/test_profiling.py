@@ -0,0 +1,54 @@
+import os
+import threading
+import tracemalloc
+
+from healapi import profiling
+from healapi.profiling import Profiler
+
+
+def test_stages_and_steps_record_timings_and_peaks():
+    with Profiler() as profiler:
+        with profiling.stage("heal"):
+            with profiling.step("allocate", file="a.py") as record:
+                data = bytearray(2 * 1024 * 1024)
+                record["bytes"] = len(data)
+                del data
+    assert not tracemalloc.is_tracing()
+    step, stage = profiler.records
+    assert (step["stage"], step["step"], step["file"], step["bytes"]) == ("heal", "allocate", "a.py", 2 * 1024 * 1024)
+    assert step["peak_kb"] >= 2048 and stage["peak_kb"] >= step["peak_kb"]
+    assert stage["step"] is None and stage["wall_ms"] >= step["wall_ms"]
+    assert {"cpu_ms", "child_cpu_ms"} <= set(stage)
+
+
+def test_steps_on_other_threads_have_no_memory_peak():
+    with Profiler() as profiler:
+        with profiler.stage("run"):
+            thread_records = []
+
+            def work():
+                with profiling.step("worker") as record:
+                    thread_records.append(record)
+
+            worker = threading.Thread(target=work)
+            worker.start()
+            worker.join()
+    assert thread_records[0]["stage"] == "run" and thread_records[0]["peak_kb"] is None
+
+
+def test_module_helpers_are_no_ops_without_a_profiler():
+    with profiling.stage("x") as record, profiling.step("y") as step_record:
+        assert record == {} and step_record == {}
+
+
+def test_cprofile_dumps_and_timing_table(tmp_path):
+    with Profiler(cprofile_dir=str(tmp_path / "prof"), trace_memory=False) as profiler:
+        with profiler.stage("diff / analyze"):
+            with profiler.step("walk"):
+                sum(range(1000))
+    stage = profiler.records[-1]
+    assert os.path.basename(stage["cprofile"]) == "diff_analyze.prof" and os.path.exists(stage["cprofile"])
+    assert stage["peak_kb"] is None
+    lines = profiler.table().splitlines()
+    assert lines[2].strip().startswith("diff / analyze") and lines[3].strip().startswith("walk")
+    assert lines[3].split("|")[-1].strip() == "-"
@@ -0,0 +1,70 @@
+import io
+import json
+
+import pytest
+
+from healapi import report_stream
+from healapi.report_stream import JsonStreamReader, select
+
+DOCUMENT = {
+    "big": {"nested": [{"s": "a \"quoted\" } ] string\\", "n": [-2.5e3, 0, 1e-7]}] * 5, "esc": "\\u00e9"},
+    "keep": {"a": 1, "b": [True, False, None], "c": "é"},
+    "list": [{"x": i, "y": "skip me" * i} for i in range(4)],
+    "num": 123456789,
+}
+
+
+def _reader(text, chunk_size):
+    return JsonStreamReader(io.StringIO(text), chunk_size=chunk_size)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, 1 << 20])
+def test_select_keeps_only_selected_fields_for_any_chunking(chunk_size):
+    text = json.dumps(DOCUMENT, indent=1)
+    fields = {"keep": True, "list": {"x": True}, "num": str}
+    assert select(_reader(text, chunk_size), fields) == {
+        "keep": DOCUMENT["keep"], "list": [{"x": i} for i in range(4)], "num": "123456789"}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1 << 20])
+def test_read_and_skip_values(chunk_size):
+    reader = _reader(json.dumps([DOCUMENT["big"], -2.5e3, "x", DOCUMENT["keep"]]), chunk_size)
+    reader.expect("[")
+    reader.skip_value()
+    reader.expect(",")
+    assert reader.read_value() == -2.5e3
+    reader.expect(",")
+    reader.skip_value()
+    reader.expect(",")
+    assert reader.read_value() == DOCUMENT["keep"]
+    reader.expect("]")
+
+
+def test_truncated_document_raises():
+    with pytest.raises(ValueError):
+        select(_reader('{"a": [1, 2', 4), {"a": True})
+    with pytest.raises(ValueError):
+        _reader('"unterminated', 4).skip_value()
+
+
+def test_truncate_output_keeps_head_and_tail():
+    text = "a" * 10 + "b" * 10
+    assert report_stream.truncate_output(text, 10) == "aaaaa\n... [10 characters truncated] ...\nbbbbb"
+    assert report_stream.truncate_output(text, 100) == text
+    assert report_stream.truncate_output(None) is None
+
+
+def test_load_newman_report_drops_bodies(tmp_path):
+    report = {"collection": {"info": {"name": "c"}, "item": [{"huge": "tree"}]},
+              "run": {"stats": {"requests": {"total": 1}}, "executions": [{
+                  "id": "e1", "item": {"name": "get", "event": ["dropped"]},
+                  "response": {"code": 200, "stream": {"data": [1, 2, 3]}},
+                  "assertions": [{"assertion": "ok", "error": {"message": "m" * 50000, "stack": "dropped"}}]}]}}
+    path = tmp_path / "newman.json"
+    path.write_text(json.dumps(report))
+    loaded = report_stream.load_newman_report(str(path))
+    assert loaded["collection"] == {"info": {"name": "c"}}
+    execution = loaded["run"]["executions"][0]
+    assert execution["item"] == {"name": "get"} and execution["response"] == {"code": 200}
+    assert len(execution["assertions"][0]["error"]["message"]) < 50000
+    assert "stack" not in execution["assertions"][0]["error"]
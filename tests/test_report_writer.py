@@ -0,0 +1,86 @@
+import json
+import os
+import stat
+
+import pytest
+
+from healapi import report_writer
+from healapi.report_writer import ARTIFACT_KEY, ReportWriter
+
+
+@pytest.mark.parametrize("name", ["report.json", "report.json.gz"])
+def test_sections_round_trip_with_side_files(tmp_path, name):
+    path = str(tmp_path / name)
+    big = [{"i": i, "text": "x" * 50} for i in range(100)]
+    artifacts = report_writer.write_report(path, {"summary": {"passed": 3}, "tests": {"small": [1, 2], "big": big}},
+                                           artifact_threshold=1024)
+    assert len(artifacts) == 1
+    assert report_writer.load_summary(path) == {"passed": 3}
+    tests = report_writer.load_section(path, "tests")
+    assert tests["small"] == [1, 2]
+    assert ARTIFACT_KEY in tests["big"] and tests["big"]["bytes"] == artifacts[tests["big"][ARTIFACT_KEY]]
+    assert report_writer.load_section(path, "tests", resolve=True)["big"] == big
+    with report_writer.open_text(path, "rt") as f:
+        assert json.load(f)["summary"] == {"passed": 3}
+
+
+def test_identical_artifacts_are_stored_once(tmp_path):
+    path = str(tmp_path / "report.json")
+    big = "y" * 4096
+    artifacts = report_writer.write_report(path, {"a": {"one": big, "two": big}}, artifact_threshold=100)
+    assert len(artifacts) == 1
+    assert os.listdir(f"{path}.artifacts") == list(artifacts)
+
+
+def test_report_without_summary_first(tmp_path):
+    path = str(tmp_path / "report.json")
+    report_writer.write_report(path, {"tests": [], "summary": {}})
+    assert report_writer.load_summary(path) is None
+
+
+def test_close_keeps_the_replaced_report_mode(tmp_path):
+    path = tmp_path / "report.json"
+    path.write_text("{}")
+    os.chmod(path, 0o644)
+    report_writer.write_report(str(path), {"summary": {}})
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+
+
+def test_failed_write_leaves_no_report(tmp_path):
+    path = tmp_path / "report.json"
+    with pytest.raises(RuntimeError):
+        with ReportWriter(str(path)) as writer:
+            writer.write_section("summary", {})
+            raise RuntimeError("boom")
+    assert os.listdir(tmp_path) == []
+
+
+def test_unknown_compression_raises(tmp_path):
+    with pytest.raises(ValueError):
+        report_writer.open_text(str(tmp_path / "x"), "wt", "lz4")
+
+
+def test_large_summary_stays_inline(tmp_path):
+    from healapi import report_generator
+    executions = [{"item": {"name": f"request {i}"}, "response": {"code": 500},
+                   "assertions": [{"assertion": "ok", "error": {"message": f"failed {i}"}}]} for i in range(2000)]
+    test_results = {"type": "postman", "report": {"run": {"executions": executions, "failures": executions}}}
+    path = str(tmp_path / "report.json")
+    report = report_generator.generate_report({}, {}, test_results, output_path=path, report_format="sections",
+                                              artifact_threshold=10000)
+    assert os.listdir(f"{path}.artifacts")
+    assert report_writer.load_summary(path) == report["summary"]
+    assert report_generator.report_summary(path)["endpoint_results"][-1] == ["request 1999", "Fail"]
+    assert "request 1999" in report_generator.summarize_report({"summary": report_generator.report_summary(path)})
+
+
+def test_summary_side_files_of_older_reports_are_resolved(tmp_path):
+    path = str(tmp_path / "report.json")
+    with ReportWriter(path, artifact_threshold=10) as writer:
+        writer.write_section("other", {"big": "x" * 100})
+    with open(path, encoding="utf-8") as f:
+        section = json.load(f)["other"]
+    # Rewrite as a summary section holding an artifact reference, as earlier versions wrote them
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"summary": section}, f)
+    assert report_writer.load_summary(path) == {"big": "x" * 100}
@@ -0,0 +1,126 @@
+import copy
+import json
+import time
+
+from healapi import healing_engine, result_cache, test_runner
+from healapi.result_cache import ResultCache, SpecIndex
+
+SPEC = {
+    "paths": {
+        "/users/{id}": {"get": {"responses": {"200": {"content": {"application/json": {
+            "schema": {"$ref": "#/components/schemas/User"}}}}}}},
+        "/users/me": {"get": {"responses": {"200": {}}}},
+        "/orders": {"get": {"responses": {"200": {}}}},
+    },
+    "components": {"schemas": {"User": {"properties": {"address": {"$ref": "#/components/schemas/Address"}}},
+                               "Address": {"properties": {"city": {}}}}},
+}
+
+
+def test_digest_is_stable_across_key_order():
+    assert result_cache.digest({"a": 1, "b": 2}) == result_cache.digest({"b": 2, "a": 1})
+    assert result_cache.digest("x") == result_cache.digest(b"x")
+
+
+def test_resolve_prefers_the_most_literal_template():
+    index = SpecIndex(SPEC)
+    assert index.resolve("/users/7") == "/users/{id}"
+    assert index.resolve("/users/me") == "/users/me"
+    assert index.resolve("/users/{{userId}}") == "/users/{id}"
+    assert index.resolve("/users/7/avatar") is None
+
+
+def test_operation_digest_follows_nested_refs():
+    changed = copy.deepcopy(SPEC)
+    changed["components"]["schemas"]["Address"]["properties"]["zip"] = {}
+    before, after = SpecIndex(SPEC), SpecIndex(changed)
+    assert before.operation_digest("/users/{id}", "GET") != after.operation_digest("/users/{id}", "get")
+    assert before.operation_digest("/orders", "get") == after.operation_digest("/orders", "get")
+    assert before.operation_digest("/orders", "post") is None
+
+
+def test_request_path_and_pytest_test_paths():
+    assert result_cache.request_path({"raw": "{{baseUrl}}/users/1?x=1"}) == "/users/1"
+    assert result_cache.request_path({"path": ["users", "1"]}) == "/users/1"
+    assert result_cache.request_path("https://api.example.com/orders#top") == "/orders"
+    source = 'def test_a():\n    get(BASE + "/users/1?x=1")\n\nclass T:\n    def test_b(self):\n        get("http://h/orders")\n'
+    assert result_cache.pytest_test_paths(source) == {"test_a": ["/users/1"], "test_b": ["/orders"]}
+
+
+def test_result_cache_validity_and_persistence(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = ResultCache(path)
+    assert cache.lookup("k", "f", "op") is None
+    cache.store("k", "f", "op", {"outcome": "passed"})
+    cache.store("uncacheable", "f", None, {"outcome": "passed"})
+    cache.save()
+
+    reloaded = ResultCache(path)
+    assert reloaded.lookup("k", "f", "op") == {"outcome": "passed"}
+    assert reloaded.lookup("k", "f2", "op") is None
+    assert reloaded.lookup("k", "f", "op2") is None
+    assert "uncacheable" not in reloaded.entries
+    assert (reloaded.hits, reloaded.misses) == (1, 2)
+
+    assert ResultCache(path, max_age=10).lookup("k", "f", "op") is not None
+    stale = ResultCache(path, max_age=10)
+    stale.entries["k"]["recorded_at"] = time.time() - 100
+    assert stale.lookup("k", "f", "op") is None
+
+
+def test_healed_tests_collects_touched_identifiers():
+    healing = {"healed_postman_requests": [{"request": "get user"}],
+               "healed_pytest_files": [{"file": "tests/a.py", "action": "patched"}, {"file": "tests/b.py", "action": "no_change"}],
+               "patches": {"tests/./c.py": "diff"}}
+    assert result_cache.healed_tests(healing) == {"get user", "tests/a.py", "tests/c.py"}
+    renamed = {"healed_postman_requests": [{"request": "/people/{id}", "action": "renamed-to /users/{id}"}]}
+    assert result_cache.healed_tests(renamed) == {"/people/{id}", "/users/{id}"}
+
+
+def test_postman_run_reuses_passing_results(tmp_path, api_server):
+    spec = {"paths": {"/users/{id}": {"get": {"responses": {"200": {}}}}}}
+    collection = {"variable": [{"key": "baseUrl", "value": api_server}], "item": [
+        {"name": "user", "request": {"method": "GET", "url": {"raw": "{{baseUrl}}/users/1"}},
+         "event": [{"listen": "test", "script": {"exec": ["pm.test(\"ok\", function () { pm.response.to.have.status(200); });"]}}]},
+        {"name": "missing", "request": {"method": "GET", "url": {"raw": "{{baseUrl}}/users/1/x"}}},
+    ]}
+    collection_path = tmp_path / "collection.json"
+    collection_path.write_text(json.dumps(collection))
+    options = {"result_cache": str(tmp_path / "cache.json"), "spec": spec, "postman_runner": "native"}
+
+    assert test_runner.run_tests("postman", str(collection_path), **options)["cached"] == 0
+    second = test_runner.run_tests("postman", str(collection_path), **options)
+    assert second["cached"] == 1
+    assert [e["item"]["name"] for e in second["report"]["run"]["executions"]] == ["user", "missing"]
+    assert test_runner.run_tests("postman", str(collection_path), touched={"user"}, **options)["cached"] == 0
+
+    changed = {"paths": {"/users/{id}": {"get": {"responses": {"200": {}, "404": {}}}}}}
+    assert test_runner.run_tests("postman", str(collection_path), **dict(options, spec=changed))["cached"] == 0
+
+
+def test_renamed_postman_requests_are_rerun(tmp_path, api_server):
+    collection_path = tmp_path / "collection.json"
+    collection_path.write_text(json.dumps({"variable": [{"key": "baseUrl", "value": api_server}], "item": [
+        {"name": "person", "request": {"method": "GET", "url": {"raw": "{{baseUrl}}/people/{id}"}}},
+    ]}))
+    spec = {"paths": {"/users/{id}": {"get": {"responses": {"200": {}}}}}}
+    healed_path = str(tmp_path / "healed.json")
+    healing = healing_engine.heal_postman_collection(str(collection_path), {"renamed_endpoints": [{"from": "/people/{id}", "to": "/users/{id}"}]},
+                                                     spec, output_path=healed_path)
+    options = {"result_cache": str(tmp_path / "cache.json"), "spec": spec, "postman_runner": "native"}
+    test_runner.run_tests("postman", healed_path, **options)
+    assert test_runner.run_tests("postman", healed_path, **options)["cached"] == 1
+    assert test_runner.run_tests("postman", healed_path, touched=result_cache.healed_tests(healing), **options)["cached"] == 0
+
+
+def test_postman_collections_chaining_variables_always_run_in_full(tmp_path, api_server):
+    collection_path = tmp_path / "collection.json"
+    collection_path.write_text(json.dumps({"variable": [{"key": "baseUrl", "value": api_server}], "item": [
+        {"name": "login", "request": {"method": "GET", "url": {"raw": "{{baseUrl}}/users/1"}},
+         "event": [{"listen": "test", "script": {"exec": ["pm.environment.set('userId', pm.response.json().id);"]}}]},
+        {"name": "user", "request": {"method": "GET", "url": {"raw": "{{baseUrl}}/users/{{userId}}"}}},
+    ]}))
+    options = {"result_cache": str(tmp_path / "cache.json"), "spec": {"paths": {"/users/{id}": {"get": {}}}}, "postman_runner": "native"}
+    test_runner.run_tests("postman", str(collection_path), **options)
+    second = test_runner.run_tests("postman", str(collection_path), **options)
+    assert second["cached"] == 0 and len(second["report"]["run"]["executions"]) == 2
@@ -0,0 +1,94 @@
+import json
+import sqlite3
+
+import pytest
+
+from healapi import report_writer, run_history
+from healapi.run_history import HistoryStore
+
+
+def _execution(name, path, passed, time_ms=10, method="GET"):
+    assertions = [{"assertion": "ok"} if passed else {"assertion": "ok", "error": {"message": f"{name} broke"}}]
+    return {"item": {"name": name, "request": {"method": method, "url": {"raw": "{{baseUrl}}" + path}}},
+            "response": {"code": 200 if passed else 500, "responseTime": time_ms}, "assertions": assertions}
+
+
+def _report(*executions, diff=None, healing=None):
+    return {"api_diff": diff or {}, "healing_actions": healing or {},
+            "test_results": {"type": "postman", "report": {"run": {
+                "timings": {"started": 0, "completed": 25}, "executions": list(executions)}}}}
+
+
+def test_record_run_summarises_results_changes_and_healing(tmp_path):
+    diff = {"removed_endpoints": ["/orders"], "renamed_endpoints": [{"from": "/users", "to": "/accounts"}],
+            "property_changes": [{"path": "/accounts", "method": "get", "added_properties": ["b", "a"]}]}
+    healing = {"healed_postman_requests": [{"request": "orders", "action": "removed"}]}
+    with HistoryStore(str(tmp_path / "h.db")) as store:
+        run_id = store.record_run(_report(_execution("users", "/users/1", True), _execution("orders", "/orders", False),
+                                          diff=diff, healing=healing))
+        run = store.runs()[0]
+        assert run["id"] == run_id
+        assert (run["passed"], run["failed"], run["removed"], run["renamed"], run["healing_actions"]) == (1, 1, 1, 1, 1)
+        assert run["duration_ms"] == 25
+        changes = {c["kind"]: json.loads(c["detail"]) for c in store.endpoint_changes("/accounts")}
+        assert changes == {"renamed": {"from": "/users"}, "properties": {"added": ["a", "b"], "removed": []}}
+        assert store.healing_history("orders")[0]["action"] == "removed"
+        assert store.endpoint_history("/users/1")[0]["status"] == "pass"
+
+
+def test_failing_streaks(tmp_path):
+    with HistoryStore(str(tmp_path / "h.db")) as store:
+        store.record_run(_report(_execution("a", "/a", True), _execution("b", "/b", False)))
+        second = store.record_run(_report(_execution("a", "/a", False), _execution("b", "/b", False)))
+        third = store.record_run(_report(_execution("a", "/a", False), _execution("b", "/b", True)))
+        assert store.failing_since("a")["id"] == second
+        assert store.failing_since("b") is None
+        assert [(row["name"], row["failing_since_run"]) for row in store.failing()] == [("a", second)]
+        assert store.runs(limit=1)[0]["id"] == third
+
+
+def test_slowest_and_latency_baseline(tmp_path):
+    with HistoryStore(str(tmp_path / "h.db")) as store:
+        for time_ms in (10, 20, 30):
+            store.record_run(_report(_execution("fast", "/fast", True, 1), _execution("slow", "/slow", True, time_ms)))
+        assert [row["name"] for row in store.slowest()] == ["slow", "fast"]
+        assert store.slowest(last_runs=1)[0]["avg_ms"] == 30
+        assert store.latency_baseline(["GET /slow", "POST /slow"], runs=2) == {"GET /slow": [20, 30], "POST /slow": []}
+
+
+def test_pytest_rows():
+    report = {"report": {"duration": 0.5, "tests": [
+        {"nodeid": "tests/test_a.py::test_x", "outcome": "failed", "call": {"duration": 0.25, "crash": {"message": "boom"}}},
+        {"nodeid": "tests/test_a.py::test_y", "outcome": "xfailed"},
+    ]}}
+    rows = run_history.result_rows(report)
+    assert rows[0][3:] == ("tests/test_a.py", None, "fail", None, 250.0, 0, "boom")
+    assert rows[1][5] == "skipped"
+
+
+def test_import_sectioned_report_file(tmp_path):
+    path = str(tmp_path / "report.json.gz")
+    report_writer.write_report(path, dict(_report(_execution("a", "/a", True)), summary={}), artifact_threshold=64)
+    with HistoryStore(str(tmp_path / "h.db")) as store:
+        run_history.import_report_file(store, path)
+        assert store.runs()[0]["report_path"] == path
+        assert store.endpoint_history("a")[0]["status"] == "pass"
+
+
+def test_unknown_schema_version_is_rejected(tmp_path):
+    path = str(tmp_path / "h.db")
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA user_version=99")
+    conn.close()
+    with pytest.raises(ValueError):
+        HistoryStore(path)
+
+
+def test_cli_fails_without_a_database(tmp_path, capsys):
+    db = str(tmp_path / "history.db")
+    assert run_history.main(["--db", db, "runs"]) == 1
+    assert "No history database" in capsys.readouterr().out
+    with HistoryStore(db):
+        pass
+    assert run_history.main(["--db", db, "runs"]) is None
+    assert json.loads(capsys.readouterr().out) == []
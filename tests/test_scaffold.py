@@ -0,0 +1,77 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from healapi import diff_engine, mock_server, postman_runner, scaffold
+
+OLD_SPEC = {"openapi": "3.0.0", "paths": {"/users": {"get": {"responses": {"200": {}}}}}}
+NEW_SPEC = {
+    "openapi": "3.0.0",
+    "paths": {
+        "/users": {"get": {"responses": {"200": {}}},
+                   "post": {"requestBody": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/NewUser"}}}},
+                            "responses": {"201": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/User"}}}}}}},
+        "/users/{id}/avatar": {"parameters": [{"name": "id", "in": "path", "schema": {"type": "integer", "minimum": 42}}],
+                               "get": {"responses": {"200": {"content": {"application/json": {"schema": {
+                                   "allOf": [{"$ref": "#/components/schemas/NewUser"}, {"properties": {"url": {"type": "string"}}}]}}}}}}},
+    },
+    "components": {"schemas": {
+        "NewUser": {"type": "object", "properties": {"name": {"type": "string"}}},
+        "User": {"allOf": [{"$ref": "#/components/schemas/NewUser"}, {"properties": {"id": {"type": "integer"}}}]},
+    }},
+}
+
+
+@pytest.fixture
+def scaffolded():
+    return scaffold.scaffold_tests(diff_engine.diff_specs(OLD_SPEC, NEW_SPEC), NEW_SPEC)
+
+
+def test_added_operations_include_new_methods_of_existing_paths():
+    diff = diff_engine.diff_specs(OLD_SPEC, NEW_SPEC)
+    assert scaffold.added_operations(diff, NEW_SPEC) == [("/users", "post"), ("/users/{id}/avatar", "get")]
+
+
+def test_scaffolded_requests_and_tests(scaffolded):
+    post, avatar = scaffolded["postman_items"]
+    assert post["name"] == "POST /users" and json.loads(post["request"]["body"]["raw"]) == {"name": "string"}
+    assert "    pm.response.to.have.status(201);" in post["event"][0]["script"]["exec"]
+    assert "    pm.expect(jsonData).to.have.property('id');" in post["event"][0]["script"]["exec"]
+    assert avatar["request"]["url"]["raw"] == "{{apiurl}}/users/42/avatar"
+    (name, source), = scaffolded["pytest_files"].items()
+    assert name == "test_scaffold_0000.py"
+    assert "def test_post_users():" in source and "json={'name': 'string'}" in source
+    assert 'assert "url" in data' in source
+
+
+def test_scaffold_folder_only_adds_new_requests(scaffolded):
+    collection = {"item": [{"name": "GET /users", "request": {}}]}
+    once = scaffold.add_to_collection(collection, scaffolded["postman_items"])
+    twice = scaffold.add_to_collection(once, scaffolded["postman_items"])
+    assert [i["name"] for i in twice["item"]] == ["GET /users", scaffold.SCAFFOLD_FOLDER]
+    assert len(twice["item"][1]["item"]) == 2
+
+
+def test_scaffolded_tests_pass_against_the_mock_server(tmp_path, scaffolded):
+    server = mock_server.start_mock_server(NEW_SPEC)
+    url = mock_server.server_url(server)
+    try:
+        collection_path = str(tmp_path / "scaffold.json")
+        scaffold.write_scaffold(scaffolded, "postman", collection_path)
+        report = postman_runner.run_collection(collection_path, env_vars={"apiurl": url})
+        assert report["run"]["stats"]["assertions"]["failed"] == 0 and report["run"]["stats"]["assertions"]["total"] == 4
+
+        written = scaffold.write_scaffold(scaffolded, "pytest", str(tmp_path / "tests"))
+        result = subprocess.run([sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", *written], capture_output=True,
+                                text=True, env={**os.environ, "HEALAPI_MOCK_URL": url}, cwd=str(tmp_path))
+        assert result.returncode == 0, result.stdout
+    finally:
+        mock_server.stop_mock_server(server)
+
+
+def test_nothing_to_scaffold(tmp_path):
+    result = scaffold.scaffold_added_endpoints(diff_engine.diff_specs(OLD_SPEC, OLD_SPEC), OLD_SPEC, "pytest", str(tmp_path / "out"))
+    assert result == {"operations": 0, "written": []} and not (tmp_path / "out").exists()
@@ -0,0 +1,61 @@
+from healapi.script_rewriter import ScriptRewriter, response_properties
+
+SPEC = {"paths": {"/users/{id}": {"get": {"responses": {
+    "200": {"content": {"application/json": {"schema": {"properties": {"full_name": {}, "email": {}, "status": {}}}}}},
+    "404": {"content": {"application/json": {"schema": {"properties": {"error": {}}}}}},
+}}}}}
+CHANGES = {("/users/{id}", "get"): (["name"], ["full_name"])}
+
+
+def test_response_properties_cover_all_status_codes():
+    assert response_properties(SPEC, "/users/{id}", "get") == {"full_name", "email", "status", "error"}
+    assert response_properties(SPEC, "/missing", "get") == set()
+
+
+def test_rewrites_property_assertions_and_accesses():
+    lines = [
+        "var body = pm.response.json();",
+        "pm.expect(body).to.have.property('name');",
+        "pm.expect(jsonData['name']).to.eql('x');",
+        "pm.expect(pm.response.json().name).to.eql('x');",
+        "pm.expect(body).to.have.property(\"email\");",
+    ]
+    new_lines, changed = ScriptRewriter(SPEC, CHANGES).rewrite_lines(lines, "/users/{id}", "get")
+    assert changed
+    assert new_lines == [
+        "var body = pm.response.json();",
+        "pm.expect(body).to.have.property('full_name');",
+        "pm.expect(jsonData['full_name']).to.eql('x');",
+        "pm.expect(pm.response.json().full_name).to.eql('x');",
+        "pm.expect(body).to.have.property(\"email\");",
+    ]
+
+
+def test_leaves_other_variables_and_unknown_properties_alone():
+    lines = ["pm.expect(other).to.have.property('name');", "console.log(config.name);",
+             "pm.expect(jsonData).to.have.property('zzzz_unrelated');"]
+    rewriter = ScriptRewriter(SPEC, {})
+    new_lines, changed = rewriter.rewrite_lines(lines, "/users/{id}", "get")
+    assert not changed
+    assert new_lines == lines
+
+
+def test_replacement_prefers_similar_added_then_expected_properties_and_is_cached():
+    rewriter = ScriptRewriter(SPEC, CHANGES)
+    assert rewriter.replacement_for("/users/{id}", "get", "name") == "full_name"
+    assert rewriter.replacement_for("/users/{id}", "get", "emial") == "email"
+    assert ("/users/{id}", "get", "emial") in rewriter._replacements
+    # A lone added property is only a fallback when nothing expected is similar
+    assert rewriter.replacement_for("/users/{id}", "get", "zzzz") == "full_name"
+    assert ScriptRewriter(SPEC).replacement_for("/users/{id}", "get", "zzzz") is None
+
+
+def test_rewrite_item_updates_string_and_list_scripts():
+    item = {"event": [
+        {"listen": "prerequest", "script": {"exec": ["pm.expect(jsonData).to.have.property('name');"]}},
+        {"listen": "test", "script": {"exec": "pm.expect(jsonData).to.have.property('name');\n// done"}},
+        {"listen": "test", "script": {"exec": ["pm.expect(jsonData).to.have.property('email');"]}},
+    ]}
+    assert ScriptRewriter(SPEC, CHANGES).rewrite_item(item, "/users/{id}", "get") == [1]
+    assert item["event"][0]["script"]["exec"] == ["pm.expect(jsonData).to.have.property('name');"]
+    assert item["event"][1]["script"]["exec"] == "pm.expect(jsonData).to.have.property('full_name');\n// done"
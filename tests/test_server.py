@@ -0,0 +1,146 @@
+import copy
+import json
+import threading
+
+import pytest
+
+from healapi import diff_engine, llm_backends
+from healapi.llm_backends import ChatStream, LLMBackend
+from healapi.server import CachingBackend, JobQueue, LRUCache, QueueFull, WarmState, create_app
+
+OLD_SPEC = {"openapi": "3.0.0", "paths": {
+    "/users/{id}": {"get": {"responses": {"200": {"content": {"application/json": {
+        "schema": {"properties": {"name": {}, "email": {}}}}}}}}},
+    "/orders": {"get": {"responses": {"200": {}}}},
+    "/items": {"get": {"responses": {"200": {}}}},
+}}
+COLLECTION = {"item": [{"name": "orders", "request": {"method": "GET", "url": {"raw": "{{baseUrl}}/orders"}}},
+                       {"name": "items", "request": {"method": "GET", "url": {"raw": "{{baseUrl}}/items"}}}]}
+
+
+def _new_spec():
+    spec = copy.deepcopy(OLD_SPEC)
+    del spec["paths"]["/orders"]
+    del spec["paths"]["/users/{id}"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]["properties"]["email"]
+    return spec
+
+
+class ScriptedBackend(LLMBackend):
+    """Yields its answer in two chunks and counts calls."""
+    name = "scripted"
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.calls = 0
+
+    def stream_chat(self, model, messages, timeout=None):
+        self.calls += 1
+        return ChatStream(self._chunks)
+
+    def _chunks(self, stream):
+        stream.usage = {"prompt_tokens": 1, "completion_tokens": 1}
+        yield self.answer[:3]
+        yield self.answer[3:]
+
+
+@pytest.fixture
+def client():
+    jobs = JobQueue(workers=2)
+    app = create_app(WarmState(cache_size=4), jobs)
+    yield app.test_client()
+    jobs.shutdown()
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache["b"] = 2
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats() == {"size": 2, "max_size": 2, "hits": 3, "misses": 1}
+
+
+def test_caching_backend_replays_complete_answers():
+    inner, cache = ScriptedBackend("hello world"), LRUCache(4)
+    messages = [{"role": "user", "content": "hi"}]
+    backend = CachingBackend(inner, cache)
+    first = backend.stream_chat("m", messages)
+    assert "".join(first) == "hello world" and first.usage == {"prompt_tokens": 1, "completion_tokens": 1}
+    replayed = backend.stream_chat("m", messages)
+    assert list(replayed) == ["hello world"]
+    assert inner.calls == 1 and replayed.usage == {"prompt_tokens": 0, "completion_tokens": 0}
+
+    # An abandoned stream without a usable payload is not cached
+    stream = CachingBackend(ScriptedBackend('{"a": 1}'), cache).stream_chat("m", [{"role": "user", "content": "other"}])
+    next(stream)
+    stream.close()
+    assert cache.stats()["size"] == 1
+
+
+def test_warm_state_diff_matches_diff_specs_and_reuses_results():
+    state = WarmState()
+    body = {"old_spec": OLD_SPEC, "new_spec": _new_spec()}
+    first = state.run_diff(body)
+    assert first["diff"] == diff_engine.diff_specs(OLD_SPEC, _new_spec())
+    assert state.run_diff(copy.deepcopy(body))["diff_digest"] == first["diff_digest"]
+    assert state.stats()["diffs"]["hits"] == 1
+
+    # A second spec pair sharing unchanged paths reuses their per-path results
+    newer = _new_spec()
+    newer["paths"]["/extra"] = {"get": {"responses": {"200": {}}}}
+    hits = state.path_diffs.hits
+    assert state.run_diff({"old_spec": OLD_SPEC, "new_spec": newer})["diff"]["added_endpoints"] == ["/extra"]
+    assert state.path_diffs.hits > hits
+
+
+def test_warm_state_shares_one_caching_llm_backend():
+    state = WarmState(llm_options={"backend": "stub"})
+    try:
+        backend = state.llm_backend()
+        assert isinstance(backend, CachingBackend) and state.llm_backend() is backend
+        streams = [backend.stream_chat("m", [{"role": "user", "content": "p" * n}]) for n in (40, 80)]
+        for stream in streams:
+            list(stream)
+        assert [stream.usage["prompt_tokens"] for stream in streams] == [10, 20]
+    finally:
+        llm_backends.shutdown_stub_servers()
+
+
+def test_job_queue_rejects_jobs_beyond_max_pending():
+    release = threading.Event()
+    jobs = JobQueue(workers=1, max_pending=1)
+    try:
+        job = jobs.submit("wait", release.wait)
+        with pytest.raises(QueueFull):
+            jobs.submit("wait", release.wait)
+        release.set()
+        assert jobs.wait(job["id"], 5)["status"] == "done"
+        assert jobs.stats()["jobs"] == {"done": 1}
+    finally:
+        release.set()
+        jobs.shutdown()
+
+
+def test_endpoints_run_jobs(client):
+    response = client.post("/analyze?wait=5", json={"old_spec": json.dumps(OLD_SPEC), "new_spec": _new_spec(),
+                                                    "test_type": "postman", "collection": COLLECTION})
+    assert response.status_code == 200
+    assert response.get_json()["result"]["affected"] == ["orders"]
+
+    response = client.post("/heal?wait=5", json={"old_spec": OLD_SPEC, "new_spec": _new_spec(),
+                                                 "test_type": "postman", "collection": COLLECTION})
+    job = response.get_json()
+    assert job["status"] == "done" and job["result"]["healing"]["patch"]
+    assert client.get(f"/jobs/{job['id']}").get_json()["result"] == job["result"]
+
+    failed = client.post("/diff?wait=5", json={"old_spec": OLD_SPEC}).get_json()
+    assert failed["status"] == "error" and "new_spec" in failed["error"]
+
+
+def test_endpoints_validate_requests(client):
+    assert client.post("/diff", data="[]", content_type="application/json").status_code == 400
+    assert client.post("/diff?wait=soon", json={}).status_code == 400
+    assert client.get("/jobs/unknown").status_code == 404
+    health = client.get("/health").get_json()
+    assert health["status"] == "ok" and health["queue"]["workers"] == 2 and "specs" in health["caches"]
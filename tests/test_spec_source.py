@@ -0,0 +1,98 @@
+import json
+import os
+import subprocess
+
+import pytest
+
+from healapi import spec_source
+from healapi.spec_source import SpecStore
+
+SPEC = {"openapi": "3.0.0", "paths": {"/users": {"get": {"responses": {"200": {}}}}}}
+
+
+@pytest.fixture
+def repo(tmp_path):
+    path = tmp_path / "repo"
+    path.mkdir()
+    (path / "api.json").write_text(json.dumps(SPEC))
+
+    def git(*args):
+        return subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args], cwd=path, check=True,
+                              capture_output=True).stdout
+    git("init", "-q")
+    git("add", "api.json")
+    git("commit", "-qm", "spec")
+    return path, git
+
+
+def test_blob_sha_matches_git_hash_object(repo):
+    path, git = repo
+    assert spec_source.blob_sha((path / "api.json").read_bytes()) == git("hash-object", "api.json").decode().strip()
+
+
+@pytest.mark.parametrize("source", ["git:HEAD", "git::api.json", "git:HEAD:"])
+def test_invalid_git_sources(source):
+    assert spec_source.is_git_source(source)
+    with pytest.raises(ValueError):
+        spec_source.split_git_source(source)
+
+
+def test_file_and_git_blob_share_one_parse(repo):
+    path, _ = repo
+    store = SpecStore(repo=str(path))
+    from_file = store.load(str(path / "api.json"))
+    from_git = store.load("git:HEAD:api.json")
+    assert from_git is from_file and from_file == SPEC
+    assert (store.hits, store.misses) == (1, 1)
+    assert store.index(from_git) is store.index(from_file)
+    for source in ("git:HEAD:missing.json", "git:no-such-rev:api.json"):
+        with pytest.raises(FileNotFoundError):
+            store.load(source)
+
+
+def test_git_sources_outside_a_repository_raise(tmp_path):
+    with pytest.raises(ValueError):
+        SpecStore(repo=str(tmp_path)).load("git:HEAD:api.json")
+
+
+def test_disk_cache_is_reused_by_later_stores(tmp_path):
+    spec_path = tmp_path / "api.json"
+    spec_path.write_text(json.dumps(SPEC))
+    cache_dir = str(tmp_path / "cache")
+    first = SpecStore(cache_dir)
+    first.load(str(spec_path))
+    assert len(os.listdir(cache_dir)) == 1
+
+    second = SpecStore(cache_dir)
+    spec = second.load(str(spec_path))
+    assert spec == SPEC and (second.hits, second.misses) == (1, 0)
+    assert second.index(spec).operation_digest("/users", "get") == first.index(first.load(str(spec_path))).operation_digest("/users", "get")
+
+    (name,) = os.listdir(cache_dir)
+    assert name.endswith(".json.json") and json.loads((tmp_path / "cache" / name).read_text())["spec"] == SPEC
+    for content in (b"not json", b'{"version": 2, "spec": [], "operations": []}', b'{"version": 2, "spec": {}, "operations": [1]}'):
+        (tmp_path / "cache" / name).write_bytes(content)
+        third = SpecStore(cache_dir)
+        assert third.load(str(spec_path)) == SPEC and third.misses == 1
+
+
+def test_specs_json_cannot_represent_are_only_cached_in_memory(tmp_path):
+    spec_path = tmp_path / "api.yaml"
+    spec_path.write_text("paths:\n  /users:\n    get:\n      responses:\n        200: {}\n")
+    cache_dir = tmp_path / "cache"
+    store = SpecStore(str(cache_dir))
+    spec = store.load(str(spec_path))
+    assert spec["paths"]["/users"]["get"]["responses"] == {200: {}}
+    assert store.load(str(spec_path)) is spec and not cache_dir.exists()
+
+
+def test_store_evicts_least_recently_used_specs(tmp_path):
+    store = SpecStore(max_entries=1)
+    paths = []
+    for i in range(2):
+        paths.append(tmp_path / f"spec{i}.json")
+        paths[-1].write_text(json.dumps({"paths": {f"/p{i}": {}}}))
+    first = store.load(str(paths[0]))
+    store.load(str(paths[1]))
+    assert store.load(str(paths[0])) is not first and store.misses == 3
+    assert store.index(first) is not store.index(first)
@@ -0,0 +1,55 @@
+import ast
+import json
+
+from healapi import diff_engine, synthetic, test_analyzer
+
+
+def test_generate_spec_is_seeded():
+    spec = synthetic.generate_spec(40, seed=3)
+    assert spec == synthetic.generate_spec(40, seed=3) != synthetic.generate_spec(40, seed=4)
+    assert len(spec["paths"]) == 40 and sum("{id}" in path for path in spec["paths"]) == 20
+    assert len(spec["components"]["schemas"]) == 5
+
+
+def test_mutations_show_up_in_the_diff():
+    old = synthetic.generate_spec(200)
+    new, mutations = synthetic.mutate_spec(old, seed=1, renames=2, property_changes=2, removals=2, additions=2,
+                                           schema_changes=1, method_changes=2)
+    kinds = [m["kind"] for m in mutations]
+    assert {kind: kinds.count(kind) for kind in set(kinds)} == {"rename": 2, "property": 2, "remove": 2, "add": 2,
+                                                               "schema": 1, "method": 2}
+    assert old == synthetic.generate_spec(200)
+
+    diff = diff_engine.diff_specs(old, new)
+    assert sorted(diff["removed_endpoints"]) == sorted(m["path"] for m in mutations if m["kind"] == "remove")
+    assert sorted(diff["added_endpoints"]) == sorted(m["path"] for m in mutations if m["kind"] == "add")
+    assert sorted(r["from"] for r in diff["renamed_endpoints"]) == sorted(m["path"] for m in mutations if m["kind"] == "rename")
+    assert {c["path"] for c in diff["changed_endpoints"]} >= {m["path"] for m in mutations if m["kind"] == "method"}
+
+
+def test_generated_tests_are_flagged_by_the_analyzers(tmp_path):
+    old = synthetic.generate_spec(100)
+    new, mutations = synthetic.mutate_spec(old, seed=1, removals=1, method_changes=1)
+    diff = diff_engine.diff_specs(old, new)
+    collection = synthetic.generate_postman_collection(old)
+    assert sum(len(folder["item"]) for folder in collection["item"]) == sum(len(item) - ("parameters" in item) for item in old["paths"].values())
+    assert test_analyzer.analyze_collection(collection, diff)
+
+    files = synthetic.generate_pytest_suite(old, str(tmp_path / "tests"), tests_per_file=10)
+    sources = {}
+    for path in files:
+        with open(path, encoding="utf-8") as f:
+            sources[path] = f.read()
+        ast.parse(sources[path])
+    assert len(files) == 10
+    assert test_analyzer.analyze_pytest_sources(sources, diff)
+
+
+def test_write_scenario(tmp_path):
+    scenario = synthetic.write_scenario(str(tmp_path), paths=60, pytest_paths=5)
+    assert scenario["mutation_counts"] == synthetic.default_mutations(60)
+    assert json.loads((tmp_path / "scenario.json").read_text())["mutations"] == scenario["mutations"]
+    for name in scenario["files"].values():
+        assert (tmp_path / name).exists()
+    assert scenario["pytest_files"] == len(list((tmp_path / "tests").iterdir())) == 1
+    assert synthetic.write_scenario(str(tmp_path / "full"), paths=60)["pytest_files"] == 6
@@ -0,0 +1,97 @@
+import pytest
+
+from healapi import test_runner
+
+
+def _request(name):
+    return {"name": name, "request": {"method": "GET", "url": {"raw": f"{{{{baseUrl}}}}/{name}"}}}
+
+
+COLLECTION = {
+    "info": {"name": "c"},
+    "event": [{"listen": "prerequest"}],
+    "item": [
+        {"name": "users", "auth": {"type": "bearer"}, "item": [_request("u1"), _request("u2"), _request("u3")]},
+        _request("health"),
+        {"name": "orders", "item": [{"name": "nested", "item": [_request("o1")]}, _request("o2")]},
+    ],
+}
+
+
+def _names(collection):
+    names = []
+    for item in collection["item"]:
+        names.extend(_names(item) if "item" in item else [item["name"]])
+    return names
+
+
+@pytest.mark.parametrize("strategy", ["balanced", "folder"])
+def test_split_collection_keeps_every_request_in_order(strategy):
+    shards = test_runner.split_collection(COLLECTION, 3, strategy)
+    assert 1 < len(shards) <= 3
+    assert [name for shard in shards for name in _names(shard)] == _names(COLLECTION)
+    assert all(shard["info"] == COLLECTION["info"] and shard["event"] == COLLECTION["event"] for shard in shards)
+
+
+def test_balanced_split_rebuilds_folders_with_their_settings():
+    shards = test_runner.split_collection(COLLECTION, 6, "balanced")
+    assert [len(_names(shard)) for shard in shards] == [1] * 6
+    first = shards[0]["item"][0]
+    assert first["name"] == "users" and first["auth"] == {"type": "bearer"}
+
+
+def test_unknown_split_strategy_raises():
+    with pytest.raises(ValueError):
+        test_runner.split_collection(COLLECTION, 2, "random")
+
+
+def test_merge_newman_reports_pools_stats_and_timings():
+    def report(requests, average, failures):
+        return {"run": {"stats": {"requests": {"total": requests, "pending": 0, "failed": len(failures)}},
+                        "timings": {"responseAverage": average, "responseMin": average, "responseMax": average, "responseSd": 0,
+                                    "started": average, "completed": average * 10},
+                        "executions": [{}] * requests, "failures": failures}}
+
+    merged = test_runner.merge_newman_reports([report(1, 10.0, []), report(3, 30.0, [{"error": "x"}])], COLLECTION)
+    run = merged["run"]
+    assert run["stats"]["requests"] == {"total": 4, "pending": 0, "failed": 1}
+    assert run["timings"]["responseAverage"] == pytest.approx(25.0)
+    assert run["timings"]["responseMin"] == 10.0 and run["timings"]["responseMax"] == 30.0
+    assert run["timings"]["responseSd"] == pytest.approx(75 ** 0.5)
+    assert run["timings"]["started"] == 10.0 and run["timings"]["completed"] == 300.0
+    assert len(run["executions"]) == 4 and run["failures"] == [{"error": "x"}]
+    assert merged["collection"]["info"] == {"name": "c"}
+
+
+def test_shard_pytest_ids_balances_by_duration_and_keeps_order():
+    ids = [f"t.py::test_{i}" for i in range(6)]
+    durations = {ids[0]: 10.0, ids[1]: 1.0, ids[2]: 1.0, ids[3]: 1.0, ids[4]: 1.0}
+    shards = test_runner.shard_pytest_ids(ids, 2, durations)
+    assert sorted(sum(shards, [])) == sorted(ids)
+    assert [ids[0]] in shards
+    assert all(shard == sorted(shard, key=ids.index) for shard in shards)
+    assert test_runner.shard_pytest_ids(ids[:1], 4) == [ids[:1]]
+
+
+def test_merge_pytest_reports_sums_and_orders():
+    first = {"created": 5, "duration": 2.0, "exitcode": 0, "summary": {"passed": 1, "total": 1},
+             "tests": [{"nodeid": "b"}]}
+    second = {"created": 3, "duration": 4.0, "exitcode": 1, "summary": {"passed": 1, "failed": 1, "total": 2},
+              "tests": [{"nodeid": "c"}, {"nodeid": "a"}]}
+    merged = test_runner.merge_pytest_reports([first, second], node_order=["a", "b", "c"])
+    assert merged["summary"] == {"passed": 2, "failed": 1, "total": 3}
+    assert [t["nodeid"] for t in merged["tests"]] == ["a", "b", "c"]
+    assert (merged["created"], merged["duration"], merged["exitcode"]) == (3, 4.0, 1)
+
+
+@pytest.mark.parametrize("content", ["{not json", "[1, 2]", '{"t.py::a": "slow", "t.py::b": 2}'])
+def test_durations_file_is_optional_and_tolerates_bad_content(tmp_path, content):
+    assert test_runner._load_durations(None) == {} and test_runner._load_durations(str(tmp_path / "none.json")) == {}
+    path = tmp_path / "cache" / "durations.json"
+    path.parent.mkdir()
+    path.write_text(content)
+    report = {"tests": [{"nodeid": "t.py::a", "setup": {"duration": 0.5}, "call": {"duration": 1.0}}]}
+    test_runner._save_durations(str(path), report)
+    expected = {"t.py::a": 1.5, "t.py::b": 2.0} if content.startswith('{"') else {"t.py::a": 1.5}
+    assert test_runner._load_durations(str(path)) == expected
+    assert [p.name for p in path.parent.iterdir()] == ["durations.json"]
@@ -0,0 +1,79 @@
+import json
+import os
+
+from healapi.llm_backends import LLMBackend
+from healapi.watch import WatchSession
+
+
+def _spec(user_props, extra_paths=()):
+    paths = {"/users/{id}": {"get": {"responses": {"200": {"content": {"application/json": {
+        "schema": {"properties": {p: {"type": "string"} for p in user_props}}}}}}}}}
+    for path in extra_paths:
+        paths[path] = {"get": {"responses": {"200": {}}}}
+    return {"openapi": "3.0.0", "paths": paths}
+
+
+def _write(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(data if isinstance(data, str) else json.dumps(data))
+    # Distinct stat signatures even within one mtime tick
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+def _session(tmp_path, test_type, test_path, **kwargs):
+    old, new = tmp_path / "old.json", tmp_path / "new.json"
+    _write(old, _spec(["name"], ["/orders"]))
+    _write(new, _spec(["name"], ["/orders"]))
+    return WatchSession(str(old), str(new), test_type, str(test_path), **kwargs), str(new)
+
+
+class OfflineBackend(LLMBackend):
+    """Backend without a default model, so healing never calls it."""
+
+    def stream_chat(self, model, messages, timeout=None):
+        raise AssertionError("no LLM call expected")
+
+
+def test_cycles_recompute_only_on_content_changes(tmp_path):
+    collection = tmp_path / "collection.json"
+    _write(collection, {"item": [{"name": "orders", "request": {"method": "GET", "url": {"raw": "{{baseUrl}}/orders"}}}]})
+    session, new = _session(tmp_path, "postman", collection)
+
+    first = session.run_cycle(session.poll())
+    assert first["stale"] and session.affected == []
+    assert session.run_cycle(session.poll())["stale"] is False
+
+    # Same content rewritten: a new signature but nothing to recompute
+    _write(new, _spec(["name"], ["/orders"]))
+    assert session.run_cycle(session.poll())["stale"] is False
+
+    _write(new, _spec(["name"]))
+    result = session.run_cycle(session.poll())
+    assert result["stale"] and set(result["timings"]) >= {"parse_lint", "diff", "analyze", "heal"}
+    assert session.diff["removed_endpoints"] == ["/orders"]
+    assert session.affected == ["orders"]
+    assert session.healing["healed_postman_requests"]
+    assert json.loads(collection.read_text())["item"][0]["name"] == "orders"
+
+
+def test_pytest_files_heal_as_dry_run_and_only_when_stale(tmp_path):
+    tests = tmp_path / "tests"
+    tests.mkdir()
+    source = 'import requests\n\ndef test_orders():\n    requests.get("/orders")\n'
+    _write(tests / "test_orders.py", source)
+    _write(tests / "test_users.py", 'def test_users():\n    assert "/users/1"\n')
+    session, new = _session(tmp_path, "pytest", tests, heal_options={"llm_backend": OfflineBackend()})
+
+    session.run_cycle(session.poll())
+    assert session.affected == []
+    _write(new, {**_spec(["name"]), "paths": {**_spec(["name"])["paths"], "/orders": {"post": {"responses": {"200": {}}}}}})
+    session.run_cycle(session.poll())
+    assert session.affected == [str(tests / "test_orders.py")]
+    assert [a["file"] for a in session.healing["healed_pytest_files"]] == session.affected
+    assert (tests / "test_orders.py").read_text() == source
+
+    cached = session._heal_cache[str(tests / "test_orders.py")]
+    _write(tests / "test_users.py", 'def test_users():\n    assert "/users/2"\n')
+    assert session.run_cycle(session.poll())["stale"]
+    assert session._heal_cache[str(tests / "test_orders.py")] is cached